@@ -19,8 +19,16 @@ from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+import asset_scheduler
+import gee_session
+import geo_cache
+import model_registry
+import network_cache
+import single_flight
+import user_cache
 from auth import router as auth_router
 from database import Base, engine
+from models import create_missing_indexes
 
 # Router imports
 from routers.agriculture import router as agriculture_router
@@ -99,6 +107,13 @@ app.include_router(opportunities_router)
 async def _create_auth_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
+
+
+@app.on_event("startup")
+async def _load_models():
+    """Warm up the surrogate models as configured by MODEL_LOADING."""
+    await model_registry.start_loading()
 
 
 @app.on_event("startup")
@@ -118,6 +133,13 @@ def health() -> dict:
         "status": "awake",
         "environment": "production",
         "timestamp": datetime.now().isoformat(),
+        "gee_session": gee_session.get_metrics(),
+        "geo_cache": geo_cache.get_stats(),
+        "single_flight": single_flight.get_metrics(),
+        "models": model_registry.get_metrics(),
+        "auth": user_cache.get_stats(),
+        "supply_chain_graphs": network_cache.get_stats(),
+        "portfolio_scheduler": asset_scheduler.get_metrics(),
     }
 
 
@@ -0,0 +1,254 @@
+"""
+Bounded Asset Scheduler
+=======================
+
+/api/v1/portfolio/analyze-csv used to hand every batch of a portfolio to
+``asyncio.gather`` at once: all batches were queued on the default thread
+pool up front, every result was held until the last batch finished, and
+nothing bounded how long one asset could take or noticed that the client
+had gone away.
+
+``AssetScheduler.run`` runs a function over a stream of assets on a
+dedicated pool of PORTFOLIO_CONCURRENCY threads and yields each result as
+it completes. Threads rather than processes: an asset's time goes to Earth
+Engine round trips (run_simulation -> gee_connector), which release the GIL,
+and the worker threads share the process's Earth Engine session, lookup
+cache and single-flight group, which a process pool would have to rebuild
+per process. The pool is therefore sized for concurrent lookups, not for
+the CPU count.
+
+- Back-pressure: a run keeps at most ``concurrency`` assets pending (running
+  or waiting for a thread) and takes the next asset from the input iterator
+  only after one of them has been yielded, so a consumer that stops reading
+  stops the run from starting new assets. An ``asyncio.Semaphore`` with one
+  slot per pool thread admits assets to the pool, so concurrent runs share
+  it without queueing work behind each other on the executor.
+- Timeouts: an asset running longer than PORTFOLIO_ASSET_TIMEOUT seconds, or
+  not given a thread within that time, is reported as failed with
+  ``TimeoutError``. A Python thread cannot be killed, so a timed-out asset
+  keeps its thread and slot until it returns (its result is then
+  discarded); once every thread is held that way, the remaining assets time
+  out waiting for one.
+- Cancellation: ``cancelled`` (e.g. ``request.is_disconnected``) is polled
+  every PORTFOLIO_CANCEL_POLL seconds; once it returns True, assets not yet
+  started are dropped and ``AssetsCancelled`` is raised. Assets already
+  running finish in the background and their results are discarded.
+  Closing the generator early has the same effect.
+- Progress: each run counts assets done, in flight, failed and timed out;
+  ``get_metrics`` reports the active runs and process-wide totals.
+
+Usage:
+    from asset_scheduler import default_scheduler
+
+    async for index, result, error in default_scheduler.run(simulate, rows):
+        ...
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Assets simulated in parallel per worker process (concurrent Earth Engine lookups)
+PORTFOLIO_CONCURRENCY = int(os.environ.get("PORTFOLIO_CONCURRENCY", "16"))
+
+# Seconds an asset may run, or wait for a thread, before it is reported as failed (0 disables)
+PORTFOLIO_ASSET_TIMEOUT = float(os.environ.get("PORTFOLIO_ASSET_TIMEOUT", "60"))
+
+# Seconds between client-disconnect checks while assets are running
+PORTFOLIO_CANCEL_POLL = float(os.environ.get("PORTFOLIO_CANCEL_POLL", "0.25"))
+
+
+class AssetsCancelled(Exception):
+    """Raised by ``AssetScheduler.run`` when its ``cancelled`` callback returned True."""
+
+
+class RunProgress:
+    """Live counters of one scheduler run."""
+
+    def __init__(self, total: Optional[int] = None):
+        self.total = total
+        self.done = 0
+        self.in_flight = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.started_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'done': self.done,
+            'in_flight': self.in_flight,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+            'elapsed_s': round(time.monotonic() - self.started_at, 3),
+        }
+
+
+class _AssetTimeout(TimeoutError):
+    """TimeoutError raised by the scheduler, as opposed to one raised by the asset's function."""
+
+
+class AssetScheduler:
+    """Runs a function over assets on a bounded thread pool, yielding results as they complete."""
+
+    def __init__(
+        self,
+        concurrency: int = PORTFOLIO_CONCURRENCY,
+        timeout: float = PORTFOLIO_ASSET_TIMEOUT,
+        cancel_poll: float = PORTFOLIO_CANCEL_POLL,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.cancel_poll = cancel_poll
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # One slot per pool thread; asyncio primitives belong to one event loop
+        self._slots: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+        self._runs: List[RunProgress] = []
+        self._counters = {'total_runs': 0, 'cancelled_runs': 0, 'assets_done': 0, 'assets_failed': 0, 'assets_timed_out': 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='asset-scheduler')
+            return self._executor
+
+    def _loop_slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.concurrency)
+            return slots
+
+    async def _run_asset(
+        self, fn: Callable[[Any, int], Any], item: Any, index: int, progress: RunProgress,
+    ) -> Tuple[int, Any, Optional[BaseException]]:
+        """Run ``fn(item, index)`` on a pool thread once one is free; errors are returned, not raised."""
+        loop = asyncio.get_running_loop()
+        slots = self._loop_slots(loop)
+        limit = self.timeout if self.timeout > 0 else None
+        try:
+            await asyncio.wait_for(slots.acquire(), limit)
+        except TimeoutError:
+            return index, None, _AssetTimeout(f"Asset {index} not started within {self.timeout:g}s")
+
+        future = loop.run_in_executor(self._pool(), fn, item, index)
+        # The slot is free again only when the thread is, even after a timeout
+        future.add_done_callback(lambda _: slots.release())
+        progress.in_flight += 1
+        try:
+            # asyncio.wait leaves the future running when it times out or this task is cancelled
+            done, _ = await asyncio.wait((future,), timeout=limit)
+        finally:
+            progress.in_flight -= 1
+        if not done:
+            return index, None, _AssetTimeout(f"Asset {index} exceeded {self.timeout:g}s")
+        try:
+            return index, future.result(), None
+        except Exception as e:
+            return index, None, e
+
+    async def run(
+        self,
+        fn: Callable[[Any, int], Any],
+        items: Iterable[Any],
+        cancelled: Optional[Callable[[], Awaitable[bool]]] = None,
+        is_failure: Optional[Callable[[Any], bool]] = None,
+        progress: Optional[RunProgress] = None,
+    ) -> AsyncIterator[Tuple[int, Any, Optional[BaseException]]]:
+        """
+        Run ``fn(item, index)`` for every item, yielding results in completion order.
+
+        Args:
+            fn: Function executed on a scheduler thread for each item
+            items: Assets to process; consumed lazily, as results are yielded
+            cancelled: Async callback polled while waiting; True stops the run
+            is_failure: Counts a returned result as failed in the progress counters
+            progress: Counters to update (a new RunProgress when omitted)
+
+        Yields:
+            (index, result, error) tuples: ``error`` is the exception raised by
+            ``fn`` (or a TimeoutError) and ``result`` is None when it is set
+
+        Raises:
+            AssetsCancelled: ``cancelled`` returned True
+        """
+        progress = progress or RunProgress()
+        source = enumerate(items)
+        exhausted = False
+        pending: Set[asyncio.Task] = set()
+        next_poll = time.monotonic() + self.cancel_poll
+        with self._lock:
+            self._runs.append(progress)
+            self._counters['total_runs'] += 1
+        try:
+            while True:
+                while not exhausted and len(pending) < self.concurrency:
+                    entry = next(source, None)
+                    if entry is None:
+                        exhausted = True
+                    else:
+                        index, item = entry
+                        pending.add(asyncio.create_task(self._run_asset(fn, item, index, progress)))
+                if not pending:
+                    return
+
+                wait = max(0.0, next_poll - time.monotonic()) if cancelled is not None else None
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, result, error = task.result()
+                    progress.done += 1
+                    if isinstance(error, _AssetTimeout):
+                        progress.timed_out += 1
+                    if error is not None or (is_failure is not None and is_failure(result)):
+                        progress.failed += 1
+                    yield index, result, error
+
+                if cancelled is not None and time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + self.cancel_poll
+                    if await cancelled():
+                        with self._lock:
+                            self._counters['cancelled_runs'] += 1
+                        raise AssetsCancelled(f"Run cancelled after {progress.done} assets")
+        finally:
+            # Assets not yet started are dropped; running ones finish on their thread
+            for task in pending:
+                task.cancel()
+            with self._lock:
+                self._runs.remove(progress)
+                self._counters['assets_done'] += progress.done
+                self._counters['assets_failed'] += progress.failed
+                self._counters['assets_timed_out'] += progress.timed_out
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics: Dict[str, Any] = dict(self._counters)
+            runs = [run.to_dict() for run in self._runs]
+        # Totals include the runs still in progress
+        metrics['assets_done'] += sum(run['done'] for run in runs)
+        metrics['assets_failed'] += sum(run['failed'] for run in runs)
+        metrics['assets_timed_out'] += sum(run['timed_out'] for run in runs)
+        metrics['assets_in_flight'] = sum(run['in_flight'] for run in runs)
+        metrics['active_runs'] = runs
+        metrics['concurrency'] = self.concurrency
+        metrics['asset_timeout_s'] = self.timeout
+        return metrics
+
+
+# Process-wide scheduler used by routers.portfolio
+default_scheduler = AssetScheduler()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Metrics for the process-wide scheduler."""
+    return default_scheduler.get_metrics()
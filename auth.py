@@ -8,14 +8,15 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import user_cache
 from database import get_db
 from models import User
 from schemas import MeResponse, TokenResponse, UserCreate, UserLogin
 from security import (
     create_access_token,
     decode_access_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
 )
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -23,12 +24,7 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 bearer_scheme = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Dependency that extracts and validates the JWT from the Authorization header."""
-    token = credentials.credentials
+async def _authenticate(token: str, db: AsyncSession, trust_claims: bool) -> User:
     try:
         payload = decode_access_token(token)
         user_id: str | None = payload.get("sub")
@@ -46,15 +42,48 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
+    if trust_claims:
+        user = user_cache.user_from_claims(payload)
+        if user is not None:
+            return user
+
+    cache = user_cache.default_cache
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+
+    cache.record_query()
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
+    cache.put(user)
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Dependency that extracts and validates the JWT from the Authorization header.
+
+    The user is served from user_cache (or, in signed-claims mode, from the
+    token itself) when possible, so most requests skip the users table.
+    """
+    return await _authenticate(credentials.credentials, db, trust_claims=True)
+
+
+async def get_verified_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Like ``get_current_user`` but never trusts token claims alone, so the
+    user is known to exist (cached for at most AUTH_USER_CACHE_TTL_S)."""
+    return await _authenticate(credentials.credentials, db, trust_claims=False)
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(body: UserCreate, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == body.email))
@@ -64,12 +93,12 @@ async def register(body: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="A user with this email already exists",
         )
 
-    user = User(email=body.email, hashed_password=hash_password(body.password))
+    user = User(email=body.email, hashed_password=await hash_password_async(body.password))
     db.add(user)
     await db.commit()
     await db.refresh(user)
 
-    token = create_access_token(subject=user.id)
+    token = create_access_token(subject=user.id, extra_claims={"email": user.email})
     return TokenResponse(access_token=token)
 
 
@@ -78,16 +107,16 @@ async def login(body: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == body.email))
     user = result.scalar_one_or_none()
 
-    if user is None or not verify_password(body.password, user.hashed_password):
+    if user is None or not await verify_password_async(body.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    token = create_access_token(subject=user.id)
+    token = create_access_token(subject=user.id, extra_claims={"email": user.email})
     return TokenResponse(access_token=token)
 
 
 @router.get("/me", response_model=MeResponse)
-async def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: User = Depends(get_verified_user)):
     return current_user
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: portfolio asset scheduling, throughput and peak RSS.
+
+Simulates synthetic portfolio rows (see bench_portfolio_csv.py) three ways:
+
+- gather: every batch of 250 rows handed to ``asyncio.gather`` at once on
+  the default thread pool (the previous analyze-csv implementation);
+- scheduler: /api/v1/portfolio/analyze-csv's ``run_assets`` on the bounded
+  asset scheduler, results collected in row order;
+- streamed: the scheduler with each result dropped once it is counted,
+  i.e. the memory floor of a streaming consumer.
+
+Each run happens in a fresh child process so its peak RSS (ru_maxrss) is
+its own. The legacy per-row subprocess fan-out is not repeated here; it is
+covered, on a few rows, by bench_portfolio_csv.py.
+
+Usage:
+    python benchmarks/bench_asset_scheduler.py --rows 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_portfolio_csv import synthetic_rows  # noqa: E402
+
+MODES = ("gather", "scheduler", "streamed")
+
+
+def _run_batch(rows: list, start_index: int) -> list:
+    from routers.portfolio import run_asset_simulation
+
+    return [run_asset_simulation(row, start_index + offset) for offset, row in enumerate(rows)]
+
+
+async def _gather(rows: list) -> int:
+    batches = await asyncio.gather(*(
+        asyncio.to_thread(_run_batch, rows[start:start + 250], start)
+        for start in range(0, len(rows), 250)
+    ))
+    return sum(len(batch) for batch in batches)
+
+
+async def _scheduler(rows: list) -> int:
+    from routers.portfolio import run_assets
+
+    return len(await run_assets(rows))
+
+
+async def _streamed(rows: list) -> int:
+    from asset_scheduler import default_scheduler
+    from routers.portfolio import run_asset_simulation
+
+    count = 0
+    async for _ in default_scheduler.run(run_asset_simulation, rows):
+        count += 1
+    return count
+
+
+def _child(mode: str, n_rows: int) -> None:
+    rows = synthetic_rows(n_rows)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = asyncio.run({"gather": _gather, "scheduler": _scheduler, "streamed": _streamed}[mode](rows))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"rows": count, "seconds": elapsed, "peak_kb": peak, "baseline_kb": baseline}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'rows':>7} {'mode':<10} {'seconds':>9} {'rows/sec':>10} {'peak RSS':>10} {'growth':>10}")
+    print("=" * 62)
+    for n_rows in args.rows:
+        for mode in args.modes:
+            out = subprocess.run([sys.executable, __file__, "--child", mode, str(n_rows)],
+                                 capture_output=True, text=True, check=True).stdout
+            stats = json.loads(out.strip().splitlines()[-1])
+            print(f"{n_rows:>7,} {mode:<10} {stats['seconds']:>8.2f}s {stats['rows'] / stats['seconds']:>10.0f} "
+                  f"{stats['peak_kb'] / 1024:>8.0f}MB {(stats['peak_kb'] - stats['baseline_kb']) / 1024:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
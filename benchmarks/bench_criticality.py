@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark: node criticality index vs one cascade query per node.
+
+Builds tiered supply chain networks (see bench_cascade_engine.py) and times
+each criticality_engine metric for all nodes at once. The alternative it
+replaces, one nx.descendants call per node on a networkx.DiGraph, is timed
+on a sample of nodes and extrapolated to the whole network.
+
+Usage:
+    python benchmarks/bench_criticality.py --nodes 1000 10000 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import networkx as nx  # noqa: E402
+
+from bench_cascade_engine import tiered_network  # noqa: E402
+from criticality_engine import betweenness, dominated_nodes, downstream_reach  # noqa: E402
+from network_cache import CompiledNetwork  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--per-node-samples", type=int, default=50, help="Nodes timed with nx.descendants")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>9} {'edges':>9} {'reach':>9} {'dominators':>11} {'betweenness':>12} {'total':>9} {'per-node nx':>13}")
+    print("=" * 80)
+    for n_nodes in args.nodes:
+        nodes, edges = tiered_network(n_nodes)
+        network = CompiledNetwork.compile("bench", nodes, edges)
+
+        timings = []
+        for metric in (downstream_reach, dominated_nodes, betweenness):
+            start = time.perf_counter()
+            metric(network)
+            timings.append(time.perf_counter() - start)
+
+        G = nx.DiGraph()
+        G.add_nodes_from(range(n_nodes))
+        G.add_edges_from((s, int(t)) for s in range(n_nodes) for t in network.successors(s))
+        sample = random.Random(0).sample(range(n_nodes), min(args.per_node_samples, n_nodes))
+        start = time.perf_counter()
+        for v in sample:
+            nx.descendants(G, v)
+        per_node = (time.perf_counter() - start) / len(sample) * n_nodes
+
+        print(f"{n_nodes:>9,} {network.num_edges:>9,} " + " ".join(f"{t:>8.2f}s" for t in timings[:1])
+              + f" {timings[1]:>10.2f}s {timings[2]:>11.2f}s {sum(timings):>8.2f}s {per_node:>12.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark: sklearn vs compiled flat-array random forest inference.
+
+The production pickles are Git LFS objects, so a forest with the flood
+surrogate's hyperparameters is trained on its synthetic data generator.
+
+Usage:
+    python benchmarks/bench_forest_compiler.py --trees 100 --rows 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+
+import train_flood_surrogate  # noqa: E402
+from forest_compiler import CompiledForest  # noqa: E402
+
+FEATURES = ['rain_intensity_mm_hr', 'impervious_pct', 'slope_pct']
+
+
+def best_of(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=5000, help="Training set size")
+    parser.add_argument("--rows", type=int, default=20000, help="Batch size to score")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    df = train_flood_surrogate.generate_synthetic_flood_data(n_samples=args.samples)
+    X, y = df[FEATURES].values, df['flood_depth_cm'].values
+    model = RandomForestRegressor(n_estimators=args.trees, max_depth=20, min_samples_split=5,
+                                  min_samples_leaf=2, random_state=42).fit(X, y)
+    forest = CompiledForest.from_sklearn(model)
+
+    rng = np.random.default_rng(1)
+    batch = X[rng.integers(0, len(X), args.rows)] * rng.uniform(0.9, 1.1, (args.rows, X.shape[1]))
+    assert np.array_equal(forest.predict(batch), model.predict(batch))
+
+    print(f"Random forest inference: {args.trees} trees, max depth {forest.max_depth}")
+    print("=" * 72)
+    for label, data, repeat in (("single row", batch[:1], args.repeat * 20),
+                                ("64 rows", batch[:64], args.repeat * 5),
+                                (f"{args.rows} rows", batch, args.repeat)):
+        sklearn_ms = best_of(model.predict, data, repeat)
+        compiled_ms = best_of(forest.predict, data, repeat)
+        print(f"  {label:<12} sklearn {sklearn_ms:9.2f} ms   compiled {compiled_ms:9.2f} ms"
+              f"   {sklearn_ms / compiled_ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
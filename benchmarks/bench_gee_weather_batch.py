@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark: per-point vs batched GEE weather retrieval (offline).
+
+Runs gee_connector against the MockEarthEngine test double with a simulated
+per-getInfo() latency, so round-trip savings can be measured without
+credentials.
+
+Usage:
+    python benchmarks/bench_gee_weather_batch.py --points 200 --latency-ms 150
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import gee_connector  # noqa: E402
+import geo_cache  # noqa: E402
+from mock_earth_engine import MockEarthEngine  # noqa: E402
+
+DATES = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=150.0,
+                        help="Simulated latency per getInfo() round trip")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    points = [(rng.uniform(-50, 60), rng.uniform(-170, 170)) for _ in range(args.points)]
+
+    fake_ee = MockEarthEngine(latency_s=args.latency_ms / 1000.0)
+    gee_connector.ee = fake_ee
+    gee_connector.authenticate_gee = lambda: None
+    # Measure round trips, not cache hits
+    geo_cache.default_cache = geo_cache.GeoCache(path=None, enabled=False)
+
+    print(f"GEE weather retrieval: {args.points} points, {args.latency_ms:.0f} ms per round trip")
+    print("=" * 72)
+
+    start = time.perf_counter()
+    for lat, lon in points:
+        gee_connector.get_weather_data(lat, lon, **DATES)
+    sequential_s = time.perf_counter() - start
+    print(f"  get_weather_data (loop)    {fake_ee.getinfo_calls:>5} getInfo  {sequential_s:8.2f} s")
+
+    fake_ee.getinfo_calls = 0
+    start = time.perf_counter()
+    gee_connector.get_weather_data_many(points, **DATES)
+    batched_s = time.perf_counter() - start
+    print(f"  get_weather_data_many      {fake_ee.getinfo_calls:>5} getInfo  {batched_s:8.2f} s")
+    print(f"\n  Speedup: {sequential_s / batched_s:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
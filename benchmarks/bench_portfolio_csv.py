@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark: portfolio CSV simulation throughput (rows/sec).
+
+Compares the legacy per-row ``headless_runner.py`` subprocess fan-out with the
+in-process ``simulation_engine`` runs on the bounded asset scheduler used by
+/api/v1/portfolio/analyze-csv.
+
+Usage:
+    python benchmarks/bench_portfolio_csv.py --rows 5000 --legacy-rows 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from routers.portfolio import run_assets  # noqa: E402
+
+CROPS = ["maize", "cocoa", "rice", "soy", "wheat"]
+
+
+def synthetic_rows(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "lat": round(rng.uniform(-40, 50), 4),
+            "lon": round(rng.uniform(-120, 140), 4),
+            "asset_value": round(rng.uniform(1e5, 5e6), 2),
+            "crop_type": rng.choice(CROPS),
+        }
+        for _ in range(n)
+    ]
+
+
+async def _legacy_single(row: dict) -> int:
+    """Replicates the pre-simulation_engine subprocess call for one row."""
+    cmd = [
+        sys.executable, str(REPO_ROOT / "headless_runner.py"),
+        "--lat", str(row["lat"]), "--lon", str(row["lon"]),
+        "--scenario_year", "2050",
+        "--project_type", "agriculture",
+        "--crop_type", row["crop_type"],
+    ]
+    env = os.environ.copy()
+    env["FINANCIAL_CAPEX"] = str(row["asset_value"])
+    env["FINANCIAL_OPEX"] = str(row["asset_value"] * 0.1)
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        cwd=str(REPO_ROOT), env=env,
+    )
+    await process.communicate()
+    return process.returncode
+
+
+async def _legacy(rows: list) -> None:
+    await asyncio.gather(*(_legacy_single(r) for r in rows))
+
+
+async def _in_process(rows: list) -> list:
+    return await run_assets(rows)
+
+
+def _timed(label: str, coro, n: int) -> float:
+    start = time.perf_counter()
+    asyncio.run(coro)
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<28} {n:>7} rows  {elapsed:8.2f} s  {rate:10.1f} rows/sec")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="Rows for the in-process run")
+    parser.add_argument("--legacy-rows", type=int, default=100,
+                        help="Rows for the subprocess run (0 to skip; it is slow)")
+    args = parser.parse_args()
+
+    print("Portfolio CSV simulation throughput")
+    print("=" * 72)
+    legacy_rate = None
+    if args.legacy_rows > 0:
+        legacy_rate = _timed("subprocess (legacy)", _legacy(synthetic_rows(args.legacy_rows)),
+                             args.legacy_rows)
+    rate = _timed("in-process scheduler", _in_process(synthetic_rows(args.rows)), args.rows)
+    if legacy_rate:
+        print(f"\n  Speedup: {rate / legacy_rate:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
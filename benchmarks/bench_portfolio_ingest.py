@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark: portfolio CSV ingestion, vectorized vs per-row parsing.
+
+Generates synthetic portfolio CSVs (suffixed and formatted asset values
+such as "5m", "$200,000" or "1.5B", plus two extra columns) and times
+routers.portfolio.parse_portfolio_csv against the per-row parser it
+replaced (df.iterrows, one regex per value, one dict per row). The per-row
+parser is timed on --legacy-rows rows and extrapolated.
+
+Usage:
+    python benchmarks/bench_portfolio_ingest.py --rows 100000 1000000 --legacy-rows 100000
+"""
+
+import argparse
+import io
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+
+from routers.portfolio import parse_portfolio_csv  # noqa: E402
+
+CROPS = ["maize", "cocoa", "rice", "soy", "wheat"]
+
+
+def synthetic_csv(n: int, seed: int = 42) -> bytes:
+    rng = random.Random(seed)
+    lines = ["latitude,longitude,asset_value_usd,crop_type,owner,region"]
+    for i in range(n):
+        amount = rng.uniform(1, 900)
+        value = rng.choice([f"{amount:.1f}m", f"{amount:.0f}k", f"${amount * 1000:,.0f}", f"{amount / 100:.2f}B", f"{amount * 1e4:.2f}"])
+        lines.append(f"{rng.uniform(-40, 50):.4f},{rng.uniform(-120, 140):.4f},\"{value}\","
+                     f"{rng.choice(CROPS)},owner{i % 97},R{i % 13}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def legacy_parse(contents: bytes) -> list:
+    """The per-row parser parse_portfolio_csv replaced."""
+    df = pd.read_csv(io.BytesIO(contents))
+    df.columns = df.columns.astype(str).str.lower().str.replace(r"[^a-z0-9_]", "", regex=True)
+    lat_col = next((c for c in df.columns if "lat" in c), "lat")
+    lon_col = next((c for c in df.columns if "lon" in c or "lng" in c), "lon")
+    val_col = next((c for c in df.columns if any(x in c for x in ["val", "price", "amount", "cost", "invest", "usd"])), None)
+    crop_col = next((c for c in df.columns if "crop" in c), "crop_type")
+    df.dropna(how="all", inplace=True)
+    df.dropna(axis=1, how="all", inplace=True)
+    records = []
+    for _, row in df.iterrows():
+        raw_val = str(row.get(val_col, "0")).lower()
+        multiplier = 1
+        if "m" in raw_val:
+            multiplier = 1000000
+        elif "k" in raw_val:
+            multiplier = 1000
+        elif "b" in raw_val:
+            multiplier = 1000000000
+        clean_val = re.sub(r"[^0-9.]", "", raw_val)
+        try:
+            val = float(clean_val) * multiplier if clean_val else 0.0
+        except ValueError:
+            val = 0.0
+        record = {"lat": float(row.get(lat_col, 0.0)), "lon": float(row.get(lon_col, 0.0)),
+                  "asset_value": val, "crop_type": str(row.get(crop_col, "unknown"))}
+        for col in df.columns:
+            if col not in (lat_col, lon_col, val_col, crop_col):
+                record[col] = row.get(col)
+        records.append(record)
+    return records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--legacy-rows", type=int, default=100000, help="Rows timed with the per-row parser (0 to skip)")
+    args = parser.parse_args()
+
+    legacy_per_row = None
+    if args.legacy_rows > 0:
+        contents = synthetic_csv(args.legacy_rows)
+        start = time.perf_counter()
+        legacy_parse(contents)
+        legacy_per_row = (time.perf_counter() - start) / args.legacy_rows
+
+    print(f"{'rows':>9} {'MB':>7} {'read_csv':>9} {'vectorized':>11} {'per-row':>10} {'speedup':>8}")
+    print("=" * 60)
+    for n_rows in args.rows:
+        contents = synthetic_csv(n_rows)
+        start = time.perf_counter()
+        pd.read_csv(io.BytesIO(contents))
+        read_only = time.perf_counter() - start
+
+        start = time.perf_counter()
+        records, _ = parse_portfolio_csv(contents)
+        elapsed = time.perf_counter() - start
+        assert len(records) == n_rows
+
+        legacy = f"~{legacy_per_row * n_rows:>8.1f}s" if legacy_per_row else f"{'-':>9}"
+        speedup = f"{legacy_per_row * n_rows / elapsed:>7.0f}x" if legacy_per_row else ""
+        print(f"{n_rows:>9,} {len(contents) / 1e6:>7.1f} {read_only:>8.2f}s {elapsed:>10.2f}s {legacy} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
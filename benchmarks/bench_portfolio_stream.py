@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmark: streamed vs collected portfolio analysis, first result and peak RSS.
+
+Runs synthetic portfolio rows (see bench_portfolio_csv.py) through:
+
+- collected: analyze-csv's path, all results gathered, the summary
+  aggregated and the whole body serialized as one JSON document;
+- stream: analyze-csv/stream's ``stream_assets``, each NDJSON line
+  serialized and discarded as a client would receive it.
+
+Time to first result is when the first asset result can be sent (the whole
+run for the collected body). Each run happens in a fresh child process so
+its peak RSS (ru_maxrss) is its own.
+
+Usage:
+    python benchmarks/bench_portfolio_stream.py --rows 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_portfolio_csv import synthetic_rows  # noqa: E402
+
+MODES = ("collected", "stream")
+
+
+async def _collected(rows: list, start: float) -> float:
+    from routers.portfolio import PortfolioAggregator, run_assets
+
+    results = await run_assets(rows)
+    aggregator = PortfolioAggregator()
+    for result in results:
+        aggregator.add(result)
+    json.dumps({"portfolio_summary": aggregator.summary({}), "asset_results": results})
+    return time.perf_counter() - start
+
+
+async def _stream(rows: list, start: float) -> float:
+    from routers.portfolio import stream_assets
+
+    first = None
+    async for line in stream_assets(rows, {}):
+        if first is None and line.startswith('{"type":"asset_result"'):
+            first = time.perf_counter() - start
+    return first
+
+
+def _child(mode: str, n_rows: int) -> None:
+    from routers.portfolio import run_asset_simulation
+
+    rows = synthetic_rows(n_rows)
+    # The first simulation in a process pays for lazy imports; a server is past that
+    run_asset_simulation(dict(rows[0]), 0)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    first = asyncio.run({"collected": _collected, "stream": _stream}[mode](rows, start))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"first": first, "seconds": elapsed, "peak_kb": peak, "baseline_kb": baseline}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'rows':>7} {'mode':<10} {'first result':>13} {'total':>9} {'peak RSS':>10} {'growth':>10}")
+    print("=" * 64)
+    for n_rows in args.rows:
+        for mode in MODES:
+            out = subprocess.run([sys.executable, __file__, "--child", mode, str(n_rows)],
+                                 capture_output=True, text=True, check=True).stdout
+            stats = json.loads(out.strip().splitlines()[-1])
+            print(f"{n_rows:>7,} {mode:<10} {stats['first'] * 1000:>10.1f} ms {stats['seconds']:>8.2f}s "
+                  f"{stats['peak_kb'] / 1024:>8.0f}MB {(stats['peak_kb'] - stats['baseline_kb']) / 1024:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Benchmark: threaded scalar vs vectorized sensitivity analysis over Atlas locations.
+
+Usage:
+    python benchmarks/bench_sensitivity.py --locations 100000
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from physics_engine import SUPPORTED_CROPS  # noqa: E402
+from sensitivity_engine import run_parallel_sensitivity, run_sensitivity_analysis  # noqa: E402
+
+
+def _locations(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "climate_conditions": {"temperature_c": float(t), "rainfall_mm": float(r)},
+            "crop_analysis": {"crop_type": str(c)},
+            "financial_analysis": {"assumptions": {"capex": 2000.0, "opex": 425.0, "price_per_ton": float(p)}},
+        }
+        for t, r, c, p in zip(
+            rng.uniform(15, 38, n), rng.uniform(200, 2800, n),
+            rng.choice(SUPPORTED_CROPS, n), rng.uniform(1000, 6000, n),
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locations", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=20)
+    args = parser.parse_args()
+
+    locations = _locations(args.locations)
+    print(f"Sensitivity analysis: {args.locations:,} locations x 4 shocks")
+    print("=" * 72)
+
+    sample = min(10000, args.locations)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(run_sensitivity_analysis, locations[:sample]))
+    threaded_s = (time.perf_counter() - start) * args.locations / sample
+    print(f"  ThreadPoolExecutor ({args.workers} workers, est.)  {threaded_s:8.3f} s")
+
+    start = time.perf_counter()
+    run_parallel_sensitivity(locations)
+    batch_s = time.perf_counter() - start
+    print(f"  run_parallel_sensitivity (vectorized)   {batch_s:8.3f} s")
+    print(f"\n  Speedup: {threaded_s / batch_s:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Benchmark: cascade simulation with and without the compiled network cache.
+
+Stores random networks (~5 edges per node) in a temporary SQLite database
+and times simulate_supply_chain_cascade for a series of disruptions on the
+same network: the previous implementation (reload nodes and edges, build a
+networkx.DiGraph, nx.descendants) against the cached CSR network, first
+request (cache miss) and subsequent ones. Both build the same response
+dicts; response serialization is not included.
+
+Usage:
+    python benchmarks/bench_supply_chain_cascade.py --nodes 1000 10000 100000 --requests 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import networkx as nx  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import network_cache  # noqa: E402
+from database import Base  # noqa: E402
+from models import SupplyChainEdge, SupplyChainNode  # noqa: E402
+from routers import supply_chain  # noqa: E402
+
+TYPES = ("Supplier", "Manufacturer", "Port", "Distribution")
+
+
+async def store_network(sessions, n_nodes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    network_id = str(uuid.uuid4())
+    nodes = [{"network_id": network_id, "node_id": f"node_{i}", "label": f"Facility {i}",
+              "node_type": TYPES[i % 4], "baseline_status": "Secure"} for i in range(n_nodes)]
+    edges = [{"network_id": network_id, "source_node_id": f"node_{rng.randrange(n_nodes)}",
+              "target_node_id": f"node_{rng.randrange(n_nodes)}"} for _ in range(5 * n_nodes)]
+    async with sessions() as session:
+        await session.execute(insert(SupplyChainNode), nodes)
+        await session.execute(insert(SupplyChainEdge), edges)
+        await session.commit()
+    return network_id
+
+
+async def legacy_cascade(sessions, network_id: str, disrupted_node_id: str) -> dict:
+    """The pre-cache implementation: reload, rebuild the DiGraph, walk descendants."""
+    async with sessions() as session:
+        db_nodes = (await session.execute(select(SupplyChainNode).where(SupplyChainNode.network_id == network_id))).scalars().all()
+        db_edges = (await session.execute(select(SupplyChainEdge).where(SupplyChainEdge.network_id == network_id))).scalars().all()
+    G = nx.DiGraph()
+    node_data_map = {}
+    for node in db_nodes:
+        G.add_node(node.node_id)
+        node_data_map[node.node_id] = {"label": node.label, "type": node.node_type, "status": node.baseline_status}
+    for edge in db_edges:
+        G.add_edge(edge.source_node_id, edge.target_node_id)
+    nx.descendants(G, disrupted_node_id)
+    node_data_map[disrupted_node_id]["status"] = "Critical"
+    for nid in G.successors(disrupted_node_id):
+        node_data_map[nid]["status"] = "Warning"
+    disrupted_edges = {(disrupted_node_id, t) for t in G.successors(disrupted_node_id)}
+    return {
+        "nodes": [{"id": nid, "data": dict(d)} for nid, d in node_data_map.items()],
+        "edges": [{"id": f"e{i}", "source": s, "target": t, "is_disrupted": (s, t) in disrupted_edges}
+                  for i, (s, t) in enumerate(G.edges(), 1)],
+    }
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:9.1f} ms"
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        supply_chain.async_session = sessions
+
+        print(f"Cascade simulation, {args.requests} disruptions per network, SQLite")
+        print(f"{'nodes':>9} {'edges':>9} {'legacy mean':>14} {'cache miss':>12} {'cache hit mean':>16} {'speedup':>8}")
+        print("=" * 76)
+        for n_nodes in args.nodes:
+            network_id = await store_network(sessions, n_nodes)
+            rng = random.Random(1)
+            targets = [f"node_{rng.randrange(n_nodes)}" for _ in range(args.requests)]
+
+            legacy = []
+            for node_id in targets[:args.legacy_requests]:
+                start = time.perf_counter()
+                await legacy_cascade(sessions, network_id, node_id)
+                legacy.append(time.perf_counter() - start)
+
+            network_cache.default_cache.clear()
+            timings = []
+            for node_id in targets:
+                req = supply_chain.CascadeRequest(network_id=network_id, disrupted_node_id=node_id, hazard_severity="Severe")
+                start = time.perf_counter()
+                await supply_chain.simulate_supply_chain_cascade(req)
+                timings.append(time.perf_counter() - start)
+
+            hit = statistics.mean(timings[1:])
+            network = network_cache.default_cache.get(network_id)
+            print(f"{n_nodes:>9,} {network.num_edges:>9,} {_ms(statistics.mean(legacy)):>14} {_ms(timings[0]):>12} "
+                  f"{_ms(hit):>16} {statistics.mean(legacy) / hit:7.1f}x")
+
+        stats = network_cache.get_stats()
+        print(f"\ncache: {stats['networks']} networks, {stats['bytes'] / 1e6:.1f} MB, hit rate {stats['hit_rate']}")
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--legacy-requests", type=int, default=3, help="Disruptions timed with the legacy implementation")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark: per-row ORM vs batched bulk supply chain network upload.
+
+Generates random networks (one CSV row per edge, ~5 edges per node) and
+uploads them through /api/v1/supply-chain/upload into a temporary SQLite
+database, then times the previous implementation (one session.add() per
+node and edge) on the same file.
+
+Usage:
+    python benchmarks/bench_supply_chain_upload.py --edges 10000 100000 1000000 --legacy-max 100000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import SupplyChainEdge, SupplyChainNode  # noqa: E402
+from routers import supply_chain  # noqa: E402
+
+TYPES = ("Supplier", "Manufacturer", "Port", "Distribution")
+
+
+def network_csv(n_edges: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    n_nodes = max(2, n_edges // 5)
+    out = io.StringIO()
+    out.write("source_id,source_label,source_type,target_id,target_label,target_type\n")
+    for _ in range(n_edges):
+        s, t = rng.randrange(n_nodes), rng.randrange(n_nodes)
+        out.write(f"node_{s},Facility {s},{TYPES[s % 4]},node_{t},Facility {t},{TYPES[t % 4]}\n")
+    return out.getvalue().encode()
+
+
+async def legacy_upload(sessions, data: bytes) -> int:
+    """The pre-bulk implementation: whole file in memory, one ORM object per row."""
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8")))
+    network_id = str(uuid.uuid4())
+    nodes, edges = {}, []
+    for row in reader:
+        source_id, target_id = row["source_id"].strip(), row["target_id"].strip()
+        nodes.setdefault(source_id, (row["source_label"].strip(), row["source_type"].strip()))
+        nodes.setdefault(target_id, (row["target_label"].strip(), row["target_type"].strip()))
+        edges.append((source_id, target_id))
+    async with sessions() as session:
+        for node_id, (label, node_type) in nodes.items():
+            session.add(SupplyChainNode(network_id=network_id, node_id=node_id, label=label, node_type=node_type, baseline_status="Secure"))
+        for source_id, target_id in edges:
+            session.add(SupplyChainEdge(network_id=network_id, source_node_id=source_id, target_node_id=target_id))
+        await session.commit()
+    return len(edges)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=100000, help="Skip the ORM version above this many edges")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def create():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        asyncio.run(create())
+        supply_chain.async_session = sessions
+        app = FastAPI()
+        app.include_router(supply_chain.router)
+        client = TestClient(app)
+
+        print(f"Supply chain upload into SQLite, batch {supply_chain.UPLOAD_BATCH_ROWS} rows")
+        print("=" * 72)
+        for n_edges in args.edges:
+            data = network_csv(n_edges)
+            start = time.perf_counter()
+            response = client.post("/api/v1/supply-chain/upload", files={"file": ("network.csv", data, "text/csv")})
+            bulk_s = time.perf_counter() - start
+            assert response.status_code == 200, response.text
+            line = f"  {n_edges:>9,} edges  {len(data) / 1e6:6.1f} MB   bulk {bulk_s:7.2f} s"
+
+            if n_edges <= args.legacy_max:
+                start = time.perf_counter()
+                asyncio.run(legacy_upload(sessions, data))
+                legacy_s = time.perf_counter() - start
+                line += f"   per-row ORM {legacy_s:7.2f} s   {legacy_s / bulk_s:5.1f}x"
+            print(line)
+
+        asyncio.run(engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Benchmark: per-scenario DataFrame predictions vs one batched predict on a NumPy matrix.
+
+Uses a freshly trained random forest with the flood surrogate's feature
+columns (the production pickle is not required).
+
+Usage:
+    python benchmarks/bench_surrogate_batch.py --scenarios 10000 --trees 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from routers._shared import predict_matrix  # noqa: E402
+from routers.flood import FLOOD_FEATURES  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--trees", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = list(FLOOD_FEATURES)
+    X = pd.DataFrame(rng.uniform(0, 1, (5000, 3)) * [150, 1, 10], columns=columns)
+    model = RandomForestRegressor(n_estimators=args.trees, random_state=0).fit(X, X.iloc[:, 0] * X.iloc[:, 1])
+
+    rows = rng.uniform(0, 1, (args.scenarios, 2, 3)) * [150, 1, 10]
+    print(f"Flood surrogate: {args.scenarios:,} scenarios x 2 rows, {args.trees} trees")
+    print("=" * 72)
+
+    sample = min(500, args.scenarios)
+    start = time.perf_counter()
+    for baseline, intervention in rows[:sample]:
+        model.predict(pd.DataFrame({c: [v] for c, v in zip(columns, baseline)}))
+        model.predict(pd.DataFrame({c: [v] for c, v in zip(columns, intervention)}))
+    single_s = (time.perf_counter() - start) * args.scenarios / sample
+    print(f"  per-scenario DataFrames (est.)  {single_s:8.3f} s")
+
+    start = time.perf_counter()
+    predict_matrix(model, rows.reshape(-1, 3), FLOOD_FEATURES)
+    batch_s = time.perf_counter() - start
+    print(f"  predict_matrix                  {batch_s:8.3f} s")
+    print(f"\n  Speedup: {single_s / batch_s:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
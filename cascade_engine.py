@@ -0,0 +1,136 @@
+# =============================================================================
+# Cascade Engine - Probabilistic Supply Chain Failure Propagation
+# =============================================================================
+"""
+Monte Carlo independent-cascade simulation on a compiled supply chain network
+(network_cache.CompiledNetwork).
+
+Every sample starts with a set of disrupted nodes failed at hop 0. A node
+that fails at hop h gets one chance to fail each of its successors at hop
+h + 1, with probability p_edge * hop_decay ** h, so the shock weakens as it
+travels away from the disrupted region. A sample ends when no new node
+fails (or after max_hops).
+
+All samples advance together: the frontier is one array of
+(sample, node) keys, expanded through the CSR arrays, filtered with one
+vector of random draws and deduplicated with np.unique, so a hop is a
+handful of NumPy calls whatever the number of samples. The per-sample
+failed state is a flat bool array of samples x nodes; samples are run in
+chunks that keep it within CASCADE_STATE_MB, and a hop's candidate edges
+are processed at most CASCADE_EDGE_BATCH at a time.
+"""
+
+import os
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+# Upper bound on samples per request
+MAX_SAMPLES = int(os.environ.get("CASCADE_MAX_SAMPLES", "20000"))
+
+# Memory for the failed-node state of one chunk of samples, in megabytes
+CASCADE_STATE_MB = float(os.environ.get("CASCADE_STATE_MB", "64"))
+
+# Candidate edges drawn per NumPy pass (bounds the temporary arrays of a hop)
+CASCADE_EDGE_BATCH = int(os.environ.get("CASCADE_EDGE_BATCH", "4000000"))
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + count) for each pair."""
+    total = int(counts.sum())
+    return np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+
+
+def simulate_cascade(
+    network: Any,
+    disrupted: Sequence[int],
+    edge_probability: Union[float, np.ndarray],
+    hop_decay: float = 1.0,
+    samples: int = 1000,
+    max_hops: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run Monte Carlo cascades from a set of disrupted nodes.
+
+    Args:
+        network: CompiledNetwork (uses num_nodes, indptr and indices)
+        disrupted: Node indices failed at hop 0
+        edge_probability: Transmission probability, scalar or one per edge in CSR order
+        hop_decay: Factor applied to transmission probabilities per hop travelled
+        samples: Number of cascades to simulate (max MAX_SAMPLES)
+        max_hops: Stop propagating after this many hops (default: no limit)
+        seed: Random seed, for reproducible results
+
+    Returns:
+        Dictionary with:
+        - failure_probability: Fraction of samples in which each node failed
+        - mean_hops: Mean hop at which each node failed (NaN if it never did)
+        - failed_per_sample: Number of failed nodes in each sample
+        - hops: Deepest hop reached by any sample
+    """
+    samples = int(samples)
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES:,}, got {samples}")
+    if not 0.0 <= hop_decay <= 1.0:
+        raise ValueError(f"hop_decay must be between 0 and 1, got {hop_decay}")
+
+    n = network.num_nodes
+    indptr, indices = network.indptr, network.indices
+    p_edge = np.asarray(edge_probability, dtype=np.float32)
+    if p_edge.ndim == 0:
+        p_edge = np.full(len(indices), p_edge, dtype=np.float32)
+    elif p_edge.shape != indices.shape:
+        raise ValueError(f"edge_probability has {p_edge.size} values for {len(indices)} edges")
+
+    seeds = np.unique(np.asarray(disrupted, dtype=np.int64))
+    if len(seeds) == 0:
+        raise ValueError("At least one disrupted node is required")
+
+    rng = np.random.default_rng(seed)
+    failures = np.zeros(n, dtype=np.int64)
+    hop_totals = np.zeros(n, dtype=np.int64)
+    failed_per_sample = np.zeros(samples, dtype=np.int64)
+    deepest = 0
+
+    chunk = int(max(1, min(samples, CASCADE_STATE_MB * 1024 * 1024 // max(n, 1))))
+    for first in range(0, samples, chunk):
+        size = min(chunk, samples - first)
+        failed = np.zeros(size * n, dtype=bool)
+        frontier = (np.arange(size, dtype=np.int64)[:, None] * n + seeds).ravel()
+        failed[frontier] = True
+        hop = 0
+        while len(frontier) and (max_hops is None or hop < max_hops):
+            scale = np.float32(hop_decay ** hop)
+            hop += 1
+            starts = indptr[frontier % n]
+            counts = indptr[frontier % n + 1] - starts
+            reached = []
+            # Split the frontier so each pass draws at most CASCADE_EDGE_BATCH edges
+            bounds = np.searchsorted(np.cumsum(counts), np.arange(CASCADE_EDGE_BATCH, int(counts.sum()), CASCADE_EDGE_BATCH))
+            for keys, key_starts, key_counts in zip(np.split(frontier, bounds), np.split(starts, bounds), np.split(counts, bounds)):
+                edges = _ranges(key_starts, key_counts)
+                hit = rng.random(len(edges), dtype=np.float32) < p_edge[edges] * scale
+                candidates = np.repeat(keys - keys % n, key_counts)[hit] + indices[edges[hit]]
+                candidates = np.unique(candidates[~failed[candidates]])
+                failed[candidates] = True
+                reached.append(candidates)
+            frontier = np.concatenate(reached) if reached else np.empty(0, dtype=np.int64)
+            if len(frontier):
+                deepest = max(deepest, hop)
+                sample, node = np.divmod(frontier, n)
+                node_failures = np.bincount(node, minlength=n)
+                failures += node_failures
+                hop_totals += hop * node_failures
+                failed_per_sample[first:first + size] += np.bincount(sample, minlength=size)
+
+    failures[seeds] += samples
+    failed_per_sample += len(seeds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_hops = np.where(failures > 0, hop_totals / failures, np.nan)
+    return {
+        "failure_probability": failures / samples,
+        "mean_hops": mean_hops,
+        "failed_per_sample": failed_per_sample,
+        "hops": deepest,
+    }
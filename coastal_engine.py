@@ -2,37 +2,27 @@
 # Coastal Resilience Engine - Flood Risk Analysis
 # =============================================================================
 
-import json
 import os
 import ee
-from gee_credentials import load_gee_credentials
+import gee_session
 
 
 def authenticate_gee():
     """
-    Authenticate with Google Earth Engine using service account.
-    
-    Supports multiple credential sources (priority order):
+    Ensure the shared Earth Engine session is initialized.
+
+    Delegates to gee_session, which initializes once per worker process and
+    refreshes the session before the service-account token expires.
+    Credential sources (priority order):
     1. WARP_GEE_CREDENTIALS (Cloud Agents)
     2. GEE_SERVICE_ACCOUNT_JSON (legacy)
     3. credentials.json (project root)
     4. credentials.json (~/.adaptmetric/)
+
+    Raises:
+        ValueError: If credentials are missing or initialization failed
     """
-    credentials_dict = load_gee_credentials()
-    if not credentials_dict:
-        raise ValueError(
-            "Google Earth Engine credentials not found. "
-            "Set WARP_GEE_CREDENTIALS or GEE_SERVICE_ACCOUNT_JSON env var, "
-            "or place credentials.json in project root or ~/.adaptmetric/"
-        )
-    
-    # Convert dict back to JSON string for ee.ServiceAccountCredentials
-    credentials_json = json.dumps(credentials_dict)
-    credentials = ee.ServiceAccountCredentials(
-        credentials_dict['client_email'],
-        key_data=credentials_json
-    )
-    ee.Initialize(credentials)
+    gee_session.ensure_initialized()
 
 
 def analyze_flood_risk(lat: float, lon: float, slr_meters: float, surge_meters: float) -> dict:
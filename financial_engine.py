@@ -2,7 +2,12 @@
 # Financial Engine - ROI and NPV Calculations
 # =============================================================================
 
-from typing import Optional, List, Tuple
+import functools
+from typing import Optional, List, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, List[float], np.ndarray]
 
 
 def calculate_npv(cash_flows: List[float], discount_rate: float) -> float:
@@ -169,3 +174,261 @@ def generate_cash_flows(
         cash_flows.append(net_annual)
     
     return cash_flows
+
+
+# =============================================================================
+# Batched (array-native) metrics
+# =============================================================================
+#
+# Cash flows are a 2-D (scenarios x years) matrix, or a 1-D vector for a
+# single scenario; discount rates are a scalar or one rate per scenario.
+# Each function returns one value per scenario.
+
+# Unique discount rates above which tables are computed directly rather than
+# assembled from cached rows (e.g. Monte Carlo-sampled rates)
+_MAX_CACHED_RATES = 64
+
+
+@functools.lru_cache(maxsize=512)
+def _growth_row(discount_rate: float, years: int) -> np.ndarray:
+    """Read-only (1 + r)^t for t = 0 .. years-1."""
+    row = np.power(1.0 + discount_rate, np.arange(years, dtype=np.float64))
+    row.setflags(write=False)
+    return row
+
+
+def discount_growth_table(discount_rates: ArrayLike, years: int) -> np.ndarray:
+    """
+    Table of (1 + r)^t, the divisor applied to each year's cash flow.
+    
+    Rows for repeated rates come from an LRU cache, so valuing many scenarios
+    at a handful of rates does not recompute the powers.
+    
+    Args:
+        discount_rates: Scalar rate or 1-D array of rates (decimal)
+        years: Number of periods (t = 0 .. years-1)
+    
+    Returns:
+        Array of shape (years,) for a scalar rate, else (len(rates), years)
+    """
+    rates = np.asarray(discount_rates, dtype=np.float64)
+    if rates.ndim == 0:
+        return _growth_row(float(rates), years)
+    
+    unique, inverse = np.unique(rates, return_inverse=True)
+    if unique.size > _MAX_CACHED_RATES:
+        return np.power(1.0 + rates[:, None], np.arange(years, dtype=np.float64))
+    table = np.stack([_growth_row(float(r), years) for r in unique])
+    return table[inverse]
+
+
+def _as_matrix(cash_flows: ArrayLike) -> Tuple[np.ndarray, bool]:
+    """(scenarios x years) float matrix and whether the input was a single scenario."""
+    flows = np.asarray(cash_flows, dtype=np.float64)
+    if flows.ndim == 1:
+        return flows[None, :], True
+    if flows.ndim != 2:
+        raise ValueError(f"cash_flows must be 1-D or 2-D, got shape {flows.shape}")
+    return flows, False
+
+
+def _growth_for(flows: np.ndarray, discount_rates: ArrayLike) -> np.ndarray:
+    rates = np.asarray(discount_rates, dtype=np.float64)
+    if rates.ndim > 1 or (rates.ndim == 1 and rates.size != flows.shape[0]):
+        raise ValueError(
+            f"discount_rates must be a scalar or have one rate per scenario ({flows.shape[0]}), got shape {rates.shape}"
+        )
+    return discount_growth_table(rates, flows.shape[1])
+
+
+def _unwrap(values: np.ndarray, single: bool):
+    return values[0] if single else values
+
+
+def calculate_npv_batch(cash_flows: ArrayLike, discount_rates: ArrayLike) -> np.ndarray:
+    """
+    Vectorized calculate_npv.
+    
+    Args:
+        cash_flows: (scenarios x years) cash flows, Year 0 first
+        discount_rates: Scalar rate or one rate per scenario (decimal)
+    
+    Returns:
+        NPV per scenario (a scalar for 1-D cash_flows)
+    """
+    flows, single = _as_matrix(cash_flows)
+    npv = (flows / _growth_for(flows, discount_rates)).sum(axis=1)
+    return _unwrap(npv, single)
+
+
+def calculate_bcr_batch(cash_flows: ArrayLike, discount_rates: ArrayLike) -> np.ndarray:
+    """
+    Vectorized calculate_bcr.
+    
+    Args:
+        cash_flows: (scenarios x years) cash flows
+        discount_rates: Scalar rate or one rate per scenario (decimal)
+    
+    Returns:
+        BCR per scenario; inf where there are benefits but no costs, 0.0 where neither
+    """
+    flows, single = _as_matrix(cash_flows)
+    discounted = flows / _growth_for(flows, discount_rates)
+    pv_benefits = np.where(flows > 0, discounted, 0.0).sum(axis=1)
+    pv_costs = np.where(flows > 0, 0.0, -discounted).sum(axis=1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bcr = pv_benefits / pv_costs
+    no_costs = pv_costs == 0
+    bcr[no_costs] = np.where(pv_benefits[no_costs] > 0, np.inf, 0.0)
+    return _unwrap(bcr, single)
+
+
+def calculate_payback_period_batch(cash_flows: ArrayLike) -> np.ndarray:
+    """
+    Vectorized calculate_payback_period (simple, undiscounted, linearly interpolated).
+    
+    Args:
+        cash_flows: (scenarios x years) cash flows
+    
+    Returns:
+        Years to payback per scenario; NaN where cumulative cash flow never turns positive
+    """
+    flows, single = _as_matrix(cash_flows)
+    if flows.shape[1] == 0:
+        # No years to pay back in, as calculate_payback_period([]) is None
+        return _unwrap(np.full(flows.shape[0], np.nan), single)
+    cumulative = np.cumsum(flows, axis=1)
+    reached = cumulative >= 0
+    paid_back = reached.any(axis=1)
+    year = np.argmax(reached, axis=1)
+    
+    rows = np.arange(flows.shape[0])
+    flow = flows[rows, year]
+    cumulative_previous = cumulative[rows, year] - flow
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interpolated = year - 1 + np.abs(cumulative_previous) / flow
+    
+    payback = np.where(flow != 0, interpolated, year.astype(np.float64))
+    payback = np.where(year == 0, 0.0, payback)
+    payback = np.where(paid_back, payback, np.nan)
+    return _unwrap(payback, single)
+
+
+def calculate_irr_batch(
+    cash_flows: ArrayLike,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Internal Rate of Return per scenario: the rate at which NPV is zero.
+    
+    Safeguarded Newton iteration, vectorized across scenarios: each scenario
+    keeps a bracket [lo, hi] with an NPV sign change, takes Newton steps while
+    they stay inside the bracket, and bisects otherwise. The bracket starts at
+    [-0.99, 1.0] and the upper end is doubled up to 10 times if needed (to
+    1024, i.e. 102,400%).
+    
+    Args:
+        cash_flows: (scenarios x years) cash flows
+        tol: Convergence tolerance on the rate
+        max_iter: Maximum iterations
+    
+    Returns:
+        IRR per scenario (decimal); NaN where no sign change is found. For
+        non-conventional flows with several IRRs, one root in the bracket is returned.
+    """
+    flows, single = _as_matrix(cash_flows)
+    
+    def npv_and_slope(rows: np.ndarray, rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # NPV is a polynomial in d = 1 / (1 + r); evaluate it and its
+        # derivative by Horner's rule, one column at a time.
+        d = 1.0 / (1.0 + rate)
+        value = np.zeros_like(rate)
+        d_value = np.zeros_like(rate)
+        for k in range(flows.shape[1] - 1, -1, -1):
+            d_value = d_value * d + value
+            value = value * d + flows[rows, k]
+        return value, -d_value * d * d
+    
+    n = flows.shape[0]
+    all_rows = np.arange(n)
+    lo = np.full(n, -0.99)
+    hi = np.full(n, 1.0)
+    f_lo = npv_and_slope(all_rows, lo)[0]
+    f_hi = npv_and_slope(all_rows, hi)[0]
+    for _ in range(10):
+        widen = np.flatnonzero(np.sign(f_lo) == np.sign(f_hi))
+        if widen.size == 0:
+            break
+        hi[widen] *= 2.0
+        f_hi[widen] = npv_and_slope(widen, hi[widen])[0]
+    
+    valid = (np.sign(f_lo) != np.sign(f_hi)) | (f_lo == 0) | (f_hi == 0)
+    valid &= (flows != 0).any(axis=1)
+    rate = np.where(f_lo == 0, lo, np.where(f_hi == 0, hi, (lo + hi) / 2.0))
+    active = np.flatnonzero(valid & (f_lo != 0) & (f_hi != 0))
+    
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        r = rate[active]
+        value, slope = npv_and_slope(active, r)
+        
+        # Shrink the bracket around the root
+        same_as_lo = np.sign(value) == np.sign(f_lo[active])
+        a_lo = np.where(same_as_lo, r, lo[active])
+        a_hi = np.where(same_as_lo, hi[active], r)
+        lo[active] = a_lo
+        hi[active] = a_hi
+        f_lo[active] = np.where(same_as_lo, value, f_lo[active])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = r - value / slope
+        use_newton = np.isfinite(newton) & (newton > a_lo) & (newton < a_hi)
+        next_rate = np.where(use_newton, newton, (a_lo + a_hi) / 2.0)
+        
+        exact = value == 0
+        rate[active] = np.where(exact, r, next_rate)
+        converged = exact | (np.abs(next_rate - r) < tol) | (a_hi - a_lo < tol)
+        active = active[~converged]
+    
+    irr = np.where(valid, rate, np.nan)
+    return _unwrap(irr, single)
+
+
+def calculate_irr(cash_flows: List[float]) -> Optional[float]:
+    """
+    Calculate Internal Rate of Return (IRR).
+    
+    Args:
+        cash_flows: List of yearly cash flows (Year 0 = initial investment, usually negative)
+    
+    Returns:
+        IRR as decimal (e.g., 0.12 for 12%) or None if the NPV never changes sign
+    """
+    irr = float(calculate_irr_batch(cash_flows))
+    return None if np.isnan(irr) else irr
+
+
+def calculate_roi_metrics_batch(cash_flows: ArrayLike, discount_rates: ArrayLike) -> dict:
+    """
+    Vectorized calculate_roi_metrics for a whole portfolio in one call.
+    
+    Args:
+        cash_flows: (scenarios x years) cash flows
+        discount_rates: Scalar rate or one rate per scenario (decimal)
+    
+    Returns:
+        Dictionary of unrounded per-scenario arrays:
+        - 'npv': Net Present Value
+        - 'bcr': Benefit-Cost Ratio
+        - 'payback_period_years': Years to payback (NaN if never)
+        - 'irr': Internal Rate of Return (NaN if undefined)
+    """
+    return {
+        'npv': calculate_npv_batch(cash_flows, discount_rates),
+        'bcr': calculate_bcr_batch(cash_flows, discount_rates),
+        'payback_period_years': calculate_payback_period_batch(cash_flows),
+        'irr': calculate_irr_batch(cash_flows),
+    }
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Compiled Random Forest Inference
+================================
+
+The surrogate models (ag, coastal, flood, coffee) are sklearn
+RandomForestRegressors. Unpickling them is slow and memory-hungry, and
+``predict`` has a high fixed cost per call (input validation, joblib dispatch
+per tree), which dominates single-row requests.
+
+``export`` flattens every tree of a fitted forest into contiguous per-node
+arrays, concatenated across trees:
+
+    feature[n], threshold[n]   split test  X[feature] <= threshold
+    children[n, 2]             (left, right) node index; leaves point to themselves
+    missing_left[n]            where NaN inputs go (sklearn >= 1.3 semantics)
+    value[n]                   leaf prediction
+    roots[t], depth[t]         first node and depth of tree t
+
+and saves them as ``.npy`` files in a ``<model>.forest/`` directory.
+``CompiledForest`` loads them with memory mapping (near-instant, shared
+between workers through the page cache) and walks the trees with NumPy
+gathers, one tree level per step:
+
+- small batches advance every tree at once, so a single row costs one
+  vectorized step per level instead of sklearn's per-call overhead;
+- large batches go tree by tree (each tree stays in cache), dropping rows
+  from the working set once they reach a leaf, with groups of trees on
+  FOREST_PREDICT_THREADS threads.
+
+sklearn evaluates splits on float32 inputs, so thresholds are stored as the
+largest float32 not above the float64 split value, which gives the same
+decisions. Leaf values are summed tree by tree in order, so predictions are
+bit-for-bit identical to ``RandomForestRegressor.predict`` with n_jobs=1
+(a model with n_jobs > 1 sums trees in thread-completion order, so it can
+differ from itself in the last ulp).
+
+Routers load models through ``load_model``, which prefers a compiled
+directory next to the pickle when one exists and was exported from that
+pickle (its size and mtime are recorded in ``meta.json``); after the pickle
+is replaced, the pickle is loaded until ``export`` is re-run.
+
+Usage:
+    python forest_compiler.py export flood_surrogate.pkl coastal_surrogate.pkl
+    python forest_compiler.py check flood_surrogate.pkl
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Set FOREST_COMPILED=0 to always unpickle the sklearn models
+USE_COMPILED = os.environ.get("FOREST_COMPILED", "1") != "0"
+
+# Batches up to this many rows advance all trees together; larger batches go tree by tree
+FOREST_WIDE_MAX_ROWS = int(os.environ.get("FOREST_WIDE_MAX_ROWS", "256"))
+
+# Rows evaluated per pass in tree-by-tree mode; per-tree results for a pass
+# are held until they are summed in tree order
+FOREST_PREDICT_CHUNK_ROWS = int(os.environ.get("FOREST_PREDICT_CHUNK_ROWS", "16384"))
+
+# Threads evaluating tree groups in tree-by-tree mode
+FOREST_PREDICT_THREADS = int(os.environ.get("FOREST_PREDICT_THREADS", str(min(4, os.cpu_count() or 1))))
+
+# Levels between removing finished rows in tree-by-tree mode
+_COMPACT_EVERY = 6
+
+FORMAT_VERSION = 1
+_ARRAYS = ("feature", "threshold", "children", "missing_left", "value", "roots", "depth")
+
+
+def compiled_path(model_path: str) -> Path:
+    """Directory holding the compiled form of ``model_path`` (``x.pkl`` -> ``x.forest``)."""
+    return Path(model_path).with_suffix(".forest")
+
+
+def source_stamp(model_path: str) -> Optional[Dict[str, int]]:
+    """Size and mtime of the pickle at ``model_path``, or None if it does not exist."""
+    try:
+        stat = os.stat(model_path)
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_stale(directory: Path, model_path: str) -> bool:
+    """
+    Whether the artefact in ``directory`` was built from a different
+    ``model_path`` than the one on disk (by the ``source`` in its meta.json).
+
+    An artefact whose pickle is missing is not stale: it is all there is.
+    """
+    current = source_stamp(model_path)
+    if current is None:
+        return False
+    return json.loads((directory / "meta.json").read_text()).get("source") != current
+
+
+class CompiledForest:
+    """Flat-array random forest regressor with an sklearn-compatible ``predict``."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        missing_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        depth: np.ndarray,
+        n_features: int,
+        feature_names: Optional[Sequence[str]] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.n_features_in_ = int(n_features)
+        self.max_depth = int(depth.max()) if len(depth) else 0
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object) if feature_names is not None else None
+
+        # Index arrays are stored as intp, so for memory-mapped models these
+        # are views rather than copies
+        self._feature = np.asarray(feature, dtype=np.intp)
+        self._children = np.asarray(children, dtype=np.intp).ravel()
+        self._is_leaf = self._children[0::2] == np.arange(len(feature))
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledForest":
+        """
+        Flatten a fitted single-output RandomForestRegressor (or ExtraTreesRegressor).
+
+        Raises:
+            ValueError: If the model is not a single-output forest regressor
+        """
+        estimators = getattr(model, "estimators_", None)
+        if not estimators or not hasattr(estimators[0], "tree_"):
+            raise ValueError(f"Expected a fitted tree ensemble, got {type(model).__name__}")
+        if getattr(model, "n_outputs_", 1) != 1 or estimators[0].tree_.value.shape[2] != 1:
+            raise ValueError("Only single-output forest regressors can be compiled")
+
+        features, thresholds, children, missing, values, roots, depths = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n = tree.node_count
+            left = tree.children_left.astype(np.int64)
+            right = tree.children_right.astype(np.int64)
+            leaf = left == -1
+            own = np.arange(n)
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            children.append(np.stack([np.where(leaf, own, left), np.where(leaf, own, right)], axis=1) + offset)
+            missing_go_to_left = getattr(tree, "missing_go_to_left", None)
+            missing.append(np.zeros(n, dtype=bool) if missing_go_to_left is None else missing_go_to_left.astype(bool))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            depths.append(tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=_float32_floor(np.concatenate(thresholds)),
+            children=np.concatenate(children).astype(np.intp),
+            missing_left=np.concatenate(missing),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            depth=np.asarray(depths, dtype=np.int32),
+            n_features=model.n_features_in_,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    def save(self, path: str, source: Optional[Dict[str, int]] = None) -> Path:
+        """Write the arrays and metadata (``source``: see ``source_stamp``) to the directory ``path``."""
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "n_features": self.n_features_in_,
+            "n_estimators": self.n_estimators,
+            "feature_names": None if self.feature_names_in_ is None else [str(f) for f in self.feature_names_in_],
+            "source": source,
+        }
+        (directory / "meta.json").write_text(json.dumps(meta, indent=2))
+        return directory
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompiledForest":
+        """
+        Load a compiled forest saved with ``save``.
+
+        Args:
+            path: Compiled model directory
+            mmap: Memory-map the arrays instead of reading them into memory
+
+        Raises:
+            ValueError: If the directory was written by an incompatible version
+        """
+        directory = Path(path)
+        meta = json.loads((directory / "meta.json").read_text())
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled forest format: {meta.get('format_version')}")
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in _ARRAYS
+        }
+        return cls(n_features=meta["n_features"], feature_names=meta["feature_names"], **arrays)
+
+    def _as_matrix(self, X: Any) -> np.ndarray:
+        if self.feature_names_in_ is not None and hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)]
+        # sklearn trees evaluate splits on float32 inputs
+        matrix = np.asarray(X, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {matrix.shape}, but the model expects {self.n_features_in_} features")
+        return matrix
+
+    def _go_right(self, x: np.ndarray, nodes: np.ndarray, has_missing: bool) -> np.ndarray:
+        go_right = x > self.threshold.take(nodes)
+        if has_missing:
+            go_right = np.where(np.isnan(x), ~self.missing_left.take(nodes), go_right)
+        return go_right
+
+    def _predict_wide(self, X: np.ndarray, has_missing: bool) -> np.ndarray:
+        """All trees advance together: (rows x trees) nodes, one step per level."""
+        n_rows = len(X)
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows) * self.n_features_in_)[:, None]
+        nodes = np.broadcast_to(self.roots.astype(np.intp), (n_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat.take(row_offset + self._feature.take(nodes))
+            nodes = self._children.take(2 * nodes + self._go_right(x, nodes, has_missing))
+        # cumsum accumulates tree by tree, in order, as sklearn does
+        return np.cumsum(self.value.take(nodes), axis=1)[:, -1] / len(self.roots)
+
+    def _tree_predictions(self, columns: np.ndarray, n_rows: int, trees: Sequence[int], has_missing: bool) -> List[np.ndarray]:
+        """Per-tree predictions for column-major inputs, dropping rows that reached a leaf."""
+        predictions = []
+        for t in trees:
+            nodes = np.full(n_rows, self.roots[t], dtype=np.intp)
+            rows = np.arange(n_rows)
+            tree_values = np.empty(n_rows)
+            depth = int(self.depth[t])
+            for level in range(1, depth + 1):
+                x = columns.take(self._feature.take(nodes) * n_rows + rows)
+                nodes = self._children.take(2 * nodes + self._go_right(x, nodes, has_missing))
+                if level % _COMPACT_EVERY == 0 and level < depth:
+                    done = self._is_leaf.take(nodes)
+                    if done.any():
+                        tree_values[rows[done]] = self.value.take(nodes[done])
+                        active = ~done
+                        nodes, rows = nodes[active], rows[active]
+            tree_values[rows] = self.value.take(nodes)
+            predictions.append(tree_values)
+        return predictions
+
+    def _predict_by_tree(self, X: np.ndarray, has_missing: bool) -> np.ndarray:
+        """One tree at a time over all rows; tree groups run on FOREST_PREDICT_THREADS threads."""
+        n_rows = len(X)
+        columns = np.ascontiguousarray(X.T).ravel()
+        groups = [g.tolist() for g in np.array_split(np.arange(len(self.roots)), max(1, FOREST_PREDICT_THREADS)) if len(g)]
+        if len(groups) > 1:
+            # NumPy gathers and ufuncs release the GIL, so tree groups run in parallel
+            with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+                parts = list(pool.map(lambda trees: self._tree_predictions(columns, n_rows, trees, has_missing), groups))
+        else:
+            parts = [self._tree_predictions(columns, n_rows, groups[0], has_missing)]
+
+        total = np.zeros(n_rows)
+        for part in parts:
+            for tree_values in part:
+                total += tree_values
+        return total / len(self.roots)
+
+    def predict(self, X: Any) -> np.ndarray:
+        """
+        Predict for a (rows x features) array or DataFrame.
+
+        Returns:
+            1-D float64 array, identical to the source model's predict()
+        """
+        X = self._as_matrix(X)
+        has_missing = bool(np.isnan(X).any())
+        if len(X) <= FOREST_WIDE_MAX_ROWS:
+            return self._predict_wide(X, has_missing)
+        return np.concatenate([
+            self._predict_by_tree(X[start:start + FOREST_PREDICT_CHUNK_ROWS], has_missing)
+            for start in range(0, len(X), FOREST_PREDICT_CHUNK_ROWS)
+        ])
+
+
+def _float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each value, so ``x32 > floor`` matches ``float64(x32) > value``."""
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _unpickle(model_path: str) -> Any:
+    try:
+        import joblib
+        return joblib.load(model_path)
+    except ImportError:
+        with open(model_path, "rb") as f:
+            return pickle.load(f)
+
+
+def load_model(model_path: str, loader=None) -> Any:
+    """
+    Load a surrogate model, preferring its compiled form.
+
+    Args:
+        model_path: Path to the pickled sklearn model
+        loader: Callable that unpickles ``model_path`` (default: joblib.load)
+
+    Returns:
+        CompiledForest if ``<model>.forest/`` exists, was exported from the
+        current pickle (see ``is_stale``) and FOREST_COMPILED is not "0",
+        otherwise the unpickled model
+
+    Raises:
+        FileNotFoundError: If neither form exists
+    """
+    compiled = compiled_path(model_path)
+    if USE_COMPILED and (compiled / "meta.json").exists():
+        try:
+            if is_stale(compiled, model_path):
+                raise ValueError("exported from a different pickle; re-run export")
+            forest = CompiledForest.load(str(compiled))
+            print(f"Using compiled forest {compiled} ({forest.n_estimators} trees, memory-mapped)")
+            return forest
+        except Exception as e:
+            print(f"Warning: Failed to load compiled model {compiled}: {e}; falling back to {model_path}", file=sys.stderr)
+    return (loader or _unpickle)(model_path)
+
+
+def export(model_path: str, output: Optional[str] = None) -> CompiledForest:
+    """Compile the pickled forest at ``model_path`` into ``output`` (default ``<model>.forest``)."""
+    forest = CompiledForest.from_sklearn(_unpickle(model_path))
+    forest.save(output or str(compiled_path(model_path)), source=source_stamp(model_path))
+    return forest
+
+
+def check(model_path: str, rows: int = 2000, seed: int = 0) -> dict:
+    """
+    Compare a compiled forest with its source model on random inputs.
+
+    Inputs are drawn around each feature's split thresholds so every branch
+    is exercised.
+
+    Returns:
+        Dictionary with max_abs_diff, identical, and the single-row and batch
+        latencies (ms) of both implementations
+    """
+    model = _unpickle(model_path)
+    forest = CompiledForest.load(str(compiled_path(model_path)))
+
+    rng = np.random.default_rng(seed)
+    X = np.empty((rows, forest.n_features_in_))
+    for j in range(forest.n_features_in_):
+        splits = forest.threshold[forest.feature == j]
+        lo, hi = (splits.min(), splits.max()) if splits.size else (0.0, 1.0)
+        pad = 0.1 * (hi - lo) + 1e-6
+        X[:, j] = rng.uniform(lo - pad, hi + pad, rows)
+    if forest.feature_names_in_ is not None:
+        import pandas as pd
+        X = pd.DataFrame(X, columns=list(forest.feature_names_in_))
+
+    def timed(fn, data, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn(data)
+        return result, (time.perf_counter() - start) * 1000 / repeat
+
+    expected, sklearn_batch_ms = timed(model.predict, X, 1)
+    actual, compiled_batch_ms = timed(forest.predict, X, 1)
+    single = X[:1]
+    _, sklearn_single_ms = timed(model.predict, single, 20)
+    _, compiled_single_ms = timed(forest.predict, single, 20)
+
+    return {
+        "rows": rows,
+        "max_abs_diff": float(np.max(np.abs(actual - expected))),
+        "identical": bool(np.array_equal(actual, expected)),
+        "sklearn_single_ms": round(sklearn_single_ms, 3),
+        "compiled_single_ms": round(compiled_single_ms, 3),
+        "sklearn_batch_ms": round(sklearn_batch_ms, 2),
+        "compiled_batch_ms": round(compiled_batch_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile random forest surrogates to flat arrays')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help='Compile pickled models to <model>.forest/')
+    export_parser.add_argument('models', nargs='+')
+
+    check_parser = sub.add_parser('check', help='Compare compiled and pickled predictions')
+    check_parser.add_argument('models', nargs='+')
+    check_parser.add_argument('--rows', type=int, default=2000)
+
+    args = parser.parse_args()
+
+    failed = False
+    for model_path in args.models:
+        try:
+            if args.command == 'export':
+                start = time.perf_counter()
+                forest = export(model_path)
+                print(f"{model_path} -> {compiled_path(model_path)}: {forest.n_estimators} trees, "
+                      f"{forest.n_nodes:,} nodes, depth {forest.max_depth} ({time.perf_counter() - start:.1f} s)")
+            else:
+                print(f"{model_path}: {json.dumps(check(model_path, rows=args.rows))}")
+        except Exception as e:
+            failed = True
+            print(f"{model_path}: failed: {e}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
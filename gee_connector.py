@@ -2,41 +2,67 @@
 # Google Earth Engine Connector for Weather Data
 # =============================================================================
 
-import json
 import os
 from datetime import datetime, timedelta
 from typing import List
 import ee
-from gee_credentials import load_gee_credentials, is_gee_available
+import gee_session
+from geo_cache import cached_lookup
+import geo_cache
+from single_flight import coalesced
 
 
 def authenticate_gee():
     """
-    Authenticate with Google Earth Engine using service account.
-    
-    Supports multiple credential sources (priority order):
+    Ensure the shared Earth Engine session is initialized.
+
+    Delegates to gee_session, which initializes once per worker process and
+    refreshes the session before the service-account token expires.
+    Credential sources (priority order):
     1. WARP_GEE_CREDENTIALS (Cloud Agents)
     2. GEE_SERVICE_ACCOUNT_JSON (legacy)
     3. credentials.json (project root)
     4. credentials.json (~/.adaptmetric/)
+
+    Raises:
+        ValueError: If credentials are missing or initialization failed
     """
-    credentials_dict = load_gee_credentials()
-    if not credentials_dict:
-        raise ValueError(
-            "Google Earth Engine credentials not found. "
-            "Set WARP_GEE_CREDENTIALS or GEE_SERVICE_ACCOUNT_JSON env var, "
-            "or place credentials.json in project root or ~/.adaptmetric/"
-        )
+    gee_session.ensure_initialized()
+
+
+# Points per reduceRegions request in get_weather_data_many. Earth Engine caps
+# the size of a single computation, so very large point sets are chunked.
+WEATHER_BATCH_CHUNK_SIZE = int(os.environ.get("GEE_WEATHER_BATCH_CHUNK_SIZE", "500"))
+
+
+def _growing_season_windows(end_date: str) -> tuple:
+    """
+    Date windows for the most recent complete growing season before ``end_date``.
     
-    # Convert dict back to JSON string for ee.ServiceAccountCredentials
-    credentials_json = json.dumps(credentials_dict)
-    credentials = ee.ServiceAccountCredentials(
-        credentials_dict['client_email'],
-        key_data=credentials_json
-    )
-    ee.Initialize(credentials)
+    Returns:
+        (peak_start, peak_end, growing_start, growing_end) as YYYY-MM-DD strings
+    """
+    # Use the most recent complete growing season
+    # If end_date is before September, use previous year's season
+    end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
+    if end_date_obj.month < 9:
+        year = end_date_obj.year - 1
+    else:
+        year = end_date_obj.year
+    
+    # Peak growing season for heat stress: July 1 - August 31
+    peak_start = f'{year}-07-01'
+    peak_end = f'{year}-08-31'
+    
+    # Full growing season for rainfall: May 1 - September 30
+    growing_start = f'{year}-05-01'
+    growing_end = f'{year}-09-30'
+    
+    return peak_start, peak_end, growing_start, growing_end
 
 
+@coalesced
+@cached_lookup('era5_land_daily', window=lambda start_date, end_date: _growing_season_windows(end_date))
 def get_weather_data(lat: float, lon: float, start_date: str, end_date: str) -> dict:
     """
     Get weather data from ERA5-Land dataset for a location and date range.
@@ -59,25 +85,7 @@ def get_weather_data(lat: float, lon: float, start_date: str, end_date: str) ->
     
     point = ee.Geometry.Point([lon, lat])
     
-    # Extract year from start_date to construct growing season dates
-    start_year = datetime.strptime(start_date, '%Y-%m-%d').year
-    end_year = datetime.strptime(end_date, '%Y-%m-%d').year
-    
-    # Use the most recent complete growing season
-    # If end_date is before September, use previous year's season
-    end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-    if end_date_obj.month < 9:
-        year = end_year - 1
-    else:
-        year = end_year
-    
-    # Peak growing season for heat stress: July 1 - August 31
-    peak_start = f'{year}-07-01'
-    peak_end = f'{year}-08-31'
-    
-    # Full growing season for rainfall: May 1 - September 30
-    growing_start = f'{year}-05-01'
-    growing_end = f'{year}-09-30'
+    peak_start, peak_end, growing_start, growing_end = _growing_season_windows(end_date)
     
     # Get MAXIMUM temperature during peak season (July-August)
     # This captures heat stress events, not average conditions
@@ -93,7 +101,6 @@ def get_weather_data(lat: float, lon: float, start_date: str, end_date: str) ->
         geometry=point,
         scale=11132
     ).get('temperature_2m_max')
-    max_temp_celsius = ee.Number(temp_value).subtract(273.15).getInfo()
     
     # Get total precipitation during full growing season (May-Sept)
     growing_dataset = ee.ImageCollection('ECMWF/ERA5_LAND/DAILY_AGGR') \
@@ -107,14 +114,121 @@ def get_weather_data(lat: float, lon: float, start_date: str, end_date: str) ->
         geometry=point,
         scale=11132
     ).get('total_precipitation_sum')
-    total_precip_mm = ee.Number(precip_value).multiply(1000).getInfo()
+    
+    # Evaluate both values in a single round trip
+    weather = ee.Dictionary({
+        'max_temp_celsius': ee.Number(temp_value).subtract(273.15),
+        'total_precip_mm': ee.Number(precip_value).multiply(1000)
+    }).getInfo()
     
     return {
-        'max_temp_celsius': max_temp_celsius,
-        'total_precip_mm': total_precip_mm
+        'max_temp_celsius': weather.get('max_temp_celsius'),
+        'total_precip_mm': weather.get('total_precip_mm')
     }
 
 
+def get_weather_data_many(points: List[tuple], start_date: str, end_date: str,
+                          chunk_size: int = None) -> List[dict]:
+    """
+    Batched get_weather_data for many locations.
+    
+    Builds a FeatureCollection of the points and evaluates peak-season maximum
+    temperature and growing-season total precipitation for all of them with a
+    single server-side reduceRegions and one getInfo() per chunk, instead of two
+    getInfo() round trips per point.
+    
+    Args:
+        points: Sequence of (lat, lon) pairs
+        start_date: Start date (YYYY-MM-DD) - used to determine year
+        end_date: End date (YYYY-MM-DD) - used to determine year
+        chunk_size: Points per request (default: WEATHER_BATCH_CHUNK_SIZE)
+    
+    Returns:
+        List of dicts in input order with 'max_temp_celsius' and 'total_precip_mm'.
+        Values are None for points where the dataset has no coverage (e.g. open ocean).
+    
+    Points already in the geo cache (shared with get_weather_data) are not
+    re-fetched; newly fetched points with full coverage are added to it.
+    """
+    if not points:
+        return []
+    
+    windows = _growing_season_windows(end_date)
+    cache = geo_cache.default_cache
+    keys = [
+        geo_cache.make_key('get_weather_data', 'era5_land_daily', lat, lon, windows)
+        for lat, lon in points
+    ]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, cached in enumerate(results) if cached is None]
+    if not missing:
+        return results
+    
+    fetched = _fetch_weather_many([points[i] for i in missing], windows,
+                                  chunk_size or WEATHER_BATCH_CHUNK_SIZE)
+    ttl_s = geo_cache.DATASETS['era5_land_daily']['ttl_s']
+    for i, weather in zip(missing, fetched):
+        results[i] = weather
+        if weather['max_temp_celsius'] is not None and weather['total_precip_mm'] is not None:
+            cache.set(keys[i], weather, ttl_s)
+    
+    return results
+
+
+def _fetch_weather_many(points: List[tuple], windows: tuple, chunk_size: int) -> List[dict]:
+    """Uncached reduceRegions fetch behind get_weather_data_many."""
+    authenticate_gee()
+    
+    peak_start, peak_end, growing_start, growing_end = windows
+    
+    # Single two-band image: peak max temperature (K) and seasonal precipitation (m)
+    temp_max_img = ee.ImageCollection('ECMWF/ERA5_LAND/DAILY_AGGR') \
+        .filterDate(peak_start, peak_end) \
+        .select('temperature_2m_max') \
+        .max() \
+        .rename('max_temp_k')
+    precip_img = ee.ImageCollection('ECMWF/ERA5_LAND/DAILY_AGGR') \
+        .filterDate(growing_start, growing_end) \
+        .select('total_precipitation_sum') \
+        .sum() \
+        .rename('precip_m')
+    weather_img = temp_max_img.addBands(precip_img)
+    
+    results: List[dict] = []
+    for chunk_start in range(0, len(points), chunk_size):
+        chunk = points[chunk_start:chunk_start + chunk_size]
+        features = ee.FeatureCollection([
+            ee.Feature(ee.Geometry.Point([lon, lat]), {'idx': i})
+            for i, (lat, lon) in enumerate(chunk)
+        ])
+        
+        # A point covers a single pixel, so the mean equals the max/mean
+        # reducers used by get_weather_data.
+        reduced = weather_img.reduceRegions(
+            collection=features,
+            reducer=ee.Reducer.mean(),
+            scale=11132
+        ).getInfo()
+        
+        by_idx = {
+            f['properties']['idx']: f['properties']
+            for f in reduced.get('features', [])
+        }
+        for i in range(len(chunk)):
+            props = by_idx.get(i, {})
+            temp_k = props.get('max_temp_k')
+            precip_m = props.get('precip_m')
+            results.append({
+                'max_temp_celsius': temp_k - 273.15 if temp_k is not None else None,
+                'total_precip_mm': precip_m * 1000 if precip_m is not None else None,
+            })
+    
+    return results
+
+
+@coalesced
+@cached_lookup('nasadem_era5_wave',
+               cache_if=lambda result: result['slope_pct'] is not None and result['wave_height_source'] == 'era5')
 def get_coastal_params(lat: float, lon: float) -> dict:
     """
     Get coastal parameters including slope and maximum wave height for a location.
@@ -124,8 +238,9 @@ def get_coastal_params(lat: float, lon: float) -> dict:
         lon: Longitude
     
     Returns:
-        Dictionary with 'slope_pct' (slope in percentage) and 'max_wave_height' (maximum
-        significant wave height in meters over the last 5 years)
+        Dictionary with 'slope_pct' (slope in percentage), 'max_wave_height' (maximum
+        significant wave height in meters over the last 5 years) and 'wave_height_source'
+        ('era5', or 'latitude_estimate' when ERA5 failed or had no data; not cached)
     """
     authenticate_gee()
     
@@ -148,6 +263,7 @@ def get_coastal_params(lat: float, lon: float) -> dict:
     
     # Try multiple wave data sources
     max_wave_height = None
+    wave_height_source = 'era5'
     
     try:
         # Option 1: Try ERA5 monthly wave data (more reliable for ocean areas)
@@ -171,6 +287,7 @@ def get_coastal_params(lat: float, lon: float) -> dict:
     # Option 2: If no wave data, estimate based on distance from coast and latitude
     if max_wave_height is None or max_wave_height == 0:
         # Use latitude-based estimation (tropical areas have higher waves)
+        wave_height_source = 'latitude_estimate'
         abs_lat = abs(lat)
         if abs_lat < 10:  # Tropical (more storms)
             max_wave_height = 4.5
@@ -188,10 +305,19 @@ def get_coastal_params(lat: float, lon: float) -> dict:
     
     return {
         'slope_pct': slope_pct,
-        'max_wave_height': max_wave_height
+        'max_wave_height': max_wave_height,
+        'wave_height_source': wave_height_source
     }
 
 
+def _most_recent_full_year() -> int:
+    """Most recent full year of ERA5-Land monthly data (previous year, to be safe)."""
+    return datetime.now().year - 1
+
+
+@coalesced
+@cached_lookup('era5_land_monthly', window=lambda: (_most_recent_full_year(),),
+               cache_if=lambda result: any(result['rainfall_monthly_mm']) or any(result['soil_moisture_monthly']))
 def get_monthly_data(lat: float, lon: float) -> dict:
     """
     Get monthly weather data for charts from ERA5-Land dataset.
@@ -212,14 +338,7 @@ def get_monthly_data(lat: float, lon: float) -> dict:
     
     point = ee.Geometry.Point([lon, lat])
     
-    # Determine the most recent full year
-    current_date = datetime.now()
-    if current_date.month == 1:
-        # If January, use previous year as most recent full year
-        year = current_date.year - 1
-    else:
-        # Check if current year data is available (use previous year to be safe)
-        year = current_date.year - 1
+    year = _most_recent_full_year()
     
     start_date = f'{year}-01-01'
     end_date = f'{year}-12-31'
@@ -233,8 +352,18 @@ def get_monthly_data(lat: float, lon: float) -> dict:
     # Sort by system:time_start to ensure chronological order
     monthly_data = monthly_data.sort('system:time_start')
     
-    # Get the list of images
-    image_list = monthly_data.toList(monthly_data.size())
+    # Extract values at the point for every month server-side, in one round trip
+    try:
+        month_values = monthly_data.toList(12).map(
+            lambda image: ee.Image(image).reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=point,
+                scale=11132
+            )
+        ).getInfo()
+    except Exception as e:
+        print(f"[WARNING] Error fetching monthly data: {e}")
+        month_values = []
     
     rainfall_monthly_mm = []
     soil_moisture_monthly = []
@@ -242,14 +371,8 @@ def get_monthly_data(lat: float, lon: float) -> dict:
     # Process each month
     for i in range(12):
         try:
-            image = ee.Image(image_list.get(i))
-            
-            # Extract values at the point
-            values = image.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=point,
-                scale=11132
-            ).getInfo()
+            # IndexError when the month is missing from the collection
+            values = month_values[i]
             
             # Total precipitation: convert from meters to mm
             precip_m = values.get('total_precipitation', 0)
@@ -271,6 +394,8 @@ def get_monthly_data(lat: float, lon: float) -> dict:
     }
 
 
+@coalesced
+@cached_lookup('srtm_openlandmap')
 def get_terrain_data(lat: float, lon: float) -> dict:
     """
     Get terrain data including elevation and soil pH for a location.
@@ -293,7 +418,6 @@ def get_terrain_data(lat: float, lon: float) -> dict:
         geometry=point,
         scale=30
     ).get('elevation')
-    elevation_m = ee.Number(elevation_value).getInfo()
     
     # 2. Fetch Soil pH from OpenLandMap
     # Dataset: OpenLandMap Soil pH in H2O at 0cm depth
@@ -305,8 +429,15 @@ def get_terrain_data(lat: float, lon: float) -> dict:
         scale=250
     ).get('b0')
     
+    # Evaluate both values in a single round trip
+    terrain = ee.Dictionary({
+        'elevation_m': elevation_value,
+        'soil_ph_raw': soil_ph_value
+    }).getInfo()
+    elevation_m = terrain.get('elevation_m')
+    
     # Convert from pH * 10 to actual pH
-    soil_ph_raw = ee.Number(soil_ph_value).getInfo()
+    soil_ph_raw = terrain.get('soil_ph_raw')
     soil_ph = soil_ph_raw / 10.0 if soil_ph_raw is not None else None
     
     return {
@@ -315,6 +446,8 @@ def get_terrain_data(lat: float, lon: float) -> dict:
     }
 
 
+@coalesced
+@cached_lookup('modis_ndvi', window=lambda: (datetime.now().strftime('%Y-%m'),), cache_if=bool)
 def get_ndvi_timeseries(lat: float, lon: float) -> list[dict]:
     """
     Fetch a 12-month NDVI time-series from MODIS MOD13A2 (16-day, 1 km)
@@ -365,6 +498,7 @@ def get_ndvi_timeseries(lat: float, lon: float) -> list[dict]:
     ]
 
 
+@coalesced
 def analyze_spatial_viability(lat: float, lon: float, temp_increase_c: float) -> dict:
     """
     Analyze spatial viability of cropland under temperature increase scenarios.
@@ -0,0 +1,183 @@
+"""
+Google Earth Engine Session Manager
+===================================
+
+One lazily-initialized Earth Engine session per worker process, shared by
+every engine and router that talks to GEE.
+
+Previously each call site loaded credentials and ran ``ee.Initialize`` on
+every request. The session here initializes once, re-initializes when the
+session ages past ``GEE_SESSION_TTL_S`` (service-account OAuth tokens last an
+hour) or after ``invalidate()``, and remembers failures for
+``GEE_UNAVAILABLE_RETRY_S`` so offline fallbacks kick in immediately instead
+of re-reading credentials and retrying the handshake on every request.
+
+Usage:
+    from gee_session import ensure_initialized, is_available
+
+    if is_available():
+        ensure_initialized()
+        ...  # ee calls
+    else:
+        ...  # fallback
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import ee
+from gee_credentials import load_gee_credentials
+
+SESSION_TTL_S = float(os.environ.get("GEE_SESSION_TTL_S", "3000"))
+UNAVAILABLE_RETRY_S = float(os.environ.get("GEE_UNAVAILABLE_RETRY_S", "60"))
+
+CREDENTIALS_NOT_FOUND_MESSAGE = (
+    "Google Earth Engine credentials not found. "
+    "Set WARP_GEE_CREDENTIALS or GEE_SERVICE_ACCOUNT_JSON env var, "
+    "or place credentials.json in project root or ~/.adaptmetric/"
+)
+
+
+class GEEUnavailableError(ValueError):
+    """Earth Engine cannot be used (no credentials or initialization failed)."""
+
+
+class GEESession:
+    """Thread-safe, lazily-initialized Earth Engine session."""
+
+    def __init__(self, ttl_s: float = SESSION_TTL_S, retry_s: float = UNAVAILABLE_RETRY_S):
+        self.ttl_s = ttl_s
+        self.retry_s = retry_s
+        self._lock = threading.Lock()
+        self._initialized_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._init_count = 0
+        self._failure_count = 0
+        self._last_init_ms: Optional[float] = None
+        self._total_init_ms = 0.0
+
+    # -- state checks (lock-free fast paths) -------------------------------
+
+    def _is_fresh(self, now: float) -> bool:
+        return self._initialized_at is not None and now - self._initialized_at < self.ttl_s
+
+    def _in_failure_backoff(self, now: float) -> bool:
+        return self._failed_at is not None and now - self._failed_at < self.retry_s
+
+    # -- public API ---------------------------------------------------------
+
+    def ensure_initialized(self) -> None:
+        """
+        Initialize Earth Engine if needed.
+
+        Cheap when a fresh session exists. Raises GEEUnavailableError
+        immediately (without touching credentials) while a recent failure is
+        being remembered.
+        """
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return
+        if self._in_failure_backoff(now):
+            raise GEEUnavailableError(self._last_error)
+
+        with self._lock:
+            now = time.monotonic()
+            if self._is_fresh(now):
+                return
+            if self._in_failure_backoff(now):
+                raise GEEUnavailableError(self._last_error)
+            self._initialize()
+
+    def is_available(self) -> bool:
+        """
+        Whether Earth Engine can be used right now.
+
+        Returns from cached state when possible; otherwise attempts a single
+        initialization, whose outcome is cached.
+        """
+        try:
+            self.ensure_initialized()
+            return True
+        except GEEUnavailableError:
+            return False
+
+    def invalidate(self) -> None:
+        """Force re-initialization on next use (e.g. after an auth error)."""
+        with self._lock:
+            self._initialized_at = None
+            self._failed_at = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Initialization counters and latency for monitoring."""
+        now = time.monotonic()
+        return {
+            'initialized': self._is_fresh(now),
+            'session_age_s': round(now - self._initialized_at, 1) if self._initialized_at is not None else None,
+            'init_count': self._init_count,
+            'init_failures': self._failure_count,
+            'last_init_ms': round(self._last_init_ms, 2) if self._last_init_ms is not None else None,
+            'avg_init_ms': round(self._total_init_ms / self._init_count, 2) if self._init_count else None,
+            'last_error': self._last_error,
+        }
+
+    # -- internals ----------------------------------------------------------
+
+    def _initialize(self) -> None:
+        """Load credentials and run ee.Initialize. Caller must hold the lock."""
+        start = time.perf_counter()
+        try:
+            credentials_dict = load_gee_credentials()
+            if not credentials_dict:
+                raise GEEUnavailableError(CREDENTIALS_NOT_FOUND_MESSAGE)
+
+            # Convert dict back to JSON string for ee.ServiceAccountCredentials
+            credentials_json = json.dumps(credentials_dict)
+            credentials = ee.ServiceAccountCredentials(
+                credentials_dict['client_email'],
+                key_data=credentials_json
+            )
+            ee.Initialize(credentials)
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            self._initialized_at = None
+            self._failure_count += 1
+            self._last_error = str(e)
+            if isinstance(e, GEEUnavailableError):
+                raise
+            raise GEEUnavailableError(f"Earth Engine initialization failed: {e}") from e
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._initialized_at = time.monotonic()
+        self._failed_at = None
+        self._last_error = None
+        self._init_count += 1
+        self._last_init_ms = elapsed_ms
+        self._total_init_ms += elapsed_ms
+
+
+# Process-wide session shared by all engines
+session = GEESession()
+
+
+def ensure_initialized() -> None:
+    """Initialize the shared Earth Engine session if needed."""
+    session.ensure_initialized()
+
+
+def is_available() -> bool:
+    """Whether the shared Earth Engine session is usable."""
+    return session.is_available()
+
+
+def invalidate() -> None:
+    """Force the shared session to re-initialize on next use."""
+    session.invalidate()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Metrics for the shared Earth Engine session."""
+    return session.get_metrics()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Geospatial Lookup Cache
+=======================
+
+Read-through cache for the point lookups in gee_connector. Satellite-derived
+values are static for a given pixel and season, and users query the same
+ports and farms repeatedly, so results are cached under
+
+    (function, dataset, lat/lon snapped to the dataset's native grid, date window)
+
+in two tiers:
+
+- an in-process LRU (``GEO_CACHE_MEMORY_SIZE`` entries), and
+- an on-disk SQLite database (``GEO_CACHE_PATH``) in WAL mode, shared by all
+  uvicorn workers on the host.
+
+Entries expire after a per-dataset TTL. Only successful lookups are cached:
+exceptions propagate and are retried on the next call, and results built
+from fallback values (estimated wave heights, missing slope, empty monthly
+or NDVI series) are returned but not stored.
+
+Snapping to the native grid means two points inside the same pixel share an
+entry, which matches what Earth Engine returns for a point reduceRegion at the
+dataset's scale.
+
+Usage:
+    python geo_cache.py warm global_targets_100.csv --workers 8
+    python geo_cache.py stats
+    python geo_cache.py purge
+"""
+
+import argparse
+import csv
+import functools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DAY_S = 24 * 3600
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'geo_cache.sqlite3')
+CACHE_PATH = os.environ.get("GEO_CACHE_PATH", DEFAULT_PATH)
+MEMORY_SIZE = int(os.environ.get("GEO_CACHE_MEMORY_SIZE", "4096"))
+CACHE_ENABLED = os.environ.get("GEO_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Native grid (degrees) and time-to-live per cached dataset
+DATASETS: Dict[str, Dict[str, float]] = {
+    # ERA5-Land daily aggregates, 0.1 deg grid. Completed seasons only change on reanalysis.
+    'era5_land_daily': {'resolution_deg': 0.1, 'ttl_s': 30 * DAY_S},
+    # ERA5-Land monthly aggregates, 0.1 deg grid
+    'era5_land_monthly': {'resolution_deg': 0.1, 'ttl_s': 30 * DAY_S},
+    # SRTM 1 arc-second elevation + OpenLandMap soil pH (static)
+    'srtm_openlandmap': {'resolution_deg': 1.0 / 3600, 'ttl_s': 365 * DAY_S},
+    # NASADEM 1 arc-second slope + ERA5 5-year max wave height
+    'nasadem_era5_wave': {'resolution_deg': 1.0 / 3600, 'ttl_s': 30 * DAY_S},
+    # MODIS MOD13A2 NDVI, ~1 km (30 arc-second) grid, rolling 12-month window
+    'modis_ndvi': {'resolution_deg': 1.0 / 120, 'ttl_s': DAY_S},
+}
+
+
+def make_key(function: str, dataset: str, lat: float, lon: float, window: Iterable = ()) -> str:
+    """
+    Cache key for a point lookup.
+
+    Args:
+        function: Lookup function name (e.g. 'get_weather_data')
+        dataset: Key into DATASETS
+        lat: Latitude
+        lon: Longitude
+        window: Date window components (e.g. season start/end dates)
+
+    Returns:
+        Key string with coordinates snapped to the dataset's native grid
+    """
+    resolution = DATASETS[dataset]['resolution_deg']
+    cell = (int(round(lat / resolution)), int(round(lon / resolution)))
+    return '|'.join([function, dataset, f'{cell[0]},{cell[1]}', ','.join(str(w) for w in window)])
+
+
+class GeoCache:
+    """Two-tier (LRU memory + SQLite disk) cache of JSON-serializable lookup results.
+
+    Args:
+        path: SQLite database path; None for a memory-only cache
+        memory_size: Maximum entries held in the in-process LRU
+        enabled: When False, every lookup is a miss and nothing is stored
+    """
+
+    def __init__(self, path: Optional[str] = CACHE_PATH, memory_size: int = MEMORY_SIZE,
+                 enabled: bool = CACHE_ENABLED):
+        self.path = path or None
+        self.memory_size = memory_size
+        self.enabled = enabled
+        self._memory: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._disk_failed = False
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'errors': 0}
+
+    # -- disk tier ----------------------------------------------------------
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Per-thread SQLite connection, or None if the disk tier is unavailable."""
+        if self.path is None or self._disk_failed:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=10)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS geo_cache ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Geo cache disk tier disabled (%s): %s", self.path, e)
+                self._disk_failed = True
+                self._count('errors')
+                return None
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                'SELECT expires_at, value FROM geo_cache WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Geo cache read failed: %s", e)
+            self._count('errors')
+            return None
+        return (row[0], row[1]) if row else None
+
+    def _disk_set(self, key: str, expires_at: float, payload: str) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO geo_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, payload, expires_at)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Geo cache write failed: %s", e)
+            self._count('errors')
+
+    # -- memory tier --------------------------------------------------------
+
+    def _memory_put(self, key: str, expires_at: float, payload: str) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    # -- public API ---------------------------------------------------------
+
+    def get(self, key: str) -> Any:
+        """
+        Look up a cached value.
+
+        Returns:
+            A fresh copy of the cached value, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return json.loads(entry[1])
+                del self._memory[key]
+
+        entry = self._disk_get(key, now)
+        if entry is not None:
+            self._memory_put(key, *entry)
+            self._count('disk_hits')
+            return json.loads(entry[1])
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Any, ttl_s: float) -> None:
+        """Store a JSON-serializable value in both tiers for ``ttl_s`` seconds."""
+        if not self.enabled:
+            return
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning("Geo cache skipped unserializable value for %s: %s", key, e)
+            self._count('errors')
+            return
+        expires_at = time.time() + ttl_s
+        self._memory_put(key, expires_at, payload)
+        self._disk_set(key, expires_at, payload)
+        self._count('stores')
+
+    def purge_expired(self) -> int:
+        """Delete expired entries from both tiers. Returns rows removed from disk."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (exp, _) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+        conn = self._connection()
+        if conn is None:
+            return 0
+        removed = conn.execute('DELETE FROM geo_cache WHERE expires_at <= ?', (now,)).rowcount
+        conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        conn = self._connection()
+        if conn is not None:
+            conn.execute('DELETE FROM geo_cache')
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes; ``disk_entries`` is None if the disk tier cannot be read."""
+        disk_entries = None
+        conn = self._connection()
+        if conn is not None:
+            try:
+                disk_entries = conn.execute('SELECT COUNT(*) FROM geo_cache').fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning("Geo cache count failed: %s", e)
+                self._count('errors')
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else None
+        stats['disk_path'] = None if self._disk_failed else self.path
+        if conn is not None:
+            stats['disk_entries'] = disk_entries
+        return stats
+
+
+# Process-wide cache used by gee_connector
+default_cache = GeoCache()
+
+
+def cached_lookup(dataset: str, window: Optional[Callable[..., Iterable]] = None,
+                  cache_if: Optional[Callable[[Any], bool]] = None):
+    """
+    Decorator caching a ``fn(lat, lon, ...)`` lookup in ``default_cache``.
+
+    Args:
+        dataset: Key into DATASETS (native grid and TTL)
+        window: Maps the remaining arguments of the call to the date window
+            that determines the result; omitted when the result only depends
+            on location
+        cache_if: Predicate on the result; results it rejects (e.g. fallback
+            values returned after a failed fetch) are not cached
+    """
+    ttl_s = DATASETS[dataset]['ttl_s']
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(lat: float, lon: float, *args, **kwargs):
+            key = make_key(fn.__name__, dataset, lat, lon, window(*args, **kwargs) if window else ())
+            cache = default_cache
+            value = cache.get(key)
+            if value is not None:
+                return value
+            value = fn(lat, lon, *args, **kwargs)
+            if cache_if is None or cache_if(value):
+                cache.set(key, value, ttl_s)
+            return value
+        return wrapper
+    return decorator
+
+
+def get_stats() -> Dict[str, Any]:
+    """Stats for the process-wide cache."""
+    return default_cache.get_stats()
+
+
+# =============================================================================
+# Warm-up
+# =============================================================================
+
+# gee_connector lookups to pre-fetch per target project type
+LOOKUPS_BY_PROJECT_TYPE = {
+    'agriculture': ('weather', 'monthly', 'terrain'),
+    'coastal': ('coastal',),
+    'flood': ('terrain',),
+}
+
+
+def _lookup_functions() -> Dict[str, Callable[[float, float], Any]]:
+    import gee_connector
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=365)
+    return {
+        'weather': lambda lat, lon: gee_connector.get_weather_data(
+            lat, lon, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+        ),
+        'monthly': gee_connector.get_monthly_data,
+        'terrain': gee_connector.get_terrain_data,
+        'coastal': gee_connector.get_coastal_params,
+        'ndvi': gee_connector.get_ndvi_timeseries,
+    }
+
+
+def warm(targets_csv: str, workers: int = 4, lookups: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Pre-fetch lookups for every target in a CSV with name, lat, lon, project_type columns.
+
+    Args:
+        targets_csv: Path to targets CSV (e.g. global_targets_100.csv)
+        workers: Concurrent lookups
+        lookups: Lookup names to run for every target; defaults to
+            LOOKUPS_BY_PROJECT_TYPE for each row's project_type
+
+    Returns:
+        Dictionary with 'tasks', 'failed' (list of error strings) and 'stats'
+    """
+    functions = _lookup_functions()
+    with open(targets_csv, newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    tasks = []
+    for row in rows:
+        names = lookups or LOOKUPS_BY_PROJECT_TYPE.get(row.get('project_type', ''), ('weather',))
+        for name in names:
+            tasks.append((row.get('name', ''), name, float(row['lat']), float(row['lon'])))
+
+    def run(task):
+        target, name, lat, lon = task
+        try:
+            functions[name](lat, lon)
+            return None
+        except Exception as e:
+            return f"{target} [{name}]: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        failed = [err for err in pool.map(run, tasks) if err]
+
+    return {'tasks': len(tasks), 'failed': failed, 'stats': default_cache.get_stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the geospatial lookup cache')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    warm_parser = sub.add_parser('warm', help='Pre-fetch lookups for a targets CSV')
+    warm_parser.add_argument('targets_csv', nargs='?', default='global_targets_100.csv')
+    warm_parser.add_argument('--workers', type=int, default=4)
+    warm_parser.add_argument('--lookups', type=str, default=None,
+                             help='Comma-separated subset of: weather,monthly,terrain,coastal,ndvi')
+    sub.add_parser('stats', help='Print cache statistics')
+    sub.add_parser('purge', help='Delete expired entries')
+
+    args = parser.parse_args()
+
+    if args.command == 'warm':
+        lookups = args.lookups.split(',') if args.lookups else None
+        start = time.perf_counter()
+        result = warm(args.targets_csv, workers=args.workers, lookups=lookups)
+        for err in result['failed']:
+            print(f"FAILED {err}", file=sys.stderr)
+        print(f"Warmed {result['tasks'] - len(result['failed'])}/{result['tasks']} lookups "
+              f"in {time.perf_counter() - start:.1f}s")
+        print(json.dumps(result['stats'], indent=2))
+        sys.exit(1 if result['failed'] else 0)
+    elif args.command == 'stats':
+        print(json.dumps(default_cache.get_stats(), indent=2))
+    elif args.command == 'purge':
+        print(f"Removed {default_cache.purge_expired()} expired entries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for pre-fork serving with uvicorn workers.
+
+    gunicorn api:app -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and every registered
+surrogate model is loaded there before the workers are forked, so workers
+share the model memory copy-on-write instead of each loading its own copy.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before workers fork."""
+    import model_registry
+
+    loaded = model_registry.default_registry.preload()
+    server.log.info("Preloaded models: %s", ", ".join(f"{name}={'ok' if ok else 'unavailable'}" for name, ok in loaded.items()))
@@ -26,8 +26,14 @@ Arguments:
     --workforce_size: Number of workers for health projects (default: 100)
     --daily_wage: Daily wage per worker in USD for health projects (default: 15.0)
 
+    Financial assumptions for agriculture projects are read from the
+    FINANCIAL_CAPEX, FINANCIAL_OPEX, FINANCIAL_DISCOUNT_RATE and FINANCIAL_YEARS
+    environment variables.
+
 Output:
     JSON object with calculation results printed to stdout
+
+For in-process use (no subprocess), see simulation_engine.py.
 """
 
 import argparse
@@ -35,7 +41,7 @@ import json
 import math
 import os
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Import calculation engines
 from physics_engine import calculate_yield
@@ -155,9 +161,10 @@ def run_agriculture_analysis(args, weather_data):
     avoided_loss = resilient_yield - standard_yield
     percentage_improvement = (avoided_loss / standard_yield * 100) if standard_yield > 0 else 0.0
     
-    # Calculate ROI - use environment variable overrides if provided, otherwise use defaults
-    capex = float(os.getenv('FINANCIAL_CAPEX', '2000.0'))
-    opex = float(os.getenv('FINANCIAL_OPEX', '425.0'))
+    # Calculate ROI - financial assumptions come from the simulation parameters
+    # (populated from FINANCIAL_* environment variables when run as a CLI)
+    capex = args.capex
+    opex = args.opex
     yield_benefit_pct = 30.0
 
     # Approximate commodity prices (USD/ton) for comparative ROI.
@@ -171,8 +178,8 @@ def run_agriculture_analysis(args, weather_data):
     }
     price_per_ton = prices_per_ton.get(args.crop_type, 4000.0)
 
-    analysis_years = int(os.getenv('FINANCIAL_YEARS', '10'))
-    discount_rate = float(os.getenv('FINANCIAL_DISCOUNT_RATE', '0.10'))
+    analysis_years = args.analysis_years
+    discount_rate = args.discount_rate
     
     # Generate cash flows
     incremental_cash_flows = []
@@ -448,59 +455,46 @@ def run_health_analysis(args, weather_data):
         }
 
 
+def params_from_cli(args):
+    """Build typed simulation parameters from CLI arguments and FINANCIAL_* env vars."""
+    from simulation_engine import SimulationParams
+
+    return SimulationParams(
+        lat=args.lat,
+        lon=args.lon,
+        scenario_year=args.scenario_year,
+        project_type=args.project_type,
+        crop_type=args.crop_type,
+        temp_delta=args.temp_delta,
+        rain_pct_change=args.rain_pct_change,
+        mangrove_width=args.mangrove_width,
+        slr_projection=args.slr_projection,
+        rain_intensity=args.rain_intensity,
+        workforce_size=args.workforce_size,
+        daily_wage=args.daily_wage,
+        capex=float(os.getenv('FINANCIAL_CAPEX', '2000.0')),
+        opex=float(os.getenv('FINANCIAL_OPEX', '425.0')),
+        discount_rate=float(os.getenv('FINANCIAL_DISCOUNT_RATE', '0.10')),
+        analysis_years=int(os.getenv('FINANCIAL_YEARS', '10')),
+        use_mock_data=args.use_mock_data,
+    )
+
+
 def main():
     """Main execution function."""
     try:
-        # Parse arguments
+        # Parse arguments (coordinates are validated by SimulationParams)
         args = parse_arguments()
-        
-        # Validate coordinates
-        validate_coordinates(args.lat, args.lon)
-        
-        # Get weather data based on mode
-        if args.use_mock_data:
-            # Use mock data for testing (bypasses GEE completely)
-            from mock_data import get_mock_weather
-            weather_data = get_mock_weather(args.lat, args.lon)
+        params = params_from_cli(args)
+
+        from simulation_engine import resolve_weather, run_simulation
+
+        if params.use_mock_data:
             print(f"Info: Using mock data for testing", file=sys.stderr)
-        else:
-            # Try to get weather data from GEE, fallback to approximation
-            try:
-                from gee_connector import get_weather_data
-                
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=365)
-                
-                weather_data = get_weather_data(
-                    lat=args.lat,
-                    lon=args.lon,
-                    start_date=start_date.strftime('%Y-%m-%d'),
-                    end_date=end_date.strftime('%Y-%m-%d')
-                )
-                weather_data['data_source'] = 'google_earth_engine'
-            except Exception as gee_error:
-                print(f"Warning: GEE unavailable, using fallback data: {gee_error}", file=sys.stderr)
-                weather_data = get_weather_data_fallback(args.lat, args.lon)
-        
-        # Route to appropriate analysis based on project type
-        if args.project_type == 'agriculture':
-            result = run_agriculture_analysis(args, weather_data)
-        elif args.project_type == 'coastal':
-            result = run_coastal_analysis(args, weather_data)
-        elif args.project_type == 'flood':
-            result = run_flood_analysis(args, weather_data)
-        elif args.project_type == 'health':
-            result = run_health_analysis(args, weather_data)
-        else:
-            result = {
-                'error': 'Invalid project type',
-                'message': f'Unknown project_type: {args.project_type}'
-            }
-        
-        # Add metadata
-        result['execution_timestamp'] = datetime.now().isoformat()
-        result['success'] = 'error' not in result
-        
+        weather_data = resolve_weather(params)
+
+        result = run_simulation(params, weather_data)
+
         # Output JSON to stdout
         print(json.dumps(result, indent=2))
         
@@ -2,7 +2,8 @@
 """
 Initialize database tables for Supply Chain Network.
 
-This script creates the supply_chain_nodes and supply_chain_edges tables.
+This script creates the supply_chain_nodes, supply_chain_edges and
+supply_chain_node_criticality tables.
 Run this once before using the supply chain endpoints.
 
 Usage:
@@ -11,7 +12,7 @@ Usage:
 
 import asyncio
 from database import engine, Base
-from models import SupplyChainNode, SupplyChainEdge, User
+from models import SupplyChainNode, SupplyChainEdge, SupplyChainNodeCriticality, User, create_missing_indexes
 
 
 async def init_db():
@@ -21,14 +22,18 @@ async def init_db():
     async with engine.begin() as conn:
         # Create all tables defined in Base metadata
         await conn.run_sync(Base.metadata.create_all)
+        # Indexes added to tables created by an earlier version
+        await conn.run_sync(create_missing_indexes)
     
     print("✓ Database tables created successfully:")
     print("  - supply_chain_nodes")
     print("  - supply_chain_edges")
+    print("  - supply_chain_node_criticality")
     print("  - users")
     print("\nYou can now use the supply chain endpoints:")
     print("  POST /api/v1/supply-chain/upload")
     print("  POST /api/v1/supply-chain/simulate-cascade")
+    print("  GET  /api/v1/supply-chain/networks/{network_id}/criticality")
 
 
 if __name__ == "__main__":
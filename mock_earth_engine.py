@@ -0,0 +1,381 @@
+"""
+Mock Earth Engine Client for Testing
+====================================
+
+An offline stand-in for the subset of the ``ee`` API used by gee_connector.
+Pixel values come from mock_data, so results are deterministic per location,
+and every ``getInfo()`` is counted (with optional simulated latency) so the
+number of Earth Engine round trips can be asserted in tests and measured in
+benchmarks.
+
+Usage:
+    from mock_earth_engine import MockEarthEngine
+    import gee_connector
+
+    fake_ee = MockEarthEngine(latency_s=0.05)
+    monkeypatch.setattr(gee_connector, "ee", fake_ee)
+    monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+
+    gee_connector.get_weather_data_many([(40.7, -74.0), (5.6, -0.2)], ...)
+    assert fake_ee.getinfo_calls == 1
+
+The mock does not model time: temporal reductions (max/sum/mean) over a
+collection return the seasonal value mock_data reports for the location.
+Collections listed in COLLECTIONS (ERA5-Land monthly, MODIS NDVI) hold one
+image per month, so per-image server-side ``map`` and ``getRegion`` can be
+exercised too; ``getRegion`` stamps image i with the middle of month i+1 of
+REGION_YEAR.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from mock_data import get_mock_coastal_params, get_mock_elevation, get_mock_monthly_data, get_mock_weather
+
+# band name -> f(lat, lon) pixel value, per dataset id
+PixelFn = Callable[[float, float], Optional[float]]
+
+
+def _era5_max_temp_k(lat: float, lon: float) -> float:
+    return get_mock_weather(lat, lon)['max_temp_celsius'] + 273.15
+
+
+def _era5_precip_m(lat: float, lon: float) -> float:
+    return get_mock_weather(lat, lon)['total_precip_mm'] / 1000.0
+
+
+def _coastal(key: str) -> PixelFn:
+    return lambda lat, lon: get_mock_coastal_params(lat, lon)[key]
+
+
+def _era5_monthly(key: str, scale: float, month: int) -> PixelFn:
+    return lambda lat, lon: get_mock_monthly_data(lat, lon)[key][month] * scale
+
+
+DATASETS: Dict[str, Dict[str, PixelFn]] = {
+    'ECMWF/ERA5_LAND/DAILY_AGGR': {
+        'temperature_2m_max': _era5_max_temp_k,
+        'total_precipitation_sum': _era5_precip_m,
+    },
+    'USGS/SRTMGL1_003': {
+        'elevation': get_mock_elevation,
+    },
+    'OpenLandMap/SOL/SOL_PH-H2O_USDA-4C1A2A_M/v02': {
+        'b0': lambda lat, lon: 65.0,
+    },
+    'NASA/NASADEM_HGT/001': {
+        'elevation': get_mock_elevation,
+    },
+    'ECMWF/ERA5/MONTHLY': {
+        'mean_significant_wave_height': _coastal('max_wave_height'),
+    },
+}
+
+
+# Time-varying collections: one band dict per image, in chronological order
+COLLECTIONS: Dict[str, List[Dict[str, PixelFn]]] = {
+    'ECMWF/ERA5_LAND/MONTHLY_AGGR': [
+        {
+            'total_precipitation': _era5_monthly('rainfall_monthly_mm', 0.001, month),
+            'volumetric_soil_water_layer_1': _era5_monthly('soil_moisture_monthly', 1.0, month),
+        }
+        for month in range(12)
+    ],
+    # NDVI x 10000, as MODIS stores it
+    'MODIS/061/MOD13A2': [{'NDVI': lambda lat, lon: 6000.0} for _ in range(12)],
+}
+
+# Year getRegion stamps its monthly images with
+REGION_YEAR = 2024
+
+
+class MockEEException(Exception):
+    """Raised where the real client would raise ee.EEException."""
+
+
+class _Point:
+    def __init__(self, coords: List[float]):
+        self.lon, self.lat = float(coords[0]), float(coords[1])
+
+
+class _Geometry:
+    Point = _Point
+
+
+class _Reducer:
+    def __init__(self, name: str):
+        self.name = name
+
+    @staticmethod
+    def mean():
+        return _Reducer('mean')
+
+    @staticmethod
+    def max():
+        return _Reducer('max')
+
+    @staticmethod
+    def first():
+        return _Reducer('first')
+
+    @staticmethod
+    def sum():
+        return _Reducer('sum')
+
+
+class _Terrain:
+    @staticmethod
+    def slope(image: '_Image') -> '_Image':
+        # Slope is taken from mock_data rather than derived from the elevation band
+        return _Image(image._ee, {'slope': _coastal('slope_pct')})
+
+
+class _Feature:
+    def __init__(self, geometry: _Point, properties: Optional[dict] = None):
+        self.geometry = geometry
+        self.properties = dict(properties or {})
+
+
+class _FeatureCollection:
+    def __init__(self, features: Iterable[_Feature]):
+        self.features = list(features)
+
+
+class MockEarthEngine:
+    """Offline stand-in for the ``ee`` module.
+
+    Args:
+        latency_s: Simulated network latency added to every getInfo() call
+        missing_points: (lat, lon) pairs treated as having no data coverage
+        collection_size: Images returned by time-varying collections (at most
+            12 months); fewer simulates months missing from the archive
+        failing_datasets: Dataset ids whose ImageCollection/Image construction
+            raises MockEEException, simulating an unavailable dataset
+    """
+
+    EEException = MockEEException
+    Geometry = _Geometry
+    Reducer = _Reducer
+    Terrain = _Terrain
+    Feature = _Feature
+    FeatureCollection = _FeatureCollection
+
+    def __init__(self, latency_s: float = 0.0, missing_points: Iterable[tuple] = (),
+                 collection_size: int = 12, failing_datasets: Iterable[str] = ()):
+        self.latency_s = latency_s
+        self.missing_points = {(float(lat), float(lon)) for lat, lon in missing_points}
+        self.collection_size = collection_size
+        self.failing_datasets = set(failing_datasets)
+        self.getinfo_calls = 0
+        self.initialize_calls = 0
+
+    # -- module-level functions -------------------------------------------
+
+    def Initialize(self, credentials: Any = None, **kwargs) -> None:
+        self.initialize_calls += 1
+
+    def ServiceAccountCredentials(self, email: str, key_data: str = None) -> dict:
+        return {'client_email': email}
+
+    # -- constructors ---------------------------------------------------------
+
+    def ImageCollection(self, dataset_id: str) -> '_ImageCollection':
+        self._check_available(dataset_id)
+        if dataset_id in COLLECTIONS:
+            images = [dict(bands) for bands in COLLECTIONS[dataset_id][:self.collection_size]]
+        else:
+            images = [dict(DATASETS[dataset_id])]
+        return _ImageCollection(self, images)
+
+    def Image(self, arg) -> '_Image':
+        if isinstance(arg, _Image):
+            return arg
+        self._check_available(arg)
+        return _Image(self, dict(DATASETS[arg]))
+
+    def Number(self, value) -> '_Number':
+        return _Number(self, value)
+
+    def Dictionary(self, values: dict) -> '_Dictionary':
+        return _Dictionary(self, dict(values))
+
+    # -- internals ----------------------------------------------------------
+
+    def _check_available(self, dataset_id: str) -> None:
+        if dataset_id in self.failing_datasets:
+            raise MockEEException(f"Dataset {dataset_id} is unavailable")
+
+    def _round_trip(self, value: Any) -> Any:
+        self.getinfo_calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return value
+
+    def _sample(self, fn: PixelFn, lat: float, lon: float) -> Optional[float]:
+        if (lat, lon) in self.missing_points:
+            return None
+        return fn(lat, lon)
+
+
+def _evaluate(value: Any) -> Any:
+    """Client-side value of a (possibly computed) mock object."""
+    return value._evaluate() if hasattr(value, '_evaluate') else value
+
+
+class _ImageCollection:
+    def __init__(self, engine: MockEarthEngine, images: List[Dict[str, PixelFn]]):
+        self._ee = engine
+        self._images = images
+
+    def filterBounds(self, geometry: Any) -> '_ImageCollection':
+        return self
+
+    def filterDate(self, start: str, end: str) -> '_ImageCollection':
+        return self
+
+    def sort(self, prop: str, ascending: bool = True) -> '_ImageCollection':
+        return self
+
+    def select(self, names) -> '_ImageCollection':
+        names = [names] if isinstance(names, str) else list(names)
+        return _ImageCollection(self._ee, [{n: bands[n] for n in names} for bands in self._images])
+
+    def size(self) -> '_Number':
+        return _Number(self._ee, len(self._images))
+
+    def toList(self, count) -> '_List':
+        return _List(self._ee, [_Image(self._ee, dict(bands)) for bands in self._images[:_evaluate(count)]])
+
+    def getRegion(self, geometry: _Point, scale: float = None, **kwargs) -> '_List':
+        names = list(self._images[0]) if self._images else []
+        rows: List[Any] = [['id', 'longitude', 'latitude', 'time', *names]]
+        for i, bands in enumerate(self._images):
+            stamp = datetime(REGION_YEAR, i % 12 + 1, 15, tzinfo=timezone.utc).timestamp() * 1000
+            values = [self._ee._sample(bands[n], geometry.lat, geometry.lon) for n in names]
+            rows.append([str(i), geometry.lon, geometry.lat, stamp, *values])
+        return _List(self._ee, rows)
+
+    def _reduce(self) -> '_Image':
+        return _Image(self._ee, dict(self._images[0]))
+
+    max = _reduce
+    sum = _reduce
+    mean = _reduce
+
+
+class _Image:
+    def __init__(self, engine: MockEarthEngine, bands: Dict[str, PixelFn]):
+        self._ee = engine
+        self._bands = bands
+
+    def select(self, names) -> '_Image':
+        names = [names] if isinstance(names, str) else list(names)
+        return _Image(self._ee, {n: self._bands[n] for n in names})
+
+    def rename(self, name: str) -> '_Image':
+        (fn,) = self._bands.values()
+        return _Image(self._ee, {name: fn})
+
+    def addBands(self, other: '_Image') -> '_Image':
+        return _Image(self._ee, {**self._bands, **other._bands})
+
+    def _sample_point(self, point: _Point) -> dict:
+        values = {name: self._ee._sample(fn, point.lat, point.lon) for name, fn in self._bands.items()}
+        return {k: v for k, v in values.items() if v is not None}
+
+    def reduceRegion(self, reducer: _Reducer, geometry: _Point, scale: float = None, **kwargs) -> '_Dictionary':
+        return _Dictionary(self._ee, self._sample_point(geometry))
+
+    def reduceRegions(self, collection: _FeatureCollection, reducer: _Reducer,
+                      scale: float = None, **kwargs) -> '_ComputedFeatures':
+        features = [
+            {'type': 'Feature', 'properties': {**f.properties, **self._sample_point(f.geometry)}}
+            for f in collection.features
+        ]
+        return _ComputedFeatures(self._ee, features)
+
+
+class _ComputedFeatures:
+    def __init__(self, engine: MockEarthEngine, features: List[dict]):
+        self._ee = engine
+        self._features = features
+
+    def _evaluate(self) -> dict:
+        return {'type': 'FeatureCollection', 'features': self._features}
+
+    def getInfo(self) -> dict:
+        return self._ee._round_trip(self._evaluate())
+
+
+class _List:
+    def __init__(self, engine: MockEarthEngine, items: List[Any]):
+        self._ee = engine
+        self._items = items
+
+    def get(self, index: int) -> Any:
+        if index >= len(self._items):
+            raise MockEEException(f"List.get: List index must be between 0 and {len(self._items) - 1}")
+        return self._items[index]
+
+    def map(self, fn: Callable[[Any], Any]) -> '_List':
+        return _List(self._ee, [fn(item) for item in self._items])
+
+    def _evaluate(self) -> list:
+        return [_evaluate(item) for item in self._items]
+
+    def getInfo(self) -> list:
+        self._ee._round_trip(None)
+        return self._evaluate()
+
+
+class _Dictionary:
+    def __init__(self, engine: MockEarthEngine, values: dict):
+        self._ee = engine
+        self._values = values
+
+    def get(self, key: str) -> '_Number':
+        return _Number(self._ee, self._values.get(key))
+
+    def _evaluate(self) -> dict:
+        return {k: _evaluate(v) for k, v in self._values.items()}
+
+    def getInfo(self) -> dict:
+        self._ee._round_trip(None)
+        return self._evaluate()
+
+
+class _Number:
+    """Null values pass through getInfo() as None; arithmetic on null fails, like ee."""
+
+    _INVALID = object()
+
+    def __init__(self, engine: MockEarthEngine, value):
+        self._ee = engine
+        self._value = value._value if isinstance(value, _Number) else value
+
+    def _apply(self, fn) -> '_Number':
+        if self._value is None or self._value is _Number._INVALID:
+            return _Number(self._ee, _Number._INVALID)
+        return _Number(self._ee, fn(self._value))
+
+    def subtract(self, other: float) -> '_Number':
+        return self._apply(lambda v: v - other)
+
+    def add(self, other: float) -> '_Number':
+        return self._apply(lambda v: v + other)
+
+    def multiply(self, other: float) -> '_Number':
+        return self._apply(lambda v: v * other)
+
+    def divide(self, other: float) -> '_Number':
+        return self._apply(lambda v: v / other)
+
+    def _evaluate(self) -> Optional[float]:
+        if self._value is _Number._INVALID:
+            raise MockEEException("Number.subtract: Parameter 'left' is required.")
+        return self._value
+
+    def getInfo(self) -> Optional[float]:
+        self._ee._round_trip(None)
+        return self._evaluate()
@@ -0,0 +1,292 @@
+"""
+Model Registry
+==============
+
+One place that owns the ML surrogate models (ag, coffee, flood, coastal).
+Routers register a model by name and path at import time, which costs
+nothing; the model is loaded by whichever comes first:
+
+- the first request that needs it (concurrent requests wait for the same
+  load rather than loading it twice);
+- the background warm-up thread started with the app (MODEL_LOADING);
+- ``preload()`` in a pre-fork server's master process.
+
+MODEL_LOADING selects what happens at app startup:
+
+    lazy        nothing; each model loads on first use
+    background  (default) a daemon thread loads every model, so a worker
+                starts serving immediately and only requests for a model
+                still loading wait for it
+    eager       startup blocks until every model is loaded
+
+Pre-fork sharing: uvicorn ``--workers`` spawns fresh interpreters, so each
+worker holds its own copy of every unpickled forest (compiled forests are
+memory-mapped and already shared through the page cache). Under gunicorn with ``preload_app`` (gunicorn.conf.py), ``preload()``
+loads all models in the master and calls ``gc.freeze()``, so forked workers
+share the model pages copy-on-write and the cyclic GC does not touch them.
+
+A model that cannot be loaded raises ModelUnavailableError from ``get``; the
+failure is remembered for MODEL_RETRY_S seconds so a missing file is not
+retried on every request.
+
+Usage:
+    from model_registry import register_model, get_model
+
+    register_model("flood", "flood_surrogate.pkl")
+    model = get_model("flood")
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from forest_compiler import CompiledForest, load_model
+
+# What happens at app startup: "lazy", "background" or "eager"
+MODEL_LOADING = os.environ.get("MODEL_LOADING", "background").strip().lower()
+
+# Seconds before a model that failed to load is tried again
+MODEL_RETRY_S = float(os.environ.get("MODEL_RETRY_S", "60"))
+
+
+class ModelUnavailableError(RuntimeError):
+    """A registered model could not be loaded."""
+
+    def __init__(self, name: str, path: str, reason: str):
+        super().__init__(f"{name.capitalize()} model unavailable ({path}): {reason}")
+        self.name = name
+        self.path = path
+        self.reason = reason
+
+
+class _Entry:
+    __slots__ = ('name', 'path', 'loader', 'lock', 'model', 'status', 'error', 'failed_at',
+                 'load_time_ms', 'rss_delta_bytes', 'model_bytes', 'memory_mapped', 'loads')
+
+    def __init__(self, name: str, path: str, loader: Callable[[str], Any]):
+        self.name = name
+        self.path = path
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.model = None
+        self.status = 'unloaded'
+        self.error: Optional[str] = None
+        self.failed_at = 0.0
+        self.load_time_ms: Optional[float] = None
+        self.rss_delta_bytes: Optional[int] = None
+        self.model_bytes: Optional[int] = None
+        self.memory_mapped = False
+        self.loads = 0
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux), else None."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _model_bytes(model: Any) -> Optional[int]:
+    """Size of a model's arrays, or None if the type is not recognised."""
+    if isinstance(model, CompiledForest):
+        return sum(int(getattr(model, name).nbytes) for name in
+                   ("feature", "threshold", "children", "missing_left", "value", "roots", "depth"))
+    estimators = getattr(model, "estimators_", None)
+    if estimators and hasattr(estimators[0], "tree_"):
+        total = 0
+        for estimator in estimators:
+            state = estimator.tree_.__getstate__()
+            total += int(state["nodes"].nbytes) + int(state["values"].nbytes)
+        return total
+    return None
+
+
+def _is_memory_mapped(model: Any) -> bool:
+    import numpy as np
+    return isinstance(model, CompiledForest) and isinstance(model.threshold, np.memmap)
+
+
+class ModelRegistry:
+    """Named models, loaded once per process on first use or warm-up."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, path: str, loader: Callable[[str], Any] = load_model) -> None:
+        """
+        Register a model without loading it.
+
+        Args:
+            name: Key used with ``get``
+            path: Model file, passed to ``loader``
+            loader: Callable returning the model for ``path``
+        """
+        with self._lock:
+            existing = self._entries.get(name)
+            if existing is None or (existing.path, existing.loader) != (path, loader):
+                self._entries[name] = _Entry(name, path, loader)
+
+    def put(self, name: str, model: Any, path: str = "<in-memory>") -> None:
+        """Register an already loaded model (e.g. a test double)."""
+        entry = _Entry(name, path, lambda _: model)
+        entry.model, entry.status = model, 'loaded'
+        with self._lock:
+            self._entries[name] = entry
+
+    def names(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def _entry(self, name: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"No model registered as '{name}'")
+        return entry
+
+    def is_loaded(self, name: str) -> bool:
+        return self._entry(name).model is not None
+
+    def get(self, name: str) -> Any:
+        """
+        The model registered as ``name``, loading it if needed.
+
+        Raises:
+            KeyError: If no model is registered under ``name``
+            ModelUnavailableError: If the model cannot be loaded
+        """
+        entry = self._entry(name)
+        model = entry.model
+        if model is not None:
+            return model
+        with entry.lock:
+            if entry.model is None:
+                if entry.error is not None and time.monotonic() - entry.failed_at < MODEL_RETRY_S:
+                    raise ModelUnavailableError(name, entry.path, entry.error)
+                self._load(entry)
+            return entry.model
+
+    async def get_async(self, name: str) -> Any:
+        """``get`` for async endpoints: a model that still has to load is loaded off the event loop."""
+        entry = self._entry(name)
+        model = entry.model
+        if model is not None:
+            return model
+        return await asyncio.to_thread(self.get, name)
+
+    def _load(self, entry: _Entry) -> None:
+        entry.status = 'loading'
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        try:
+            model = entry.loader(entry.path)
+        except Exception as e:
+            entry.status = 'failed'
+            entry.error = "file not found" if isinstance(e, FileNotFoundError) else str(e)
+            entry.failed_at = time.monotonic()
+            print(f"Warning: Failed to load {entry.name} model from {entry.path}: {entry.error}", file=sys.stderr)
+            raise ModelUnavailableError(entry.name, entry.path, entry.error) from e
+
+        entry.load_time_ms = round((time.perf_counter() - start) * 1000, 1)
+        rss_after = _rss_bytes()
+        entry.rss_delta_bytes = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        entry.model_bytes = _model_bytes(model)
+        entry.memory_mapped = _is_memory_mapped(model)
+        entry.error = None
+        entry.loads += 1
+        entry.status = 'loaded'
+        entry.model = model
+        print(f"{entry.name.capitalize()} model loaded from {entry.path} in {entry.load_time_ms} ms")
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """
+        Load models now (all registered ones by default), one after another.
+
+        Returns:
+            Dictionary of model name to whether it is loaded
+        """
+        loaded = {}
+        for name in list(names) if names is not None else self.names():
+            try:
+                self.get(name)
+                loaded[name] = True
+            except ModelUnavailableError:
+                loaded[name] = False
+        return loaded
+
+    def start_warm_up(self) -> threading.Thread:
+        """Run ``warm_up`` in a daemon thread (once per registry)."""
+        with self._lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self.warm_up, name="model-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def preload(self) -> Dict[str, bool]:
+        """
+        Load every model and freeze the heap, before a pre-fork server forks
+        its workers, so they share the model pages copy-on-write.
+        """
+        loaded = self.warm_up()
+        gc.collect()
+        gc.freeze()
+        return loaded
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-model status, load time (ms) and memory (bytes)."""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            entry.name: {
+                "path": entry.path,
+                "status": entry.status,
+                "type": type(entry.model).__name__ if entry.model is not None else None,
+                "load_time_ms": entry.load_time_ms,
+                "model_bytes": entry.model_bytes,
+                "rss_delta_bytes": entry.rss_delta_bytes,
+                "memory_mapped": entry.memory_mapped,
+                "loads": entry.loads,
+                "error": entry.error,
+            }
+            for entry in entries
+        }
+
+
+# Process-wide registry shared by the routers
+default_registry = ModelRegistry()
+
+
+def register_model(name: str, path: str, loader: Callable[[str], Any] = load_model) -> None:
+    """Register a model with the process-wide registry."""
+    default_registry.register(name, path, loader)
+
+
+def get_model(name: str) -> Any:
+    """The named model from the process-wide registry (see ``ModelRegistry.get``)."""
+    return default_registry.get(name)
+
+
+async def get_model_async(name: str) -> Any:
+    """The named model from the process-wide registry (see ``ModelRegistry.get_async``)."""
+    return await default_registry.get_async(name)
+
+
+async def start_loading() -> None:
+    """App startup hook implementing MODEL_LOADING."""
+    if MODEL_LOADING == "eager":
+        await asyncio.to_thread(default_registry.warm_up)
+    elif MODEL_LOADING == "background":
+        default_registry.start_warm_up()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Metrics for the process-wide registry."""
+    return {"loading": MODEL_LOADING, "models": default_registry.get_metrics()}
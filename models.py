@@ -5,7 +5,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, String, ForeignKey, Integer
+from sqlalchemy import Boolean, DateTime, Float, String, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
@@ -31,7 +31,7 @@ class SupplyChainNode(Base):
     __tablename__ = "supply_chain_nodes"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    network_id: Mapped[str] = mapped_column(String(36), index=True, nullable=False)
+    network_id: Mapped[str] = mapped_column(String(36), nullable=False)
     node_id: Mapped[str] = mapped_column(String(255), nullable=False)  # User-defined node identifier
     label: Mapped[str] = mapped_column(String(500), nullable=False)
     node_type: Mapped[str] = mapped_column(String(100), nullable=False)  # Supplier, Manufacturer, Port, Distribution
@@ -40,8 +40,9 @@ class SupplyChainNode(Base):
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
 
-    # Unique constraint on network_id + node_id
+    # Node lookups are always scoped to a network
     __table_args__ = (
+        Index("ix_supply_chain_nodes_network_node", "network_id", "node_id"),
         {"sqlite_autoincrement": True},
     )
 
@@ -51,13 +52,51 @@ class SupplyChainEdge(Base):
     __tablename__ = "supply_chain_edges"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    network_id: Mapped[str] = mapped_column(String(36), index=True, nullable=False)
+    network_id: Mapped[str] = mapped_column(String(36), nullable=False)
     source_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
     target_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
 
+    # Edge loads are per network; the source column serves adjacency lookups
     __table_args__ = (
+        Index("ix_supply_chain_edges_network_source", "network_id", "source_node_id"),
         {"sqlite_autoincrement": True},
     )
+
+
+class SupplyChainNodeCriticality(Base):
+    """Precomputed single-node failure impact of a supply chain node (criticality_engine)."""
+    __tablename__ = "supply_chain_node_criticality"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    network_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    node_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)  # 1 = most critical
+    downstream_reach: Mapped[int] = mapped_column(Integer, nullable=False)
+    dominated_nodes: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_single_point_of_failure: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    betweenness: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    # Served as ranked pages and single-node lookups within a network
+    __table_args__ = (
+        Index("ix_supply_chain_node_criticality_network_rank", "network_id", "rank", unique=True),
+        Index("ix_supply_chain_node_criticality_network_node", "network_id", "node_id", unique=True),
+        {"sqlite_autoincrement": True},
+    )
+
+
+def create_missing_indexes(connection) -> None:
+    """
+    Create indexes added after a table was first created.
+
+    ``Base.metadata.create_all`` skips tables that already exist, including
+    their new indexes, so run this after it (``conn.run_sync``).
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
@@ -9,18 +9,38 @@ Simulates financial outcomes under various risk scenarios:
 """
 
 import numpy as np
-from typing import Dict, Any, List
-from financial_engine import calculate_npv
+from typing import Dict, Any
+
+# Upper bound on iterations per location; 1e6 draws keep peak memory ~30 MB.
+MAX_ITERATIONS = 1_000_000
+
+
+def annuity_factor(discount_rate: float, years: int) -> float:
+    """
+    Present value of 1.0 received at the end of each year for ``years`` years.
+
+    Equivalent to discounting a flat cash flow with calculate_npv:
+    Σ 1 / (1 + r)^t for t = 1 to n.
+    """
+    if years <= 0:
+        return 0.0
+    if discount_rate == 0:
+        return float(years)
+    return float((1.0 - (1.0 + discount_rate) ** -years) / discount_rate)
 
 
 def run_simulation(base_data: Dict[str, Any], iterations: int = 50) -> Dict[str, Any]:
     """
     Run Monte Carlo simulation on a single location's financial model.
     
+    All risk draws are generated as arrays and NPV is evaluated in closed form
+    (initial CAPEX plus a discounted annuity of net annual benefit), so even
+    MAX_ITERATIONS draws complete in milliseconds.
+    
     Args:
         base_data: A single location object from the Atlas containing
                    financial_analysis and crop_analysis data
-        iterations: Number of simulation runs (default: 50)
+        iterations: Number of simulation runs (default: 50, max: MAX_ITERATIONS)
     
     Returns:
         Dictionary with:
@@ -30,6 +50,10 @@ def run_simulation(base_data: Dict[str, Any], iterations: int = 50) -> Dict[str,
         - simulation_count: Number of iterations run
         - risk_factors: Description of risk factors applied
     """
+    iterations = int(iterations)
+    if not 1 <= iterations <= MAX_ITERATIONS:
+        raise ValueError(f"iterations must be between 1 and {MAX_ITERATIONS:,}, got {iterations}")
+
     # Extract base assumptions
     financial = base_data.get('financial_analysis', {})
     assumptions = financial.get('assumptions', {})
@@ -46,54 +70,33 @@ def run_simulation(base_data: Dict[str, Any], iterations: int = 50) -> Dict[str,
     # Get yield percentages from crop analysis
     base_resilient_yield = crop_analysis.get('resilient_yield_pct', 100.0) / 100.0
     
-    # Store NPV results
-    npv_results: List[float] = []
-    
     # Set seed for reproducibility (but allow different results per location)
     location = base_data.get('location', {})
     seed = int(abs(hash((location.get('lat', 0), location.get('lon', 0)))) % (2**31))
     rng = np.random.default_rng(seed)
     
-    for _ in range(iterations):
-        # 1. Yield Volatility: Normal variation (mean=base, std_dev=15%)
-        yield_multiplier = rng.normal(loc=1.0, scale=0.15)
-        yield_multiplier = max(0.1, yield_multiplier)  # Floor at 10% to avoid negative
-        stressed_yield = base_resilient_yield * yield_multiplier
-        
-        # 2. Price Volatility: +/- 10% (uniform distribution for market risk)
-        price_multiplier = rng.uniform(0.90, 1.10)
-        stressed_price = base_price * price_multiplier
-        
-        # 3. CAPEX Overruns: +/- 5% (execution risk)
-        capex_multiplier = rng.uniform(0.95, 1.05)
-        stressed_capex = base_capex * capex_multiplier
-        
-        # 4. Recalculate annual benefit with stressed parameters
-        # Annual benefit = yield_benefit_pct * stressed_yield * price
-        # Simplified: benefit scales with yield and price
-        stressed_annual_benefit = (base_yield_benefit / 100.0) * stressed_yield * stressed_price
-        
-        # 5. Generate stressed cash flows
-        cash_flows = []
-        
-        # Year 0: Initial CAPEX (negative)
-        cash_flows.append(-stressed_capex)
-        
-        # Years 1 to N: Net annual cash flow (benefit - opex)
-        for year in range(1, analysis_years + 1):
-            net_annual = stressed_annual_benefit - base_opex
-            cash_flows.append(net_annual)
-        
-        # 6. Calculate stressed NPV
-        npv = calculate_npv(cash_flows, discount_rate)
-        npv_results.append(npv)
+    # 1. Yield Volatility: Normal variation (mean=base, std_dev=15%),
+    #    floored at 10% to avoid negative yields
+    yield_multiplier = np.maximum(0.1, rng.normal(loc=1.0, scale=0.15, size=iterations))
+    stressed_yield = base_resilient_yield * yield_multiplier
     
-    # Calculate statistics
-    npv_array = np.array(npv_results)
+    # 2. Price Volatility: +/- 10% (uniform distribution for market risk)
+    stressed_price = base_price * rng.uniform(0.90, 1.10, size=iterations)
+    
+    # 3. CAPEX Overruns: +/- 5% (execution risk)
+    stressed_capex = base_capex * rng.uniform(0.95, 1.05, size=iterations)
     
+    # 4. Annual benefit scales with yield and price
+    stressed_annual_benefit = (base_yield_benefit / 100.0) * stressed_yield * stressed_price
+    
+    # 5. NPV of [-CAPEX, (benefit - opex) x analysis_years] in closed form
+    npv_array = (stressed_annual_benefit - base_opex) * annuity_factor(discount_rate, analysis_years)
+    npv_array -= stressed_capex
+    
+    # Calculate statistics
     mean_npv = float(np.mean(npv_array))
     var_95 = float(np.percentile(npv_array, 5))  # 5th percentile = worst 5% outcomes
-    default_count = np.sum(npv_array < 0)
+    default_count = np.count_nonzero(npv_array < 0)
     default_probability = float(default_count / iterations * 100)
     
     return {
@@ -132,7 +135,7 @@ if __name__ == "__main__":
         }
     }
     
-    result = run_simulation(sample_location, iterations=50)
+    result = run_simulation(sample_location, iterations=100_000)
     print("Monte Carlo Simulation Results:")
     print(f"  Mean NPV: ${result['mean_npv']:,.2f}")
     print(f"  VaR 95%:  ${result['VaR_95']:,.2f}")
@@ -0,0 +1,289 @@
+"""
+Compiled Supply Chain Network Cache
+===================================
+
+/api/v1/supply-chain/simulate-cascade used to reload every node and edge of
+a network from the database and build a fresh ``networkx.DiGraph`` on each
+request, although analysts run dozens of what-if disruptions against the
+same network in a session.
+
+A network is now loaded once per worker and compiled into a
+``CompiledNetwork``: node attributes in parallel lists, a node id -> index
+map, and the successor lists as CSR arrays (``indptr`` / ``indices``). The
+compiled networks are kept in an LRU bounded by SUPPLY_CHAIN_GRAPH_CACHE_SIZE
+networks and SUPPLY_CHAIN_GRAPH_CACHE_MB megabytes, so cascades on a cached
+network are pure in-memory traversals.
+
+Networks are immutable once uploaded (every upload creates a new network id),
+so entries never go stale; the upload endpoint still invalidates its network
+id. Concurrent requests for a network that is not cached share one load.
+
+Usage:
+    from network_cache import get_network
+
+    network = await get_network(network_id, load_network)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Compiled networks kept per worker (0 disables the cache)
+SUPPLY_CHAIN_GRAPH_CACHE_SIZE = int(os.environ.get("SUPPLY_CHAIN_GRAPH_CACHE_SIZE", "16"))
+
+# Memory budget for compiled networks per worker, in megabytes
+SUPPLY_CHAIN_GRAPH_CACHE_MB = float(os.environ.get("SUPPLY_CHAIN_GRAPH_CACHE_MB", "512"))
+
+
+class CompiledNetwork:
+    """
+    A supply chain network as CSR adjacency arrays.
+
+    Nodes are numbered 0..n-1 in load order. The successors of node ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]``, in the order their first edge was
+    loaded; duplicate edges are dropped. This is the node and edge order of a
+    ``networkx.DiGraph`` built from the same rows, so edge ``k`` of
+    ``edges()`` is the graph's edge ``k``.
+    """
+
+    def __init__(
+        self,
+        network_id: str,
+        node_ids: List[str],
+        labels: List[str],
+        node_types: List[str],
+        statuses: List[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+    ):
+        self.network_id = network_id
+        self.node_ids = node_ids
+        self.labels = labels
+        self.node_types = node_types
+        self.statuses = statuses
+        self.indptr = indptr
+        self.indices = indices
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.nbytes = self._measure()
+
+    @classmethod
+    def compile(
+        cls,
+        network_id: str,
+        nodes: Iterable[Sequence[str]],
+        edges: Iterable[Sequence[str]],
+    ) -> "CompiledNetwork":
+        """
+        Build the CSR form of a network.
+
+        Args:
+            network_id: Network the rows belong to
+            nodes: (node_id, label, node_type, baseline_status) rows; a repeated
+                node id keeps its first row
+            edges: (source_node_id, target_node_id) rows; edges naming a node
+                that is not in ``nodes`` are ignored
+
+        Returns:
+            CompiledNetwork
+        """
+        node_ids: List[str] = []
+        labels: List[str] = []
+        node_types: List[str] = []
+        statuses: List[str] = []
+        index: Dict[str, int] = {}
+        # Node types and statuses repeat, so store one string object per value
+        names: Dict[str, str] = {}
+        for node_id, label, node_type, status in nodes:
+            if node_id in index:
+                continue
+            index[node_id] = len(node_ids)
+            node_ids.append(node_id)
+            labels.append(label)
+            node_types.append(names.setdefault(node_type, node_type))
+            statuses.append(names.setdefault(status, status))
+
+        sources: List[int] = []
+        targets: List[int] = []
+        for source_id, target_id in edges:
+            source, target = index.get(source_id), index.get(target_id)
+            if source is not None and target is not None:
+                sources.append(source)
+                targets.append(target)
+
+        n = len(node_ids)
+        source_arr = np.asarray(sources, dtype=np.int64)
+        target_arr = np.asarray(targets, dtype=np.int64)
+        # First occurrence of each distinct edge, grouped by source in load order
+        _, first = np.unique(source_arr * max(n, 1) + target_arr, return_index=True)
+        first = first[np.lexsort((first, source_arr[first]))]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source_arr[first], minlength=n), out=indptr[1:])
+        indices = target_arr[first].astype(np.int32)
+        return cls(network_id, node_ids, labels, node_types, statuses, indptr, indices)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def successors(self, node: int) -> np.ndarray:
+        """Indices of the direct successors of node index ``node``."""
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def descendants(self, node: int) -> np.ndarray:
+        """Indices of every node reachable from ``node``, excluding ``node`` (as ``nx.descendants``)."""
+        reached = np.zeros(self.num_nodes, dtype=bool)
+        reached[node] = True
+        frontier = np.array([node], dtype=np.int64)
+        while len(frontier):
+            starts, ends = self.indptr[frontier], self.indptr[frontier + 1]
+            counts = ends - starts
+            if not counts.any():
+                break
+            offsets = np.repeat(ends - counts.cumsum(), counts) + np.arange(counts.sum())
+            nxt = np.unique(self.indices[offsets])
+            nxt = nxt[~reached[nxt]]
+            reached[nxt] = True
+            frontier = nxt
+        reached[node] = False
+        return np.flatnonzero(reached)
+
+    def edge_sources(self) -> np.ndarray:
+        """Source node index of each edge, in CSR order."""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def edges(self) -> List[Tuple[str, str]]:
+        """(source_id, target_id) of each edge, in CSR order."""
+        ids = self.node_ids
+        return [(ids[s], ids[t]) for s, t in zip(self.edge_sources().tolist(), self.indices.tolist())]
+
+    def _measure(self) -> int:
+        """Approximate memory held by this network, in bytes."""
+        total = int(self.indptr.nbytes + self.indices.nbytes)
+        total += sys.getsizeof(self.index)
+        for values in (self.node_ids, self.labels, self.node_types, self.statuses):
+            total += sys.getsizeof(values)
+        total += sum(sys.getsizeof(s) for s in self.node_ids)
+        total += sum(sys.getsizeof(s) for s in self.labels)
+        total += sum(sys.getsizeof(s) for s in set(self.node_types) | set(self.statuses))
+        return total
+
+
+class NetworkCache:
+    """LRU of compiled networks bounded by count and bytes, with hit counters."""
+
+    def __init__(self, max_networks: int = SUPPLY_CHAIN_GRAPH_CACHE_SIZE, max_mb: float = SUPPLY_CHAIN_GRAPH_CACHE_MB):
+        self.max_networks = max_networks
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._networks: "OrderedDict[str, CompiledNetwork]" = OrderedDict()
+        self._bytes = 0
+        self._loads: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._counters = {'hits': 0, 'misses': 0, 'shared_loads': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, network_id: str) -> Optional[CompiledNetwork]:
+        """The cached network, or None (counted as a hit or miss)."""
+        with self._lock:
+            network = self._networks.get(network_id)
+            if network is None:
+                self._counters['misses'] += 1
+                return None
+            self._networks.move_to_end(network_id)
+            self._counters['hits'] += 1
+            return network
+
+    def put(self, network: CompiledNetwork) -> None:
+        """Cache ``network``, evicting least recently used networks to stay within budget."""
+        if self.max_networks <= 0 or network.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._networks.pop(network.network_id, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._networks[network.network_id] = network
+            self._bytes += network.nbytes
+            while len(self._networks) > self.max_networks or self._bytes > self.max_bytes:
+                _, evicted = self._networks.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._counters['evictions'] += 1
+
+    async def get_or_load(self, network_id: str, load: Callable[[str], Awaitable[CompiledNetwork]]) -> CompiledNetwork:
+        """
+        The cached network, or the result of ``load(network_id)``, which is cached.
+
+        Concurrent misses for the same network on one event loop await a
+        single load. Exceptions raised by ``load`` propagate and nothing is cached.
+        """
+        network = self.get(network_id)
+        if network is not None:
+            return network
+        loop = asyncio.get_running_loop()
+        key = (id(loop), network_id)
+        with self._lock:
+            task = self._loads.get(key)
+            if task is None:
+                task = self._loads[key] = loop.create_task(self._load(key, network_id, load))
+            else:
+                self._counters['shared_loads'] += 1
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Tuple[int, str], network_id: str, load: Callable[[str], Awaitable[CompiledNetwork]]) -> CompiledNetwork:
+        try:
+            network = await load(network_id)
+            self.put(network)
+            return network
+        finally:
+            with self._lock:
+                self._loads.pop(key, None)
+
+    def invalidate(self, network_id: str) -> None:
+        with self._lock:
+            network = self._networks.pop(network_id, None)
+            if network is not None:
+                self._bytes -= network.nbytes
+                self._counters['invalidations'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._networks.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats['networks'] = len(self._networks)
+            stats['nodes'] = sum(network.num_nodes for network in self._networks.values())
+            stats['edges'] = sum(network.num_edges for network in self._networks.values())
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        stats['max_networks'] = self.max_networks
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+# Process-wide cache used by routers.supply_chain
+default_cache = NetworkCache()
+
+
+async def get_network(network_id: str, load: Callable[[str], Awaitable[CompiledNetwork]]) -> CompiledNetwork:
+    """The network from the process-wide cache, loading it with ``load`` on a miss."""
+    return await default_cache.get_or_load(network_id, load)
+
+
+def invalidate(network_id: str) -> None:
+    """Drop ``network_id`` from the process-wide cache."""
+    default_cache.invalidate(network_id)
+
+
+def get_stats() -> Dict[str, Any]:
+    """Statistics for the process-wide cache."""
+    return default_cache.get_stats()
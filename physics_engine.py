@@ -4,6 +4,8 @@
 # Supports: Maize, Cocoa, Rice, Soy, Wheat
 # =============================================================================
 
+import numpy as np
+
 # ============= MAIZE PARAMETERS =============
 # Critical temperature threshold (°C)
 MAIZE_CRITICAL_TEMP_C = 28.0  # Lowered to make heat stress more common
@@ -200,14 +202,10 @@ def _calculate_staple_crop_yield(
     return max(0.0, min(100.0, yield_pct))
 
 
-def calculate_maize_yield(temp: float, rain: float, seed_type: int, temp_delta: float = 0.0, rain_pct_change: float = 0.0) -> float:
-    """Calculate maize yield based on temperature, rainfall, and seed type."""
-    return _calculate_staple_crop_yield(
-        temp=temp,
-        rain=rain,
-        seed_type=seed_type,
-        temp_delta=temp_delta,
-        rain_pct_change=rain_pct_change,
+# Per-crop parameters for the generic staple-crop model, shared by the scalar
+# wrappers below and by calculate_yield_batch.
+STAPLE_CROP_PARAMS = {
+    'maize': dict(
         critical_temp_c=MAIZE_CRITICAL_TEMP_C,
         heat_loss_rate_optimal=MAIZE_HEAT_LOSS_RATE_OPTIMAL,
         heat_loss_rate_drought=MAIZE_HEAT_LOSS_RATE_DROUGHT,
@@ -218,6 +216,55 @@ def calculate_maize_yield(temp: float, rain: float, seed_type: int, temp_delta:
         resilience_drought_factor=MAIZE_RESILIENCE_DROUGHT_FACTOR,
         waterlog_loss_per_100mm=5.0,
         waterlog_resilience_multiplier=0.6,
+    ),
+    'rice': dict(
+        critical_temp_c=RICE_CRITICAL_TEMP_C,
+        heat_loss_rate_optimal=RICE_HEAT_LOSS_RATE_OPTIMAL,
+        heat_loss_rate_drought=RICE_HEAT_LOSS_RATE_DROUGHT,
+        min_rainfall_mm=RICE_MIN_RAINFALL_MM,
+        optimal_rainfall_min_mm=RICE_OPTIMAL_RAINFALL_MIN_MM,
+        optimal_rainfall_max_mm=RICE_OPTIMAL_RAINFALL_MAX_MM,
+        resilience_delta_c=RICE_RESILIENCE_DELTA_C,
+        resilience_drought_factor=RICE_RESILIENCE_DROUGHT_FACTOR,
+        waterlog_loss_per_100mm=RICE_WATERLOG_LOSS_PER_100MM,
+        waterlog_resilience_multiplier=0.8,
+    ),
+    'soy': dict(
+        critical_temp_c=SOY_CRITICAL_TEMP_C,
+        heat_loss_rate_optimal=SOY_HEAT_LOSS_RATE_OPTIMAL,
+        heat_loss_rate_drought=SOY_HEAT_LOSS_RATE_DROUGHT,
+        min_rainfall_mm=SOY_MIN_RAINFALL_MM,
+        optimal_rainfall_min_mm=SOY_OPTIMAL_RAINFALL_MIN_MM,
+        optimal_rainfall_max_mm=SOY_OPTIMAL_RAINFALL_MAX_MM,
+        resilience_delta_c=SOY_RESILIENCE_DELTA_C,
+        resilience_drought_factor=SOY_RESILIENCE_DROUGHT_FACTOR,
+        waterlog_loss_per_100mm=SOY_WATERLOG_LOSS_PER_100MM,
+        waterlog_resilience_multiplier=0.6,
+    ),
+    'wheat': dict(
+        critical_temp_c=WHEAT_CRITICAL_TEMP_C,
+        heat_loss_rate_optimal=WHEAT_HEAT_LOSS_RATE_OPTIMAL,
+        heat_loss_rate_drought=WHEAT_HEAT_LOSS_RATE_DROUGHT,
+        min_rainfall_mm=WHEAT_MIN_RAINFALL_MM,
+        optimal_rainfall_min_mm=WHEAT_OPTIMAL_RAINFALL_MIN_MM,
+        optimal_rainfall_max_mm=WHEAT_OPTIMAL_RAINFALL_MAX_MM,
+        resilience_delta_c=WHEAT_RESILIENCE_DELTA_C,
+        resilience_drought_factor=WHEAT_RESILIENCE_DROUGHT_FACTOR,
+        waterlog_loss_per_100mm=WHEAT_WATERLOG_LOSS_PER_100MM,
+        waterlog_resilience_multiplier=0.6,
+    ),
+}
+
+
+def calculate_maize_yield(temp: float, rain: float, seed_type: int, temp_delta: float = 0.0, rain_pct_change: float = 0.0) -> float:
+    """Calculate maize yield based on temperature, rainfall, and seed type."""
+    return _calculate_staple_crop_yield(
+        temp=temp,
+        rain=rain,
+        seed_type=seed_type,
+        temp_delta=temp_delta,
+        rain_pct_change=rain_pct_change,
+        **STAPLE_CROP_PARAMS['maize'],
     )
 
 
@@ -229,16 +276,7 @@ def calculate_rice_yield(temp: float, rain: float, seed_type: int, temp_delta: f
         seed_type=seed_type,
         temp_delta=temp_delta,
         rain_pct_change=rain_pct_change,
-        critical_temp_c=RICE_CRITICAL_TEMP_C,
-        heat_loss_rate_optimal=RICE_HEAT_LOSS_RATE_OPTIMAL,
-        heat_loss_rate_drought=RICE_HEAT_LOSS_RATE_DROUGHT,
-        min_rainfall_mm=RICE_MIN_RAINFALL_MM,
-        optimal_rainfall_min_mm=RICE_OPTIMAL_RAINFALL_MIN_MM,
-        optimal_rainfall_max_mm=RICE_OPTIMAL_RAINFALL_MAX_MM,
-        resilience_delta_c=RICE_RESILIENCE_DELTA_C,
-        resilience_drought_factor=RICE_RESILIENCE_DROUGHT_FACTOR,
-        waterlog_loss_per_100mm=RICE_WATERLOG_LOSS_PER_100MM,
-        waterlog_resilience_multiplier=0.8,
+        **STAPLE_CROP_PARAMS['rice'],
     )
 
 
@@ -250,16 +288,7 @@ def calculate_soy_yield(temp: float, rain: float, seed_type: int, temp_delta: fl
         seed_type=seed_type,
         temp_delta=temp_delta,
         rain_pct_change=rain_pct_change,
-        critical_temp_c=SOY_CRITICAL_TEMP_C,
-        heat_loss_rate_optimal=SOY_HEAT_LOSS_RATE_OPTIMAL,
-        heat_loss_rate_drought=SOY_HEAT_LOSS_RATE_DROUGHT,
-        min_rainfall_mm=SOY_MIN_RAINFALL_MM,
-        optimal_rainfall_min_mm=SOY_OPTIMAL_RAINFALL_MIN_MM,
-        optimal_rainfall_max_mm=SOY_OPTIMAL_RAINFALL_MAX_MM,
-        resilience_delta_c=SOY_RESILIENCE_DELTA_C,
-        resilience_drought_factor=SOY_RESILIENCE_DROUGHT_FACTOR,
-        waterlog_loss_per_100mm=SOY_WATERLOG_LOSS_PER_100MM,
-        waterlog_resilience_multiplier=0.6,
+        **STAPLE_CROP_PARAMS['soy'],
     )
 
 
@@ -271,16 +300,7 @@ def calculate_wheat_yield(temp: float, rain: float, seed_type: int, temp_delta:
         seed_type=seed_type,
         temp_delta=temp_delta,
         rain_pct_change=rain_pct_change,
-        critical_temp_c=WHEAT_CRITICAL_TEMP_C,
-        heat_loss_rate_optimal=WHEAT_HEAT_LOSS_RATE_OPTIMAL,
-        heat_loss_rate_drought=WHEAT_HEAT_LOSS_RATE_DROUGHT,
-        min_rainfall_mm=WHEAT_MIN_RAINFALL_MM,
-        optimal_rainfall_min_mm=WHEAT_OPTIMAL_RAINFALL_MIN_MM,
-        optimal_rainfall_max_mm=WHEAT_OPTIMAL_RAINFALL_MAX_MM,
-        resilience_delta_c=WHEAT_RESILIENCE_DELTA_C,
-        resilience_drought_factor=WHEAT_RESILIENCE_DROUGHT_FACTOR,
-        waterlog_loss_per_100mm=WHEAT_WATERLOG_LOSS_PER_100MM,
-        waterlog_resilience_multiplier=0.6,
+        **STAPLE_CROP_PARAMS['wheat'],
     )
 
 
@@ -314,6 +334,181 @@ def calculate_yield(temp: float, rain: float, seed_type: int, crop_type: str = '
     )
 
 
+# ============= VECTORIZED KERNEL =============
+# Crop order used for integer crop codes in calculate_yield_batch.
+SUPPORTED_CROPS = ('maize', 'cocoa', 'rice', 'soy', 'wheat')
+
+_STAPLE_PARAM_NAMES = (
+    'critical_temp_c',
+    'heat_loss_rate_optimal',
+    'heat_loss_rate_drought',
+    'min_rainfall_mm',
+    'optimal_rainfall_min_mm',
+    'optimal_rainfall_max_mm',
+    'resilience_delta_c',
+    'resilience_drought_factor',
+    'waterlog_loss_per_100mm',
+    'waterlog_resilience_multiplier',
+)
+
+# (n_crops,) lookup table per parameter; the cocoa row is unused (NaN).
+_STAPLE_PARAM_TABLE = {
+    name: np.array([
+        STAPLE_CROP_PARAMS[crop][name] if crop in STAPLE_CROP_PARAMS else np.nan
+        for crop in SUPPORTED_CROPS
+    ])
+    for name in _STAPLE_PARAM_NAMES
+}
+_COCOA_CODE = SUPPORTED_CROPS.index('cocoa')
+
+
+def crop_codes(crop_type) -> np.ndarray:
+    """
+    Map crop names (case-insensitive) to integer codes indexing SUPPORTED_CROPS.
+
+    Accepts a single name or an array-like of names. Raises ValueError for
+    unsupported crops, matching calculate_yield.
+    """
+    names = np.asarray(crop_type)
+    unique, inverse = np.unique(names, return_inverse=True)
+    unique_codes = np.empty(len(unique), dtype=np.intp)
+    for i, name in enumerate(unique):
+        try:
+            unique_codes[i] = SUPPORTED_CROPS.index(str(name).lower())
+        except ValueError:
+            raise ValueError(
+                f"Unsupported crop_type: {name}. Supported crops: 'maize', 'cocoa', 'rice', 'soy', 'wheat'"
+            ) from None
+    return unique_codes[inverse].reshape(names.shape)
+
+
+def _python_max0(values: np.ndarray) -> np.ndarray:
+    """Element-wise ``max(0.0, x)`` with Python semantics (``-0.0`` becomes ``0.0``)."""
+    return np.where(values > 0.0, values, 0.0)
+
+
+def _clamp_yield(yield_pct: np.ndarray) -> np.ndarray:
+    """Element-wise ``max(0.0, min(100.0, y))`` with Python semantics."""
+    return _python_max0(np.where(yield_pct < 100.0, yield_pct, 100.0))
+
+
+def _staple_crop_yield_batch(temp, rain, resilient, codes) -> np.ndarray:
+    """Vectorized _calculate_staple_crop_yield over pre-perturbed inputs.
+
+    ``codes`` is either an integer array of crop codes or a single crop name,
+    in which case the crop parameters stay scalar.
+    """
+    if isinstance(codes, str):
+        p = STAPLE_CROP_PARAMS[codes]
+    else:
+        p = {name: table[codes] for name, table in _STAPLE_PARAM_TABLE.items()}
+
+    yield_pct = np.full(temp.shape, 100.0)
+
+    effective_critical_temp = np.where(
+        resilient, p['critical_temp_c'] + p['resilience_delta_c'], p['critical_temp_c']
+    )
+    is_drought = rain < p['optimal_rainfall_min_mm']
+
+    heat = temp > effective_critical_temp
+    loss_rate = np.where(is_drought, p['heat_loss_rate_drought'], p['heat_loss_rate_optimal'])
+    yield_pct = np.where(heat, yield_pct - (temp - effective_critical_temp) * loss_rate, yield_pct)
+
+    min_rain = p['min_rainfall_mm']
+    opt_min = p['optimal_rainfall_min_mm']
+    opt_max = p['optimal_rainfall_max_mm']
+    severe = rain < min_rain
+    moderate = ~severe & (rain < opt_min)
+    waterlogged = ~severe & ~moderate & (rain > opt_max)
+
+    # Severe drought: yield scales with a fraction of minimum rainfall
+    base_yield = np.where(min_rain > 0, rain / min_rain, 0.0) * 0.5
+    base_yield = np.where(resilient, np.minimum(base_yield * 1.3, 0.7), base_yield)
+
+    # Moderate drought: linear recovery between minimum and optimal rainfall
+    denom = opt_min - min_rain
+    rain_factor = np.where(denom != 0, 0.5 + 0.5 * (rain - min_rain) / denom, 0.5)
+    rain_factor = np.where(resilient, 1.0 - ((1.0 - rain_factor) * p['resilience_drought_factor']), rain_factor)
+
+    # Waterlogging above the optimal range
+    waterlog_loss = ((rain - opt_max) / 100.0) * p['waterlog_loss_per_100mm']
+    waterlog_loss = np.where(resilient, waterlog_loss * p['waterlog_resilience_multiplier'], waterlog_loss)
+
+    yield_pct = np.where(severe, yield_pct * base_yield, yield_pct)
+    yield_pct = np.where(moderate, yield_pct * rain_factor, yield_pct)
+    yield_pct = np.where(waterlogged, yield_pct - waterlog_loss, yield_pct)
+
+    return _clamp_yield(yield_pct)
+
+
+def _cocoa_yield_batch(temp, rain, resilient) -> np.ndarray:
+    """Vectorized calculate_cocoa_yield over pre-perturbed inputs."""
+    yield_pct = np.full(temp.shape, 100.0)
+
+    severe = rain < COCOA_MIN_RAIN_MM
+    suboptimal = ~severe & (rain < COCOA_OPTIMAL_RAIN_MM)
+
+    severe_penalty = ((COCOA_MIN_RAIN_MM - rain) / 100.0) * COCOA_RAIN_PENALTY_PER_100MM
+    suboptimal_penalty = (1.0 - rain / COCOA_OPTIMAL_RAIN_MM) * 20.0
+    rain_penalty = np.where(severe, severe_penalty, suboptimal_penalty)
+    rain_penalty = np.where(resilient, rain_penalty * COCOA_RESILIENCE_DROUGHT_FACTOR, rain_penalty)
+    yield_pct = np.where(severe | suboptimal, yield_pct - rain_penalty, yield_pct)
+
+    heat = temp > COCOA_HEAT_LIMIT_C
+    heat_penalty = (temp - COCOA_HEAT_LIMIT_C) * COCOA_HEAT_PENALTY_PER_DEGREE
+    heat_penalty = np.where(resilient, heat_penalty * COCOA_RESILIENCE_HEAT_FACTOR, heat_penalty)
+    yield_pct = np.where(heat, yield_pct - heat_penalty, yield_pct)
+
+    return _clamp_yield(yield_pct)
+
+
+def calculate_yield_batch(temp, rain, seed_type, crop_type='maize', temp_delta=0.0, rain_pct_change=0.0) -> np.ndarray:
+    """
+    Vectorized calculate_yield over NumPy arrays of inputs.
+
+    All arguments broadcast against each other, so any mix of scalars and
+    arrays works (e.g. one location across many climate shocks, or many
+    locations with one crop). crop_type may be a name, an array of names, or
+    an integer array of codes from crop_codes().
+
+    Results are bit-for-bit identical to calling calculate_yield element-wise.
+
+    Returns:
+        float64 array of yields (0-100), shaped like the broadcast inputs
+    """
+    crop = np.asarray(crop_type)
+    codes = crop if np.issubdtype(crop.dtype, np.integer) else crop_codes(crop)
+    single_code = int(codes.flat[0]) if codes.size and codes.min() == codes.max() else None
+
+    temp, rain, seed_type, codes, temp_delta, rain_pct_change = np.broadcast_arrays(
+        np.asarray(temp, dtype=np.float64),
+        np.asarray(rain, dtype=np.float64),
+        np.asarray(seed_type),
+        codes,
+        np.asarray(temp_delta, dtype=np.float64),
+        np.asarray(rain_pct_change, dtype=np.float64),
+    )
+
+    # Apply climate perturbation using Delta Method
+    simulated_temp = temp + temp_delta
+    simulated_rain = _python_max0(rain * (1 + (rain_pct_change / 100)))
+    resilient = seed_type == 1
+
+    # Single-crop batches (the common case) skip the per-element parameter
+    # lookup and the other crop model entirely.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if single_code == _COCOA_CODE:
+            return _cocoa_yield_batch(simulated_temp, simulated_rain, resilient)
+        if single_code is not None:
+            crop = SUPPORTED_CROPS[single_code]
+            return _staple_crop_yield_batch(simulated_temp, simulated_rain, resilient, crop)
+
+        staple = _staple_crop_yield_batch(simulated_temp, simulated_rain, resilient, codes)
+        cocoa = _cocoa_yield_batch(simulated_temp, simulated_rain, resilient)
+
+    return np.where(codes == _COCOA_CODE, cocoa, staple)
+
+
 # Legacy function for backwards compatibility
 def simulate_maize_yield(temp: float, rain: float, seed_type: int, temp_delta: float = 0.0, rain_pct_change: float = 0.0) -> float:
     """
@@ -2,8 +2,18 @@
 
 from __future__ import annotations
 
+import os
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
 from fastapi.responses import JSONResponse
 
+# Upper bound on scenarios per /predict-batch request
+PREDICT_BATCH_MAX_SCENARIOS = int(os.environ.get("PREDICT_BATCH_MAX_SCENARIOS", "50000"))
+# Rows passed to a surrogate model per predict() call
+PREDICT_BATCH_CHUNK_ROWS = int(os.environ.get("PREDICT_BATCH_CHUNK_ROWS", "100000"))
+
 
 def legacy_error(status_code: int, message: str, code: str) -> JSONResponse:
     """Return a JSON error response matching the legacy Flask format."""
@@ -13,6 +23,36 @@ def legacy_error(status_code: int, message: str, code: str) -> JSONResponse:
     )
 
 
+def model_unavailable(error: Exception) -> JSONResponse:
+    """Legacy-format 500 for a model the registry could not load (model_registry.ModelUnavailableError)."""
+    return legacy_error(500, str(error), "MODEL_NOT_FOUND")
+
+
+def legacy_error_payload(message: str, code: str) -> dict:
+    """Per-item error in the legacy format, for batch responses."""
+    return {"status": "error", "message": message, "code": code}
+
+
+def predict_matrix(model, rows: np.ndarray, feature_names: Sequence[str]) -> np.ndarray:
+    """
+    Run a surrogate model over a (rows x features) matrix in as few predict() calls as possible.
+
+    Models fitted on DataFrames get one DataFrame per chunk (so sklearn sees
+    the feature names it was trained with) instead of one per scenario.
+
+    Returns:
+        1-D float array of predictions, one per row
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    predictions = np.empty(len(rows))
+    named = getattr(model, "feature_names_in_", None) is not None
+    for start in range(0, len(rows), PREDICT_BATCH_CHUNK_ROWS):
+        chunk = rows[start:start + PREDICT_BATCH_CHUNK_ROWS]
+        X = pd.DataFrame(chunk, columns=list(feature_names)) if named else chunk
+        predictions[start:start + len(chunk)] = np.asarray(model.predict(X), dtype=np.float64).ravel()
+    return predictions
+
+
 # Material Degradation Curves: interventions that reduce OPEX climate penalty by 85%
 _OPEX_INTERVENTION_NAMES = frozenset(
     s.lower().replace(" ", "_").replace("-", "_")
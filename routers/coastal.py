@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
-import pickle
+import asyncio
+import os
 import sys
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-import pandas as pd
+import numpy as np
 from fastapi import APIRouter, Depends
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
 from auth import get_current_user
+from model_registry import ModelUnavailableError, get_model_async, register_model
 from models import User
 from gee_connector import get_coastal_params
 from coastal_engine import analyze_flood_risk, analyze_urban_impact
@@ -19,7 +21,10 @@ from lifespan_depreciation import (
     coastal_lifespan_penalty, apply_lifespan_depreciation,
     coastal_has_intervention_rescue,
 )
-from routers._shared import legacy_error, has_opex_intervention
+from routers._shared import (
+    PREDICT_BATCH_MAX_SCENARIOS, legacy_error, legacy_error_payload,
+    has_opex_intervention, model_unavailable, predict_matrix,
+)
 
 router = APIRouter(prefix="/api/v1/coastal", tags=["Coastal"])
 
@@ -27,17 +32,8 @@ router = APIRouter(prefix="/api/v1/coastal", tags=["Coastal"])
 # ML model
 # ---------------------------------------------------------------------------
 
-_COASTAL_MODEL_PATH = "coastal_surrogate.pkl"
-coastal_pkl_model = None
-
-try:
-    with open(_COASTAL_MODEL_PATH, "rb") as _f:
-        coastal_pkl_model = pickle.load(_f)
-    print(f"Coastal model loaded successfully from {_COASTAL_MODEL_PATH}")
-except FileNotFoundError:
-    print(f"Warning: Coastal model file '{_COASTAL_MODEL_PATH}' not found.")
-except Exception as _e:
-    print(f"Warning: Failed to load coastal model: {_e}")
+COASTAL_MODEL = "coastal"
+register_model(COASTAL_MODEL, "coastal_surrogate.pkl")
 
 # ---------------------------------------------------------------------------
 # Pydantic models
@@ -58,6 +54,10 @@ class PredictCoastalRunupRequest(BaseModel):
     drainage_upgrade: Optional[bool] = Field(None)
 
 
+class PredictCoastalRunupBatchRequest(BaseModel):
+    scenarios: List[PredictCoastalRunupRequest] = Field(..., min_length=1, max_length=PREDICT_BATCH_MAX_SCENARIOS)
+
+
 class PredictCoastalFloodRequest(BaseModel):
     lat: float = Field(..., ge=-90, le=90)
     lon: float = Field(..., ge=-180, le=180)
@@ -75,80 +75,181 @@ class PredictCoastalFloodRequest(BaseModel):
 # ---------------------------------------------------------------------------
 
 
+# Surrogate model input columns, in training order
+COASTAL_FEATURES = ("wave_height", "slope", "mangrove_width_m")
+
+# Concurrent get_coastal_params lookups per /predict-batch request
+COASTAL_BATCH_LOOKUP_CONCURRENCY = int(os.environ.get("COASTAL_BATCH_LOOKUP_CONCURRENCY", "8"))
+
+
+def _effective_mangrove_width(req: PredictCoastalRunupRequest) -> float:
+    """Mangrove buffers narrower than 10 m are modelled as 10 m."""
+    mangrove_width = req.mangrove_width
+    if 0 < mangrove_width < 10:
+        mangrove_width = 10
+    return mangrove_width
+
+
+def _coastal_runup_result(
+    req: PredictCoastalRunupRequest,
+    mangrove_width: float,
+    coastal_data: Dict[str, Any],
+    runup_a: float,
+    runup_b: float,
+) -> Dict[str, Any]:
+    """The /predict ``data`` payload for one scenario, given its two predicted runups."""
+    lat, lon = req.lat, req.lon
+    initial_lifespan_years = req.initial_lifespan_years
+    sea_level_rise = req.sea_level_rise
+    intervention = req.intervention.strip()
+    daily_revenue = req.daily_revenue
+    expected_downtime_days = req.expected_downtime_days
+    slope = coastal_data["slope_pct"]
+    wave_height = coastal_data["max_wave_height"]
+
+    raw_penalty = coastal_lifespan_penalty(sea_level_rise)
+    has_intervention_rescue = coastal_has_intervention_rescue(intervention)
+    adjusted_lifespan, lifespan_penalty = apply_lifespan_depreciation(initial_lifespan_years, raw_penalty, has_intervention_rescue)
+
+    avoided_runup = runup_a - runup_b
+    DAMAGE_COST_PER_METER = 10000
+    NUM_PROPERTIES = 100
+    avoided_damage_usd = avoided_runup * DAMAGE_COST_PER_METER * NUM_PROPERTIES
+    percentage_improvement = (avoided_runup / runup_a * 100) if runup_a > 0 else 0
+
+    from infrastructure_engine import calculate_avoided_business_interruption
+    has_intervention = mangrove_width > 0
+    interruption = calculate_avoided_business_interruption(daily_revenue=daily_revenue, expected_downtime_days=expected_downtime_days, has_intervention=has_intervention)
+
+    base_annual_opex: float = float(req.base_annual_opex)
+    if sea_level_rise > 1.0:
+        opex_penalty_pct = 0.30
+    elif sea_level_rise > 0.5:
+        opex_penalty_pct = 0.15
+    else:
+        opex_penalty_pct = 0.0
+    opex_climate_penalty: float = base_annual_opex * opex_penalty_pct
+    if has_opex_intervention(intervention):
+        opex_climate_penalty *= 0.15
+    adjusted_opex: float = base_annual_opex + opex_climate_penalty
+
+    return {
+        "input_conditions": {"lat": lat, "lon": lon, "mangrove_width_m": mangrove_width, "initial_lifespan_years": initial_lifespan_years, "sea_level_rise_m": sea_level_rise, "intervention": intervention or None, "base_annual_opex": base_annual_opex, "daily_revenue": daily_revenue, "expected_downtime_days": expected_downtime_days},
+        "coastal_params": {"detected_slope_pct": round(slope, 2), "storm_wave_height": round(wave_height, 2)},
+        "predictions": {"baseline_runup": round(runup_a, 4), "protected_runup": round(runup_b, 4)},
+        "analysis": {"avoided_loss": round(avoided_damage_usd, 2), "avoided_runup_m": round(avoided_runup, 4), "percentage_improvement": round(percentage_improvement, 2), "recommendation": "with_mangroves" if avoided_runup > 0 else "baseline", "avoided_business_interruption": interruption["avoided_business_interruption"]},
+        "asset_depreciation": {"adjusted_lifespan": adjusted_lifespan, "lifespan_penalty": lifespan_penalty},
+        "material_degradation_opex": {"adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2)},
+        "economic_assumptions": {"damage_cost_per_meter": DAMAGE_COST_PER_METER, "num_properties": NUM_PROPERTIES, "total_value_basis": "USD per meter of flood reduction \u00d7 properties affected"},
+        "slope": round(slope / 100, 4), "storm_wave": round(wave_height, 2),
+        "avoided_loss": round(avoided_damage_usd, 2), "avoided_business_interruption": interruption["avoided_business_interruption"],
+        "adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2),
+    }
+
+
+def _coastal_rows(coastal_data: Dict[str, Any], mangrove_width: float) -> List[List[float]]:
+    """Unprotected and mangrove-protected feature rows (COASTAL_FEATURES order)."""
+    wave_height, slope = coastal_data["max_wave_height"], coastal_data["slope_pct"]
+    return [[wave_height, slope, 0.0], [wave_height, slope, mangrove_width]]
+
+
 @router.post("/predict")
 async def predict_coastal(req: PredictCoastalRunupRequest, user: User = Depends(get_current_user)):
     """Predict coastal runup elevation with and without mangrove protection."""
-    if coastal_pkl_model is None:
-        return legacy_error(500, "Coastal model file not found. Ensure coastal_surrogate.pkl exists.", "MODEL_NOT_FOUND")
+    try:
+        coastal_model = await get_model_async(COASTAL_MODEL)
+    except ModelUnavailableError as e:
+        return model_unavailable(e)
 
     try:
-        lat, lon = req.lat, req.lon
-        mangrove_width = req.mangrove_width
-        initial_lifespan_years = req.initial_lifespan_years
-        sea_level_rise = req.sea_level_rise
-        intervention = req.intervention.strip()
-        daily_revenue = req.daily_revenue
-        expected_downtime_days = req.expected_downtime_days
+        mangrove_width = _effective_mangrove_width(req)
+        coastal_data = await run_in_threadpool(get_coastal_params, req.lat, req.lon)
 
-        raw_penalty = coastal_lifespan_penalty(sea_level_rise)
-        has_intervention_rescue = coastal_has_intervention_rescue(intervention)
-        adjusted_lifespan, lifespan_penalty = apply_lifespan_depreciation(initial_lifespan_years, raw_penalty, has_intervention_rescue)
+        runup_a, runup_b = predict_matrix(coastal_model, _coastal_rows(coastal_data, mangrove_width), COASTAL_FEATURES).tolist()
+        return {"status": "success", "data": _coastal_runup_result(req, mangrove_width, coastal_data, runup_a, runup_b)}
+
+    except ValueError:
+        return legacy_error(400, "Invalid numeric values for lat/lon/mangrove_width", "INVALID_NUMERIC_VALUE")
+    except Exception as e:
+        return legacy_error(500, f"Prediction failed: {str(e)}", "PREDICTION_ERROR")
+
+
+def _coastal_batch_results(
+    coastal_model: Any,
+    scenarios: List[PredictCoastalRunupRequest],
+    coastal_by_point: Dict[Tuple[float, float], Any],
+) -> List[Dict[str, Any]]:
+    """
+    /predict responses for batch scenarios, in order; runs the surrogate once over every row.
+
+    ``coastal_by_point`` maps each (lat, lon) to its coastal parameters, or to
+    the exception its lookup raised.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(scenarios)
+    valid, rows, widths = [], [], []
+    for i, scenario in enumerate(scenarios):
+        coastal_data = coastal_by_point[(scenario.lat, scenario.lon)]
+        if isinstance(coastal_data, Exception):
+            results[i] = legacy_error_payload(f"Prediction failed: {str(coastal_data)}", "PREDICTION_ERROR")
+            continue
+        mangrove_width = _effective_mangrove_width(scenario)
+        valid.append(i)
+        widths.append(mangrove_width)
+        rows.extend(_coastal_rows(coastal_data, mangrove_width))
+
+    runups = predict_matrix(coastal_model, np.array(rows).reshape(-1, len(COASTAL_FEATURES)), COASTAL_FEATURES).tolist()
+    for n, i in enumerate(valid):
+        scenario = scenarios[i]
+        try:
+            coastal_data = coastal_by_point[(scenario.lat, scenario.lon)]
+            data = _coastal_runup_result(scenario, widths[n], coastal_data, runups[2 * n], runups[2 * n + 1])
+            results[i] = {"status": "success", "data": data}
+        except Exception as e:
+            results[i] = legacy_error_payload(f"Prediction failed: {str(e)}", "PREDICTION_ERROR")
+    return results
+
+
+@router.post("/predict-batch")
+async def predict_coastal_batch(req: PredictCoastalRunupBatchRequest, user: User = Depends(get_current_user)):
+    """
+    Batch variant of /predict for many coastal sites.
+
+    Coastal parameters are fetched once per distinct location, with at most
+    COASTAL_BATCH_LOOKUP_CONCURRENCY lookups in flight; then the unprotected
+    and protected rows of every scenario go through the surrogate model
+    together. Each entry of ``data.results`` is the /predict response for that
+    scenario, in request order; a failed lookup fails only its scenarios.
+    """
+    try:
+        coastal_model = await get_model_async(COASTAL_MODEL)
+    except ModelUnavailableError as e:
+        return model_unavailable(e)
+
+    try:
+        semaphore = asyncio.Semaphore(max(1, COASTAL_BATCH_LOOKUP_CONCURRENCY))
 
-        if 0 < mangrove_width < 10:
-            mangrove_width = 10
-
-        coastal_data = await run_in_threadpool(get_coastal_params, lat, lon)
-        slope = coastal_data["slope_pct"]
-        wave_height = coastal_data["max_wave_height"]
-
-        scenario_a_df = pd.DataFrame({"wave_height": [wave_height], "slope": [slope], "mangrove_width_m": [0.0]})
-        scenario_b_df = pd.DataFrame({"wave_height": [wave_height], "slope": [slope], "mangrove_width_m": [mangrove_width]})
-
-        runup_a = float(coastal_pkl_model.predict(scenario_a_df)[0])
-        runup_b = float(coastal_pkl_model.predict(scenario_b_df)[0])
-
-        avoided_runup = runup_a - runup_b
-        DAMAGE_COST_PER_METER = 10000
-        NUM_PROPERTIES = 100
-        avoided_damage_usd = avoided_runup * DAMAGE_COST_PER_METER * NUM_PROPERTIES
-        percentage_improvement = (avoided_runup / runup_a * 100) if runup_a > 0 else 0
-
-        from infrastructure_engine import calculate_avoided_business_interruption
-        has_intervention = mangrove_width > 0
-        interruption = calculate_avoided_business_interruption(daily_revenue=daily_revenue, expected_downtime_days=expected_downtime_days, has_intervention=has_intervention)
-
-        base_annual_opex: float = float(req.base_annual_opex)
-        if sea_level_rise > 1.0:
-            opex_penalty_pct = 0.30
-        elif sea_level_rise > 0.5:
-            opex_penalty_pct = 0.15
-        else:
-            opex_penalty_pct = 0.0
-        opex_climate_penalty: float = base_annual_opex * opex_penalty_pct
-        if has_opex_intervention(intervention):
-            opex_climate_penalty *= 0.15
-        adjusted_opex: float = base_annual_opex + opex_climate_penalty
+        async def lookup(point: Tuple[float, float]) -> Any:
+            async with semaphore:
+                try:
+                    return await run_in_threadpool(get_coastal_params, *point)
+                except Exception as e:
+                    return e
+
+        points = list(dict.fromkeys((s.lat, s.lon) for s in req.scenarios))
+        coastal_by_point = dict(zip(points, await asyncio.gather(*(lookup(p) for p in points))))
+
+        # The forest predict and result assembly are CPU-bound; keep them off the event loop
+        results = await run_in_threadpool(_coastal_batch_results, coastal_model, req.scenarios, coastal_by_point)
 
         return {
             "status": "success",
-            "data": {
-                "input_conditions": {"lat": lat, "lon": lon, "mangrove_width_m": mangrove_width, "initial_lifespan_years": initial_lifespan_years, "sea_level_rise_m": sea_level_rise, "intervention": intervention or None, "base_annual_opex": base_annual_opex, "daily_revenue": daily_revenue, "expected_downtime_days": expected_downtime_days},
-                "coastal_params": {"detected_slope_pct": round(slope, 2), "storm_wave_height": round(wave_height, 2)},
-                "predictions": {"baseline_runup": round(runup_a, 4), "protected_runup": round(runup_b, 4)},
-                "analysis": {"avoided_loss": round(avoided_damage_usd, 2), "avoided_runup_m": round(avoided_runup, 4), "percentage_improvement": round(percentage_improvement, 2), "recommendation": "with_mangroves" if avoided_runup > 0 else "baseline", "avoided_business_interruption": interruption["avoided_business_interruption"]},
-                "asset_depreciation": {"adjusted_lifespan": adjusted_lifespan, "lifespan_penalty": lifespan_penalty},
-                "material_degradation_opex": {"adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2)},
-                "economic_assumptions": {"damage_cost_per_meter": DAMAGE_COST_PER_METER, "num_properties": NUM_PROPERTIES, "total_value_basis": "USD per meter of flood reduction \u00d7 properties affected"},
-                "slope": round(slope / 100, 4), "storm_wave": round(wave_height, 2),
-                "avoided_loss": round(avoided_damage_usd, 2), "avoided_business_interruption": interruption["avoided_business_interruption"],
-                "adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2),
-            },
+            "data": {"count": len(results), "failed": sum(r["status"] != "success" for r in results), "locations": len(points), "results": results},
         }
 
     except ValueError:
         return legacy_error(400, "Invalid numeric values for lat/lon/mangrove_width", "INVALID_NUMERIC_VALUE")
     except Exception as e:
-        return legacy_error(500, f"Prediction failed: {str(e)}", "PREDICTION_ERROR")
+        return legacy_error(500, f"Batch prediction failed: {str(e)}", "PREDICTION_ERROR")
 
 
 @router.post("/predict-flood")
@@ -2,19 +2,22 @@
 
 from __future__ import annotations
 
-import pickle
 import sys
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-import pandas as pd
+import numpy as np
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 
 from auth import get_current_user
+from model_registry import ModelUnavailableError, get_model, register_model
 from models import User
 from flood_engine import analyze_flash_flood, calculate_rainfall_frequency, analyze_infrastructure_risk
 from lifespan_depreciation import flood_lifespan_penalty, apply_lifespan_depreciation, flood_has_intervention_rescue
-from routers._shared import legacy_error, has_opex_intervention
+from routers._shared import (
+    PREDICT_BATCH_MAX_SCENARIOS, legacy_error, legacy_error_payload,
+    has_opex_intervention, model_unavailable, predict_matrix,
+)
 
 router = APIRouter(prefix="/api/v1/flood", tags=["Flood"])
 
@@ -22,17 +25,8 @@ router = APIRouter(prefix="/api/v1/flood", tags=["Flood"])
 # ML model
 # ---------------------------------------------------------------------------
 
-_FLOOD_MODEL_PATH = "flood_surrogate.pkl"
-flood_pkl_model = None
-
-try:
-    with open(_FLOOD_MODEL_PATH, "rb") as _f:
-        flood_pkl_model = pickle.load(_f)
-    print(f"Flood model loaded successfully from {_FLOOD_MODEL_PATH}")
-except FileNotFoundError:
-    print(f"Warning: Flood model file '{_FLOOD_MODEL_PATH}' not found.")
-except Exception as _e:
-    print(f"Warning: Failed to load flood model: {_e}")
+FLOOD_MODEL = "flood"
+register_model(FLOOD_MODEL, "flood_surrogate.pkl")
 
 # ---------------------------------------------------------------------------
 # Pydantic models
@@ -64,6 +58,10 @@ class PredictUrbanFloodRequest(BaseModel):
     drainage_upgrade: Optional[bool] = Field(None)
 
 
+class PredictUrbanFloodBatchRequest(BaseModel):
+    scenarios: List[PredictUrbanFloodRequest] = Field(..., min_length=1, max_length=PREDICT_BATCH_MAX_SCENARIOS)
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -151,97 +149,164 @@ def predict_flash_flood(req: PredictFlashFloodRequest):
         return legacy_error(500, f"Flash flood analysis failed: {str(e)}", "FLASH_FLOOD_ERROR")
 
 
+# Green-infrastructure imperviousness reduction per intervention type
+INTERVENTION_FACTORS = {"green_roof": 0.30, "permeable_pavement": 0.40, "bioswales": 0.25, "rain_gardens": 0.20, "sponge_city": 0.35, "sponge city": 0.35, "none": 0.0}
+
+# Surrogate model input columns, in training order
+FLOOD_FEATURES = ("rain_intensity_mm_hr", "impervious_pct", "slope_pct")
+
+
+def _flood_damage_pct(depth_cm: float) -> float:
+    if depth_cm <= 0: return 0.0
+    if depth_cm < 5: return (depth_cm / 5.0) * 2.0
+    if depth_cm < 15: return 2.0 + 6.0 * ((depth_cm - 5) / 10.0)
+    if depth_cm < 30: return 8.0 + 12.0 * ((depth_cm - 15) / 15.0)
+    if depth_cm < 60: return 20.0 + 20.0 * ((depth_cm - 30) / 30.0)
+    return min(40.0 + 30.0 * min((depth_cm - 60) / 60.0, 1.0), 70.0)
+
+
+def _validate_urban_flood(req: PredictUrbanFloodRequest) -> Optional[Tuple[str, str]]:
+    """(message, code) for an out-of-range scenario, else None."""
+    if not (10 <= req.rain_intensity <= 150):
+        return "Rain intensity must be between 10 and 150 mm/hr", "INVALID_RAIN_INTENSITY"
+    if not (0.0 <= req.current_imperviousness <= 1.0):
+        return "Current imperviousness must be between 0.0 and 1.0", "INVALID_IMPERVIOUSNESS"
+    if not (0.1 <= req.slope_pct <= 10.0):
+        return "Slope must be between 0.1 and 10.0 percent", "INVALID_SLOPE"
+    if req.intervention_type.lower() not in INTERVENTION_FACTORS:
+        return f"Invalid intervention type. Must be one of: {', '.join(INTERVENTION_FACTORS.keys())}", "INVALID_INTERVENTION_TYPE"
+    return None
+
+
+def _urban_flood_rows(req: PredictUrbanFloodRequest) -> Tuple[List[float], List[float]]:
+    """Baseline and intervention feature rows (FLOOD_FEATURES order) for one scenario."""
+    intervention_imperviousness = max(0.0, req.current_imperviousness - INTERVENTION_FACTORS[req.intervention_type.lower()])
+    return (
+        [req.rain_intensity, req.current_imperviousness, req.slope_pct],
+        [req.rain_intensity, intervention_imperviousness, req.slope_pct],
+    )
+
+
+def _urban_flood_result(req: PredictUrbanFloodRequest, depth_baseline: float, depth_intervention: float) -> Dict[str, Any]:
+    """The /predict ``data`` payload for one scenario, given its two predicted depths."""
+    rain_intensity = req.rain_intensity
+    current_imperviousness = req.current_imperviousness
+    intervention_type = req.intervention_type.lower()
+    slope_pct = req.slope_pct
+    building_value = req.building_value
+    num_buildings = req.num_buildings
+    initial_lifespan_years = req.initial_lifespan_years
+    global_warming = req.global_warming
+    daily_revenue = req.daily_revenue
+    expected_downtime_days = req.expected_downtime_days
+
+    raw_penalty = flood_lifespan_penalty(global_warming)
+    has_intervention_rescue = flood_has_intervention_rescue(intervention_type)
+    adjusted_lifespan, lifespan_penalty = apply_lifespan_depreciation(initial_lifespan_years, raw_penalty, has_intervention_rescue)
+
+    base_annual_opex: float = float(req.base_annual_opex)
+    if global_warming > 2.0:
+        opex_penalty_pct = 0.25
+    elif global_warming > 1.5:
+        opex_penalty_pct = 0.12
+    else:
+        opex_penalty_pct = 0.0
+    opex_climate_penalty: float = base_annual_opex * opex_penalty_pct
+    if has_opex_intervention(intervention_type):
+        opex_climate_penalty *= 0.15
+    adjusted_opex: float = base_annual_opex + opex_climate_penalty
+
+    reduction_factor = INTERVENTION_FACTORS[intervention_type]
+    intervention_imperviousness = max(0.0, current_imperviousness - reduction_factor)
+
+    avoided_depth_cm = depth_baseline - depth_intervention
+    percentage_improvement = (avoided_depth_cm / depth_baseline * 100) if depth_baseline > 0 else 0
+
+    baseline_damage_pct = _flood_damage_pct(depth_baseline)
+    intervention_damage_pct = _flood_damage_pct(depth_intervention)
+    avoided_damage_pct = baseline_damage_pct - intervention_damage_pct
+    avoided_damage_usd = (avoided_damage_pct / 100) * num_buildings * building_value
+
+    from infrastructure_engine import calculate_avoided_business_interruption
+    has_intervention = intervention_type != "none"
+    interruption = calculate_avoided_business_interruption(daily_revenue=daily_revenue, expected_downtime_days=expected_downtime_days, has_intervention=has_intervention)
+
+    return {
+        "input_conditions": {"rain_intensity_mm_hr": rain_intensity, "current_imperviousness": current_imperviousness, "intervention_type": intervention_type, "slope_pct": slope_pct, "building_value": building_value, "num_buildings": num_buildings, "initial_lifespan_years": initial_lifespan_years, "global_warming_c": global_warming, "base_annual_opex": base_annual_opex, "daily_revenue": daily_revenue, "expected_downtime_days": expected_downtime_days},
+        "asset_depreciation": {"adjusted_lifespan": adjusted_lifespan, "lifespan_penalty": lifespan_penalty},
+        "material_degradation_opex": {"adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2)},
+        "imperviousness_change": {"baseline": round(current_imperviousness, 3), "intervention": round(intervention_imperviousness, 3), "reduction_factor": reduction_factor, "absolute_reduction": round(current_imperviousness - intervention_imperviousness, 3)},
+        "predictions": {"baseline_depth_cm": round(depth_baseline, 2), "intervention_depth_cm": round(depth_intervention, 2)},
+        "analysis": {"avoided_depth_cm": round(avoided_depth_cm, 2), "percentage_improvement": round(percentage_improvement, 2), "baseline_damage_pct": round(baseline_damage_pct, 2), "intervention_damage_pct": round(intervention_damage_pct, 2), "avoided_damage_pct": round(avoided_damage_pct, 2), "avoided_loss": round(avoided_damage_usd, 2), "recommendation": intervention_type if avoided_depth_cm > 0 else "none", "avoided_business_interruption": interruption["avoided_business_interruption"]},
+        "economic_assumptions": {"num_buildings": num_buildings, "avg_building_value": building_value, "total_value_at_risk": num_buildings * building_value, "damage_function": "Urban Flood Damage (Huizinga et al., 2017)", "total_value_basis": "Avoided structural damage across affected buildings"},
+        "depth_baseline": round(depth_baseline, 2), "depth_intervention": round(depth_intervention, 2),
+        "avoided_loss": round(avoided_damage_usd, 2), "avoided_business_interruption": interruption["avoided_business_interruption"],
+        "adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2),
+    }
+
+
 @router.post("/predict")
 def predict_flood(req: PredictUrbanFloodRequest, user: User = Depends(get_current_user)):
     """Predict urban flood depth with and without green infrastructure intervention."""
-    if flood_pkl_model is None:
-        return legacy_error(500, "Flood model file not found. Ensure flood_surrogate.pkl exists.", "MODEL_NOT_FOUND")
+    try:
+        flood_model = get_model(FLOOD_MODEL)
+    except ModelUnavailableError as e:
+        return model_unavailable(e)
+
+    try:
+        invalid = _validate_urban_flood(req)
+        if invalid:
+            return legacy_error(400, *invalid)
+
+        depth_baseline, depth_intervention = predict_matrix(flood_model, _urban_flood_rows(req), FLOOD_FEATURES).tolist()
+        return {"status": "success", "data": _urban_flood_result(req, depth_baseline, depth_intervention)}
+
+    except ValueError as ve:
+        return legacy_error(400, f"Invalid numeric values: {str(ve)}", "INVALID_NUMERIC_VALUE")
+    except Exception as e:
+        return legacy_error(500, f"Prediction failed: {str(e)}", "PREDICTION_ERROR")
+
 
+@router.post("/predict-batch")
+def predict_flood_batch(req: PredictUrbanFloodBatchRequest, user: User = Depends(get_current_user)):
+    """
+    Batch variant of /predict for many scenarios (e.g. every building in a city).
+
+    Baseline and intervention rows of all valid scenarios go through the
+    surrogate model together. Each entry of ``data.results`` is the /predict
+    response for that scenario, in request order; invalid scenarios get a
+    per-item error instead of failing the batch.
+    """
     try:
-        rain_intensity = req.rain_intensity
-        current_imperviousness = req.current_imperviousness
-        intervention_type = req.intervention_type.lower()
-        slope_pct = req.slope_pct
-        building_value = req.building_value
-        num_buildings = req.num_buildings
-        initial_lifespan_years = req.initial_lifespan_years
-        global_warming = req.global_warming
-        daily_revenue = req.daily_revenue
-        expected_downtime_days = req.expected_downtime_days
-
-        raw_penalty = flood_lifespan_penalty(global_warming)
-        has_intervention_rescue = flood_has_intervention_rescue(intervention_type)
-        adjusted_lifespan, lifespan_penalty = apply_lifespan_depreciation(initial_lifespan_years, raw_penalty, has_intervention_rescue)
-
-        base_annual_opex: float = float(req.base_annual_opex)
-        if global_warming > 2.0:
-            opex_penalty_pct = 0.25
-        elif global_warming > 1.5:
-            opex_penalty_pct = 0.12
-        else:
-            opex_penalty_pct = 0.0
-        opex_climate_penalty: float = base_annual_opex * opex_penalty_pct
-        if has_opex_intervention(intervention_type):
-            opex_climate_penalty *= 0.15
-        adjusted_opex: float = base_annual_opex + opex_climate_penalty
-
-        if not (10 <= rain_intensity <= 150):
-            return legacy_error(400, "Rain intensity must be between 10 and 150 mm/hr", "INVALID_RAIN_INTENSITY")
-        if not (0.0 <= current_imperviousness <= 1.0):
-            return legacy_error(400, "Current imperviousness must be between 0.0 and 1.0", "INVALID_IMPERVIOUSNESS")
-        if not (0.1 <= slope_pct <= 10.0):
-            return legacy_error(400, "Slope must be between 0.1 and 10.0 percent", "INVALID_SLOPE")
-
-        INTERVENTION_FACTORS = {"green_roof": 0.30, "permeable_pavement": 0.40, "bioswales": 0.25, "rain_gardens": 0.20, "sponge_city": 0.35, "sponge city": 0.35, "none": 0.0}
-
-        if intervention_type not in INTERVENTION_FACTORS:
-            return legacy_error(400, f"Invalid intervention type. Must be one of: {', '.join(INTERVENTION_FACTORS.keys())}", "INVALID_INTERVENTION_TYPE")
-
-        baseline_df = pd.DataFrame({"rain_intensity_mm_hr": [rain_intensity], "impervious_pct": [current_imperviousness], "slope_pct": [slope_pct]})
-        reduction_factor = INTERVENTION_FACTORS[intervention_type]
-        intervention_imperviousness = max(0.0, current_imperviousness - reduction_factor)
-        intervention_df = pd.DataFrame({"rain_intensity_mm_hr": [rain_intensity], "impervious_pct": [intervention_imperviousness], "slope_pct": [slope_pct]})
-
-        depth_baseline = float(flood_pkl_model.predict(baseline_df)[0])
-        depth_intervention = float(flood_pkl_model.predict(intervention_df)[0])
-
-        avoided_depth_cm = depth_baseline - depth_intervention
-        percentage_improvement = (avoided_depth_cm / depth_baseline * 100) if depth_baseline > 0 else 0
-
-        def _flood_damage_pct(depth_cm: float) -> float:
-            if depth_cm <= 0: return 0.0
-            if depth_cm < 5: return (depth_cm / 5.0) * 2.0
-            if depth_cm < 15: return 2.0 + 6.0 * ((depth_cm - 5) / 10.0)
-            if depth_cm < 30: return 8.0 + 12.0 * ((depth_cm - 15) / 15.0)
-            if depth_cm < 60: return 20.0 + 20.0 * ((depth_cm - 30) / 30.0)
-            return min(40.0 + 30.0 * min((depth_cm - 60) / 60.0, 1.0), 70.0)
-
-        baseline_damage_pct = _flood_damage_pct(depth_baseline)
-        intervention_damage_pct = _flood_damage_pct(depth_intervention)
-        avoided_damage_pct = baseline_damage_pct - intervention_damage_pct
-        avoided_damage_usd = (avoided_damage_pct / 100) * num_buildings * building_value
-
-        from infrastructure_engine import calculate_avoided_business_interruption
-        has_intervention = intervention_type != "none"
-        interruption = calculate_avoided_business_interruption(daily_revenue=daily_revenue, expected_downtime_days=expected_downtime_days, has_intervention=has_intervention)
+        flood_model = get_model(FLOOD_MODEL)
+    except ModelUnavailableError as e:
+        return model_unavailable(e)
+
+    try:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(req.scenarios)
+        valid, rows = [], []
+        for i, scenario in enumerate(req.scenarios):
+            invalid = _validate_urban_flood(scenario)
+            if invalid:
+                results[i] = legacy_error_payload(*invalid)
+                continue
+            valid.append(i)
+            rows.extend(_urban_flood_rows(scenario))
+
+        depths = predict_matrix(flood_model, np.array(rows).reshape(-1, len(FLOOD_FEATURES)), FLOOD_FEATURES).tolist()
+        for n, i in enumerate(valid):
+            try:
+                data = _urban_flood_result(req.scenarios[i], depths[2 * n], depths[2 * n + 1])
+                results[i] = {"status": "success", "data": data}
+            except Exception as e:
+                results[i] = legacy_error_payload(f"Prediction failed: {str(e)}", "PREDICTION_ERROR")
 
         return {
             "status": "success",
-            "data": {
-                "input_conditions": {"rain_intensity_mm_hr": rain_intensity, "current_imperviousness": current_imperviousness, "intervention_type": intervention_type, "slope_pct": slope_pct, "building_value": building_value, "num_buildings": num_buildings, "initial_lifespan_years": initial_lifespan_years, "global_warming_c": global_warming, "base_annual_opex": base_annual_opex, "daily_revenue": daily_revenue, "expected_downtime_days": expected_downtime_days},
-                "asset_depreciation": {"adjusted_lifespan": adjusted_lifespan, "lifespan_penalty": lifespan_penalty},
-                "material_degradation_opex": {"adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2)},
-                "imperviousness_change": {"baseline": round(current_imperviousness, 3), "intervention": round(intervention_imperviousness, 3), "reduction_factor": reduction_factor, "absolute_reduction": round(current_imperviousness - intervention_imperviousness, 3)},
-                "predictions": {"baseline_depth_cm": round(depth_baseline, 2), "intervention_depth_cm": round(depth_intervention, 2)},
-                "analysis": {"avoided_depth_cm": round(avoided_depth_cm, 2), "percentage_improvement": round(percentage_improvement, 2), "baseline_damage_pct": round(baseline_damage_pct, 2), "intervention_damage_pct": round(intervention_damage_pct, 2), "avoided_damage_pct": round(avoided_damage_pct, 2), "avoided_loss": round(avoided_damage_usd, 2), "recommendation": intervention_type if avoided_depth_cm > 0 else "none", "avoided_business_interruption": interruption["avoided_business_interruption"]},
-                "economic_assumptions": {"num_buildings": num_buildings, "avg_building_value": building_value, "total_value_at_risk": num_buildings * building_value, "damage_function": "Urban Flood Damage (Huizinga et al., 2017)", "total_value_basis": "Avoided structural damage across affected buildings"},
-                "depth_baseline": round(depth_baseline, 2), "depth_intervention": round(depth_intervention, 2),
-                "avoided_loss": round(avoided_damage_usd, 2), "avoided_business_interruption": interruption["avoided_business_interruption"],
-                "adjusted_opex": round(adjusted_opex, 2), "opex_climate_penalty": round(opex_climate_penalty, 2),
-            },
+            "data": {"count": len(results), "failed": sum(r["status"] != "success" for r in results), "results": results},
         }
 
     except ValueError as ve:
         return legacy_error(400, f"Invalid numeric values: {str(ve)}", "INVALID_NUMERIC_VALUE")
     except Exception as e:
-        return legacy_error(500, f"Prediction failed: {str(e)}", "PREDICTION_ERROR")
+        return legacy_error(500, f"Batch prediction failed: {str(e)}", "PREDICTION_ERROR")
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from typing import Dict, Any, List
 
@@ -10,7 +9,7 @@ import ee
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
-from gee_credentials import load_gee_credentials
+import gee_session
 
 router = APIRouter(prefix="/api/v1/macro", tags=["Macro"])
 
@@ -46,15 +45,6 @@ _SOVEREIGN_RISK_CACHE: Dict[str, Any] = {
 # ---------------------------------------------------------------------------
 
 
-def _authenticate_gee_sovereign():
-    credentials_dict = load_gee_credentials()
-    if not credentials_dict:
-        raise ValueError("Google Earth Engine credentials not found")
-    credentials_json = json.dumps(credentials_dict)
-    credentials = ee.ServiceAccountCredentials(credentials_dict["client_email"], key_data=credentials_json)
-    ee.Initialize(credentials)
-
-
 def _map_fao_to_iso(fao_code: int, country_name: str) -> str:
     fao_to_iso = {
         1: "AFG", 2: "ALB", 4: "DZA", 7: "AGO", 10: "ARG", 11: "ARM", 12: "AUS",
@@ -89,7 +79,7 @@ def calculate_global_sovereign_risk() -> List[Dict[str, Any]]:
     print("[Sovereign Risk] Computing fresh global risk scores via GEE...")
 
     try:
-        _authenticate_gee_sovereign()
+        gee_session.ensure_initialized()
 
         countries = ee.FeatureCollection("FAO/GAUL/2015/level0")
         flood_hazard = ee.Image("JRC/GSW1_4/GlobalSurfaceWater").select("occurrence")
@@ -2,33 +2,24 @@
 
 from __future__ import annotations
 
-import asyncio
 import io
 import json
-import os
-import re
-import sys
-from typing import Dict, Any, List, Literal, Optional
-from pathlib import Path
+from collections.abc import Sequence
+from typing import Dict, Any, AsyncIterator, List, Literal, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+import asset_scheduler
+from asset_scheduler import AssetsCancelled, RunProgress
 from resilient_score import calculate_resilient_score
+from simulation_engine import SimulationParams, run_simulation
 
 router = APIRouter(prefix="/api/v1/portfolio", tags=["Portfolio"])
 
-
-def _resolve_headless_runner_path() -> Path:
-    """Resolve `headless_runner.py` without relying on current working directory."""
-    this_dir = Path(__file__).resolve().parent
-    for candidate_dir in (this_dir, *this_dir.parents):
-        candidate = candidate_dir / "headless_runner.py"
-        if candidate.exists():
-            return candidate
-    raise FileNotFoundError("Unable to locate 'headless_runner.py' in the repo.")
-
 # ---------------------------------------------------------------------------
 # Pydantic models
 # ---------------------------------------------------------------------------
@@ -80,50 +71,32 @@ class PortfolioResponse(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-async def process_single_asset(row_data: dict, row_index: int) -> dict:
-    """Process a single portfolio asset asynchronously."""
+def _asset_params(row_data: dict) -> SimulationParams:
+    """Build simulation parameters for one CSV row (asset value drives CAPEX/OPEX)."""
+    asset_value = float(row_data["asset_value"])
+    return SimulationParams(
+        lat=float(row_data["lat"]),
+        lon=float(row_data["lon"]),
+        scenario_year=int(row_data.get("scenario_year", 2050)),
+        project_type="agriculture",
+        crop_type=str(row_data["crop_type"]),
+        temp_delta=float(row_data.get("temp_delta", 0.0)),
+        rain_pct_change=float(row_data.get("rain_pct_change", 0.0)),
+        capex=asset_value,
+        opex=asset_value * 0.1,
+        discount_rate=0.10,
+        analysis_years=10,
+    )
+
+
+def run_asset_simulation(row_data: dict, row_index: int) -> dict:
+    """Simulate a single portfolio asset in-process."""
     try:
-        runner_path = _resolve_headless_runner_path()
-        lat = float(row_data["lat"])
-        lon = float(row_data["lon"])
-        crop_type = str(row_data["crop_type"])
-        asset_value = float(row_data["asset_value"])
-
-        scenario_year = int(row_data.get("scenario_year", 2050))
-        temp_delta = float(row_data.get("temp_delta", 0.0))
-        rain_pct_change = float(row_data.get("rain_pct_change", 0.0))
-
-        cmd = [
-            sys.executable,
-            str(runner_path),
-            "--lat", str(lat), "--lon", str(lon),
-            "--scenario_year", str(scenario_year),
-            "--project_type", "agriculture",
-            "--crop_type", crop_type,
-            "--temp_delta", str(temp_delta),
-            "--rain_pct_change", str(rain_pct_change),
-        ]
-
-        env = os.environ.copy()
-        env["FINANCIAL_CAPEX"] = str(asset_value)
-        env["FINANCIAL_OPEX"] = str(asset_value * 0.1)
-        env["FINANCIAL_DISCOUNT_RATE"] = "0.10"
-        env["FINANCIAL_YEARS"] = "10"
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(runner_path.parent),
-            env=env,
-        )
-
-        stdout, stderr = await process.communicate()
+        result = run_simulation(_asset_params(row_data))
 
-        if process.returncode != 0:
-            return {"row_index": row_index, "status": "error", "error": f"Simulation failed: {stderr.decode()}", "input": row_data}
+        if not result.get("success"):
+            return {"row_index": row_index, "status": "error", "error": f"Simulation failed: {result.get('message', result.get('error'))}", "input": row_data}
 
-        result = json.loads(stdout.decode())
         result["row_index"] = row_index
         result["status"] = "success"
         result["input"] = row_data
@@ -133,128 +106,311 @@ async def process_single_asset(row_data: dict, row_index: int) -> dict:
             result["resilient_score_data"] = None
         return result
 
-    except json.JSONDecodeError as e:
-        return {"row_index": row_index, "status": "error", "error": f"Failed to parse simulation output: {str(e)}", "input": row_data}
     except (ValueError, KeyError) as e:
         return {"row_index": row_index, "status": "error", "error": f"Invalid row data: {str(e)}", "input": row_data}
     except Exception as e:
         return {"row_index": row_index, "status": "error", "error": f"Unexpected error: {str(e)}", "input": row_data}
 
 
+def _failed_asset(row_index: int, row_data: dict, error: BaseException) -> dict:
+    """Error result for an asset the scheduler could not finish."""
+    reason = "Timed out" if isinstance(error, TimeoutError) else "Unexpected error"
+    return {"row_index": row_index, "status": "error", "error": f"{reason}: {error}", "input": row_data}
+
+
+def _ndjson(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+async def run_assets(records: Sequence, request: Optional[Request] = None) -> List[dict]:
+    """
+    Simulate portfolio assets on the bounded asset scheduler.
+
+    Args:
+        records: Parsed CSV rows
+        request: Incoming request; the run is cancelled if its client disconnects
+
+    Returns:
+        One result per record, in row order; assets that raised or timed out
+        get an error result
+    """
+    results: List[Optional[dict]] = [None] * len(records)
+    async for index, result, error in asset_scheduler.default_scheduler.run(
+        run_asset_simulation,
+        records,
+        cancelled=request.is_disconnected if request is not None else None,
+        is_failure=lambda r: r.get("status") != "success",
+        progress=RunProgress(total=len(records)),
+    ):
+        if error is not None:
+            result = _failed_asset(index, records[index], error)
+        results[index] = result
+    return results
+
+
+# Value suffixes, in the order they are checked ("5m", "200k", "1b")
+VALUE_MULTIPLIERS = (("m", 1_000_000.0), ("k", 1_000.0), ("b", 1_000_000_000.0))
+
+
+def _to_float(cleaned: np.ndarray) -> np.ndarray:
+    """float64 of digit/dot byte strings; empty strings and several dots give 0 (as float() failing)."""
+    dots = np.strings.count(cleaned, b".")
+    valid = (np.strings.str_len(cleaned) > dots) & (dots <= 1)
+    return np.where(valid, np.where(valid, cleaned, b"0").astype(np.float64), 0.0)
+
+
+def parse_asset_values(values: pd.Series) -> np.ndarray:
+    """
+    Asset values in USD from a CSV value column, as float64.
+
+    Text is lower-cased, scaled by the first suffix letter it contains
+    (m, then k, then b) and stripped of everything but digits and dots
+    ("$5m" -> 5e6, "200K" -> 2e5); values that do not parse count as 0.
+    Numeric columns are taken as they are on purpose (sign dropped, NaN -> 0)
+    rather than through the text rules, which misread floats whose str()
+    uses an exponent ("1e20" -> 120.0, "1.5e-05" -> 1.505).
+    """
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        numbers = np.abs(values.to_numpy(dtype=np.float64, na_value=np.nan))
+        return np.where(np.isfinite(numbers), numbers, 0.0)
+
+    text = values.astype(str).str.lower()
+    multiplier = np.select([text.str.contains(suffix, regex=False).to_numpy() for suffix, _ in VALUE_MULTIPLIERS],
+                           [factor for _, factor in VALUE_MULTIPLIERS], 1.0)
+    cleaned = text.str.replace(r"[^0-9.]", "", regex=True).str.encode("ascii")
+    return _to_float(cleaned.to_numpy(dtype="S")) * multiplier
+
+
+class PortfolioRecords(Sequence):
+    """
+    Parsed portfolio rows held column by column.
+
+    ``lat``, ``lon`` and ``asset_value`` are float64 arrays and ``crop_type``
+    a list of strings; the CSV's other columns are kept as lists of Python
+    values. Indexing builds the record dict of one row on demand, so a
+    portfolio costs a few arrays until its assets are simulated.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, asset_value: np.ndarray, crop_type: List[str], extras: Dict[str, list]):
+        self.lat = lat
+        self.lon = lon
+        self.asset_value = asset_value
+        self.crop_type = crop_type
+        self.extras = extras
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record: dict = {
+            "lat": float(self.lat[index]),
+            "lon": float(self.lon[index]),
+            "asset_value": float(self.asset_value[index]),
+            "crop_type": self.crop_type[index],
+        }
+        for col, values in self.extras.items():
+            record[col] = values[index]
+        return record
+
+
+def parse_portfolio_csv(contents: bytes) -> Tuple[PortfolioRecords, Dict[str, int]]:
+    """
+    Parse an uploaded portfolio CSV into simulation records.
+
+    Args:
+        contents: Raw CSV bytes
+
+    Returns:
+        (records, crop_distribution): the rows as PortfolioRecords (each
+        record has ``lat``, ``lon``, ``asset_value`` and ``crop_type`` plus
+        the row's other columns) and the number of rows per crop
+
+    Raises:
+        HTTPException: 400 if a required column cannot be found
+        ValueError: A latitude or longitude is not a number
+    """
+    df = pd.read_csv(io.BytesIO(contents))
+    df.columns = df.columns.astype(str).str.lower().str.replace(r"[^a-z0-9_]", "", regex=True)
+
+    lat_col = next((c for c in df.columns if "lat" in c), "lat")
+    lon_col = next((c for c in df.columns if "lon" in c or "lng" in c), "lon")
+    val_col = next((c for c in df.columns if any(x in c for x in ["val", "price", "amount", "cost", "invest", "usd"])), None)
+    if not val_col and len(df.columns) > 2:
+        val_col = df.columns[2]
+    if not val_col:
+        val_col = "asset_value"
+    crop_col = next((c for c in df.columns if "crop" in c), "crop_type")
+
+    # Drop empty rows, then empty columns (one isna pass for both)
+    empty = df.isna().to_numpy()
+    empty_rows, empty_cols = empty.all(axis=1), empty.all(axis=0)
+    if empty_rows.any() or empty_cols.any():
+        df = df.loc[~empty_rows, ~empty_cols]
+
+    required_columns = [lat_col, lon_col, val_col, crop_col]
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {', '.join(missing_columns)}. Detected columns: {list(df.columns)}",
+        )
+
+    records = PortfolioRecords(
+        lat=df[lat_col].to_numpy(dtype=np.float64),
+        lon=df[lon_col].to_numpy(dtype=np.float64),
+        asset_value=parse_asset_values(df[val_col]),
+        crop_type=df[crop_col].astype(str).tolist(),
+        extras={col: df[col].tolist() for col in df.columns if col not in required_columns},
+    )
+    return records, df[crop_col].value_counts().to_dict()
+
+
+class PortfolioAggregator:
+    """Running totals for ``portfolio_summary``, updated one asset result at a time."""
+
+    def __init__(self):
+        self.total_assets = 0
+        self.successful = 0
+        self.failed = 0
+        self.total_portfolio_value = 0.0
+        self.total_value_at_risk = 0.0
+        self.resilience_total = 0.0
+        self.resilience_count = 0
+        self.total_npv = 0.0
+        self.total_expected_loss = 0.0
+        self.resilient_total = 0.0
+        self.resilient_count = 0
+
+    def add(self, result: dict) -> None:
+        self.total_assets += 1
+        self.total_portfolio_value += result["input"]["asset_value"]
+
+        resilient_score = (result.get("resilient_score_data") or {}).get("resilient_score")
+        if resilient_score is not None:
+            self.resilient_total += resilient_score
+            self.resilient_count += 1
+
+        if result.get("status") == "error":
+            self.failed += 1
+        if result.get("status") != "success":
+            return
+        self.successful += 1
+
+        var_95 = result.get("monte_carlo", {}).get("var_95", 0.0)
+        if var_95:
+            self.total_value_at_risk += abs(float(var_95))
+
+        resilience_score = result.get("resilience_score")
+        if resilience_score is not None:
+            try:
+                self.resilience_total += float(resilience_score)
+                self.resilience_count += 1
+            except (ValueError, TypeError):
+                pass
+
+        npv = result.get("financial", {}).get("npv_usd", 0.0)
+        if npv:
+            self.total_npv += float(npv)
+
+        expected_loss = result.get("risk", {}).get("expected_loss_usd", 0.0)
+        if expected_loss:
+            self.total_expected_loss += float(expected_loss)
+
+    def summary(self, crop_distribution: Dict[str, int]) -> dict:
+        """The ``portfolio_summary`` of the results added so far."""
+        average_resilience_score = self.resilience_total / self.resilience_count if self.resilience_count else 0.0
+        value = self.total_portfolio_value
+        return {
+            "total_assets": self.total_assets,
+            "successful_simulations": self.successful,
+            "failed_simulations": self.failed,
+            "total_portfolio_value_usd": round(float(value), 2),
+            "total_value_at_risk_usd": round(float(self.total_value_at_risk), 2),
+            "average_resilience_score": round(float(average_resilience_score), 2),
+            "total_npv_usd": round(float(self.total_npv), 2),
+            "total_expected_loss_usd": round(float(self.total_expected_loss), 2),
+            "risk_exposure_pct": round((self.total_value_at_risk / value * 100) if value > 0 else 0.0, 2),
+            "crop_distribution": crop_distribution,
+            "average_resilient_score": round(self.resilient_total / self.resilient_count, 1) if self.resilient_count else None,
+        }
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
 
 
 @router.post("/analyze-csv")
-async def analyze_portfolio_csv(file: UploadFile = File(...)) -> dict:
-    """Analyze a CSV portfolio upload with concurrent processing."""
+async def analyze_portfolio_csv(request: Request, file: UploadFile = File(...)) -> dict:
+    """Analyze a CSV portfolio upload, simulating assets in-process on the bounded asset scheduler."""
     try:
         contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        df.columns = df.columns.astype(str).str.lower().str.replace(r"[^a-z0-9_]", "", regex=True)
-
-        lat_col = next((c for c in df.columns if "lat" in c), "lat")
-        lon_col = next((c for c in df.columns if "lon" in c or "lng" in c), "lon")
-        val_col = next((c for c in df.columns if any(x in c for x in ["val", "price", "amount", "cost", "invest", "usd"])), None)
-        if not val_col and len(df.columns) > 2:
-            val_col = df.columns[2]
-        if not val_col:
-            val_col = "asset_value"
-        crop_col = next((c for c in df.columns if "crop" in c), "crop_type")
-
-        df.dropna(how="all", inplace=True)
-        df.dropna(axis=1, how="all", inplace=True)
-
-        required_columns = [lat_col, lon_col, val_col, crop_col]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns: {', '.join(missing_columns)}. Detected columns: {list(df.columns)}",
-            )
-
-        records: list[dict] = []
-        for _, row in df.iterrows():
-            raw_val = str(row.get(val_col, "0")).lower()
-            multiplier = 1
-            if "m" in raw_val:
-                multiplier = 1000000
-            elif "k" in raw_val:
-                multiplier = 1000
-            elif "b" in raw_val:
-                multiplier = 1000000000
-            clean_val = re.sub(r"[^0-9.]", "", raw_val)
-            try:
-                val = float(clean_val) * multiplier if clean_val else 0.0
-            except ValueError:
-                val = 0.0
-            lat = float(row.get(lat_col, 0.0))
-            lon = float(row.get(lon_col, 0.0))
-            crop = str(row.get(crop_col, "unknown"))
-            record: dict = {"lat": lat, "lon": lon, "asset_value": val, "crop_type": crop}
-            for col in df.columns:
-                if col not in (lat_col, lon_col, val_col, crop_col):
-                    record[col] = row.get(col)
-            records.append(record)
-
-        tasks = [process_single_asset(row, idx) for idx, row in enumerate(records)]
-        results = await asyncio.gather(*tasks)
-
-        successful = [r for r in results if r.get("status") == "success"]
-        failed = [r for r in results if r.get("status") == "error"]
-
-        total_portfolio_value = sum(r["input"]["asset_value"] for r in results)
-
-        total_value_at_risk = 0.0
-        resilience_scores: list[float] = []
-        total_npv = 0.0
-        total_expected_loss = 0.0
-
-        for result in successful:
-            monte_carlo = result.get("monte_carlo", {})
-            var_95 = monte_carlo.get("var_95", 0.0)
-            if var_95:
-                total_value_at_risk += abs(float(var_95))
-
-            resilience_score = result.get("resilience_score")
-            if resilience_score is not None:
-                try:
-                    resilience_scores.append(float(resilience_score))
-                except (ValueError, TypeError):
-                    pass
-
-            financial = result.get("financial", {})
-            npv = financial.get("npv_usd", 0.0)
-            if npv:
-                total_npv += float(npv)
-
-            risk = result.get("risk", {})
-            expected_loss = risk.get("expected_loss_usd", 0.0)
-            if expected_loss:
-                total_expected_loss += float(expected_loss)
-
-        average_resilience_score = sum(resilience_scores) / len(resilience_scores) if resilience_scores else 0.0
-
-        scores = [a.get("resilient_score_data", {}).get("resilient_score") for a in results if a.get("resilient_score_data")]
-        scores = [s for s in scores if s is not None]
-        average_resilient_score = round(sum(scores) / len(scores), 1) if scores else None
-
-        portfolio_summary = {
-            "total_assets": len(records),
-            "successful_simulations": len(successful),
-            "failed_simulations": len(failed),
-            "total_portfolio_value_usd": round(float(total_portfolio_value), 2),
-            "total_value_at_risk_usd": round(float(total_value_at_risk), 2),
-            "average_resilience_score": round(float(average_resilience_score), 2),
-            "total_npv_usd": round(float(total_npv), 2),
-            "total_expected_loss_usd": round(float(total_expected_loss), 2),
-            "risk_exposure_pct": round((total_value_at_risk / total_portfolio_value * 100) if total_portfolio_value > 0 else 0.0, 2),
-            "crop_distribution": df[crop_col].value_counts().to_dict(),
-            "average_resilient_score": average_resilient_score,
-        }
-        return {"portfolio_summary": portfolio_summary, "asset_results": results}
+        records, crop_distribution = parse_portfolio_csv(contents)
+        results = await run_assets(records, request)
+
+        aggregator = PortfolioAggregator()
+        for result in results:
+            aggregator.add(result)
+        return {"portfolio_summary": aggregator.summary(crop_distribution), "asset_results": results}
+
+    except AssetsCancelled as e:
+        # The client is gone; nobody reads this response
+        raise HTTPException(status_code=499, detail=str(e)) from e
+    except HTTPException:
+        raise
+    except pd.errors.EmptyDataError:
+        raise HTTPException(status_code=400, detail="Uploaded CSV file is empty")
+    except pd.errors.ParserError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse CSV file: {str(e)}") from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Portfolio analysis failed: {str(e)}") from e
+
+
+async def stream_assets(records: Sequence, crop_distribution: Dict[str, int]) -> AsyncIterator[str]:
+    """
+    NDJSON lines for a streamed portfolio analysis.
 
+    Emits a ``started`` line, one ``asset_result`` line per asset as soon as
+    it completes (in completion order; ``row_index`` gives the CSV row), then
+    the ``portfolio_summary`` built from running totals, so no result is
+    kept after it is sent. An ``error`` line replaces the summary if the
+    run fails part-way.
+    """
+    aggregator = PortfolioAggregator()
+    yield _ndjson({"type": "started", "total_assets": len(records)})
+    try:
+        async for index, result, error in asset_scheduler.default_scheduler.run(
+            run_asset_simulation,
+            records,
+            is_failure=lambda r: r.get("status") != "success",
+            progress=RunProgress(total=len(records)),
+        ):
+            if error is not None:
+                result = _failed_asset(index, records[index], error)
+            aggregator.add(result)
+            yield _ndjson({"type": "asset_result", "result": result})
+    except Exception as e:
+        yield _ndjson({"type": "error", "detail": f"Portfolio analysis failed: {str(e)}"})
+        return
+    yield _ndjson({"type": "portfolio_summary", "portfolio_summary": aggregator.summary(crop_distribution)})
+
+
+@router.post("/analyze-csv/stream")
+async def analyze_portfolio_csv_stream(file: UploadFile = File(...)) -> StreamingResponse:
+    """
+    Analyze a CSV portfolio upload, streaming each asset result as NDJSON as soon as it completes.
+
+    The CSV is validated before the stream starts, so parse errors are plain
+    HTTP errors. If the client disconnects, the stream is cancelled and
+    assets not started yet are dropped.
+    """
+    try:
+        contents = await file.read()
+        records, crop_distribution = parse_portfolio_csv(contents)
+    except HTTPException:
+        raise
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="Uploaded CSV file is empty")
     except pd.errors.ParserError as e:
@@ -262,6 +418,8 @@ async def analyze_portfolio_csv(file: UploadFile = File(...)) -> dict:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Portfolio analysis failed: {str(e)}") from e
 
+    return StreamingResponse(stream_assets(records, crop_distribution), media_type="application/x-ndjson")
+
 
 @router.post("/analyze", response_model=PortfolioResponse)
 def analyze_portfolio(req: PortfolioRequest) -> dict:
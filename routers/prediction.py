@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
-import pickle
+import asyncio
+import os
 import random
 import statistics
 import sys
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
-import joblib
 import numpy as np
 from fastapi import APIRouter, Depends
 from fastapi.concurrency import run_in_threadpool
@@ -17,14 +18,15 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from auth import get_current_user
+from model_registry import ModelUnavailableError, get_model_async, register_model
 from models import User
 from physics_engine import calculate_yield, calculate_volatility
 from financial_engine import calculate_npv, calculate_payback_period
 from gee_connector import (
-    get_weather_data, get_monthly_data, analyze_spatial_viability, get_terrain_data,
+    get_weather_data, get_weather_data_many, get_monthly_data, analyze_spatial_viability, get_terrain_data,
 )
 from batch_processor import run_batch_job
-from routers._shared import legacy_error
+from routers._shared import legacy_error, model_unavailable
 
 router = APIRouter(prefix="/api/v1/prediction", tags=["Prediction"])
 
@@ -32,28 +34,11 @@ router = APIRouter(prefix="/api/v1/prediction", tags=["Prediction"])
 # In-process ML models
 # ---------------------------------------------------------------------------
 
-_AG_MODEL_PATH = "ag_surrogate.pkl"
-_COFFEE_MODEL_PATH = "coffee_model.pkl"
-
-ag_pkl_model = None
-coffee_pkl_model = None
-
-try:
-    with open(_AG_MODEL_PATH, "rb") as _f:
-        ag_pkl_model = pickle.load(_f)
-    print(f"Model loaded successfully from {_AG_MODEL_PATH}")
-except FileNotFoundError:
-    print(f"Warning: Model file '{_AG_MODEL_PATH}' not found.")
-except Exception as _e:
-    print(f"Warning: Failed to load model: {_e}")
-
-try:
-    coffee_pkl_model = joblib.load(_COFFEE_MODEL_PATH)
-    print(f"Coffee model loaded successfully from {_COFFEE_MODEL_PATH}")
-except FileNotFoundError:
-    print(f"Warning: Coffee model file '{_COFFEE_MODEL_PATH}' not found.")
-except Exception as _e:
-    print(f"Warning: Failed to load coffee model: {_e}")
+AG_MODEL = "ag"
+COFFEE_MODEL = "coffee"
+
+register_model(AG_MODEL, "ag_surrogate.pkl")
+register_model(COFFEE_MODEL, "coffee_model.pkl")
 
 SEED_TYPES = {"standard": 0, "resilient": 1}
 
@@ -68,6 +53,91 @@ FALLBACK_TERRAIN = {
     "soil_ph": 6.5,
 }
 
+# Per-lookup timeouts (seconds) for the concurrent hazard fetch. A lookup that
+# exceeds its timeout is treated as failed and its fallback is used, so one
+# slow dataset cannot stall the whole request.
+LOOKUP_TIMEOUTS_S = {
+    "weather": float(os.environ.get("PREDICT_WEATHER_TIMEOUT_S", "20")),
+    "monthly": float(os.environ.get("PREDICT_MONTHLY_TIMEOUT_S", "20")),
+    "terrain": float(os.environ.get("PREDICT_TERRAIN_TIMEOUT_S", "15")),
+    "spatial": float(os.environ.get("PREDICT_SPATIAL_TIMEOUT_S", "30")),
+}
+
+# ---------------------------------------------------------------------------
+# Concurrent hazard fetch
+# ---------------------------------------------------------------------------
+
+# name -> (blocking lookup, positional args, keyword args)
+HazardLookups = Dict[str, Tuple[Callable[..., Any], tuple, Dict[str, Any]]]
+
+
+async def _run_lookup(fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any], timeout_s: float) -> Dict[str, Any]:
+    """
+    Run one blocking lookup in the threadpool. Never raises; failures are returned in 'error'.
+
+    The gee_connector lookups are @coalesced, so identical lookups in flight
+    from concurrent requests share one execution.
+    """
+    start = time.perf_counter()
+    try:
+        value = await asyncio.wait_for(run_in_threadpool(fn, *args, **kwargs), timeout=timeout_s)
+        error = None
+    except asyncio.TimeoutError:
+        value, error = None, TimeoutError(f"timed out after {timeout_s}s")
+    except Exception as e:
+        value, error = None, e
+    return {"value": value, "error": error, "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def fetch_hazards(
+    lookups: HazardLookups,
+    timings_ms: Dict[str, float],
+    required: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run independent hazard lookups concurrently.
+
+    Args:
+        lookups: Lookups keyed by name (a key of LOOKUP_TIMEOUTS_S)
+        timings_ms: Updated in place with each lookup's elapsed time and the
+            wall time of the whole fetch under 'hazard_fetch'
+        required: Lookup the others are only useful with; if it fails, the
+            others still running are cancelled and reported as skipped. A
+            lookup already running in a worker thread cannot be interrupted
+            and finishes there, but the request no longer waits for it.
+
+    Returns:
+        Dict of name -> {'value', 'error', 'elapsed_ms'}; 'error' is None on success
+    """
+    start = time.perf_counter()
+    tasks = {
+        name: asyncio.ensure_future(_run_lookup(fn, args, kwargs, LOOKUP_TIMEOUTS_S[name]))
+        for name, (fn, args, kwargs) in lookups.items()
+    }
+    skipped = set()
+    try:
+        if required is not None and (await tasks[required])["error"] is not None:
+            for name, task in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    skipped.add(name)
+        results = {}
+        for name, task in tasks.items():
+            try:
+                results[name] = await task
+            except asyncio.CancelledError:
+                if name not in skipped:
+                    raise
+                error = RuntimeError(f"skipped: {required} lookup failed")
+                results[name] = {"value": None, "error": error, "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)}
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    timings_ms["hazard_fetch"] = round((time.perf_counter() - start) * 1000, 2)
+    for name, result in results.items():
+        timings_ms[name] = result["elapsed_ms"]
+    return results
+
 # ---------------------------------------------------------------------------
 # Pydantic models
 # ---------------------------------------------------------------------------
@@ -122,13 +192,16 @@ async def get_hazard(req: GetHazardRequest):
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365)
 
+        timings_ms: Dict[str, float] = {}
+        hazards = await fetch_hazards({
+            "weather": (get_weather_data, (), {"lat": lat, "lon": lon, "start_date": start_date.strftime("%Y-%m-%d"), "end_date": end_date.strftime("%Y-%m-%d")}),
+            "terrain": (get_terrain_data, (), {"lat": lat, "lon": lon}),
+        }, timings_ms)
+
         try:
-            weather_data = await run_in_threadpool(
-                get_weather_data,
-                lat=lat, lon=lon,
-                start_date=start_date.strftime("%Y-%m-%d"),
-                end_date=end_date.strftime("%Y-%m-%d"),
-            )
+            if hazards["weather"]["error"] is not None:
+                raise hazards["weather"]["error"]
+            weather_data = hazards["weather"]["value"]
             hazard_metrics = {
                 "max_temp_celsius": weather_data["max_temp_celsius"],
                 "total_rain_mm": weather_data["total_precip_mm"],
@@ -139,7 +212,9 @@ async def get_hazard(req: GetHazardRequest):
             hazard_metrics = FALLBACK_WEATHER.copy()
 
         try:
-            terrain_data = await run_in_threadpool(get_terrain_data, lat=lat, lon=lon)
+            if hazards["terrain"]["error"] is not None:
+                raise hazards["terrain"]["error"]
+            terrain_data = hazards["terrain"]["value"]
             hazard_metrics["elevation_m"] = terrain_data["elevation_m"]
             hazard_metrics["soil_ph"] = terrain_data["soil_ph"]
         except Exception as terrain_error:
@@ -152,6 +227,7 @@ async def get_hazard(req: GetHazardRequest):
             "data": {
                 "location": {"lat": lat, "lon": lon},
                 "hazard_metrics": hazard_metrics,
+                "timings_ms": timings_ms,
             },
         }
 
@@ -162,40 +238,59 @@ async def get_hazard(req: GetHazardRequest):
 @router.post("/predict")
 async def predict(req: PredictRequest, user: User = Depends(get_current_user)):
     """Predict crop yield and calculate avoided loss."""
+    request_start = time.perf_counter()
+    timings_ms: Dict[str, float] = {}
     try:
         crop_type = req.crop_type.lower()
 
         if crop_type not in ("maize", "cocoa", "coffee"):
             return legacy_error(400, f"Unsupported crop_type: {crop_type}. Supported crops: 'maize', 'cocoa', 'coffee'", "INVALID_CROP_TYPE")
 
-        if crop_type == "coffee" and coffee_pkl_model is None:
-            return legacy_error(500, "Coffee model file not found. Ensure coffee_model.pkl exists.", "MODEL_NOT_FOUND")
+        coffee_model = None
+        if crop_type == "coffee":
+            try:
+                coffee_model = await get_model_async(COFFEE_MODEL)
+            except ModelUnavailableError as e:
+                return model_unavailable(e)
 
         monthly_data = None
+        hazards: Dict[str, Dict[str, Any]] = {}
         has_location = False
-        location_lat = 0.0
-        location_lon = 0.0
 
         if req.lat is not None and req.lon is not None:
             lat = float(req.lat)
             lon = float(req.lon)
 
+            # Every lookup depends only on (lat, lon), so fire them together.
+            # Weather gates the rest: if it fails, the location results are unused
+            # and the lookups still running are cancelled.
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=365)
+            lookups: HazardLookups = {
+                "weather": (get_weather_data, (), {"lat": lat, "lon": lon, "start_date": start_date.strftime("%Y-%m-%d"), "end_date": end_date.strftime("%Y-%m-%d")}),
+                "monthly": (get_monthly_data, (lat, lon), {}),
+            }
+            if crop_type == "coffee" and req.elevation is None and req.elevation_m is None:
+                lookups["terrain"] = (get_terrain_data, (), {"lat": lat, "lon": lon})
+            if crop_type != "coffee" and float(req.temp_increase) != 0.0:
+                print(f"[SPATIAL] Running spatial analysis for lat={lat}, lon={lon}, temp_increase={float(req.temp_increase)}", file=sys.stderr, flush=True)
+                lookups["spatial"] = (analyze_spatial_viability, (lat, lon, float(req.temp_increase)), {})
+            hazards = await fetch_hazards(lookups, timings_ms, required="weather")
+
             try:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=365)
-                weather_data = await run_in_threadpool(get_weather_data, lat=lat, lon=lon, start_date=start_date.strftime("%Y-%m-%d"), end_date=end_date.strftime("%Y-%m-%d"))
+                if hazards["weather"]["error"] is not None:
+                    raise hazards["weather"]["error"]
+                weather_data = hazards["weather"]["value"]
                 base_temp = weather_data["max_temp_celsius"]
                 base_rain = weather_data["total_precip_mm"]
                 data_source = "gee_auto_lookup"
 
-                try:
-                    monthly_data = await run_in_threadpool(get_monthly_data, lat, lon)
-                except Exception as monthly_error:
-                    print(f"Monthly data error: {monthly_error}", file=sys.stderr, flush=True)
+                if hazards["monthly"]["error"] is None:
+                    monthly_data = hazards["monthly"]["value"]
+                else:
+                    print(f"Monthly data error: {hazards['monthly']['error']}", file=sys.stderr, flush=True)
 
                 has_location = True
-                location_lat = lat
-                location_lon = lon
 
             except Exception as gee_error:
                 print(f"GEE error, using fallback: {gee_error}", file=sys.stderr, flush=True)
@@ -223,7 +318,9 @@ async def predict(req: PredictRequest, user: User = Depends(get_current_user)):
 
             if has_location and req.elevation is None and req.elevation_m is None:
                 try:
-                    terrain_data = await run_in_threadpool(get_terrain_data, lat=location_lat, lon=location_lon)
+                    if hazards["terrain"]["error"] is not None:
+                        raise hazards["terrain"]["error"]
+                    terrain_data = hazards["terrain"]["value"]
                     elevation = terrain_data["elevation_m"] if terrain_data["elevation_m"] else 1200.0
                     soil_ph = terrain_data["soil_ph"] if terrain_data["soil_ph"] else 6.0
                 except Exception as terrain_error:
@@ -235,7 +332,8 @@ async def predict(req: PredictRequest, user: User = Depends(get_current_user)):
             rain_anomaly_mm = (rain_change / 100.0) * base_rain
 
             features = np.array([[baseline_temp_c, temp_anomaly_c, rainfall_mm, rain_anomaly_mm, elevation, soil_ph]])
-            yield_impact = float(coffee_pkl_model.predict(features)[0])
+            yield_impact = float(coffee_model.predict(features)[0])
+            timings_ms["total"] = round((time.perf_counter() - request_start) * 1000, 2)
 
             return {
                 "status": "success",
@@ -257,6 +355,7 @@ async def predict(req: PredictRequest, user: User = Depends(get_current_user)):
                         "description": f"Under current conditions, expected yield is {yield_impact * 100:.1f}% of maximum potential.",
                         "risk_factors": [],
                     },
+                    "timings_ms": timings_ms,
                 },
             }
 
@@ -304,11 +403,10 @@ async def predict(req: PredictRequest, user: User = Depends(get_current_user)):
 
         spatial_analysis = None
         if has_location and temp_increase != 0.0:
-            try:
-                print(f"[SPATIAL] Running spatial analysis for lat={location_lat}, lon={location_lon}, temp_increase={temp_increase}", file=sys.stderr, flush=True)
-                spatial_analysis = await run_in_threadpool(analyze_spatial_viability, location_lat, location_lon, temp_increase)
-            except Exception as spatial_error:
-                print(f"Spatial analysis error: {spatial_error}", file=sys.stderr, flush=True)
+            if hazards["spatial"]["error"] is None:
+                spatial_analysis = hazards["spatial"]["value"]
+            else:
+                print(f"Spatial analysis error: {hazards['spatial']['error']}", file=sys.stderr, flush=True)
 
         chart_data = None
         if monthly_data is not None:
@@ -346,6 +444,9 @@ async def predict(req: PredictRequest, user: User = Depends(get_current_user)):
         if roi_analysis is not None:
             response_data["roi_analysis"] = roi_analysis
 
+        timings_ms["total"] = round((time.perf_counter() - request_start) * 1000, 2)
+        response_data["timings_ms"] = timings_ms
+
         return {"status": "success", "data": response_data}
 
     except ValueError:
@@ -380,18 +481,22 @@ async def predict_portfolio(req: PredictPortfolioRequest, user: User = Depends(g
         total_tonnage = 0.0
         location_results: list[dict] = []
 
-        for idx, loc in enumerate(locations):
+        # One batched Earth Engine request for every location
+        try:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=365)
+            all_weather = await run_in_threadpool(get_weather_data_many, [(loc.lat, loc.lon) for loc in locations], start_date=start_date.strftime("%Y-%m-%d"), end_date=end_date.strftime("%Y-%m-%d"))
+        except Exception as weather_error:
+            return legacy_error(500, f"Failed to fetch weather data: {str(weather_error)}", "WEATHER_DATA_ERROR")
+
+        for idx, (loc, weather_data) in enumerate(zip(locations, all_weather)):
             lat = loc.lat
             lon = loc.lon
 
-            try:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=365)
-                weather_data = await run_in_threadpool(get_weather_data, lat=lat, lon=lon, start_date=start_date.strftime("%Y-%m-%d"), end_date=end_date.strftime("%Y-%m-%d"))
-                base_temp = weather_data["max_temp_celsius"]
-                base_rain = weather_data["total_precip_mm"]
-            except Exception as weather_error:
-                return legacy_error(500, f"Failed to fetch weather data for location {idx}: {str(weather_error)}", "WEATHER_DATA_ERROR")
+            base_temp = weather_data["max_temp_celsius"]
+            base_rain = weather_data["total_precip_mm"]
+            if base_temp is None or base_rain is None:
+                return legacy_error(500, f"Failed to fetch weather data for location {idx}: no ERA5-Land coverage at ({lat}, {lon})", "WEATHER_DATA_ERROR")
 
             years = 10
             annual_yields: list[float] = []
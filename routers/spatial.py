@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 import random
 from datetime import datetime, timedelta
 from typing import Dict
@@ -14,7 +13,7 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from gee_connector import get_ndvi_timeseries
-from gee_credentials import load_gee_credentials
+import gee_session
 
 router = APIRouter(prefix="/api/v1/spatial", tags=["Spatial"])
 
@@ -49,15 +48,6 @@ def _ndvi_mock_series() -> list[dict]:
 _TIMELAPSE_CACHE: Dict[str, dict] = {}
 
 
-def _authenticate_gee_timelapse():
-    credentials_dict = load_gee_credentials()
-    if not credentials_dict:
-        raise ValueError("Google Earth Engine credentials not found")
-    credentials_json = json.dumps(credentials_dict)
-    credentials = ee.ServiceAccountCredentials(credentials_dict["client_email"], key_data=credentials_json)
-    ee.Initialize(credentials)
-
-
 def calculate_climate_timelapse(hazard_type: str) -> Dict[str, str]:
     """Generate Mapbox-compatible XYZ tile URLs for climate projections."""
     cache_key = hazard_type
@@ -71,7 +61,7 @@ def calculate_climate_timelapse(hazard_type: str) -> Dict[str, str]:
     print(f"[Timelapse {hazard_type}] Computing fresh tile URLs via GEE...")
 
     try:
-        _authenticate_gee_timelapse()
+        gee_session.ensure_initialized()
 
         PROJECTION_YEARS = [2026, 2030, 2040, 2050]
 
@@ -4,18 +4,44 @@ from __future__ import annotations
 
 import csv
 import io
+import os
 import uuid as uuid_lib
-from typing import Optional, List, Literal, Dict, Any, Tuple
+from datetime import datetime, timezone
+from typing import Optional, List, Literal, Dict, Any, Set, Tuple
 
-import networkx as nx
-from fastapi import APIRouter, HTTPException, UploadFile, File
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import async_session
-from models import SupplyChainNode, SupplyChainEdge
+from models import SupplyChainNode, SupplyChainEdge, SupplyChainNodeCriticality
+import network_cache
+from cascade_engine import MAX_SAMPLES, simulate_cascade
+from criticality_engine import compute_criticality
+from network_cache import CompiledNetwork
 
 router = APIRouter(prefix="/api/v1/supply-chain", tags=["Supply Chain"])
 
+# CSV rows parsed and inserted per batch by /upload
+UPLOAD_BATCH_ROWS = int(os.environ.get("SUPPLY_CHAIN_UPLOAD_BATCH_ROWS", "10000"))
+
+# Set SUPPLY_CHAIN_UPLOAD_COPY=0 to use INSERT instead of COPY on PostgreSQL
+UPLOAD_USE_COPY = os.environ.get("SUPPLY_CHAIN_UPLOAD_COPY", "1") != "0"
+
+# Set SUPPLY_CHAIN_CRITICALITY_ON_UPLOAD=0 to build the criticality index on first request instead
+CRITICALITY_ON_UPLOAD = os.environ.get("SUPPLY_CHAIN_CRITICALITY_ON_UPLOAD", "1") != "0"
+
+# Default per-edge transmission probability of the probabilistic cascade
+CASCADE_SEVERITY_PROBABILITY = {"Moderate": 0.25, "Severe": 0.5, "Catastrophic": 0.85}
+
+# Failure probability at which a node is reported Critical / Warning
+CASCADE_CRITICAL_PROBABILITY = 0.5
+CASCADE_WARNING_PROBABILITY = 0.05
+
 # ---------------------------------------------------------------------------
 # Pydantic models
 # ---------------------------------------------------------------------------
@@ -34,6 +60,63 @@ class CascadeRequest(BaseModel):
     hazard_severity: Optional[Literal["Moderate", "Severe", "Catastrophic"]] = Field(None)
 
 
+class EdgeFailureProbability(BaseModel):
+    source: str
+    target: str
+    probability: float = Field(..., ge=0.0, le=1.0)
+
+
+class ProbabilisticCascadeRequest(BaseModel):
+    network_id: str = Field(...)
+    disrupted_node_ids: List[str] = Field(..., min_length=1)
+    hazard_severity: Literal["Moderate", "Severe", "Catastrophic"] = Field("Severe")
+    edge_failure_probability: Optional[float] = Field(None, ge=0.0, le=1.0)
+    edge_probabilities: Optional[List[EdgeFailureProbability]] = Field(None)
+    hop_decay: float = Field(0.85, ge=0.0, le=1.0)
+    samples: int = Field(1000, ge=1, le=MAX_SAMPLES)
+    max_hops: Optional[int] = Field(None, ge=1)
+    seed: Optional[int] = Field(None)
+    limit: Optional[int] = Field(None, ge=1)
+
+
+class CascadeNodeProbability(BaseModel):
+    id: str
+    label: str
+    type: str
+    failure_probability: float
+    mean_hops: float
+    status: Literal["Secure", "Warning", "Critical"]
+
+
+class ProbabilisticCascadeResponse(BaseModel):
+    network_id: str
+    samples: int
+    edge_failure_probability: float
+    hop_decay: float
+    expected_failed_nodes: float
+    p95_failed_nodes: float
+    max_hops_reached: int
+    nodes: List[CascadeNodeProbability]
+
+
+class NodeCriticality(BaseModel):
+    node_id: str
+    label: str
+    type: str
+    rank: int
+    downstream_reach: int
+    dominated_nodes: int
+    is_single_point_of_failure: bool
+    betweenness: float
+
+
+class CriticalityResponse(BaseModel):
+    network_id: str
+    total_nodes: int
+    single_points_of_failure: int
+    nodes: List[NodeCriticality]
+
+
 class CascadeNodeData(BaseModel):
     label: str
     status: Literal["Secure", "Warning", "Critical"]
@@ -128,6 +211,73 @@ def _simulate_cascade_failure(
     return updated_nodes, updated_edges
 
 
+_REQUIRED_COLUMNS = ("source_id", "source_label", "source_type", "target_id", "target_label", "target_type")
+
+
+
+def _read_network_batch(
+    reader: Any,
+    columns: Dict[str, int],
+    seen_nodes: Set[str],
+    network_id: str,
+    max_rows: int,
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Parse up to ``max_rows`` CSV rows into node and edge rows.
+
+    A node is emitted the first time its id appears (its label and type come
+    from that row) and added to ``seen_nodes``; every CSV row is one edge.
+    Blank rows are skipped, as csv.DictReader did.
+
+    Args:
+        reader: csv.reader positioned after the header
+        columns: Header name -> field index, for _REQUIRED_COLUMNS
+
+    Returns:
+        (new node rows, edge rows) as column dicts; both empty at end of file
+
+    Raises:
+        HTTPException: 400 if a row has fewer fields than the header needs
+    """
+    source_id_i, source_label_i, source_type_i, target_id_i, target_label_i, target_type_i = (columns[c] for c in _REQUIRED_COLUMNS)
+    min_fields = max(columns.values()) + 1
+    created_at = datetime.now(timezone.utc)
+    nodes: List[dict] = []
+    edges: List[dict] = []
+    for row in reader:
+        if not any(row):
+            continue
+        if len(row) < min_fields:
+            raise HTTPException(status_code=400, detail=f"CSV line {reader.line_num} has {len(row)} fields, expected at least {min_fields}")
+        source_id = row[source_id_i].strip()
+        target_id = row[target_id_i].strip()
+        if source_id not in seen_nodes:
+            seen_nodes.add(source_id)
+            nodes.append({"network_id": network_id, "node_id": source_id, "label": row[source_label_i].strip(), "node_type": row[source_type_i].strip(), "baseline_status": "Secure", "created_at": created_at})
+        if target_id not in seen_nodes:
+            seen_nodes.add(target_id)
+            nodes.append({"network_id": network_id, "node_id": target_id, "label": row[target_label_i].strip(), "node_type": row[target_type_i].strip(), "baseline_status": "Secure", "created_at": created_at})
+        edges.append({"network_id": network_id, "source_node_id": source_id, "target_node_id": target_id, "created_at": created_at})
+        if len(edges) >= max_rows:
+            break
+    return nodes, edges
+
+
+async def _bulk_insert(session: AsyncSession, table: Table, rows: List[dict]) -> None:
+    """Insert ``rows`` into ``table`` in the session's transaction: COPY on asyncpg, else executemany."""
+    if not rows:
+        return
+    connection = await session.connection()
+    if UPLOAD_USE_COPY and connection.dialect.name == "postgresql" and connection.dialect.driver == "asyncpg":
+        columns = tuple(rows[0])
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name, records=[tuple(row[c] for c in columns) for row in rows], columns=list(columns),
+        )
+    else:
+        await connection.execute(insert(table), rows)
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -135,157 +285,322 @@ def _simulate_cascade_failure(
 
 @router.post("/upload", response_model=NetworkUploadResponse)
 async def upload_supply_chain_network(file: UploadFile = File(...)) -> dict:
-    """Upload a CSV file to create a new supply chain network."""
+    """
+    Upload a CSV file to create a new supply chain network.
+
+    The CSV is parsed in batches of UPLOAD_BATCH_ROWS rows (off the event
+    loop); each batch's new nodes and its edges are written with one bulk
+    insert (COPY on PostgreSQL), all in a single transaction, so the file is
+    never held in memory as a whole and a failed upload leaves nothing behind.
+    """
     try:
         if not file.filename.endswith(".csv"):
             raise HTTPException(status_code=400, detail="File must be a CSV file (.csv extension required)")
 
-        contents = await file.read()
-        csv_text = contents.decode("utf-8")
+        text = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        try:
+            csv_reader = csv.reader(text)
+            fieldnames = await run_in_threadpool(next, csv_reader, None)
+
+            if not fieldnames or not all(col in fieldnames for col in _REQUIRED_COLUMNS):
+                raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(_REQUIRED_COLUMNS)}")
+            columns = {name: fieldnames.index(name) for name in _REQUIRED_COLUMNS}
+
+            network_id = str(uuid_lib.uuid4())
+            seen_nodes: Set[str] = set()
+            edges_created = 0
+
+            async with async_session() as session:
+                while True:
+                    nodes, edges = await run_in_threadpool(_read_network_batch, csv_reader, columns, seen_nodes, network_id, UPLOAD_BATCH_ROWS)
+                    if not edges:
+                        break
+                    await _bulk_insert(session, SupplyChainNode.__table__, nodes)
+                    await _bulk_insert(session, SupplyChainEdge.__table__, edges)
+                    edges_created += len(edges)
+
+                if not seen_nodes:
+                    raise HTTPException(status_code=400, detail="CSV contains no valid nodes")
+                if CRITICALITY_ON_UPLOAD:
+                    await _store_criticality(session, await _read_network(session, network_id))
+                await session.commit()
+            network_cache.invalidate(network_id)
+        finally:
+            text.detach()
+
+        nodes_created = len(seen_nodes)
+        return {
+            "network_id": network_id,
+            "nodes_created": nodes_created,
+            "edges_created": edges_created,
+            "message": f"Successfully created network with {nodes_created} nodes and {edges_created} edges",
+        }
 
-        csv_reader = csv.DictReader(io.StringIO(csv_text))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to upload network: {str(e)}") from e
 
-        required_columns = ["source_id", "source_label", "source_type", "target_id", "target_label", "target_type"]
-        if not all(col in csv_reader.fieldnames for col in required_columns):
-            raise HTTPException(status_code=400, detail=f"CSV must contain columns: {', '.join(required_columns)}")
 
-        network_id = str(uuid_lib.uuid4())
+async def _read_network(session: AsyncSession, network_id: str) -> CompiledNetwork:
+    """Read a network's nodes and edges in ``session`` and compile them (see network_cache)."""
+    nodes = (await session.execute(
+        select(SupplyChainNode.node_id, SupplyChainNode.label, SupplyChainNode.node_type, SupplyChainNode.baseline_status)
+        .where(SupplyChainNode.network_id == network_id)
+        .order_by(SupplyChainNode.id)
+    )).all()
+    if not nodes:
+        raise HTTPException(status_code=404, detail=f"Network {network_id} not found")
+
+    edges = (await session.execute(
+        select(SupplyChainEdge.source_node_id, SupplyChainEdge.target_node_id)
+        .where(SupplyChainEdge.network_id == network_id)
+        .order_by(SupplyChainEdge.id)
+    )).all()
+
+    return await run_in_threadpool(CompiledNetwork.compile, network_id, nodes, edges)
+
+
+async def _load_network(network_id: str) -> CompiledNetwork:
+    """Compile a network from the database (the network cache's loader)."""
+    async with async_session() as session:
+        return await _read_network(session, network_id)
+
+
+async def _store_criticality(session: AsyncSession, network: CompiledNetwork) -> int:
+    """
+    Compute the criticality index of ``network`` and insert it in ``session``'s transaction.
+
+    Returns:
+        Number of single points of failure
+    """
+    metrics = await run_in_threadpool(compute_criticality, network)
+    created_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "network_id": network.network_id, "node_id": node_id, "rank": rank, "downstream_reach": reach,
+            "dominated_nodes": dominated, "is_single_point_of_failure": dominated > 0,
+            "betweenness": central, "created_at": created_at,
+        }
+        for node_id, rank, reach, dominated, central in zip(
+            network.node_ids, metrics["rank"].tolist(), metrics["downstream_reach"].tolist(),
+            metrics["dominated_nodes"].tolist(), metrics["betweenness"].tolist(),
+        )
+    ]
+    for start in range(0, len(rows), UPLOAD_BATCH_ROWS):
+        await _bulk_insert(session, SupplyChainNodeCriticality.__table__, rows[start:start + UPLOAD_BATCH_ROWS])
+    return int((metrics["dominated_nodes"] > 0).sum())
 
-        nodes_dict: Dict[str, dict] = {}
-        edges_list: List[dict] = []
 
-        for row in csv_reader:
-            source_id = row["source_id"].strip()
-            source_label = row["source_label"].strip()
-            source_type = row["source_type"].strip()
-            target_id = row["target_id"].strip()
-            target_label = row["target_label"].strip()
-            target_type = row["target_type"].strip()
+def _cascade_response(network: CompiledNetwork, statuses: List[str], disrupted: Optional[int] = None) -> dict:
+    """React Flow nodes and edges; the out-edges of node index ``disrupted`` are flagged."""
+    ids, labels, types = network.node_ids, network.labels, network.node_types
+    react_flow_nodes = [
+        {"id": ids[i], "data": {"label": labels[i], "status": statuses[i], "type": types[i]}}
+        for i in range(network.num_nodes)
+    ]
+    react_flow_edges = [
+        {"id": f"e{k}", "source": ids[s], "target": ids[t], "is_disrupted": s == disrupted}
+        for k, (s, t) in enumerate(zip(network.edge_sources().tolist(), network.indices.tolist()), 1)
+    ]
+    return {"nodes": react_flow_nodes, "edges": react_flow_edges}
 
-            if source_id not in nodes_dict:
-                nodes_dict[source_id] = {"label": source_label, "type": source_type}
-            if target_id not in nodes_dict:
-                nodes_dict[target_id] = {"label": target_label, "type": target_type}
 
-            edges_list.append({"source": source_id, "target": target_id})
+@router.post("/simulate-cascade", response_model=CascadeResponse)
+async def simulate_supply_chain_cascade(req: CascadeRequest) -> dict:
+    """
+    Simulate cascading failures in a supply chain network graph.
 
-        if not nodes_dict:
-            raise HTTPException(status_code=400, detail="CSV contains no valid nodes")
-        if not edges_list:
-            raise HTTPException(status_code=400, detail="CSV contains no valid edges")
+    The network is served from the per-worker compiled network cache, so
+    only the first request for a network reads the database.
+    """
+    try:
+        network = await network_cache.get_network(req.network_id, _load_network)
+        if network.num_edges == 0:
+            raise HTTPException(status_code=404, detail=f"Network {req.network_id} has no edges")
 
-        async with async_session() as session:
-            for node_id, node_data in nodes_dict.items():
-                node = SupplyChainNode(
-                    network_id=network_id,
-                    node_id=node_id,
-                    label=node_data["label"],
-                    node_type=node_data["type"],
-                    baseline_status="Secure",
-                )
-                session.add(node)
-
-            for edge_data in edges_list:
-                edge = SupplyChainEdge(
-                    network_id=network_id,
-                    source_node_id=edge_data["source"],
-                    target_node_id=edge_data["target"],
-                )
-                session.add(edge)
-
-            await session.commit()
+        statuses = list(network.statuses)
+        if not req.disrupted_node_id:
+            return _cascade_response(network, statuses)
 
-        return {
-            "network_id": network_id,
-            "nodes_created": len(nodes_dict),
-            "edges_created": len(edges_list),
-            "message": f"Successfully created network with {len(nodes_dict)} nodes and {len(edges_list)} edges",
-        }
+        disrupted = network.index.get(req.disrupted_node_id)
+        if disrupted is None:
+            raise HTTPException(status_code=404, detail=f"Node '{req.disrupted_node_id}' not found in network {req.network_id}")
+
+        statuses[disrupted] = "Critical"
+        downstream_status = "Critical" if req.hazard_severity == "Catastrophic" else "Warning"
+        for i in network.successors(disrupted).tolist():
+            statuses[i] = downstream_status
+
+        return _cascade_response(network, statuses, disrupted)
 
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to upload network: {str(e)}") from e
+        raise HTTPException(status_code=500, detail=f"Supply chain cascade simulation failed: {str(e)}") from e
 
 
-@router.post("/simulate-cascade", response_model=CascadeResponse)
-async def simulate_supply_chain_cascade(req: CascadeRequest) -> dict:
-    """Simulate cascading failures in a supply chain network graph."""
+def _edge_probabilities(network: CompiledNetwork, default: float, overrides: List[EdgeFailureProbability]) -> np.ndarray:
+    """Per-edge transmission probabilities in CSR order: ``default`` except for ``overrides``."""
+    probabilities = np.full(network.num_edges, default, dtype=np.float32)
+    for edge in overrides:
+        source, target = network.index.get(edge.source), network.index.get(edge.target)
+        position = np.flatnonzero(network.successors(source) == target) if source is not None and target is not None else []
+        if len(position) == 0:
+            raise HTTPException(status_code=400, detail=f"Edge '{edge.source}' -> '{edge.target}' not found in network {network.network_id}")
+        probabilities[network.indptr[source] + position[0]] = edge.probability
+    return probabilities
+
+
+@router.post("/simulate-cascade/probabilistic", response_model=ProbabilisticCascadeResponse)
+async def simulate_probabilistic_cascade(req: ProbabilisticCascadeRequest) -> dict:
+    """
+    Monte Carlo cascade from a set of disrupted nodes (e.g. a whole region).
+
+    Each failed node fails each successor with the edge's transmission
+    probability (``edge_failure_probability``, else the hazard severity
+    default, overridden per edge by ``edge_probabilities``), reduced by
+    ``hop_decay`` for every hop from the disrupted nodes. Returns every node
+    that failed in at least one sample, most likely first, with its failure
+    probability and the mean hop at which it failed.
+    """
     try:
-        async with async_session() as session:
-            from sqlalchemy import select
-
-            nodes_result = await session.execute(
-                select(SupplyChainNode).where(SupplyChainNode.network_id == req.network_id)
-            )
-            db_nodes = nodes_result.scalars().all()
-
-            if not db_nodes:
-                raise HTTPException(status_code=404, detail=f"Network {req.network_id} not found")
-
-            edges_result = await session.execute(
-                select(SupplyChainEdge).where(SupplyChainEdge.network_id == req.network_id)
-            )
-            db_edges = edges_result.scalars().all()
+        network = await network_cache.get_network(req.network_id, _load_network)
+
+        missing = [node_id for node_id in req.disrupted_node_ids if node_id not in network.index]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Nodes not found in network {req.network_id}: {', '.join(missing)}")
+        disrupted = [network.index[node_id] for node_id in req.disrupted_node_ids]
+
+        default_probability = req.edge_failure_probability
+        if default_probability is None:
+            default_probability = CASCADE_SEVERITY_PROBABILITY[req.hazard_severity]
+        probabilities = _edge_probabilities(network, default_probability, req.edge_probabilities or [])
+
+        result = await run_in_threadpool(
+            simulate_cascade, network, disrupted, probabilities,
+            hop_decay=req.hop_decay, samples=req.samples, max_hops=req.max_hops, seed=req.seed,
+        )
+
+        failure_probability = result["failure_probability"]
+        ranked = np.flatnonzero(failure_probability > 0)
+        ranked = ranked[np.argsort(-failure_probability[ranked], kind="stable")][:req.limit]
+        nodes = []
+        for i, p, hops in zip(ranked.tolist(), failure_probability[ranked].tolist(), result["mean_hops"][ranked].tolist()):
+            if p >= CASCADE_CRITICAL_PROBABILITY:
+                status = "Critical"
+            elif p >= CASCADE_WARNING_PROBABILITY:
+                status = "Warning"
+            else:
+                status = "Secure"
+            nodes.append({
+                "id": network.node_ids[i], "label": network.labels[i], "type": network.node_types[i],
+                "failure_probability": round(p, 6), "mean_hops": round(hops, 3), "status": status,
+            })
 
-            if not db_edges:
-                raise HTTPException(status_code=404, detail=f"Network {req.network_id} has no edges")
+        failed_per_sample = result["failed_per_sample"]
+        return {
+            "network_id": req.network_id,
+            "samples": req.samples,
+            "edge_failure_probability": default_probability,
+            "hop_decay": req.hop_decay,
+            "expected_failed_nodes": round(float(failed_per_sample.mean()), 3),
+            "p95_failed_nodes": float(np.percentile(failed_per_sample, 95)),
+            "max_hops_reached": result["hops"],
+            "nodes": nodes,
+        }
 
-        G = nx.DiGraph()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Probabilistic cascade simulation failed: {str(e)}") from e
 
-        node_data_map: Dict[str, dict] = {}
-        for node in db_nodes:
-            G.add_node(node.node_id)
-            node_data_map[node.node_id] = {"label": node.label, "type": node.node_type, "status": node.baseline_status}
 
-        for edge in db_edges:
-            G.add_edge(edge.source_node_id, edge.target_node_id)
+_CRITICALITY_COLUMNS = (
+    SupplyChainNodeCriticality.node_id, SupplyChainNode.label, SupplyChainNode.node_type.label("type"),
+    SupplyChainNodeCriticality.rank, SupplyChainNodeCriticality.downstream_reach, SupplyChainNodeCriticality.dominated_nodes,
+    SupplyChainNodeCriticality.is_single_point_of_failure, SupplyChainNodeCriticality.betweenness,
+)
 
-        if not req.disrupted_node_id:
-            react_flow_nodes = [
-                {"id": nid, "data": {"label": d["label"], "status": d["status"], "type": d["type"]}}
-                for nid, d in node_data_map.items()
-            ]
-            react_flow_edges = [
-                {"id": f"e{i}", "source": s, "target": t, "is_disrupted": False}
-                for i, (s, t) in enumerate(G.edges(), 1)
-            ]
-            return {"nodes": react_flow_nodes, "edges": react_flow_edges}
-
-        if req.disrupted_node_id not in G:
-            raise HTTPException(status_code=404, detail=f"Node '{req.disrupted_node_id}' not found in network {req.network_id}")
 
-        try:
-            downstream_nodes = nx.descendants(G, req.disrupted_node_id)
-        except nx.NetworkXError:
-            downstream_nodes = set()
+def _criticality_query(network_id: str):
+    return (
+        select(*_CRITICALITY_COLUMNS)
+        .join(SupplyChainNode, (SupplyChainNode.network_id == SupplyChainNodeCriticality.network_id)
+              & (SupplyChainNode.node_id == SupplyChainNodeCriticality.node_id))
+        .where(SupplyChainNodeCriticality.network_id == network_id)
+    )
 
-        node_data_map[req.disrupted_node_id]["status"] = "Critical"
 
-        immediate_downstream = set(G.successors(req.disrupted_node_id))
+async def _ensure_criticality(session: AsyncSession, network_id: str) -> None:
+    """Build the criticality index of a network uploaded without one (e.g. before it existed)."""
+    exists = (await session.execute(
+        select(SupplyChainNodeCriticality.id).where(SupplyChainNodeCriticality.network_id == network_id).limit(1)
+    )).first()
+    if exists:
+        return
+    network = await network_cache.get_network(network_id, _load_network)
+    try:
+        # The insert can hit the unique (network_id, node_id) index before the commit does
+        await _store_criticality(session, network)
+        await session.commit()
+    except IntegrityError:
+        # Another request stored it first
+        await session.rollback()
+
+
+@router.get("/networks/{network_id}/criticality", response_model=CriticalityResponse)
+async def get_network_criticality(
+    network_id: str,
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+) -> dict:
+    """
+    Nodes ranked by how much their failure alone would hurt the network.
+
+    Ranking: nodes they cut off from every supplier (dominated_nodes, > 0 for
+    single points of failure), then nodes downstream of them, then
+    betweenness. The index is computed at upload and stored in
+    supply_chain_node_criticality.
+    """
+    try:
+        async with async_session() as session:
+            await _ensure_criticality(session, network_id)
+            rows = (await session.execute(
+                _criticality_query(network_id).order_by(SupplyChainNodeCriticality.rank).offset(offset).limit(limit)
+            )).mappings().all()
+            total, single_points = (await session.execute(
+                select(func.count(), func.count().filter(SupplyChainNodeCriticality.is_single_point_of_failure))
+                .where(SupplyChainNodeCriticality.network_id == network_id)
+            )).one()
 
-        for nid in immediate_downstream:
-            if req.hazard_severity == "Catastrophic":
-                node_data_map[nid]["status"] = "Critical"
-            else:
-                node_data_map[nid]["status"] = "Warning"
+        return {
+            "network_id": network_id,
+            "total_nodes": total,
+            "single_points_of_failure": single_points,
+            "nodes": [dict(row) for row in rows],
+        }
 
-        disrupted_edges = set()
-        for target in G.successors(req.disrupted_node_id):
-            disrupted_edges.add((req.disrupted_node_id, target))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load network criticality: {str(e)}") from e
 
-        react_flow_nodes = [
-            {"id": nid, "data": {"label": d["label"], "status": d["status"], "type": d["type"]}}
-            for nid, d in node_data_map.items()
-        ]
-        react_flow_edges = [
-            {"id": f"e{i}", "source": s, "target": t, "is_disrupted": (s, t) in disrupted_edges}
-            for i, (s, t) in enumerate(G.edges(), 1)
-        ]
 
-        return {"nodes": react_flow_nodes, "edges": react_flow_edges}
+@router.get("/networks/{network_id}/criticality/{node_id}", response_model=NodeCriticality)
+async def get_node_criticality(network_id: str, node_id: str) -> dict:
+    """Criticality of a single node (an indexed lookup)."""
+    try:
+        async with async_session() as session:
+            await _ensure_criticality(session, network_id)
+            row = (await session.execute(
+                _criticality_query(network_id).where(SupplyChainNodeCriticality.node_id == node_id)
+            )).mappings().first()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Node '{node_id}' not found in network {network_id}")
+        return dict(row)
 
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Supply chain cascade simulation failed: {str(e)}") from e
+        raise HTTPException(status_code=500, detail=f"Failed to load node criticality: {str(e)}") from e
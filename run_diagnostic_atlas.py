@@ -5,16 +5,21 @@
 """
 Orchestrates sensitivity analysis across all locations:
 1. Load final_100_risk_narrative_atlas.json
-2. Run 4 stress tests in parallel for all 100 locations
+2. Run 4 stress tests for all locations (vectorized), or with --method sobol
+   compute variance-based Sobol indices for each location
 3. Append sensitivity_analysis to each location
 4. Update executive summaries with primary risk driver
 5. Save as global_atlas_diagnostic.json
+
+Usage:
+    python run_diagnostic_atlas.py [--method oat|sobol] [--samples N]
 """
 
+import argparse
 import json
 import re
 from datetime import datetime
-from sensitivity_engine import run_parallel_sensitivity
+from sensitivity_engine import SOBOL_SAMPLES, run_parallel_sensitivity, run_sobol_batch
 
 
 def load_atlas(filepath: str) -> list:
@@ -34,6 +39,9 @@ def update_executive_summary(location: dict) -> str:
     Update executive summary to include primary risk driver.
     
     Pattern: "INVESTABLE... Primary risk is [Driver] which accounts for [Impact]% of variance."
+    
+    Only Sobol results measure a share of variance; one-at-a-time stress
+    test results are reported as the NPV drop under the driver's shock.
     """
     original_summary = location.get('executive_summary', '')
     sensitivity = location.get('sensitivity_analysis', {})
@@ -54,7 +62,10 @@ def update_executive_summary(location: dict) -> str:
     driver_readable = driver_map.get(driver_clean, driver_clean)
     
     # Create the risk driver statement
-    risk_statement = f"Primary risk is {driver_readable} which accounts for {impact_pct:.1f}% of variance."
+    if sensitivity.get('method') == 'sobol':
+        risk_statement = f"Primary risk is {driver_readable} which accounts for {impact_pct:.1f}% of variance."
+    else:
+        risk_statement = f"Primary risk is {driver_readable} which reduces NPV by {impact_pct:.1f}% under stress."
     
     # Insert after first sentence (usually the rating)
     # Find first period followed by space
@@ -79,6 +90,13 @@ def update_executive_summary(location: dict) -> str:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Append sensitivity analysis to the risk narrative atlas")
+    parser.add_argument("--method", choices=("oat", "sobol"), default="oat",
+                        help="oat: 4 one-at-a-time stress tests; sobol: variance-based Sobol indices")
+    parser.add_argument("--samples", type=int, default=SOBOL_SAMPLES,
+                        help="Base samples per location for --method sobol")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("DIAGNOSTIC ATLAS GENERATOR")
     print("=" * 60)
@@ -89,11 +107,14 @@ def main():
     atlas = load_atlas(input_file)
     print(f"      Loaded {len(atlas)} locations")
     
-    # 2. Run sensitivity analysis in parallel
-    print(f"\n[2/4] Running sensitivity analysis (4 stress tests × {len(atlas)} locations)...")
+    # 2. Run sensitivity analysis (vectorized across locations)
     start_time = datetime.now()
-    
-    sensitivity_results = run_parallel_sensitivity(atlas, max_workers=20)
+    if args.method == "sobol":
+        print(f"\n[2/4] Running Sobol sensitivity analysis ({args.samples} samples × {len(atlas)} locations)...")
+        sensitivity_results = run_sobol_batch(atlas, n_samples=args.samples)
+    else:
+        print(f"\n[2/4] Running sensitivity analysis (4 stress tests × {len(atlas)} locations)...")
+        sensitivity_results = run_parallel_sensitivity(atlas)
     
     elapsed = (datetime.now() - start_time).total_seconds()
     print(f"      Completed in {elapsed:.2f} seconds")
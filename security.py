@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import jwt
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt work factor for new hashes (each +1 doubles the cost); existing
+# hashes keep verifying at the cost they were created with
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
+# Threads running bcrypt for the async auth endpoints. bcrypt releases the
+# GIL, so this bounds the CPU a login burst can take from the rest of the app.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_hash_executor = ThreadPoolExecutor(max_workers=max(1, PASSWORD_HASH_WORKERS), thread_name_prefix="bcrypt")
 
 # Check if we are in a production environment (Railway sets this, or we can set it)
 IS_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
@@ -32,13 +44,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """``hash_password`` on the bcrypt executor, so the event loop keeps serving."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the bcrypt executor, so the event loop keeps serving."""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
 def create_access_token(subject: str, extra_claims: dict | None = None) -> str:
     """Create a signed JWT with an expiration claim.
 
     *subject* is stored in the ``sub`` claim (typically the user id).
     """
-    expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
-    payload: dict = {"sub": subject, "exp": expire}
+    issued_at = datetime.now(timezone.utc)
+    expire = issued_at + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    payload: dict = {"sub": subject, "iat": issued_at, "exp": expire}
     if extra_claims:
         payload.update(extra_claims)
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
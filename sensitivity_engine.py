@@ -7,12 +7,54 @@ Runs 4 distinct stress tests on each location to identify primary risk drivers:
 2. Water Shock: -20% rainfall decrease
 3. Market Shock: -15% crop price decrease
 4. Operational Shock: +15% opex/capex increase
+
+run_sensitivity_analysis evaluates one location with the scalar models;
+run_sensitivity_batch / run_parallel_sensitivity evaluate many locations at
+once as a (locations x shocks) tensor.
+
+run_sobol_analysis is a global, variance-based alternative: it samples
+temperature, rainfall, price, CAPEX and OPEX jointly over SOBOL_FACTORS and
+reports first-order and total Sobol indices, i.e. the share of NPV variance
+each factor explains alone and including its interactions.
 """
 
+import operator
+import os
 from typing import Dict, Any, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from scipy.stats import qmc
+
 from financial_engine import calculate_npv, generate_cash_flows
-from physics_engine import calculate_yield
+from physics_engine import SUPPORTED_CROPS, calculate_yield, calculate_yield_batch
+
+# Locations evaluated per tensor in run_parallel_sensitivity; bounds peak
+# memory to a few hundred bytes per location.
+SENSITIVITY_CHUNK_SIZE = int(os.environ.get("SENSITIVITY_CHUNK_SIZE", "50000"))
+
+# Stress tests in report order:
+# (driver, temp_delta_c, rain_pct_change, price_change_pct, cost_increase_pct)
+SHOCKS = (
+    ("Climate (+2°C)", 2.0, 0.0, 0.0, 0.0),
+    ("Water Stress (-20%)", 0.0, -20.0, 0.0, 0.0),
+    ("Market Price (-15%)", 0.0, 0.0, -15.0, 0.0),
+    ("Operational Costs (+15%)", 0.0, 0.0, 0.0, 15.0),
+)
+
+# Sobol mode: uncertain factors sampled uniformly over (low, high), as
+# (driver, factor, low, high). Temperature is a delta in °C; the others are
+# percentage changes from the location's baseline.
+SOBOL_FACTORS = (
+    ("Climate", "temperature_delta_c", 0.0, 4.0),
+    ("Water Stress", "rainfall_change_pct", -40.0, 20.0),
+    ("Market Price", "price_change_pct", -30.0, 15.0),
+    ("Capital Costs", "capex_change_pct", -10.0, 30.0),
+    ("Operating Costs", "opex_change_pct", -10.0, 30.0),
+)
+
+# Base samples per Sobol analysis (rounded up to a power of two); each
+# location costs SOBOL_SAMPLES * (len(SOBOL_FACTORS) + 2) model evaluations.
+SOBOL_SAMPLES = int(os.environ.get("SOBOL_SAMPLES", "16384"))
 
 
 def calculate_baseline_npv(location: Dict[str, Any]) -> Tuple[float, float]:
@@ -252,44 +294,341 @@ def run_sensitivity_analysis(location: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def run_parallel_sensitivity(locations: List[Dict[str, Any]], max_workers: int = 10) -> List[Dict[str, Any]]:
+# =============================================================================
+# Vectorized sensitivity
+# =============================================================================
+
+def _number(value: Any) -> float:
+    # Strings are rejected like the scalar path's arithmetic would
+    if isinstance(value, str):
+        raise TypeError(f"expected a number, got {value!r}")
+    return float(value)
+
+
+def _location_inputs(location: Dict[str, Any]) -> Tuple[float, ...]:
+    """
+    Parse the model inputs of one location, with the same defaults as
+    calculate_baseline_npv.
+    
+    Returns:
+        Tuple of (temp, rain, crop_code, capex, opex, price_per_ton,
+        yield_benefit_pct, discount_rate, analysis_years)
+    """
+    climate = location.get('climate_conditions', {})
+    crop_analysis = location.get('crop_analysis', {})
+    assumptions = location.get('financial_analysis', {}).get('assumptions', {})
+    
+    crop_type = crop_analysis.get('crop_type', 'rice')
+    try:
+        crop_code = SUPPORTED_CROPS.index(crop_type.lower())
+    except ValueError:
+        raise ValueError(
+            f"Unsupported crop_type: {crop_type}. Supported crops: 'maize', 'cocoa', 'rice', 'soy', 'wheat'"
+        ) from None
+    
+    return (
+        _number(climate.get('temperature_c', 25.0)),
+        _number(climate.get('rainfall_mm', 1000.0)),
+        crop_code,
+        _number(assumptions.get('capex', 2000.0)),
+        _number(assumptions.get('opex', 425.0)),
+        _number(assumptions.get('price_per_ton', 4000.0)),
+        _number(assumptions.get('yield_benefit_pct', 30.0)),
+        _number(assumptions.get('discount_rate_pct', 10.0)) / 100.0,
+        operator.index(assumptions.get('analysis_years', 10)),
+    )
+
+
+def _annuity_factors(discount_rates: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Σ 1 / (1 + r)^t for t = 1 to n, per location."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factors = (1.0 - (1.0 + discount_rates) ** -years) / discount_rates
+    factors = np.where(discount_rates == 0, years, factors)
+    return np.where(years <= 0, 0.0, factors)
+
+
+def _resilient_yields(inputs: np.ndarray, temp_delta: np.ndarray, rain_pct_change: np.ndarray) -> np.ndarray:
+    """(locations x scenarios) resilient-seed yields for rows of _location_inputs."""
+    temp, rain, codes = inputs[:, 0], inputs[:, 1], inputs[:, 2].astype(np.intp)
+    return calculate_yield_batch(
+        temp[:, None], rain[:, None], 1, codes[:, None], temp_delta, rain_pct_change
+    )
+
+
+def _shocked_npv(
+    inputs: np.ndarray,
+    yields: np.ndarray,
+    price_pct: np.ndarray,
+    capex_pct: np.ndarray,
+    opex_pct: np.ndarray
+) -> np.ndarray:
+    """
+    (locations x scenarios) NPV for rows of _location_inputs.
+    
+    Each scenario scales price, CAPEX and OPEX by a percentage change; NPV is
+    CAPEX plus a discounted annuity of net annual benefit.
+    """
+    _, _, _, capex, opex, price, benefit_pct, discount_rate, years = (column[:, None] for column in inputs.T)
+    shocked_price = price * (1 + price_pct / 100.0)
+    annual_benefit = (benefit_pct / 100.0) * (yields / 100.0) * shocked_price
+    net_annual = annual_benefit - opex * (1 + opex_pct / 100.0)
+    return net_annual * _annuity_factors(discount_rate, years) - capex * (1 + capex_pct / 100.0)
+
+
+def _error_result(message: str) -> Dict[str, Any]:
+    return {
+        "baseline_npv": 0.0,
+        "primary_driver": "Error",
+        "driver_impact_pct": 0.0,
+        "sensitivity_ranking": [],
+        "error": message
+    }
+
+
+def run_sensitivity_batch(locations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run all 4 stress tests on many locations at once.
+    
+    Inputs are parsed once per location into arrays; yields are evaluated with
+    calculate_yield_batch for each distinct climate scenario (baseline, +2°C,
+    -20% rain) and NPVs for every (location, shock) pair in closed form
+    (CAPEX plus a discounted annuity of net annual benefit). Results match
+    run_sensitivity_analysis up to floating-point rounding.
+    
+    Args:
+        locations: List of location objects from the Atlas
+    
+    Returns:
+        List of run_sensitivity_analysis results in input order; locations
+        whose inputs cannot be parsed get an "Error" result instead
+    """
+    results: List[Any] = [None] * len(locations)
+    rows, valid = [], []
+    for idx, location in enumerate(locations):
+        try:
+            rows.append(_location_inputs(location))
+            valid.append(idx)
+        except Exception as e:
+            results[idx] = _error_result(str(e))
+    if not rows:
+        return results
+    
+    inputs = np.array(rows, dtype=np.float64)
+    
+    # Column 0 is the unshocked baseline, columns 1.. follow SHOCKS
+    shock_params = np.array([(0.0, 0.0, 0.0, 0.0)] + [shock[1:] for shock in SHOCKS])
+    
+    # Evaluate each distinct climate scenario once; price and cost shocks
+    # reuse the baseline yield.
+    climate, scenario = np.unique(shock_params[:, :2], axis=0, return_inverse=True)
+    yields = _resilient_yields(inputs, climate[:, 0], climate[:, 1])[:, scenario.ravel()]
+    
+    _, _, price_pct, cost_pct = shock_params.T
+    npv = _shocked_npv(inputs, yields, price_pct, cost_pct, cost_pct)
+    
+    baseline = npv[:, :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop_pct = ((baseline - npv) / np.abs(baseline)) * 100
+    
+    drivers = [shock[0] for shock in SHOCKS]
+    for idx, npv_row, drop_row in zip(valid, npv.tolist(), drop_pct.tolist()):
+        baseline_npv = npv_row[0]
+        shocks = []
+        for driver, shocked_npv, drop in zip(drivers, npv_row[1:], drop_row[1:]):
+            if baseline_npv == 0:
+                impact = 0.0 if shocked_npv >= 0 else 100.0
+            else:
+                impact = round(drop, 2)
+            shocks.append({
+                "driver": driver,
+                "shocked_npv": round(shocked_npv, 2),
+                "impact_pct": impact
+            })
+        
+        sensitivity_ranking = sorted(shocks, key=lambda x: x['impact_pct'], reverse=True)
+        primary = sensitivity_ranking[0]
+        results[idx] = {
+            "baseline_npv": round(baseline_npv, 2),
+            "primary_driver": primary['driver'],
+            "driver_impact_pct": primary['impact_pct'],
+            "sensitivity_ranking": sensitivity_ranking
+        }
+    
+    return results
+
+
+def run_parallel_sensitivity(
+    locations: List[Dict[str, Any]],
+    max_workers: int = 10,
+    chunk_size: int = SENSITIVITY_CHUNK_SIZE
+) -> List[Dict[str, Any]]:
     """
-    Run sensitivity analysis on all locations in parallel.
+    Run sensitivity analysis on all locations, vectorized in chunks.
     
     Args:
         locations: List of location objects from the Atlas
-        max_workers: Number of parallel threads
+        max_workers: Unused; kept for backwards compatibility (the work is
+            vectorized rather than spread over threads)
+        chunk_size: Locations evaluated per tensor
     
     Returns:
         List of sensitivity analysis results in the same order as input
     """
-    results = [None] * len(locations)
+    del max_workers  # accepted for existing callers; nothing to spread over threads
+    chunk_size = max(1, chunk_size)
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(locations), chunk_size):
+        results.extend(run_sensitivity_batch(locations[start:start + chunk_size]))
+    return results
+
+
+# =============================================================================
+# Global sensitivity (Sobol indices)
+# =============================================================================
+
+def saltelli_sample(n_samples: int = SOBOL_SAMPLES, seed: int = 0) -> np.ndarray:
+    """
+    Saltelli design over SOBOL_FACTORS.
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_idx = {
-            executor.submit(run_sensitivity_analysis, loc): idx 
-            for idx, loc in enumerate(locations)
-        }
+    Two independent base matrices A and B come from a scrambled Sobol
+    sequence; for each factor i, AB_i is A with column i taken from B.
+    
+    Args:
+        n_samples: Base samples N, rounded up to a power of two
+        seed: Scrambling seed, for reproducible indices
+    
+    Returns:
+        Array of shape (k + 2, N, k) stacking A, B, AB_1 .. AB_k, scaled to
+        the factor ranges (k = number of factors)
+    """
+    k = len(SOBOL_FACTORS)
+    m = max(1, int(np.ceil(np.log2(max(1, n_samples)))))
+    unit = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random_base2(m)
+    
+    low = np.array([factor[2] for factor in SOBOL_FACTORS])
+    high = np.array([factor[3] for factor in SOBOL_FACTORS])
+    a, b = low + unit[:, :k] * (high - low), low + unit[:, k:] * (high - low)
+    
+    design = np.empty((k + 2, len(unit), k))
+    design[0], design[1] = a, b
+    for i in range(k):
+        design[i + 2] = a
+        design[i + 2][:, i] = b[:, i]
+    return design
+
+
+def sobol_indices(outputs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First-order and total Sobol indices from model outputs on a Saltelli design.
+    
+    Uses the Saltelli (2010) first-order and Jansen total-effect estimators.
+    
+    Args:
+        outputs: (..., k + 2, N) outputs for A, B, AB_1 .. AB_k; any leading
+            axes (e.g. locations) are kept
+    
+    Returns:
+        Tuple of (first_order, total_order), each of shape (..., k); zero
+        where the output does not vary
+    """
+    f_a, f_b, f_ab = outputs[..., 0, None, :], outputs[..., 1, None, :], outputs[..., 2:, :]
+    variance = np.concatenate([f_a, f_b], axis=-1).var(axis=-1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_order = (f_b * (f_ab - f_a)).mean(axis=-1) / variance
+        total_order = 0.5 * ((f_a - f_ab) ** 2).mean(axis=-1) / variance
+    constant = variance == 0
+    return np.where(constant, 0.0, first_order), np.where(constant, 0.0, total_order)
+
+
+def run_sobol_batch(
+    locations: List[Dict[str, Any]],
+    n_samples: int = SOBOL_SAMPLES,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Variance-based sensitivity of NPV for each location.
+    
+    All locations share one Saltelli design; each location's
+    N * (k + 2) NPVs are evaluated in a single vectorized pass.
+    
+    Args:
+        locations: List of location objects from the Atlas
+        n_samples: Base samples N per location (rounded up to a power of two)
+        seed: Sampling seed
+    
+    Returns:
+        List in input order, each with:
+        - primary_driver: The factor with the largest first-order index
+        - driver_impact_pct: Share of NPV variance it explains alone (%)
+        - sobol_indices: All factors with first_order and total_order,
+          ordered by total_order
+        - interaction_share_pct: Variance explained only by interactions (%)
+        Locations whose inputs cannot be parsed get an "Error" result.
+    """
+    design = saltelli_sample(n_samples, seed)
+    n_blocks, n_base, k = design.shape
+    samples = design.reshape(-1, k)
+    temp_delta, rain_pct, price_pct, capex_pct, opex_pct = samples.T
+    
+    results: List[Any] = [None] * len(locations)
+    for idx, location in enumerate(locations):
+        try:
+            inputs = np.array([_location_inputs(location)], dtype=np.float64)
+        except Exception as e:
+            results[idx] = _error_result(str(e))
+            continue
         
-        # Collect results
-        for future in as_completed(future_to_idx):
-            idx = future_to_idx[future]
-            try:
-                results[idx] = future.result()
-            except Exception as e:
-                # Handle errors gracefully
-                results[idx] = {
-                    "baseline_npv": 0.0,
-                    "primary_driver": "Error",
-                    "driver_impact_pct": 0.0,
-                    "sensitivity_ranking": [],
-                    "error": str(e)
+        yields = _resilient_yields(inputs, temp_delta, rain_pct)
+        npv = _shocked_npv(inputs, yields, price_pct, capex_pct, opex_pct)[0]
+        first_order, total_order = sobol_indices(npv.reshape(n_blocks, n_base))
+        baseline_npv = float(_shocked_npv(inputs, _resilient_yields(inputs, 0.0, 0.0), 0.0, 0.0, 0.0)[0, 0])
+        
+        indices = sorted(
+            (
+                {
+                    "driver": driver,
+                    "factor": factor,
+                    "range": [low, high],
+                    "first_order": round(float(s1), 4),
+                    "total_order": round(float(st), 4)
                 }
+                for (driver, factor, low, high), s1, st in zip(SOBOL_FACTORS, first_order, total_order)
+            ),
+            key=lambda x: x['total_order'],
+            reverse=True
+        )
+        primary = max(indices, key=lambda x: x['first_order'])
+        # Clipped at 0: small negative values are sampling noise
+        interaction = max(0.0, 1.0 - float(np.clip(first_order, 0.0, None).sum()))
+        
+        results[idx] = {
+            "method": "sobol",
+            "n_samples": n_base,
+            "baseline_npv": round(baseline_npv, 2),
+            "npv_std": round(float(npv[:2 * n_base].std()), 2),
+            "primary_driver": primary['driver'],
+            "driver_impact_pct": round(max(0.0, primary['first_order']) * 100, 2),
+            "sobol_indices": indices,
+            "interaction_share_pct": round(interaction * 100, 2)
+        }
     
     return results
 
 
+def run_sobol_analysis(
+    location: Dict[str, Any],
+    n_samples: int = SOBOL_SAMPLES,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Variance-based (Sobol) sensitivity for a single location.
+    
+    See run_sobol_batch for the result structure.
+    """
+    return run_sobol_batch([location], n_samples, seed)[0]
+
+
 if __name__ == "__main__":
     # Test with sample data
     sample_location = {
@@ -0,0 +1,170 @@
+# =============================================================================
+# Simulation Engine - In-process entry point for headless simulations
+# =============================================================================
+"""
+Importable counterpart to ``headless_runner.py``.
+
+The headless runner is a CLI: it reads argparse flags and ``FINANCIAL_*``
+environment variables, runs one analysis and prints JSON. Callers inside the
+API (portfolio CSV analysis in particular) used to shell out to it once per
+asset, paying an interpreter boot, imports and a JSON round trip each time.
+
+This module exposes the same analyses behind typed parameters so they can be
+called directly and in batches:
+
+    from simulation_engine import SimulationParams, run_simulation
+
+    result = run_simulation(SimulationParams(lat=5.6, lon=-0.2, crop_type='cocoa'))
+
+Output dictionaries are identical to what ``headless_runner.py`` prints.
+"""
+
+import logging
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from headless_runner import (
+    get_weather_data_fallback,
+    run_agriculture_analysis,
+    run_coastal_analysis,
+    run_flood_analysis,
+    run_health_analysis,
+    validate_coordinates,
+)
+
+logger = logging.getLogger(__name__)
+
+PROJECT_TYPES = ('agriculture', 'coastal', 'flood', 'health')
+CROP_TYPES = ('maize', 'cocoa', 'rice', 'soy', 'wheat')
+
+_ANALYSES = {
+    'agriculture': run_agriculture_analysis,
+    'coastal': run_coastal_analysis,
+    'flood': run_flood_analysis,
+    'health': run_health_analysis,
+}
+
+
+@dataclass(frozen=True)
+class SimulationParams:
+    """Typed inputs for a single headless simulation.
+
+    Field names mirror the ``headless_runner.py`` CLI flags so instances can be
+    passed straight to the ``run_*_analysis`` functions. The financial fields
+    replace the ``FINANCIAL_*`` environment variables used by the CLI.
+    """
+    lat: float
+    lon: float
+    scenario_year: int = 2050
+    project_type: str = 'agriculture'
+    crop_type: str = 'maize'
+    temp_delta: float = 0.0
+    rain_pct_change: float = 0.0
+    mangrove_width: float = 0.0
+    slr_projection: float = 0.0
+    rain_intensity: float = 0.0
+    workforce_size: int = 100
+    daily_wage: float = 15.0
+    capex: float = 2000.0
+    opex: float = 425.0
+    discount_rate: float = 0.10
+    analysis_years: int = 10
+    use_mock_data: bool = False
+
+    def __post_init__(self):
+        if self.project_type not in PROJECT_TYPES:
+            raise ValueError(
+                f"Unknown project_type: {self.project_type}. Options: {', '.join(PROJECT_TYPES)}"
+            )
+        if self.project_type == 'agriculture' and self.crop_type not in CROP_TYPES:
+            raise ValueError(
+                f"Unsupported crop_type: {self.crop_type}. Options: {', '.join(CROP_TYPES)}"
+            )
+        validate_coordinates(self.lat, self.lon)
+
+    def with_overrides(self, **changes: Any) -> 'SimulationParams':
+        """Return a copy with the given fields replaced."""
+        return replace(self, **changes)
+
+
+def resolve_weather(params: SimulationParams) -> Dict[str, Any]:
+    """
+    Fetch the weather inputs for a simulation.
+
+    Uses mock data when ``params.use_mock_data`` is set, otherwise tries Google
+    Earth Engine for the last 365 days and falls back to the latitude-based
+    climate-zone approximation if GEE is unavailable.
+    """
+    if params.use_mock_data:
+        from mock_data import get_mock_weather
+        return get_mock_weather(params.lat, params.lon)
+
+    import gee_session
+    if not gee_session.is_available():
+        # Known-offline: skip the GEE call rather than paying for a failure
+        return get_weather_data_fallback(params.lat, params.lon)
+
+    try:
+        from gee_connector import get_weather_data
+
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=365)
+
+        weather_data = get_weather_data(
+            lat=params.lat,
+            lon=params.lon,
+            start_date=start_date.strftime('%Y-%m-%d'),
+            end_date=end_date.strftime('%Y-%m-%d')
+        )
+        weather_data['data_source'] = 'google_earth_engine'
+        return weather_data
+    except Exception as gee_error:
+        logger.warning("GEE unavailable, using fallback data: %s", gee_error)
+        return get_weather_data_fallback(params.lat, params.lon)
+
+
+def run_simulation(
+    params: SimulationParams,
+    weather_data: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Run a single simulation in-process.
+
+    Args:
+        params: Simulation inputs
+        weather_data: Pre-fetched weather inputs; resolved via ``resolve_weather``
+                      when omitted
+
+    Returns:
+        The same result dictionary ``headless_runner.py`` prints, including
+        ``execution_timestamp`` and ``success``
+    """
+    if weather_data is None:
+        weather_data = resolve_weather(params)
+
+    result = _ANALYSES[params.project_type](params, weather_data)
+    result['execution_timestamp'] = datetime.now().isoformat()
+    result['success'] = 'error' not in result
+    return result
+
+
+def run_simulations(params_list: Iterable[SimulationParams]) -> List[Dict[str, Any]]:
+    """
+    Run a batch of simulations in-process, preserving input order.
+
+    A failure in one simulation is reported in its own result slot
+    (``success: False``) instead of aborting the batch.
+    """
+    results: List[Dict[str, Any]] = []
+    for params in params_list:
+        try:
+            results.append(run_simulation(params))
+        except Exception as e:
+            results.append({
+                'success': False,
+                'error': 'Execution failed',
+                'message': str(e),
+                'execution_timestamp': datetime.now().isoformat(),
+            })
+    return results
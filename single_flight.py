@@ -0,0 +1,189 @@
+"""
+Single-Flight Request Coalescing
+================================
+
+When several callers ask for the same (function, arguments) at the same time,
+only the first one (the leader) runs the computation; the others wait for it
+and receive the same result (or exception). Nothing is cached once the call
+completes — that is geo_cache's job — this only removes duplicate in-flight
+work, e.g. a dashboard whose widgets all request the same location at once.
+
+Two entry points share one set of counters:
+
+- ``SingleFlight.do`` / the ``@coalesced`` decorator for sync functions,
+  typically executed in a threadpool;
+- ``SingleFlight.do_async`` for coroutines, which keeps waiting callers on the
+  event loop instead of tying up a worker thread each.
+
+The shared call keeps a private deep copy of the result and every caller,
+the leader included, receives its own deep copy of that, so callers that
+mutate their result cannot affect each other.
+
+Usage:
+    from single_flight import coalesced
+
+    @coalesced
+    def get_weather_data(lat, lon, start_date, end_date): ...
+"""
+
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(fn: Callable) -> inspect.Signature:
+    return inspect.signature(fn)
+
+
+def call_key(fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """
+    Key identifying a call, independent of positional vs keyword argument style.
+
+    Args:
+        fn: The function being called
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Hashable key of the function's qualified name and bound arguments
+    """
+    target = inspect.unwrap(fn)
+    try:
+        bound = _signature(target).bind(*args, **kwargs)
+        arguments = tuple(bound.arguments.items())
+    except (TypeError, ValueError):
+        arguments = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(arguments)
+    except TypeError:
+        arguments = repr(arguments)
+    return (getattr(target, '__module__', None), getattr(target, '__qualname__', repr(target)), arguments)
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._counters = {'calls': 0, 'executions': 0, 'deduplicated': 0, 'errors': 0}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` unless a call with ``key`` is already in flight,
+        in which case wait for it and return its result.
+        """
+        with self._lock:
+            self._counters['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters['executions'] += 1
+            else:
+                self._counters['deduplicated'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = copy.deepcopy(fn(*args, **kwargs))
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._counters['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return copy.deepcopy(call.result)
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``factory()`` unless a call with ``key`` is already in flight on this
+        event loop, in which case await that call instead.
+
+        The shared computation runs as its own task, so a caller that is
+        cancelled (e.g. by asyncio.wait_for) does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            self._counters['calls'] += 1
+            task = self._tasks.get(task_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[task_key] = loop.create_task(self._run_private(factory))
+                task.add_done_callback(functools.partial(self._task_done, task_key))
+                self._counters['executions'] += 1
+            else:
+                self._counters['deduplicated'] += 1
+
+        return copy.deepcopy(await asyncio.shield(task))
+
+    @staticmethod
+    async def _run_private(factory: Callable[[], Awaitable[Any]]) -> Any:
+        # The task's result is the shared copy; no caller gets it directly
+        return copy.deepcopy(await factory())
+
+    def _task_done(self, task_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+            if not task.cancelled() and task.exception() is not None:
+                self._counters['errors'] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Call counters; 'deduplicated' calls shared another call's execution."""
+        with self._lock:
+            metrics: Dict[str, Any] = dict(self._counters)
+            metrics['in_flight'] = len(self._calls) + len(self._tasks)
+        metrics['dedup_rate'] = round(metrics['deduplicated'] / metrics['calls'], 4) if metrics['calls'] else None
+        return metrics
+
+
+# Process-wide group used by the @coalesced gee_connector lookups
+default_group = SingleFlight()
+
+
+def coalesced(fn: Callable) -> Callable:
+    """Decorator: identical concurrent calls to ``fn`` share one execution."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return default_group.do(call_key(fn, args, kwargs), fn, *args, **kwargs)
+    return wrapper
+
+
+async def run_coalesced(runner: Callable[..., Awaitable[Any]], fn: Callable, *args, **kwargs) -> Any:
+    """
+    Await ``runner(fn, *args, **kwargs)``, sharing one execution among identical
+    concurrent calls.
+
+    Args:
+        runner: Executes ``fn`` asynchronously, e.g. starlette's run_in_threadpool
+        fn: Blocking function to run
+    """
+    return await default_group.do_async(call_key(fn, args, kwargs), lambda: runner(fn, *args, **kwargs))
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Metrics for the process-wide group."""
+    return default_group.get_metrics()
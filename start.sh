@@ -117,6 +117,16 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+# Compile forests to flat arrays (forest_compiler.py) so workers memory-map
+# them instead of unpickling; routers fall back to the .pkl if this fails.
+echo ""
+echo "=== Compiling surrogate forests ==="
+for MODEL in ag_surrogate.pkl coastal_surrogate.pkl flood_surrogate.pkl coffee_model.pkl; do
+    if [ -f "$MODEL" ] && [ "$MODEL" -nt "${MODEL%.pkl}.forest/meta.json" ]; then
+        python3 forest_compiler.py export "$MODEL" || echo "WARNING: Failed to compile $MODEL; it will be unpickled at startup"
+    fi
+done
+
 echo ""
 echo "=== Starting FastAPI (api:app) ==="
 echo "=== Starting Uvicorn (FastAPI) ==="
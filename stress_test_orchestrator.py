@@ -8,6 +8,7 @@ Runs simulations in parallel and merges risk-adjusted metrics into output.
 """
 
 import json
+import os
 import sys
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
@@ -19,7 +20,7 @@ from monte_carlo_engine import run_simulation
 
 INPUT_FILE = "global_atlas_v2.json"
 OUTPUT_FILE = "temp_risk_atlas.json"
-ITERATIONS = 50
+ITERATIONS = int(os.environ.get("MC_ITERATIONS", "100000"))  # Max: MAX_ITERATIONS (1e6)
 MAX_WORKERS = 8  # Parallel workers
 
 
@@ -0,0 +1,13 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+import geo_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_geo_cache(monkeypatch):
+    """Give every test an empty, memory-only geo cache instead of the on-disk one."""
+    cache = geo_cache.GeoCache(path=None)
+    monkeypatch.setattr(geo_cache, "default_cache", cache)
+    return cache
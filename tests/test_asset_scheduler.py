@@ -0,0 +1,274 @@
+"""
+Unit tests for the bounded asset scheduler (asset_scheduler) and its use by
+/api/v1/portfolio/analyze-csv.
+
+Checks that a run never has more than ``concurrency`` assets running, pulls
+its input lazily, reports exceptions and timeouts per asset, stops when the
+client disconnects and keeps the endpoint's row order.
+"""
+
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import asset_scheduler
+from asset_scheduler import AssetScheduler, AssetsCancelled, RunProgress
+from routers import portfolio
+
+
+def _collect(scheduler, fn, items, **kwargs):
+    async def run():
+        return [entry async for entry in scheduler.run(fn, items, **kwargs)]
+
+    return asyncio.run(run())
+
+
+class _Tracker:
+    """Records the peak number of concurrently running calls."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, item, index):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return item * 2
+
+
+class TestAssetScheduler:
+    def test_every_item_is_processed(self):
+        scheduler = AssetScheduler(concurrency=3)
+        entries = _collect(scheduler, lambda item, index: item * 2, range(50))
+        assert sorted((index, result) for index, result, _ in entries) == [(i, 2 * i) for i in range(50)]
+        assert all(error is None for _, _, error in entries)
+
+    def test_concurrency_is_bounded(self):
+        scheduler = AssetScheduler(concurrency=3)
+        tracker = _Tracker()
+        _collect(scheduler, tracker, range(30))
+        assert tracker.peak <= 3
+
+    def test_input_is_consumed_lazily(self):
+        scheduler = AssetScheduler(concurrency=2)
+        pulled = []
+
+        def items():
+            for i in range(20):
+                pulled.append(i)
+                yield i
+
+        async def run():
+            seen = 0
+            async for _ in scheduler.run(lambda item, index: item, items()):
+                seen += 1
+                await asyncio.sleep(0.005)
+                # Only the pending assets and the batch being yielded are ahead of the consumer
+                assert len(pulled) <= seen + 2 * scheduler.concurrency
+            return seen
+
+        assert asyncio.run(run()) == 20
+
+    def test_exceptions_are_reported_per_asset(self):
+        scheduler = AssetScheduler(concurrency=2)
+
+        def fn(item, index):
+            if item == 3:
+                raise RuntimeError("boom")
+            return item
+
+        progress = RunProgress(total=5)
+        entries = {index: (result, error) for index, result, error in _collect(scheduler, fn, range(5), progress=progress)}
+        assert isinstance(entries[3][1], RuntimeError) and entries[3][0] is None
+        assert entries[4] == (4, None)
+        assert (progress.done, progress.failed, progress.in_flight) == (5, 1, 0)
+
+    def test_slow_asset_times_out(self):
+        scheduler = AssetScheduler(concurrency=2, timeout=0.1)
+        release = threading.Event()
+
+        def fn(item, index):
+            if item == 0:
+                release.wait(5)
+            return item
+
+        progress = RunProgress()
+        entries = {index: error for index, _, error in _collect(scheduler, fn, range(6), progress=progress)}
+        release.set()
+        assert isinstance(entries[0], TimeoutError)
+        assert all(entries[i] is None for i in range(1, 6))
+        assert progress.timed_out == 1 and progress.failed == 1
+
+    def test_remaining_assets_time_out_when_every_worker_hangs(self):
+        scheduler = AssetScheduler(concurrency=1, timeout=0.05)
+        release = threading.Event()
+
+        def fn(item, index):
+            if item == 1:
+                release.wait(5)
+            return item
+
+        entries = {index: error for index, _, error in _collect(scheduler, fn, range(4))}
+        release.set()
+        assert entries[0] is None
+        assert all(isinstance(entries[i], TimeoutError) for i in (1, 2, 3))
+        assert "not started" in str(entries[3])
+
+    def test_concurrent_runs_waiting_for_the_pool_do_not_time_out(self):
+        # Waiting for a thread behind another run's assets is not a timeout
+        scheduler = AssetScheduler(concurrency=1, timeout=0.1)
+
+        def fn(item, index):
+            time.sleep(0.005)
+            return item
+
+        async def run():
+            async def one():
+                return [error async for _, _, error in scheduler.run(fn, range(150))]
+
+            return await asyncio.gather(one(), one())
+
+        for errors in asyncio.run(run()):
+            assert len(errors) == 150 and all(error is None for error in errors)
+
+    def test_run_times_out_when_another_run_holds_every_thread(self):
+        scheduler = AssetScheduler(concurrency=1, timeout=0.05)
+        release = threading.Event()
+
+        async def run():
+            async def hung():
+                return [error async for _, _, error in scheduler.run(lambda item, index: release.wait(5), range(2))]
+
+            async def queued():
+                await asyncio.sleep(0.01)
+                return [error async for _, _, error in scheduler.run(lambda item, index: item, range(3))]
+
+            return await asyncio.gather(hung(), queued())
+
+        hung, queued = asyncio.run(run())
+        release.set()
+        assert all(isinstance(error, TimeoutError) for error in hung + queued)
+        assert len(hung) == 2 and len(queued) == 3
+
+    def test_consumer_that_stops_reading_holds_no_threads(self):
+        scheduler = AssetScheduler(concurrency=2, timeout=2)
+
+        def fn(item, index):
+            time.sleep(0.002)
+            return item
+
+        async def errors(entries):
+            return [error async for _, _, error in entries]
+
+        async def run():
+            stalled = scheduler.run(fn, range(1000))
+            await stalled.__anext__()
+            # The first run's consumer stops reading; its pending assets finish and start no others
+            try:
+                return await asyncio.wait_for(errors(scheduler.run(fn, range(10))), timeout=5)
+            finally:
+                await stalled.aclose()
+
+        second = asyncio.run(run())
+        assert len(second) == 10 and all(error is None for error in second)
+
+    def test_is_failure_counts_returned_errors(self):
+        scheduler = AssetScheduler(concurrency=2)
+        progress = RunProgress()
+        _collect(scheduler, lambda item, index: {"ok": item % 2 == 0}, range(10),
+                 is_failure=lambda r: not r["ok"], progress=progress)
+        assert progress.failed == 5
+
+    def test_cancellation_stops_the_run(self):
+        scheduler = AssetScheduler(concurrency=2, cancel_poll=0.0)
+        started = []
+
+        def fn(item, index):
+            started.append(item)
+            time.sleep(0.005)
+            return item
+
+        async def disconnected():
+            return len(started) >= 4
+
+        with pytest.raises(AssetsCancelled):
+            _collect(scheduler, fn, range(1000), cancelled=disconnected)
+        time.sleep(0.05)
+        assert len(started) < 20
+        assert scheduler.get_metrics()["cancelled_runs"] == 1
+
+    def test_metrics(self):
+        scheduler = AssetScheduler(concurrency=2, timeout=0)
+
+        async def run():
+            seen = None
+            async for _ in scheduler.run(lambda item, index: time.sleep(0.01), range(6), progress=RunProgress(total=6)):
+                seen = seen or scheduler.get_metrics()
+            return seen
+
+        during = asyncio.run(run())
+        assert len(during["active_runs"]) == 1 and during["active_runs"][0]["total"] == 6
+        after = scheduler.get_metrics()
+        assert after["active_runs"] == [] and after["assets_in_flight"] == 0
+        assert (after["total_runs"], after["assets_done"], after["concurrency"]) == (1, 6, 2)
+
+
+CSV = (
+    "lat,lon,asset_value,crop_type\n"
+    "6.5,-1.5,100k,cocoa\n"
+    "42.0,-93.5,2.5m,maize\n"
+    "6.5,-1.5,50000,banana\n"
+    "-15.5,-47.7,750000,soy\n"
+)
+
+
+class TestAnalyzeCsvEndpoint:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(asset_scheduler, "default_scheduler", AssetScheduler(concurrency=2))
+        app = FastAPI()
+        app.include_router(portfolio.router)
+        return TestClient(app)
+
+    def _post(self, client, csv=CSV):
+        files = {"file": ("portfolio.csv", io.BytesIO(csv.encode()), "text/csv")}
+        return client.post("/api/v1/portfolio/analyze-csv", files=files)
+
+    def test_results_keep_row_order(self, client):
+        body = self._post(client).json()
+        assert [r["row_index"] for r in body["asset_results"]] == [0, 1, 2, 3]
+        assert [r["status"] for r in body["asset_results"]] == ["success", "success", "error", "success"]
+        summary = body["portfolio_summary"]
+        assert (summary["total_assets"], summary["successful_simulations"], summary["failed_simulations"]) == (4, 3, 1)
+        assert summary["total_portfolio_value_usd"] == 3_400_000.0
+
+    def test_missing_columns_are_a_bad_request(self, client):
+        response = self._post(client, "name,city\nx,y\n")
+        assert response.status_code == 400
+        assert "Missing required columns" in response.json()["detail"]
+
+    def test_timed_out_asset_is_an_error_row(self, client, monkeypatch):
+        monkeypatch.setattr(asset_scheduler, "default_scheduler", AssetScheduler(concurrency=2, timeout=0.05))
+        simulate = portfolio.run_asset_simulation
+
+        def slow_on_second_row(row_data, row_index):
+            if row_index == 1:
+                time.sleep(0.5)
+            return simulate(row_data, row_index)
+
+        monkeypatch.setattr(portfolio, "run_asset_simulation", slow_on_second_row)
+        results = self._post(client).json()["asset_results"]
+        assert results[1]["status"] == "error" and results[1]["error"].startswith("Timed out")
+        assert results[1]["input"]["crop_type"] == "maize"
+        assert results[0]["status"] == "success"
@@ -0,0 +1,149 @@
+"""
+Unit tests for the Monte Carlo cascade engine and
+/api/v1/supply-chain/simulate-cascade/probabilistic.
+
+Failure probabilities must converge to the closed-form values of the
+independent-cascade model on small graphs, whatever the sample chunking.
+"""
+
+import asyncio
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import cascade_engine
+import network_cache
+from cascade_engine import simulate_cascade
+from database import Base
+from network_cache import CompiledNetwork, NetworkCache
+from routers import supply_chain
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "examples" / "sample_supply_chain.csv"
+
+
+def _network(edges):
+    node_ids = sorted({node for edge in edges for node in edge})
+    return CompiledNetwork.compile("net", [(n, n, "Port", "Secure") for n in node_ids], edges)
+
+
+# a -> b -> c and a -> d -> c
+DIAMOND = _network([("a", "b"), ("b", "c"), ("a", "d"), ("d", "c")])
+
+
+class TestSimulateCascade:
+    def test_matches_closed_form(self):
+        result = simulate_cascade(DIAMOND, [0], 0.5, hop_decay=0.5, samples=20000, seed=0)
+        p_c = 1 - (1 - 0.5 * 0.25) ** 2
+        np.testing.assert_allclose(result["failure_probability"], [1.0, 0.5, p_c, 0.5], atol=0.015)
+        np.testing.assert_array_equal(result["mean_hops"], [0, 1, 2, 1])
+        assert result["hops"] == 2
+
+    def test_certain_edges_reach_all_descendants(self):
+        result = simulate_cascade(DIAMOND, [1], 1.0, samples=10)
+        np.testing.assert_array_equal(result["failure_probability"], [0, 1, 1, 0])
+        np.testing.assert_array_equal(result["failed_per_sample"], [2] * 10)
+
+    def test_multiple_disrupted_nodes(self):
+        result = simulate_cascade(DIAMOND, [1, 3, 3], 0.0, samples=5)
+        np.testing.assert_array_equal(result["failure_probability"], [0, 1, 0, 1])
+        assert result["hops"] == 0
+
+    def test_max_hops(self):
+        chain = _network([(f"n{i}", f"n{i + 1}") for i in range(5)])
+        result = simulate_cascade(chain, [0], 1.0, samples=3, max_hops=2)
+        np.testing.assert_array_equal(result["failure_probability"], [1, 1, 1, 0, 0, 0])
+
+    def test_cycles_terminate(self):
+        ring = _network([("a", "b"), ("b", "c"), ("c", "a")])
+        result = simulate_cascade(ring, [0], 1.0, samples=4)
+        np.testing.assert_array_equal(result["failure_probability"], [1, 1, 1])
+        assert result["hops"] == 2
+
+    def test_per_edge_probabilities(self):
+        # CSR order: a->b, a->d, b->c, d->c
+        result = simulate_cascade(DIAMOND, [0], np.array([1.0, 0.0, 0.5, 1.0]), samples=2000, seed=1)
+        assert result["failure_probability"][3] == 0
+        assert result["failure_probability"][2] == pytest.approx(0.5, abs=0.05)
+
+    def test_chunked_samples_and_edge_batches(self, monkeypatch):
+        nodes, rng = 300, np.random.default_rng(0)
+        edges = [(f"n{s}", f"n{t}") for s, t in rng.integers(0, nodes, (1500, 2))]
+        network = _network(edges)
+        reference = simulate_cascade(network, [0, 1], 0.3, hop_decay=0.9, samples=4000, seed=0)
+        monkeypatch.setattr(cascade_engine, "CASCADE_STATE_MB", 50 * nodes / (1024 * 1024))
+        monkeypatch.setattr(cascade_engine, "CASCADE_EDGE_BATCH", 64)
+        chunked = simulate_cascade(network, [0, 1], 0.3, hop_decay=0.9, samples=4000, seed=0)
+        np.testing.assert_allclose(chunked["failure_probability"], reference["failure_probability"], atol=0.04)
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            simulate_cascade(DIAMOND, [0], 0.5, samples=0)
+        with pytest.raises(ValueError):
+            simulate_cascade(DIAMOND, [0], np.ones(3))
+        with pytest.raises(ValueError):
+            simulate_cascade(DIAMOND, [], 0.5)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    monkeypatch.setattr(supply_chain, "async_session", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(network_cache, "default_cache", NetworkCache())
+    app = FastAPI()
+    app.include_router(supply_chain.router)
+    client = TestClient(app)
+    data = SAMPLE_CSV.read_bytes()
+    response = client.post("/api/v1/supply-chain/upload", files={"file": ("network.csv", io.BytesIO(data), "text/csv")})
+    client.network_id = response.json()["network_id"]
+    yield client
+    asyncio.run(engine.dispose())
+
+
+def _simulate(client, **body):
+    return client.post("/api/v1/supply-chain/simulate-cascade/probabilistic", json={"network_id": client.network_id, **body})
+
+
+class TestProbabilisticEndpoint:
+    def test_region_disruption(self, client):
+        response = _simulate(client, disrupted_node_ids=["port_shanghai", "dallas_warehouse"], edge_failure_probability=1.0, hop_decay=1.0, samples=50)
+        assert response.status_code == 200
+        body = response.json()
+        nodes = {node["id"]: node for node in body["nodes"]}
+        assert set(nodes) == {"port_shanghai", "dallas_warehouse", "port_la", "chicago_dc", "miami_warehouse", "ny_retail"}
+        assert all(node["status"] == "Critical" for node in nodes.values())
+        assert nodes["chicago_dc"]["mean_hops"] == 2
+        assert body["expected_failed_nodes"] == 6
+        assert body["max_hops_reached"] == 3
+
+    def test_ranked_by_probability(self, client):
+        body = _simulate(client, disrupted_node_ids=["taiwan_fab"], hazard_severity="Catastrophic", hop_decay=0.9, samples=2000, seed=0).json()
+        probabilities = [node["failure_probability"] for node in body["nodes"]]
+        assert probabilities == sorted(probabilities, reverse=True)
+        assert body["nodes"][0]["id"] == "taiwan_fab"
+        assert body["edge_failure_probability"] == supply_chain.CASCADE_SEVERITY_PROBABILITY["Catastrophic"]
+        assert len(_simulate(client, disrupted_node_ids=["taiwan_fab"], samples=200, limit=2).json()["nodes"]) <= 2
+
+    def test_edge_override(self, client):
+        body = _simulate(
+            client, disrupted_node_ids=["chicago_dc"], edge_failure_probability=1.0, samples=20,
+            edge_probabilities=[{"source": "chicago_dc", "target": "miami_warehouse", "probability": 0.0}],
+        ).json()
+        assert "miami_warehouse" not in {node["id"] for node in body["nodes"]}
+
+    def test_errors(self, client):
+        assert _simulate(client, disrupted_node_ids=["atlantis"]).status_code == 404
+        assert _simulate(client, disrupted_node_ids=[]).status_code == 422
+        response = _simulate(client, disrupted_node_ids=["port_la"], edge_probabilities=[{"source": "port_la", "target": "taiwan_fab", "probability": 0.5}])
+        assert response.status_code == 400
@@ -0,0 +1,206 @@
+"""
+Unit tests for the node criticality index (criticality_engine) and the
+/api/v1/supply-chain/networks/{network_id}/criticality endpoints.
+
+Reach counts, dominator subtree sizes and exact betweenness must equal the
+networkx results on random graphs with cycles, self-loops and duplicate
+edges, including when the bitset reachability runs in many column blocks.
+"""
+
+import asyncio
+import io
+import random
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import criticality_engine
+import network_cache
+from criticality_engine import betweenness, compute_criticality, dominated_nodes, downstream_reach
+from database import Base
+from models import SupplyChainNodeCriticality
+from network_cache import CompiledNetwork, NetworkCache
+from routers import supply_chain
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "examples" / "sample_supply_chain.csv"
+
+
+def _random_network(n_nodes, n_edges, seed):
+    rng = random.Random(seed)
+    nodes = [(f"n{i}", f"Node {i}", "Port", "Secure") for i in range(n_nodes)]
+    edges = [(f"n{rng.randrange(n_nodes)}", f"n{rng.randrange(n_nodes)}") for _ in range(n_edges)]
+    network = CompiledNetwork.compile("net", nodes, edges)
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n_nodes))
+    G.add_edges_from((s, int(t)) for s in range(n_nodes) for t in network.successors(s))
+    return network, G
+
+
+def _expected_dominated(G):
+    condensation = nx.condensation(G)
+    mapping = condensation.graph["mapping"]
+    H = G.copy()
+    H.add_edges_from(("root", v) for v in G if condensation.in_degree(mapping[v]) == 0)
+    tree = nx.DiGraph((d, v) for v, d in nx.immediate_dominators(H, "root").items() if v != d)
+    return [len(nx.descendants(tree, v)) if v in tree else 0 for v in G]
+
+
+GRAPHS = [(40, 60, 0), (60, 150, 1), (80, 80, 2), (30, 0, 3), (120, 400, 4)]
+
+
+class TestMetricsMatchNetworkx:
+    @pytest.mark.parametrize("n_nodes, n_edges, seed", GRAPHS)
+    def test_downstream_reach(self, n_nodes, n_edges, seed):
+        network, G = _random_network(n_nodes, n_edges, seed)
+        np.testing.assert_array_equal(downstream_reach(network), [len(nx.descendants(G, v)) for v in G])
+
+    def test_downstream_reach_in_blocks(self, monkeypatch):
+        monkeypatch.setattr(criticality_engine, "CRITICALITY_WORK_MB", 1e-4)
+        network, G = _random_network(500, 1200, 5)
+        np.testing.assert_array_equal(downstream_reach(network), [len(nx.descendants(G, v)) for v in G])
+
+    @pytest.mark.parametrize("n_nodes, n_edges, seed", GRAPHS)
+    def test_dominated_nodes(self, n_nodes, n_edges, seed):
+        network, G = _random_network(n_nodes, n_edges, seed)
+        np.testing.assert_array_equal(dominated_nodes(network), _expected_dominated(G))
+
+    @pytest.mark.parametrize("n_nodes, n_edges, seed", GRAPHS)
+    def test_exact_betweenness(self, n_nodes, n_edges, seed, monkeypatch):
+        monkeypatch.setattr(criticality_engine, "CRITICALITY_WORK_MB", 0.01)
+        network, G = _random_network(n_nodes, n_edges, seed)
+        expected = nx.betweenness_centrality(G)
+        np.testing.assert_allclose(betweenness(network, samples=n_nodes), [expected[v] for v in G], atol=1e-12)
+
+    def test_sampled_betweenness_finds_the_bottleneck(self):
+        # Two dense clusters joined through a single bridge node
+        rng = random.Random(0)
+        edges = [(f"a{rng.randrange(50)}", f"a{rng.randrange(50)}") for _ in range(300)]
+        edges += [(f"b{rng.randrange(50)}", f"b{rng.randrange(50)}") for _ in range(300)]
+        edges += [(f"a{i}", "bridge") for i in range(50)] + [("bridge", f"b{i}") for i in range(50)]
+        node_ids = sorted({v for edge in edges for v in edge})
+        network = CompiledNetwork.compile("net", [(v, v, "Port", "Secure") for v in node_ids], edges)
+        scores = betweenness(network, samples=30)
+        assert network.node_ids[int(np.argmax(scores))] == "bridge"
+
+
+class TestRanking:
+    def test_sample_network(self):
+        lines = SAMPLE_CSV.read_text().splitlines()[1:]
+        rows = [line.split(",") for line in lines]
+        nodes, seen = [], set()
+        for r in rows:
+            for node_id, label, node_type in ((r[0], r[1], r[2]), (r[3], r[4], r[5])):
+                if node_id not in seen:
+                    seen.add(node_id)
+                    nodes.append((node_id, label, node_type, "Secure"))
+        network = CompiledNetwork.compile("net", nodes, [(r[0], r[3]) for r in rows])
+        metrics = compute_criticality(network)
+
+        ranked = [network.node_ids[i] for i in np.argsort(metrics["rank"])]
+        assert ranked == ["taiwan_fab", "shenzhen_assembly", "port_shanghai", "port_la", "chicago_dc",
+                          "dallas_warehouse", "miami_warehouse", "ny_retail"]
+        dominated = dict(zip(network.node_ids, metrics["dominated_nodes"].tolist()))
+        # ny_retail is fed by chicago_dc and dallas_warehouse, so dallas dominates nothing
+        assert dominated["chicago_dc"] == 3 and dominated["dallas_warehouse"] == 0
+        assert sorted(metrics["rank"].tolist()) == list(range(1, 9))
+
+
+@pytest.fixture
+def app_engine(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    monkeypatch.setattr(supply_chain, "async_session", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(network_cache, "default_cache", NetworkCache())
+    app = FastAPI()
+    app.include_router(supply_chain.router)
+    yield TestClient(app), engine
+    asyncio.run(engine.dispose())
+
+
+def _upload_sample(client):
+    data = SAMPLE_CSV.read_bytes()
+    response = client.post("/api/v1/supply-chain/upload", files={"file": ("network.csv", io.BytesIO(data), "text/csv")})
+    assert response.status_code == 200
+    return response.json()["network_id"]
+
+
+def _stored_rows(engine, network_id):
+    async def load():
+        async with engine.connect() as conn:
+            return (await conn.execute(
+                select(SupplyChainNodeCriticality.node_id).where(SupplyChainNodeCriticality.network_id == network_id)
+            )).all()
+
+    return asyncio.run(load())
+
+
+class TestCriticalityEndpoints:
+    def test_index_is_built_at_upload(self, app_engine):
+        client, engine = app_engine
+        network_id = _upload_sample(client)
+        assert len(_stored_rows(engine, network_id)) == 8
+
+        body = client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality").json()
+        assert (body["total_nodes"], body["single_points_of_failure"]) == (8, 5)
+        top = body["nodes"][0]
+        assert (top["node_id"], top["label"], top["type"], top["rank"]) == ("taiwan_fab", "Taiwan Semiconductor Fab", "Supplier", 1)
+        assert top["downstream_reach"] == 7 and top["is_single_point_of_failure"]
+
+    def test_pagination(self, app_engine):
+        client, _ = app_engine
+        network_id = _upload_sample(client)
+        body = client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality", params={"limit": 3, "offset": 4}).json()
+        assert [node["rank"] for node in body["nodes"]] == [5, 6, 7]
+
+    def test_single_node_lookup(self, app_engine):
+        client, _ = app_engine
+        network_id = _upload_sample(client)
+        body = client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality/chicago_dc").json()
+        assert (body["rank"], body["dominated_nodes"], body["downstream_reach"]) == (5, 3, 3)
+        assert client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality/atlantis").status_code == 404
+
+    def test_built_on_first_request_when_missing(self, app_engine, monkeypatch):
+        client, engine = app_engine
+        monkeypatch.setattr(supply_chain, "CRITICALITY_ON_UPLOAD", False)
+        network_id = _upload_sample(client)
+        assert _stored_rows(engine, network_id) == []
+
+        body = client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality/port_la").json()
+        assert body["rank"] == 4
+        assert len(_stored_rows(engine, network_id)) == 8
+        assert client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality").json()["total_nodes"] == 8
+
+    def test_concurrent_first_requests_store_the_index_once(self, app_engine, monkeypatch):
+        client, engine = app_engine
+        monkeypatch.setattr(supply_chain, "CRITICALITY_ON_UPLOAD", False)
+        network_id = _upload_sample(client)
+        store = supply_chain._store_criticality
+
+        async def store_after_another_request(session, network):
+            # Another request stores the index between this one's check and its insert
+            async with supply_chain.async_session() as other:
+                await store(other, network)
+                await other.commit()
+            return await store(session, network)
+
+        monkeypatch.setattr(supply_chain, "_store_criticality", store_after_another_request)
+        response = client.get(f"/api/v1/supply-chain/networks/{network_id}/criticality")
+        assert response.status_code == 200
+        assert response.json()["total_nodes"] == 8
+        assert len(_stored_rows(engine, network_id)) == 8
+
+    def test_unknown_network(self, app_engine):
+        client, _ = app_engine
+        assert client.get("/api/v1/supply-chain/networks/missing/criticality").status_code == 404
@@ -0,0 +1,124 @@
+"""
+Unit tests for the batched financial metrics in financial_engine.
+
+The array-native variants must agree with the scalar calculate_npv,
+calculate_bcr and calculate_payback_period for every scenario, and the IRR
+solver must find the rate at which NPV is zero.
+"""
+
+import numpy as np
+import pytest
+
+from financial_engine import (
+    calculate_bcr,
+    calculate_bcr_batch,
+    calculate_irr,
+    calculate_irr_batch,
+    calculate_npv,
+    calculate_npv_batch,
+    calculate_payback_period,
+    calculate_payback_period_batch,
+    calculate_roi_metrics_batch,
+    discount_growth_table,
+)
+
+
+@pytest.fixture
+def portfolio():
+    rng = np.random.default_rng(42)
+    scenarios, years = 500, 16
+    capex = rng.uniform(1e4, 1e6, scenarios)
+    flows = rng.uniform(-0.1, 0.35, (scenarios, years)) * capex[:, None]
+    flows[:, 0] = -capex
+    rates = rng.choice([0.03, 0.06, 0.10], scenarios)
+    return flows, rates
+
+
+class TestBatchMatchesScalar:
+    def test_npv(self, portfolio):
+        flows, rates = portfolio
+        expected = [calculate_npv(list(f), r) for f, r in zip(flows, rates)]
+        np.testing.assert_allclose(calculate_npv_batch(flows, rates), expected, rtol=1e-10, atol=1e-6)
+
+    def test_bcr(self, portfolio):
+        flows, rates = portfolio
+        expected = [calculate_bcr(list(f), r) for f, r in zip(flows, rates)]
+        np.testing.assert_allclose(calculate_bcr_batch(flows, rates), expected, rtol=1e-12)
+
+    def test_payback_is_exact(self, portfolio):
+        flows, _ = portfolio
+        expected = [calculate_payback_period(list(f)) for f in flows]
+        expected = np.array([np.nan if p is None else p for p in expected])
+        assert np.array_equal(calculate_payback_period_batch(flows), expected, equal_nan=True)
+
+    def test_payback_without_years(self):
+        assert calculate_payback_period([]) is None
+        np.testing.assert_array_equal(calculate_payback_period_batch(np.zeros((2, 0))), [np.nan, np.nan])
+        assert np.isnan(calculate_payback_period_batch([]))
+
+    def test_scalar_rate_broadcasts(self, portfolio):
+        flows, _ = portfolio
+        expected = [calculate_npv(list(f), 0.07) for f in flows]
+        np.testing.assert_allclose(calculate_npv_batch(flows, 0.07), expected, rtol=1e-10, atol=1e-6)
+
+    def test_single_scenario_returns_scalar(self):
+        flows = [-100000] + [15000] * 20
+        assert calculate_npv_batch(flows, 0.10) == pytest.approx(calculate_npv(flows, 0.10))
+        assert np.ndim(calculate_npv_batch(flows, 0.10)) == 0
+
+
+class TestBcrEdgeCases:
+    def test_no_costs(self):
+        np.testing.assert_array_equal(calculate_bcr_batch([[10.0, 5.0], [0.0, 0.0]], 0.1), [np.inf, 0.0])
+
+
+class TestIrr:
+    @pytest.mark.parametrize("flows, expected", [
+        ([-100.0, 110.0], 0.10),
+        ([-100.0, 0.0, 121.0], 0.10),
+        ([-1000.0, 500.0, 500.0, 500.0], 0.2337519),
+        ([-100.0, 20.0, 20.0], -0.4417424),
+    ])
+    def test_known_rates(self, flows, expected):
+        assert calculate_irr(flows) == pytest.approx(expected, abs=1e-6)
+
+    def test_npv_is_zero_at_irr(self, portfolio):
+        flows, _ = portfolio
+        irr = calculate_irr_batch(flows)
+        found = ~np.isnan(irr)
+        assert found.mean() > 0.8
+        npv_at_irr = calculate_npv_batch(flows[found], irr[found])
+        np.testing.assert_allclose(npv_at_irr / flows[found, 0], 0.0, atol=1e-8)
+
+    def test_high_return_widens_bracket(self):
+        assert calculate_irr([-100.0, 1000.0]) == pytest.approx(9.0)
+
+    @pytest.mark.parametrize("flows", [[100.0, 100.0], [-100.0, -5.0], [0.0, 0.0]])
+    def test_no_sign_change_returns_none(self, flows):
+        assert calculate_irr(flows) is None
+
+
+class TestDiscountTable:
+    def test_rows_are_cached_and_read_only(self):
+        first = discount_growth_table(0.05, 10)
+        assert discount_growth_table(0.05, 10) is first
+        assert not first.flags.writeable
+
+    def test_vector_of_rates(self):
+        table = discount_growth_table(np.array([0.0, 0.1, 0.0]), 3)
+        np.testing.assert_allclose(table, [[1, 1, 1], [1, 1.1, 1.21], [1, 1, 1]])
+
+    def test_many_unique_rates(self):
+        rates = np.linspace(0.01, 0.2, 200)
+        np.testing.assert_allclose(discount_growth_table(rates, 4)[:, 3], (1 + rates) ** 3)
+
+    def test_rate_count_must_match_scenarios(self):
+        with pytest.raises(ValueError):
+            calculate_npv_batch(np.zeros((3, 5)), [0.1, 0.2])
+
+
+def test_roi_metrics_batch_keys(portfolio):
+    flows, rates = portfolio
+    metrics = calculate_roi_metrics_batch(flows, rates)
+    assert set(metrics) == {"npv", "bcr", "payback_period_years", "irr"}
+    assert all(v.shape == (len(flows),) for v in metrics.values())
@@ -0,0 +1,185 @@
+"""
+Unit tests for compiled random forest inference (forest_compiler).
+
+The production pickles are not available in the test environment, so the
+surrogates are retrained (smaller) from the repo's own synthetic data
+generators with their production hyperparameters. Compiled predictions must
+be bit-for-bit identical to sklearn's.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+
+import forest_compiler
+import train_coastal_surrogate
+import train_coffee_model
+import train_flood_surrogate
+from forest_compiler import CompiledForest, compiled_path, load_model
+
+
+def _coastal():
+    np.random.seed(0)
+    data = train_coastal_surrogate.generate_synthetic_data(n_samples=3000)
+    y = train_coastal_surrogate.calculate_runup_physics(data)
+    X = data[['wave_height', 'slope', 'mangrove_width_m']].values
+    model = RandomForestRegressor(n_estimators=20, max_depth=15, min_samples_split=5, min_samples_leaf=2, random_state=42)
+    return model.fit(X, y), X
+
+
+def _flood():
+    np.random.seed(0)
+    df = train_flood_surrogate.generate_synthetic_flood_data(n_samples=3000)
+    X = df[['rain_intensity_mm_hr', 'impervious_pct', 'slope_pct']].values
+    model = RandomForestRegressor(n_estimators=20, max_depth=20, min_samples_split=5, min_samples_leaf=2, random_state=42)
+    return model.fit(X, df['flood_depth_cm'].values), X
+
+
+def _coffee():
+    df = train_coffee_model.generate_synthetic_data(n_samples=3000, random_state=42)
+    X = df[['baseline_temp_c', 'temp_anomaly_c', 'rainfall_mm', 'rain_anomaly_mm', 'elevation_m', 'soil_ph']]
+    model = RandomForestRegressor(n_estimators=20, random_state=42)
+    return model.fit(X, df['yield_impact_pct']), X
+
+
+def _perturbed(X, seed=1):
+    """Training-like inputs, jittered and extended past the training range."""
+    values = np.asarray(X, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rows = values[rng.integers(0, len(values), 3000)]
+    spread = values.max(axis=0) - values.min(axis=0)
+    rows = rows + rng.normal(0, 0.2, rows.shape) * spread
+    return pd.DataFrame(rows, columns=X.columns) if isinstance(X, pd.DataFrame) else rows
+
+
+@pytest.fixture(scope="module", params=[_coastal, _flood, _coffee], ids=["coastal", "flood", "coffee"])
+def surrogate(request):
+    model, X = request.param()
+    return model, CompiledForest.from_sklearn(model), _perturbed(X)
+
+
+def _assert_identical(actual, expected):
+    assert actual.dtype == np.float64
+    assert np.array_equal(actual, expected)
+
+
+class TestParity:
+    def test_batch(self, surrogate):
+        model, forest, X = surrogate
+        _assert_identical(forest.predict(X), model.predict(X))
+
+    @pytest.mark.parametrize("rows", [1, 2, 17])
+    def test_small_batches(self, surrogate, rows):
+        model, forest, X = surrogate
+        _assert_identical(forest.predict(X[:rows]), model.predict(X[:rows]))
+
+    def test_tree_by_tree_with_threads_and_chunks(self, surrogate, monkeypatch):
+        model, forest, X = surrogate
+        monkeypatch.setattr(forest_compiler, "FOREST_WIDE_MAX_ROWS", 0)
+        monkeypatch.setattr(forest_compiler, "FOREST_PREDICT_THREADS", 3)
+        monkeypatch.setattr(forest_compiler, "FOREST_PREDICT_CHUNK_ROWS", 700)
+        _assert_identical(forest.predict(X), model.predict(X))
+
+    def test_saved_and_memory_mapped(self, surrogate, tmp_path):
+        model, forest, X = surrogate
+        forest.save(str(tmp_path / "model.forest"))
+        loaded = CompiledForest.load(str(tmp_path / "model.forest"))
+        assert isinstance(loaded.threshold, np.memmap)
+        assert not loaded._children.flags.owndata
+        _assert_identical(loaded.predict(X), model.predict(X))
+
+    def test_extra_trees(self):
+        rng = np.random.default_rng(3)
+        X = rng.uniform(0, 1, (2000, 4))
+        model = ExtraTreesRegressor(n_estimators=15, random_state=0).fit(X, X[:, 0] * X[:, 1] + X[:, 2])
+        _assert_identical(CompiledForest.from_sklearn(model).predict(X + 0.01), model.predict(X + 0.01))
+
+    def test_missing_values(self):
+        rng = np.random.default_rng(4)
+        X = rng.uniform(0, 1, (2000, 3))
+        y = X.sum(axis=1)
+        X[rng.random(X.shape) < 0.1] = np.nan
+        model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+        _assert_identical(CompiledForest.from_sklearn(model).predict(X), model.predict(X))
+
+
+class TestCompile:
+    def test_thresholds_are_float32_floors(self):
+        values = np.array([0.1, 0.5, 1e-8, -3.3, 1e30])
+        floors = forest_compiler._float32_floor(values)
+        assert floors.dtype == np.float32
+        assert (floors.astype(np.float64) <= values).all()
+        assert (np.nextafter(floors, np.float32(np.inf)).astype(np.float64) > values).all()
+
+    def test_rejects_classifiers_and_unfitted_models(self):
+        X = np.random.default_rng(0).uniform(size=(50, 2))
+        with pytest.raises(ValueError):
+            CompiledForest.from_sklearn(RandomForestRegressor())
+        with pytest.raises(ValueError):
+            CompiledForest.from_sklearn(RandomForestClassifier(n_estimators=2).fit(X, X[:, 0] > 0.5))
+
+    def test_dataframe_columns_are_reordered(self):
+        model, X = _coffee()
+        forest = CompiledForest.from_sklearn(model)
+        _assert_identical(forest.predict(X[X.columns[::-1]][:50]), model.predict(X[:50]))
+
+    def test_wrong_feature_count(self):
+        forest = CompiledForest.from_sklearn(_coastal()[0])
+        with pytest.raises(ValueError):
+            forest.predict(np.zeros((3, 5)))
+
+
+class TestLoadModel:
+    @pytest.fixture
+    def pickled(self, tmp_path):
+        import joblib
+        model, X = _coastal()
+        path = tmp_path / "coastal_surrogate.pkl"
+        joblib.dump(model, path)
+        return str(path), model
+
+    def test_prefers_compiled(self, pickled):
+        path, model = pickled
+        forest_compiler.export(path)
+        assert compiled_path(path).name == "coastal_surrogate.forest"
+        assert isinstance(load_model(path), CompiledForest)
+
+    def test_falls_back_to_pickle(self, pickled):
+        path, model = pickled
+        assert isinstance(load_model(path), RandomForestRegressor)
+
+    def test_replaced_pickle_is_loaded_until_re_exported(self, pickled):
+        import joblib
+        path, model = pickled
+        forest_compiler.export(path)
+        X = np.random.default_rng(1).uniform(0, 10, size=(100, model.n_features_in_))
+        joblib.dump(RandomForestRegressor(n_estimators=2, random_state=1).fit(X, X[:, 0]), path)
+        assert isinstance(load_model(path), RandomForestRegressor)
+        forest_compiler.export(path)
+        assert isinstance(load_model(path), CompiledForest)
+
+    def test_compiled_without_pickle_is_served(self, pickled):
+        path, _ = pickled
+        forest_compiler.export(path)
+        os.remove(path)
+        assert isinstance(load_model(path), CompiledForest)
+
+    def test_can_be_disabled(self, pickled, monkeypatch):
+        path, _ = pickled
+        forest_compiler.export(path)
+        monkeypatch.setattr(forest_compiler, "USE_COMPILED", False)
+        assert isinstance(load_model(path), RandomForestRegressor)
+
+    def test_check_reports_identical(self, pickled):
+        path, _ = pickled
+        forest_compiler.export(path)
+        report = forest_compiler.check(path, rows=500)
+        assert report["identical"]
+        assert report["max_abs_diff"] == 0.0
+
+    def test_missing_model(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_model(str(tmp_path / "missing.pkl"))
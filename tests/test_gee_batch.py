@@ -0,0 +1,86 @@
+"""
+Unit tests for batched GEE weather retrieval (gee_connector.get_weather_data_many).
+
+Runs offline against the MockEarthEngine test double and checks results match
+the single-point get_weather_data with far fewer getInfo() round trips.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import gee_connector
+from mock_earth_engine import MockEarthEngine
+
+POINTS = [(42.0, -93.5), (-15.5, -47.7), (-25.7, 28.2), (6.5, -1.5), (60.1, 24.9)]
+DATES = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+
+
+@pytest.fixture
+def fake_ee(monkeypatch):
+    engine = MockEarthEngine()
+    monkeypatch.setattr(gee_connector, "ee", engine)
+    monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+    return engine
+
+
+class TestGetWeatherDataMany:
+    def test_matches_single_point_lookups(self, fake_ee, isolated_geo_cache):
+        expected = [gee_connector.get_weather_data(lat, lon, **DATES) for lat, lon in POINTS]
+        assert fake_ee.getinfo_calls == len(POINTS)
+
+        isolated_geo_cache.clear()
+        fake_ee.getinfo_calls = 0
+        batched = gee_connector.get_weather_data_many(POINTS, **DATES)
+
+        assert fake_ee.getinfo_calls == 1
+        assert len(batched) == len(POINTS)
+        for single, many in zip(expected, batched):
+            assert many["max_temp_celsius"] == pytest.approx(single["max_temp_celsius"])
+            assert many["total_precip_mm"] == pytest.approx(single["total_precip_mm"])
+
+    def test_chunks_large_point_sets(self, fake_ee):
+        points = [(lat / 10.0, 10.0) for lat in range(25)]
+        results = gee_connector.get_weather_data_many(points, chunk_size=10, **DATES)
+
+        assert fake_ee.getinfo_calls == 3
+        assert len(results) == 25
+        assert all(r["max_temp_celsius"] is not None for r in results)
+
+    def test_missing_coverage_returns_none(self, monkeypatch):
+        engine = MockEarthEngine(missing_points=[POINTS[1]])
+        monkeypatch.setattr(gee_connector, "ee", engine)
+        monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+
+        results = gee_connector.get_weather_data_many(POINTS, **DATES)
+
+        assert results[1] == {"max_temp_celsius": None, "total_precip_mm": None}
+        assert results[0]["max_temp_celsius"] is not None
+
+    def test_empty_input_makes_no_requests(self, fake_ee):
+        assert gee_connector.get_weather_data_many([], **DATES) == []
+        assert fake_ee.getinfo_calls == 0
+
+
+class TestPredictPortfolioEndpoint:
+    @pytest.fixture
+    def client(self, fake_ee):
+        from auth import get_current_user
+        from routers import prediction
+
+        app = FastAPI()
+        app.include_router(prediction.router)
+        app.dependency_overrides[get_current_user] = lambda: None
+        return TestClient(app)
+
+    def test_single_batched_request_for_all_locations(self, client, fake_ee):
+        response = client.post(
+            "/api/v1/prediction/predict-portfolio",
+            json={"locations": [{"lat": lat, "lon": lon} for lat, lon in POINTS], "crop_type": "maize"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["portfolio_summary"]["num_locations"] == len(POINTS)
+        assert [loc["location_index"] for loc in data["locations"]] == list(range(len(POINTS)))
+        assert fake_ee.getinfo_calls == 1
@@ -0,0 +1,83 @@
+"""
+Unit tests for single-round-trip GEE point lookups.
+
+get_monthly_data, get_weather_data and get_terrain_data should each evaluate
+everything they need in one getInfo() call, with the same results and the same
+missing-month handling as before. Runs offline against MockEarthEngine.
+"""
+
+import pytest
+
+import gee_connector
+import mock_earth_engine
+from mock_data import get_mock_monthly_data
+from mock_earth_engine import MockEarthEngine
+
+LAT, LON = 42.0, -93.5
+
+
+@pytest.fixture
+def use_engine(monkeypatch):
+    def install(**kwargs):
+        engine = MockEarthEngine(**kwargs)
+        monkeypatch.setattr(gee_connector, "ee", engine)
+        monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+        return engine
+    return install
+
+
+class TestGetMonthlyData:
+    def test_all_months_in_one_round_trip(self, use_engine):
+        engine = use_engine()
+        result = gee_connector.get_monthly_data(LAT, LON)
+
+        expected = get_mock_monthly_data(LAT, LON)
+        assert engine.getinfo_calls == 1
+        assert result["rainfall_monthly_mm"] == pytest.approx(expected["rainfall_monthly_mm"])
+        assert result["soil_moisture_monthly"] == pytest.approx(expected["soil_moisture_monthly"])
+
+    def test_missing_months_fall_back_to_zero(self, use_engine):
+        use_engine(collection_size=7)
+        result = gee_connector.get_monthly_data(LAT, LON)
+
+        assert len(result["rainfall_monthly_mm"]) == 12
+        assert result["rainfall_monthly_mm"][7:] == [0] * 5
+        assert result["soil_moisture_monthly"][7:] == [0] * 5
+        assert all(v > 0 for v in result["rainfall_monthly_mm"][:7])
+
+    def test_failed_fetch_returns_zeros_and_is_not_cached(self, use_engine, isolated_geo_cache, monkeypatch):
+        engine = use_engine()
+
+        def boom(self):
+            raise engine.EEException("Computation timed out.")
+
+        monkeypatch.setattr(mock_earth_engine._List, "getInfo", boom)
+        result = gee_connector.get_monthly_data(LAT, LON)
+
+        assert result == {"rainfall_monthly_mm": [0] * 12, "soil_moisture_monthly": [0] * 12}
+        assert isolated_geo_cache.get_stats()["stores"] == 0
+
+
+class TestSingleDictionaryLookups:
+    def test_weather_one_round_trip(self, use_engine):
+        engine = use_engine()
+        result = gee_connector.get_weather_data(LAT, LON, "2024-01-01", "2024-12-31")
+
+        assert engine.getinfo_calls == 1
+        assert set(result) == {"max_temp_celsius", "total_precip_mm"}
+
+    def test_weather_without_coverage_raises(self, use_engine):
+        engine = use_engine(missing_points=[(LAT, LON)])
+        with pytest.raises(engine.EEException):
+            gee_connector.get_weather_data(LAT, LON, "2024-01-01", "2024-12-31")
+
+    def test_terrain_one_round_trip(self, use_engine):
+        engine = use_engine()
+        result = gee_connector.get_terrain_data(LAT, LON)
+
+        assert engine.getinfo_calls == 1
+        assert result["soil_ph"] == pytest.approx(6.5)
+
+    def test_terrain_without_coverage_returns_none(self, use_engine):
+        use_engine(missing_points=[(LAT, LON)])
+        assert gee_connector.get_terrain_data(LAT, LON) == {"elevation_m": None, "soil_ph": None}
@@ -0,0 +1,125 @@
+"""
+Unit tests for the process-wide Earth Engine session (gee_session).
+
+Runs offline against MockEarthEngine: checks that ee.Initialize runs once per
+process across engines and threads, that the session refreshes after its TTL,
+and that missing credentials are remembered so fallbacks skip the handshake.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import gee_session
+from mock_earth_engine import MockEarthEngine
+
+CREDENTIALS = {"client_email": "svc@example.iam.gserviceaccount.com", "private_key": "x"}
+
+
+@pytest.fixture
+def fake_ee(monkeypatch):
+    engine = MockEarthEngine()
+    monkeypatch.setattr(gee_session, "ee", engine)
+    monkeypatch.setattr(gee_session, "load_gee_credentials", lambda: dict(CREDENTIALS))
+    monkeypatch.setattr(gee_session, "session", gee_session.GEESession())
+    return engine
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic inside gee_session."""
+    now = [1000.0]
+    monkeypatch.setattr(gee_session.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestGEESession:
+    def test_initializes_once_across_engines(self, fake_ee):
+        import coastal_engine
+        import flood_engine
+        import gee_connector
+
+        for _ in range(5):
+            gee_connector.authenticate_gee()
+            coastal_engine.authenticate_gee()
+            flood_engine.authenticate_gee()
+
+        assert fake_ee.initialize_calls == 1
+        metrics = gee_session.get_metrics()
+        assert metrics["initialized"] is True
+        assert metrics["init_count"] == 1
+        assert metrics["last_init_ms"] is not None
+
+    def test_concurrent_first_use_initializes_once(self, fake_ee):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda _: gee_session.ensure_initialized(), range(64)))
+
+        assert fake_ee.initialize_calls == 1
+
+    def test_refreshes_after_ttl(self, fake_ee, clock):
+        gee_session.session.ttl_s = 100.0
+        gee_session.ensure_initialized()
+        clock[0] += 99.0
+        gee_session.ensure_initialized()
+        assert fake_ee.initialize_calls == 1
+
+        clock[0] += 2.0
+        gee_session.ensure_initialized()
+        assert fake_ee.initialize_calls == 2
+
+    def test_invalidate_forces_reinitialize(self, fake_ee):
+        gee_session.ensure_initialized()
+        gee_session.invalidate()
+        gee_session.ensure_initialized()
+        assert fake_ee.initialize_calls == 2
+
+
+class TestUnavailable:
+    @pytest.fixture
+    def no_credentials(self, fake_ee, monkeypatch):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return None
+
+        monkeypatch.setattr(gee_session, "load_gee_credentials", load)
+        return calls
+
+    def test_missing_credentials_raise_value_error(self, no_credentials):
+        with pytest.raises(ValueError, match="credentials not found"):
+            gee_session.ensure_initialized()
+
+    def test_failure_is_remembered_until_retry_window(self, no_credentials, clock):
+        gee_session.session.retry_s = 60.0
+
+        assert gee_session.is_available() is False
+        assert gee_session.is_available() is False
+        assert len(no_credentials) == 1
+
+        clock[0] += 61.0
+        assert gee_session.is_available() is False
+        assert len(no_credentials) == 2
+        assert gee_session.get_metrics()["init_failures"] == 2
+
+    def test_initialize_error_is_wrapped(self, fake_ee, monkeypatch):
+        def boom(credentials=None, **kwargs):
+            raise RuntimeError("network unreachable")
+
+        monkeypatch.setattr(fake_ee, "Initialize", boom)
+
+        with pytest.raises(gee_session.GEEUnavailableError, match="network unreachable"):
+            gee_session.ensure_initialized()
+        assert gee_session.get_metrics()["last_error"] == "network unreachable"
+
+    def test_simulation_falls_back_without_calling_gee(self, no_credentials, monkeypatch):
+        import gee_connector
+        from simulation_engine import SimulationParams, resolve_weather
+
+        def fail(*args, **kwargs):
+            raise AssertionError("GEE should not be called when unavailable")
+
+        monkeypatch.setattr(gee_connector, "get_weather_data", fail)
+
+        weather = resolve_weather(SimulationParams(lat=6.5, lon=-1.5))
+        assert weather["data_source"] == "fallback_climate_zone"
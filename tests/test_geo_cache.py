@@ -0,0 +1,203 @@
+"""
+Unit tests for the geospatial lookup cache (geo_cache).
+
+Covers key quantization, LRU/SQLite tiers, TTL expiry, and the read-through
+decorators on gee_connector (run offline against MockEarthEngine).
+"""
+
+import pytest
+
+import gee_connector
+import geo_cache
+from geo_cache import GeoCache, make_key
+from mock_earth_engine import MockEarthEngine, MockEEException
+
+DATES = {"start_date": "2024-01-01", "end_date": "2024-12-31"}
+
+
+@pytest.fixture
+def fake_ee(monkeypatch):
+    engine = MockEarthEngine()
+    monkeypatch.setattr(gee_connector, "ee", engine)
+    monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+    return engine
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(geo_cache.time, "time", lambda: now[0])
+    return now
+
+
+class TestMakeKey:
+    def test_points_in_same_cell_share_key(self):
+        assert make_key("f", "era5_land_daily", 40.71, -74.01) == make_key("f", "era5_land_daily", 40.74, -73.96)
+
+    def test_neighbouring_cells_differ(self):
+        assert make_key("f", "era5_land_daily", 40.71, -74.0) != make_key("f", "era5_land_daily", 40.81, -74.0)
+
+    def test_fine_grid_datasets_distinguish_nearby_points(self):
+        assert make_key("f", "srtm_openlandmap", 40.7100, -74.0) != make_key("f", "srtm_openlandmap", 40.7105, -74.0)
+
+    def test_window_and_function_are_part_of_key(self):
+        base = make_key("f", "era5_land_daily", 1.0, 2.0, ("2024",))
+        assert base != make_key("f", "era5_land_daily", 1.0, 2.0, ("2023",))
+        assert base != make_key("g", "era5_land_daily", 1.0, 2.0, ("2024",))
+
+
+class TestGeoCache:
+    def test_memory_hit_returns_independent_copy(self):
+        cache = GeoCache(path=None)
+        cache.set("k", {"a": [1, 2]}, ttl_s=60)
+
+        first = cache.get("k")
+        first["a"].append(3)
+
+        assert cache.get("k") == {"a": [1, 2]}
+        assert cache.get_stats()["memory_hits"] == 2
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = GeoCache(path=None, memory_size=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")
+        cache.set("c", 3, 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self, clock):
+        cache = GeoCache(path=None)
+        cache.set("k", 1, ttl_s=10)
+        clock[0] += 9
+        assert cache.get("k") == 1
+        clock[0] += 2
+        assert cache.get("k") is None
+
+    def test_disk_tier_is_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        GeoCache(path=path).set("k", {"v": 1.5}, ttl_s=60)
+
+        other = GeoCache(path=path)
+        assert other.get("k") == {"v": 1.5}
+        assert other.get("k") == {"v": 1.5}
+
+        stats = other.get_stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["disk_entries"] == 1
+
+    def test_purge_expired_removes_disk_rows(self, tmp_path, clock):
+        cache = GeoCache(path=str(tmp_path / "cache.sqlite3"))
+        cache.set("old", 1, ttl_s=10)
+        cache.set("new", 2, ttl_s=100)
+        clock[0] += 50
+
+        assert cache.purge_expired() == 1
+        assert cache.get_stats()["disk_entries"] == 1
+
+    def test_stats_survive_an_unreadable_disk_tier(self, tmp_path):
+        cache = GeoCache(path=str(tmp_path / "cache.sqlite3"))
+        cache.set("k", 1, ttl_s=60)
+        cache._connection().execute("DROP TABLE geo_cache")
+
+        stats = cache.get_stats()
+        assert stats["disk_entries"] is None
+        assert stats["errors"] == 1
+
+    def test_disabled_cache_never_hits(self):
+        cache = GeoCache(path=None, enabled=False)
+        cache.set("k", 1, 60)
+        assert cache.get("k") is None
+
+
+class TestCachedLookups:
+    def test_weather_served_from_cache_for_same_season(self, fake_ee):
+        first = gee_connector.get_weather_data(6.5, -1.5, **DATES)
+        calls = fake_ee.getinfo_calls
+        # Different end date in the same growing season, nearby point in the same cell
+        again = gee_connector.get_weather_data(6.52, -1.48, "2024-02-01", "2024-11-30")
+
+        assert again == first
+        assert fake_ee.getinfo_calls == calls
+
+    def test_terrain_cache_hit(self, fake_ee, isolated_geo_cache):
+        first = gee_connector.get_terrain_data(lat=27.9, lon=86.9)
+        calls = fake_ee.getinfo_calls
+        assert gee_connector.get_terrain_data(27.9, 86.9) == first
+        assert fake_ee.getinfo_calls == calls
+        assert isolated_geo_cache.get_stats()["memory_hits"] == 1
+
+    def test_errors_are_not_cached(self, fake_ee, monkeypatch):
+        engine = MockEarthEngine(missing_points=[(10.0, 10.0)])
+        monkeypatch.setattr(gee_connector, "ee", engine)
+
+        with pytest.raises(MockEEException):
+            gee_connector.get_weather_data(10.0, 10.0, **DATES)
+        assert geo_cache.default_cache.get_stats()["stores"] == 0
+
+    def test_coastal_params_from_era5_are_cached(self, fake_ee):
+        first = gee_connector.get_coastal_params(6.5, -1.5)
+        assert first["wave_height_source"] == "era5" and first["slope_pct"] is not None
+        calls = fake_ee.getinfo_calls
+        assert gee_connector.get_coastal_params(6.5, -1.5) == first
+        assert fake_ee.getinfo_calls == calls
+
+    def test_estimated_wave_height_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(gee_connector, "ee", MockEarthEngine(failing_datasets=["ECMWF/ERA5/MONTHLY"]))
+        monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+        fallback = gee_connector.get_coastal_params(6.5, -1.5)
+        assert (fallback["wave_height_source"], fallback["max_wave_height"]) == ("latitude_estimate", 4.5)
+        assert geo_cache.default_cache.get_stats()["stores"] == 0
+
+        # ERA5 is back: the next call fetches the real value
+        monkeypatch.setattr(gee_connector, "ee", MockEarthEngine())
+        assert gee_connector.get_coastal_params(6.5, -1.5)["wave_height_source"] == "era5"
+
+    def test_missing_slope_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(gee_connector, "ee", MockEarthEngine(missing_points=[(6.5, -1.5)]))
+        monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+        assert gee_connector.get_coastal_params(6.5, -1.5)["slope_pct"] is None
+        assert geo_cache.default_cache.get_stats()["stores"] == 0
+
+    def test_empty_ndvi_series_is_not_cached(self, fake_ee, monkeypatch):
+        monkeypatch.setattr(gee_connector, "ee", MockEarthEngine(missing_points=[(6.5, -1.5)]))
+        assert gee_connector.get_ndvi_timeseries(6.5, -1.5) == []
+        assert geo_cache.default_cache.get_stats()["stores"] == 0
+
+        monkeypatch.setattr(gee_connector, "ee", fake_ee)
+        series = gee_connector.get_ndvi_timeseries(6.5, -1.5)
+        assert len(series) == 12 and series[0] == {"month": "2024-01", "value": 0.6}
+        assert geo_cache.default_cache.get_stats()["stores"] == 1
+
+    def test_batch_only_fetches_uncached_points(self, fake_ee):
+        gee_connector.get_weather_data(6.5, -1.5, **DATES)
+        fake_ee.getinfo_calls = 0
+
+        results = gee_connector.get_weather_data_many([(6.5, -1.5), (42.0, -93.5)], **DATES)
+        assert fake_ee.getinfo_calls == 1
+        assert results[0] == gee_connector.get_weather_data(6.5, -1.5, **DATES)
+
+        fake_ee.getinfo_calls = 0
+        gee_connector.get_weather_data_many([(6.5, -1.5), (42.0, -93.5)], **DATES)
+        assert fake_ee.getinfo_calls == 0
+
+
+class TestWarm:
+    def test_warm_populates_cache_for_targets(self, fake_ee, tmp_path):
+        targets = tmp_path / "targets.csv"
+        targets.write_text(
+            "name,lat,lon,project_type,crop_type\n"
+            "Farm,6.5,-1.5,agriculture,cocoa\n"
+            "Hill,27.9,86.9,flood,\n"
+        )
+
+        result = geo_cache.warm(str(targets), workers=2, lookups=["weather", "terrain"])
+
+        assert result["tasks"] == 4
+        assert result["failed"] == []
+        fake_ee.getinfo_calls = 0
+        gee_connector.get_terrain_data(27.9, 86.9)
+        assert fake_ee.getinfo_calls == 0
@@ -0,0 +1,190 @@
+"""
+Unit tests for the surrogate model registry (model_registry).
+
+Models must load once per process — lazily, on warm-up or on preload — and
+a model that cannot be loaded must surface as ModelUnavailableError (and the
+legacy MODEL_NOT_FOUND response) without being retried on every request.
+"""
+
+import asyncio
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestRegressor
+
+import model_registry
+from auth import get_current_user
+from forest_compiler import CompiledForest
+from model_registry import ModelRegistry, ModelUnavailableError
+
+
+def _forest():
+    X = np.random.default_rng(0).uniform(size=(200, 3))
+    return RandomForestRegressor(n_estimators=5, max_depth=5, random_state=0).fit(X, X.sum(axis=1))
+
+
+def _counting_loader(model, delay=0.0):
+    calls = []
+    lock = threading.Lock()
+
+    def loader(path):
+        with lock:
+            calls.append(path)
+        time.sleep(delay)
+        return model
+
+    return loader, calls
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ModelRegistry()
+    monkeypatch.setattr(model_registry, "default_registry", registry)
+    return registry
+
+
+class TestLoading:
+    def test_register_does_not_load(self, registry):
+        loader, calls = _counting_loader(object())
+        registry.register("flood", "flood.pkl", loader)
+        assert calls == []
+        assert not registry.is_loaded("flood")
+        assert registry.get_metrics()["flood"]["status"] == "unloaded"
+
+    def test_concurrent_first_requests_share_one_load(self, registry):
+        model = object()
+        loader, calls = _counting_loader(model, delay=0.2)
+        registry.register("flood", "flood.pkl", loader)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: registry.get("flood"), range(8)))
+
+        assert calls == ["flood.pkl"]
+        assert all(r is model for r in results)
+
+    def test_get_async_loads_off_the_event_loop(self, registry):
+        model = object()
+        loader, calls = _counting_loader(model, delay=0.2)
+        registry.register("coastal", "coastal.pkl", loader)
+        ticks = []
+
+        async def main():
+            async def ticker():
+                for _ in range(5):
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.02)
+            result, _ = await asyncio.gather(model_registry.get_model_async("coastal"), ticker())
+            return result
+
+        assert asyncio.run(main()) is model
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.19
+        assert len(calls) == 1
+
+    def test_unknown_model(self, registry):
+        with pytest.raises(KeyError):
+            registry.get("ag")
+
+    def test_put(self, registry):
+        model = object()
+        registry.put("coffee", model)
+        assert model_registry.get_model("coffee") is model
+
+
+class TestFailures:
+    def test_missing_file(self, registry, tmp_path):
+        registry.register("flood", str(tmp_path / "flood_surrogate.pkl"))
+        with pytest.raises(ModelUnavailableError) as excinfo:
+            registry.get("flood")
+        assert "Flood model unavailable" in str(excinfo.value)
+        assert excinfo.value.reason == "file not found"
+        assert registry.get_metrics()["flood"]["status"] == "failed"
+
+    def test_failure_is_not_retried_until_retry_window_passes(self, registry, monkeypatch):
+        attempts = []
+
+        def loader(path):
+            attempts.append(path)
+            if len(attempts) == 1:
+                raise ValueError("truncated pickle")
+            return "model"
+
+        registry.register("flood", "flood.pkl", loader)
+        for _ in range(3):
+            with pytest.raises(ModelUnavailableError, match="truncated pickle"):
+                registry.get("flood")
+        assert len(attempts) == 1
+
+        monkeypatch.setattr(model_registry, "MODEL_RETRY_S", 0.0)
+        assert registry.get("flood") == "model"
+        assert registry.get_metrics()["flood"]["error"] is None
+
+    def test_router_returns_legacy_error(self, registry, tmp_path):
+        from routers import flood
+        registry.register(flood.FLOOD_MODEL, str(tmp_path / "flood_surrogate.pkl"))
+        app = FastAPI()
+        app.include_router(flood.router)
+        app.dependency_overrides[get_current_user] = lambda: None
+        response = TestClient(app).post("/api/v1/flood/predict", json={
+            "rain_intensity": 50.0, "current_imperviousness": 0.5, "intervention_type": "green_roof",
+        })
+        assert response.status_code == 500
+        assert response.json()["code"] == "MODEL_NOT_FOUND"
+
+
+class TestWarmUp:
+    def test_warm_up_reports_each_model(self, registry, tmp_path):
+        registry.register("flood", "flood.pkl", lambda path: "model")
+        registry.register("coastal", str(tmp_path / "missing.pkl"))
+        assert registry.warm_up() == {"flood": True, "coastal": False}
+
+    def test_background_warm_up(self, registry, monkeypatch):
+        loader, calls = _counting_loader("model", delay=0.1)
+        registry.register("flood", "flood.pkl", loader)
+        monkeypatch.setattr(model_registry, "MODEL_LOADING", "background")
+
+        asyncio.run(model_registry.start_loading())
+        registry.start_warm_up().join(timeout=5)
+
+        assert registry.is_loaded("flood")
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize("mode, loaded", [("lazy", False), ("eager", True)])
+    def test_startup_modes(self, registry, monkeypatch, mode, loaded):
+        registry.register("flood", "flood.pkl", lambda path: "model")
+        monkeypatch.setattr(model_registry, "MODEL_LOADING", mode)
+        asyncio.run(model_registry.start_loading())
+        assert registry.is_loaded("flood") is loaded
+
+    def test_preload_freezes_heap(self, registry):
+        registry.register("flood", "flood.pkl", lambda path: "model")
+        try:
+            assert registry.preload() == {"flood": True}
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+
+class TestMetrics:
+    def test_sklearn_forest(self, registry):
+        registry.register("ag", "ag.pkl", lambda path: _forest())
+        registry.get("ag")
+        metrics = model_registry.get_metrics()["models"]["ag"]
+        assert metrics["status"] == "loaded"
+        assert metrics["type"] == "RandomForestRegressor"
+        assert metrics["load_time_ms"] >= 0
+        assert metrics["model_bytes"] > 0
+        assert not metrics["memory_mapped"]
+
+    def test_compiled_forest_is_memory_mapped(self, registry, tmp_path):
+        CompiledForest.from_sklearn(_forest()).save(str(tmp_path / "ag.forest"))
+        registry.register("ag", str(tmp_path / "ag.forest"), CompiledForest.load)
+        registry.get("ag")
+        metrics = registry.get_metrics()["ag"]
+        assert metrics["memory_mapped"]
+        assert metrics["model_bytes"] > 0
@@ -0,0 +1,68 @@
+"""
+Unit tests for the vectorized Monte Carlo engine.
+"""
+
+import time
+
+import pytest
+
+from financial_engine import calculate_npv
+from monte_carlo_engine import MAX_ITERATIONS, annuity_factor, run_simulation
+
+SAMPLE_LOCATION = {
+    "location": {"lat": -12.5, "lon": -55.7},
+    "crop_analysis": {"resilient_yield_pct": 85.57},
+    "financial_analysis": {
+        "assumptions": {
+            "capex": 2000.0,
+            "opex": 425.0,
+            "yield_benefit_pct": 30.0,
+            "price_per_ton": 5000.0,
+            "discount_rate_pct": 10.0,
+            "analysis_years": 10,
+        }
+    },
+}
+
+
+class TestAnnuityFactor:
+    @pytest.mark.parametrize("rate,years", [(0.10, 10), (0.035, 25), (0.0, 7), (0.2, 1)])
+    def test_matches_discounted_cash_flows(self, rate, years):
+        assert annuity_factor(rate, years) == pytest.approx(calculate_npv([0.0] + [1.0] * years, rate))
+
+    def test_zero_years(self):
+        assert annuity_factor(0.1, 0) == 0.0
+
+
+class TestRunSimulation:
+    def test_output_schema(self):
+        result = run_simulation(SAMPLE_LOCATION, iterations=1000)
+        for key in ("mean_npv", "VaR_95", "default_probability", "simulation_count",
+                    "std_dev_npv", "min_npv", "max_npv", "risk_factors"):
+            assert key in result
+        assert result["simulation_count"] == 1000
+        assert result["min_npv"] <= result["VaR_95"] <= result["mean_npv"] <= result["max_npv"]
+
+    def test_reproducible_per_location(self):
+        assert run_simulation(SAMPLE_LOCATION, 5000) == run_simulation(SAMPLE_LOCATION, 5000)
+
+    def test_mean_converges_to_deterministic_npv(self):
+        """With symmetric shocks the mean NPV approaches the unshocked NPV."""
+        assumptions = SAMPLE_LOCATION["financial_analysis"]["assumptions"]
+        benefit = 0.30 * 0.8557 * assumptions["price_per_ton"]
+        expected = calculate_npv([-assumptions["capex"]] + [benefit - assumptions["opex"]] * 10, 0.10)
+
+        result = run_simulation(SAMPLE_LOCATION, iterations=200_000)
+
+        assert result["mean_npv"] == pytest.approx(expected, rel=0.01)
+
+    def test_max_iterations_is_fast(self):
+        start = time.perf_counter()
+        result = run_simulation(SAMPLE_LOCATION, iterations=MAX_ITERATIONS)
+        assert result["simulation_count"] == MAX_ITERATIONS
+        assert time.perf_counter() - start < 2.0
+
+    @pytest.mark.parametrize("iterations", [0, MAX_ITERATIONS + 1])
+    def test_rejects_out_of_range_iterations(self, iterations):
+        with pytest.raises(ValueError):
+            run_simulation(SAMPLE_LOCATION, iterations=iterations)
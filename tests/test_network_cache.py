@@ -0,0 +1,230 @@
+"""
+Unit tests for the compiled supply chain network cache (network_cache).
+
+A CompiledNetwork must have the node order, edge order, successors and
+descendants of the networkx.DiGraph the cascade endpoint used to build, and
+a cached network must be served without touching the database.
+"""
+
+import asyncio
+import io
+import random
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import network_cache
+from database import Base
+from network_cache import CompiledNetwork, NetworkCache
+from routers import supply_chain
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "examples" / "sample_supply_chain.csv"
+
+
+def _random_rows(n_nodes, n_edges, seed=0):
+    rng = random.Random(seed)
+    nodes = [(f"n{i}", f"Node {i}", ("Supplier", "Port")[i % 2], "Secure") for i in range(n_nodes)]
+    edges = [(f"n{rng.randrange(n_nodes)}", f"n{rng.randrange(n_nodes)}") for _ in range(n_edges)]
+    return nodes, edges
+
+
+def _digraph(nodes, edges):
+    G = nx.DiGraph()
+    for node_id, *_ in nodes:
+        G.add_node(node_id)
+    for source, target in edges:
+        G.add_edge(source, target)
+    return G
+
+
+def _network(network_id="net", n_nodes=50, n_edges=200, seed=0):
+    nodes, edges = _random_rows(n_nodes, n_edges, seed)
+    return CompiledNetwork.compile(network_id, nodes, edges)
+
+
+class TestCompiledNetwork:
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_networkx(self, seed):
+        # Dense enough to have duplicate edges, self-loops and cycles
+        nodes, edges = _random_rows(200, 1000, seed)
+        network = CompiledNetwork.compile("net", nodes, edges)
+        G = _digraph(nodes, edges)
+
+        assert network.node_ids == list(G.nodes())
+        assert network.edges() == list(G.edges())
+        for node_id in network.node_ids[:50]:
+            i = network.index[node_id]
+            assert [network.node_ids[j] for j in network.successors(i)] == list(G.successors(node_id))
+            assert {network.node_ids[j] for j in network.descendants(i)} == nx.descendants(G, node_id)
+
+    def test_duplicate_nodes_keep_first_row(self):
+        nodes = [("a", "A", "Port", "Secure"), ("a", "Other", "Supplier", "Warning"), ("b", "B", "Port", "Secure")]
+        network = CompiledNetwork.compile("net", nodes, [("a", "b")])
+        assert network.node_ids == ["a", "b"]
+        assert (network.labels[0], network.node_types[0], network.statuses[0]) == ("A", "Port", "Secure")
+
+    def test_edges_to_unknown_nodes_are_ignored(self):
+        nodes = [("a", "A", "Port", "Secure"), ("b", "B", "Port", "Secure")]
+        network = CompiledNetwork.compile("net", nodes, [("a", "b"), ("a", "ghost"), ("ghost", "b")])
+        assert network.edges() == [("a", "b")]
+
+    def test_no_edges(self):
+        network = CompiledNetwork.compile("net", [("a", "A", "Port", "Secure")], [])
+        assert network.num_edges == 0
+        assert list(network.indptr) == [0, 0]
+        assert len(network.descendants(0)) == 0
+
+    def test_compact_arrays(self):
+        network = _network()
+        assert network.indices.dtype == np.int32
+        assert network.nbytes > network.indptr.nbytes + network.indices.nbytes
+
+
+class TestNetworkCache:
+    def test_hit_rate(self):
+        cache = NetworkCache()
+        network = _network()
+        assert cache.get("net") is None
+        cache.put(network)
+        assert cache.get("net") is network
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+        assert stats["networks"] == 1 and stats["bytes"] == network.nbytes
+        assert stats["nodes"] == network.num_nodes and stats["edges"] == network.num_edges
+
+    def test_lru_eviction_by_count(self):
+        cache = NetworkCache(max_networks=2)
+        for network_id in ("a", "b"):
+            cache.put(_network(network_id))
+        cache.get("a")
+        cache.put(_network("c"))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        network = _network("a")
+        cache = NetworkCache(max_networks=10, max_mb=1.5 * network.nbytes / (1024 * 1024))
+        cache.put(network)
+        cache.put(_network("b"))
+        assert cache.get("a") is None and cache.get("b") is not None
+        assert cache.get_stats()["bytes"] <= cache.max_bytes
+
+    def test_oversized_network_is_not_cached(self):
+        cache = NetworkCache(max_mb=0)
+        cache.put(_network())
+        assert cache.get_stats()["networks"] == 0
+
+    def test_invalidate(self):
+        cache = NetworkCache()
+        cache.put(_network())
+        cache.invalidate("net")
+        assert cache.get("net") is None
+        assert cache.get_stats()["bytes"] == 0
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = NetworkCache()
+        calls = []
+
+        async def load(network_id):
+            calls.append(network_id)
+            await asyncio.sleep(0.01)
+            return _network(network_id)
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_load("net", load) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert calls == ["net"]
+        assert all(r is results[0] for r in results)
+        assert cache.get_stats()["shared_loads"] == 4
+
+    def test_failed_load_is_not_cached(self):
+        cache = NetworkCache()
+
+        async def load(network_id):
+            raise LookupError(network_id)
+
+        with pytest.raises(LookupError):
+            asyncio.run(cache.get_or_load("net", load))
+        assert cache.get_stats()["networks"] == 0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    monkeypatch.setattr(supply_chain, "async_session", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(network_cache, "default_cache", NetworkCache())
+    app = FastAPI()
+    app.include_router(supply_chain.router)
+    yield TestClient(app)
+    asyncio.run(engine.dispose())
+
+
+def _upload_sample(client):
+    data = SAMPLE_CSV.read_bytes()
+    response = client.post("/api/v1/supply-chain/upload", files={"file": ("network.csv", io.BytesIO(data), "text/csv")})
+    assert response.status_code == 200
+    return response.json()["network_id"]
+
+
+def _cascade(client, network_id, **body):
+    return client.post("/api/v1/supply-chain/simulate-cascade", json={"network_id": network_id, **body})
+
+
+class TestCascadeEndpoint:
+    def test_disruption_marks_direct_successors(self, client):
+        network_id = _upload_sample(client)
+        body = _cascade(client, network_id, disrupted_node_id="chicago_dc", hazard_severity="Severe").json()
+
+        statuses = {node["id"]: node["data"]["status"] for node in body["nodes"]}
+        assert statuses["chicago_dc"] == "Critical"
+        assert {n for n, s in statuses.items() if s == "Warning"} == {"dallas_warehouse", "miami_warehouse", "ny_retail"}
+        assert [e["id"] for e in body["edges"] if e["is_disrupted"]] == ["e5", "e6", "e7"]
+        assert [e["id"] for e in body["edges"]] == [f"e{i}" for i in range(1, 9)]
+
+    def test_catastrophic_and_baseline(self, client):
+        network_id = _upload_sample(client)
+        body = _cascade(client, network_id, disrupted_node_id="port_la", hazard_severity="Catastrophic").json()
+        statuses = {node["id"]: node["data"]["status"] for node in body["nodes"]}
+        assert statuses["port_la"] == statuses["chicago_dc"] == "Critical"
+
+        baseline = _cascade(client, network_id).json()
+        assert all(node["data"]["status"] == "Secure" for node in baseline["nodes"])
+        assert not any(edge["is_disrupted"] for edge in baseline["edges"])
+
+    def test_database_is_read_once(self, client, monkeypatch):
+        network_id = _upload_sample(client)
+        loads = []
+        load = supply_chain._load_network
+
+        async def counting_load(nid):
+            loads.append(nid)
+            return await load(nid)
+
+        monkeypatch.setattr(supply_chain, "_load_network", counting_load)
+        for node_id in ("taiwan_fab", "port_la", "chicago_dc"):
+            assert _cascade(client, network_id, disrupted_node_id=node_id).status_code == 200
+        assert loads == [network_id]
+        stats = network_cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+
+    def test_unknown_network_and_node(self, client):
+        assert _cascade(client, "missing").status_code == 404
+        assert network_cache.get_stats()["networks"] == 0
+        network_id = _upload_sample(client)
+        response = _cascade(client, network_id, disrupted_node_id="atlantis")
+        assert response.status_code == 404
+        assert "atlantis" in response.json()["detail"]
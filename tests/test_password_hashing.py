@@ -0,0 +1,67 @@
+"""
+Unit tests for off-loop password hashing (security).
+
+bcrypt must run on the hashing executor so the event loop keeps serving
+other coroutines while a login is being verified.
+"""
+
+import asyncio
+import threading
+import time
+
+import security
+
+
+def test_hash_uses_configured_cost():
+    hashed = security.hash_password("s3cret-pass")
+    assert hashed.split("$")[2] == f"{security.BCRYPT_ROUNDS:02d}"
+    assert security.verify_password("s3cret-pass", hashed)
+
+
+def test_async_round_trip_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    original = security.verify_password
+
+    def recording(plain, hashed):
+        threads.append(threading.current_thread().name)
+        return original(plain, hashed)
+
+    monkeypatch.setattr(security, "verify_password", recording)
+
+    async def main():
+        hashed = await security.hash_password_async("s3cret-pass")
+        ok, wrong = await asyncio.gather(
+            security.verify_password_async("s3cret-pass", hashed),
+            security.verify_password_async("not-it", hashed),
+        )
+        return ok, wrong
+
+    assert asyncio.run(main()) == (True, False)
+    assert threads and all(name.startswith("bcrypt") for name in threads)
+
+
+def test_event_loop_keeps_ticking_during_verification():
+    hashed = security.hash_password("s3cret-pass")
+    gaps = []
+
+    async def ticker(done):
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def main():
+        done = asyncio.Event()
+        ticking = asyncio.create_task(ticker(done))
+        await asyncio.gather(*(security.verify_password_async("s3cret-pass", hashed) for _ in range(3)))
+        done.set()
+        await ticking
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    assert len(gaps) > 3
+    # No single stall as long as one bcrypt verification
+    assert max(gaps) < elapsed / 3
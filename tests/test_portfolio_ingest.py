@@ -0,0 +1,168 @@
+"""
+Unit tests for vectorized portfolio CSV ingestion (routers.portfolio.parse_portfolio_csv).
+
+Records must equal those of the previous per-row parser (df.iterrows with a
+regex per value) on the same uploads, including suffixed, messy and missing
+values and extra columns.
+"""
+
+import io
+import math
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from routers.portfolio import PortfolioRecords, parse_asset_values, parse_portfolio_csv
+
+
+def _legacy_records(contents):
+    """The per-row parser parse_portfolio_csv replaced."""
+    df = pd.read_csv(io.BytesIO(contents))
+    df.columns = df.columns.astype(str).str.lower().str.replace(r"[^a-z0-9_]", "", regex=True)
+    lat_col = next((c for c in df.columns if "lat" in c), "lat")
+    lon_col = next((c for c in df.columns if "lon" in c or "lng" in c), "lon")
+    val_col = next((c for c in df.columns if any(x in c for x in ["val", "price", "amount", "cost", "invest", "usd"])), None)
+    if not val_col and len(df.columns) > 2:
+        val_col = df.columns[2]
+    crop_col = next((c for c in df.columns if "crop" in c), "crop_type")
+    df.dropna(how="all", inplace=True)
+    df.dropna(axis=1, how="all", inplace=True)
+    records = []
+    for _, row in df.iterrows():
+        raw_val = str(row.get(val_col, "0")).lower()
+        multiplier = 1
+        if "m" in raw_val:
+            multiplier = 1000000
+        elif "k" in raw_val:
+            multiplier = 1000
+        elif "b" in raw_val:
+            multiplier = 1000000000
+        clean_val = re.sub(r"[^0-9.]", "", raw_val)
+        try:
+            val = float(clean_val) * multiplier if clean_val else 0.0
+        except ValueError:
+            val = 0.0
+        record = {"lat": float(row.get(lat_col, 0.0)), "lon": float(row.get(lon_col, 0.0)),
+                  "asset_value": val, "crop_type": str(row.get(crop_col, "unknown"))}
+        for col in df.columns:
+            if col not in (lat_col, lon_col, val_col, crop_col):
+                record[col] = row.get(col)
+        records.append(record)
+    return records, df[crop_col].value_counts().to_dict()
+
+
+def _same(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def _assert_same_as_legacy(csv):
+    contents = csv.encode()
+    records, crops = parse_portfolio_csv(contents)
+    expected, expected_crops = _legacy_records(contents)
+    assert crops == expected_crops
+    assert len(records) == len(expected)
+    for record, legacy in zip(records, expected):
+        assert list(record) == list(legacy)
+        assert all(_same(record[key], legacy[key]) for key in legacy), (record, legacy)
+
+
+def _messy_csv(n_rows, seed):
+    rng = random.Random(seed)
+    values = ["5m", "200k", "1b", "$1,250,000", "2.5M USD", "  300 K ", "abc", "", "1.2.3", "-400",
+              "7e3", "12.5", "bk", "0", "1,000.75"]
+    lines = ["Latitude,Longitude,Asset Value (USD),Crop Type,Owner,Year"]
+    for _ in range(n_rows):
+        value = rng.choice(values)
+        lines.append(f"{rng.uniform(-60, 60):.4f},{rng.uniform(-170, 170):.4f},\"{value}\","
+                     f"{rng.choice(['maize', 'cocoa', ''])},{rng.choice(['a', 'b', ''])},{rng.choice(['2030', ''])}")
+    return "\n".join(lines) + "\n"
+
+
+class TestMatchesRowParser:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_messy_text_values(self, seed):
+        _assert_same_as_legacy(_messy_csv(300, seed))
+
+    def test_numeric_value_column(self):
+        _assert_same_as_legacy("lat,lon,value,crop\n1,2,100,maize\n3,4,-2.5,soy\n5,6,,rice\n7,8,1234567.891,maize\n")
+
+    def test_integer_value_column(self):
+        _assert_same_as_legacy("lat,lon,price,crop_type,site\n1,2,100,maize,x\n3,4,250000,soy,y\n")
+
+    def test_value_column_by_position(self):
+        _assert_same_as_legacy("lat,lon,worth,crop_type\n1,2,3k,maize\n")
+
+    def test_blank_rows_and_columns_are_dropped(self):
+        _assert_same_as_legacy("lat,lon,value,crop,empty\n1,2,5m,maize,\n,,,,\n3,4,6k,soy,\n")
+
+
+def _legacy_value(raw):
+    raw_val = str(raw).lower()
+    multiplier = 1
+    if "m" in raw_val:
+        multiplier = 1000000
+    elif "k" in raw_val:
+        multiplier = 1000
+    elif "b" in raw_val:
+        multiplier = 1000000000
+    clean_val = re.sub(r"[^0-9.]", "", raw_val)
+    try:
+        return float(clean_val) * multiplier if clean_val else 0.0
+    except ValueError:
+        return 0.0
+
+
+class TestParseAssetValues:
+    @pytest.mark.parametrize("extra", [
+        [],
+        ["\u20ac2m", "5\u212a", "\u0663\u0664k"],   # non-ASCII text
+        ["two\nlines 3k"],                          # newline inside a quoted value
+        ["1" * 80 + "k", "9" * 70 + ".5"],           # long digit runs
+    ])
+    def test_matches_per_value_rules(self, extra):
+        rng = random.Random(len(extra))
+        pieces = ["m", "K", "b", "$", ",", " ", ".", "-", "x", "e"] + [str(d) for d in range(10)] * 3
+        values = ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 14))) for _ in range(500)] + extra
+        np.testing.assert_array_equal(parse_asset_values(pd.Series(values, dtype=object)), [_legacy_value(v) for v in values])
+
+    def test_conversion_is_correctly_rounded(self):
+        rng = random.Random(0)
+        values = [f"{rng.uniform(0, 1e12):.{rng.randint(0, 17)}f}" for _ in range(5000)]
+        np.testing.assert_array_equal(parse_asset_values(pd.Series(values)), [float(v) for v in values])
+
+    def test_suffixes(self):
+        values = pd.Series(["5m", "200K", "1b", "$1,250", "mk", "nothing", None])
+        np.testing.assert_array_equal(parse_asset_values(values), [5e6, 2e5, 1e9, 1250.0, 0.0, 0.0, 0.0])
+
+    def test_numeric_columns_are_taken_as_is(self):
+        values = pd.Series([1e20, 1.5e-05, -3.0, np.nan])
+        np.testing.assert_array_equal(parse_asset_values(values), [1e20, 1.5e-05, 3.0, 0.0])
+
+    def test_dtype_is_float64(self):
+        assert parse_asset_values(pd.Series([1, 2, 3])).dtype == np.float64
+        assert parse_asset_values(pd.Series(["1k"])).dtype == np.float64
+
+
+class TestPortfolioRecords:
+    def test_columns_and_lazy_records(self):
+        records, _ = parse_portfolio_csv(b"lat,lon,value,crop,owner\n1.5,2,5m,maize,a\n3,4.25,6k,soy,b\n")
+        assert isinstance(records, PortfolioRecords)
+        assert records.lat.dtype == records.lon.dtype == records.asset_value.dtype == np.float64
+        assert records[1] == {"lat": 3.0, "lon": 4.25, "asset_value": 6000.0, "crop_type": "soy", "owner": "b"}
+        assert records[-1] == records[1] and records[0:1] == [records[0]]
+        assert [r["owner"] for r in records] == ["a", "b"]
+
+    def test_missing_column(self):
+        with pytest.raises(HTTPException) as exc:
+            parse_portfolio_csv(b"lat,lon,value\n1,2,3\n")
+        assert exc.value.status_code == 400
+
+    def test_non_numeric_latitude(self):
+        with pytest.raises(ValueError):
+            parse_portfolio_csv(b"lat,lon,value,crop\nnorth,2,3,maize\n")
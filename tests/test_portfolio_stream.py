@@ -0,0 +1,147 @@
+"""
+Unit tests for the streaming portfolio analysis
+(/api/v1/portfolio/analyze-csv/stream) and the running PortfolioAggregator.
+
+The streamed ``portfolio_summary`` must match the one analyze-csv returns
+for the same upload, and each asset must be sent as soon as it completes.
+"""
+
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import asset_scheduler
+from asset_scheduler import AssetScheduler
+from routers import portfolio
+
+CSV = (
+    "lat,lon,asset_value,crop_type,owner\n"
+    "6.5,-1.5,100k,cocoa,a\n"
+    "42.0,-93.5,2.5m,maize,b\n"
+    "6.5,-1.5,50000,banana,c\n"
+    "-15.5,-47.7,750000,soy,d\n"
+    "40.0,-95.0,1.2m,maize,e\n"
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(asset_scheduler, "default_scheduler", AssetScheduler(concurrency=2))
+    app = FastAPI()
+    app.include_router(portfolio.router)
+    return TestClient(app)
+
+
+def _upload(client, path, csv=CSV):
+    files = {"file": ("portfolio.csv", io.BytesIO(csv.encode()), "text/csv")}
+    return client.post(f"/api/v1/portfolio/{path}", files=files)
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestStreamEndpoint:
+    def test_stream_layout(self, client):
+        response = _upload(client, "analyze-csv/stream")
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = _lines(response)
+        assert lines[0] == {"type": "started", "total_assets": 5}
+        assert [line["type"] for line in lines[1:-1]] == ["asset_result"] * 5
+        assert sorted(line["result"]["row_index"] for line in lines[1:-1]) == [0, 1, 2, 3, 4]
+        assert lines[-1]["type"] == "portfolio_summary"
+
+    def test_summary_matches_analyze_csv(self, client):
+        streamed = _lines(_upload(client, "analyze-csv/stream"))
+        body = _upload(client, "analyze-csv").json()
+        summary, expected = streamed[-1]["portfolio_summary"], body["portfolio_summary"]
+        assert summary.pop("crop_distribution") == expected.pop("crop_distribution") == {"maize": 2, "cocoa": 1, "banana": 1, "soy": 1}
+        # Completion order only changes the order of float additions
+        assert summary == pytest.approx(expected)
+        assert (summary["total_assets"], summary["successful_simulations"], summary["failed_simulations"]) == (5, 4, 1)
+        by_row = {line["result"]["row_index"]: line["result"] for line in streamed[1:-1]}
+        assert by_row[2]["status"] == "error" and by_row[4]["input"]["owner"] == "e"
+
+    def test_missing_columns_fail_before_streaming(self, client):
+        response = _upload(client, "analyze-csv/stream", "name,city\nx,y\n")
+        assert response.status_code == 400
+        assert "Missing required columns" in response.json()["detail"]
+
+    def test_empty_upload(self, client):
+        assert _upload(client, "analyze-csv/stream", "").status_code == 400
+
+
+class TestStreamAssets:
+    def test_first_result_is_sent_before_the_rest_finish(self, monkeypatch):
+        monkeypatch.setattr(asset_scheduler, "default_scheduler", AssetScheduler(concurrency=2))
+        release = threading.Event()
+        simulate = portfolio.run_asset_simulation
+
+        def blocked_after_first(row_data, row_index):
+            if row_index > 0:
+                release.wait(5)
+            return simulate(row_data, row_index)
+
+        monkeypatch.setattr(portfolio, "run_asset_simulation", blocked_after_first)
+        records, crops = portfolio.parse_portfolio_csv(CSV.encode())
+
+        async def first_two():
+            stream = portfolio.stream_assets(records, crops)
+            try:
+                return [json.loads(await stream.__anext__()) for _ in range(2)]
+            finally:
+                release.set()
+                await stream.aclose()
+
+        started, first = asyncio.run(first_two())
+        assert started["type"] == "started"
+        assert first["type"] == "asset_result" and first["result"]["row_index"] == 0
+
+    def test_run_failure_ends_with_error_line(self, monkeypatch):
+        class Broken(AssetScheduler):
+            async def run(self, *args, **kwargs):
+                raise RuntimeError("pool gone")
+                yield
+
+        monkeypatch.setattr(asset_scheduler, "default_scheduler", Broken())
+        records, crops = portfolio.parse_portfolio_csv(CSV.encode())
+
+        async def collect():
+            return [json.loads(line) async for line in portfolio.stream_assets(records, crops)]
+
+        lines = asyncio.run(collect())
+        assert lines[-1] == {"type": "error", "detail": "Portfolio analysis failed: pool gone"}
+
+
+class TestPortfolioAggregator:
+    def test_order_independent_totals(self):
+        results = [
+            {"status": "success", "input": {"asset_value": 100.0}, "monte_carlo": {"var_95": -10.0},
+             "resilience_score": 80, "financial": {"npv_usd": 5.0}, "risk": {"expected_loss_usd": 2.0},
+             "resilient_score_data": {"resilient_score": 70}},
+            {"status": "success", "input": {"asset_value": 300.0}, "monte_carlo": {"var_95": 30.0},
+             "resilience_score": "n/a", "resilient_score_data": None},
+            {"status": "error", "input": {"asset_value": 600.0}},
+        ]
+        forward, backward = portfolio.PortfolioAggregator(), portfolio.PortfolioAggregator()
+        for result in results:
+            forward.add(result)
+        for result in reversed(results):
+            backward.add(result)
+        summary = forward.summary({"maize": 3})
+        assert summary == backward.summary({"maize": 3})
+        assert summary["total_portfolio_value_usd"] == 1000.0
+        assert summary["total_value_at_risk_usd"] == 40.0
+        assert summary["risk_exposure_pct"] == 4.0
+        assert summary["average_resilience_score"] == 80.0
+        assert summary["average_resilient_score"] == 70.0
+        assert (summary["successful_simulations"], summary["failed_simulations"]) == (2, 1)
+
+    def test_empty(self):
+        summary = portfolio.PortfolioAggregator().summary({})
+        assert summary["total_assets"] == 0 and summary["average_resilient_score"] is None
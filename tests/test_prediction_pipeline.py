@@ -0,0 +1,133 @@
+"""
+Unit tests for the concurrent hazard fetch in routers/prediction.
+
+Lookups are replaced with slow fakes to check that /predict and /get-hazard
+run them concurrently, time out slow datasets onto their fallbacks, and report
+per-stage timings.
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from auth import get_current_user
+from routers import prediction
+
+DELAY_S = 0.3
+
+
+def _slow(value, delay=DELAY_S):
+    def lookup(*args, **kwargs):
+        time.sleep(delay)
+        return value
+    return lookup
+
+
+def _failing(*args, **kwargs):
+    raise RuntimeError("GEE unavailable")
+
+
+WEATHER = {"max_temp_celsius": 31.0, "total_precip_mm": 700.0}
+MONTHLY = {"rainfall_monthly_mm": [50.0] * 12, "soil_moisture_monthly": [0.3] * 12}
+TERRAIN = {"elevation_m": 250.0, "soil_ph": 6.8}
+SPATIAL = {"viable_area_pct": 72.5}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(prediction, "get_weather_data", _slow(WEATHER))
+    monkeypatch.setattr(prediction, "get_monthly_data", _slow(MONTHLY))
+    monkeypatch.setattr(prediction, "get_terrain_data", _slow(TERRAIN))
+    monkeypatch.setattr(prediction, "analyze_spatial_viability", _slow(SPATIAL))
+
+    app = FastAPI()
+    app.include_router(prediction.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    return TestClient(app)
+
+
+class TestPredict:
+    def test_lookups_run_concurrently(self, client):
+        start = time.perf_counter()
+        response = client.post("/api/v1/prediction/predict", json={"lat": 6.5, "lon": -1.5, "crop_type": "maize", "temp_increase": 2.0})
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["input_conditions"]["data_source"] == "gee_auto_lookup"
+        assert data["spatial_analysis"] == SPATIAL
+        assert data["chart_data"]["rainfall_baseline"] == [50.0] * 12
+        # Three 0.3 s lookups; sequential would take at least 0.9 s
+        assert elapsed < 3 * DELAY_S
+
+        timings = data["timings_ms"]
+        assert set(timings) == {"weather", "monthly", "spatial", "hazard_fetch", "total"}
+        assert timings["hazard_fetch"] < 3 * DELAY_S * 1000
+
+    def test_slow_lookup_times_out_without_stalling(self, client, monkeypatch):
+        monkeypatch.setattr(prediction, "get_monthly_data", _slow(MONTHLY, delay=5.0))
+        monkeypatch.setitem(prediction.LOOKUP_TIMEOUTS_S, "monthly", 0.5)
+
+        start = time.perf_counter()
+        response = client.post("/api/v1/prediction/predict", json={"lat": 6.5, "lon": -1.5, "crop_type": "maize"})
+
+        assert time.perf_counter() - start < 2.0
+        data = response.json()["data"]
+        assert data["input_conditions"]["data_source"] == "gee_auto_lookup"
+        assert "chart_data" not in data
+
+    def test_weather_failure_uses_fallback_and_ignores_location_lookups(self, client, monkeypatch):
+        monkeypatch.setattr(prediction, "get_weather_data", _failing)
+
+        response = client.post("/api/v1/prediction/predict", json={"lat": 6.5, "lon": -1.5, "crop_type": "maize", "temp_increase": 1.0})
+
+        data = response.json()["data"]
+        assert data["input_conditions"]["data_source"] == "fallback"
+        assert data["input_conditions"]["max_temp_celsius"] == prediction.FALLBACK_WEATHER["max_temp_celsius"]
+        assert "chart_data" not in data
+        assert "spatial_analysis" not in data
+
+    def test_weather_failure_cancels_location_lookups(self, client, monkeypatch):
+        monkeypatch.setattr(prediction, "get_weather_data", _failing)
+        monkeypatch.setattr(prediction, "get_monthly_data", _slow(MONTHLY, delay=2.0))
+        monkeypatch.setattr(prediction, "analyze_spatial_viability", _slow(SPATIAL, delay=2.0))
+
+        start = time.perf_counter()
+        response = client.post("/api/v1/prediction/predict", json={"lat": 6.5, "lon": -1.5, "crop_type": "maize", "temp_increase": 1.0})
+
+        # Not held for the 2 s lookups whose results would be discarded
+        assert time.perf_counter() - start < 1.0
+        data = response.json()["data"]
+        assert data["input_conditions"]["data_source"] == "fallback"
+        assert data["timings_ms"]["hazard_fetch"] < 1000
+
+    def test_manual_mode_skips_hazard_fetch(self, client):
+        response = client.post("/api/v1/prediction/predict", json={"temp": 30.0, "rain": 800.0, "crop_type": "maize"})
+
+        timings = response.json()["data"]["timings_ms"]
+        assert set(timings) == {"total"}
+
+
+class TestGetHazard:
+    def test_weather_and_terrain_fetched_concurrently(self, client):
+        start = time.perf_counter()
+        response = client.post("/api/v1/prediction/get-hazard", json={"lat": 6.5, "lon": -1.5})
+
+        assert time.perf_counter() - start < 2 * DELAY_S
+        data = response.json()["data"]
+        assert data["hazard_metrics"]["max_temp_celsius"] == 31.0
+        assert data["hazard_metrics"]["elevation_m"] == 250.0
+        assert set(data["timings_ms"]) == {"weather", "terrain", "hazard_fetch"}
+
+    def test_terrain_timeout_falls_back(self, client, monkeypatch):
+        monkeypatch.setattr(prediction, "get_terrain_data", _slow(TERRAIN, delay=5.0))
+        monkeypatch.setitem(prediction.LOOKUP_TIMEOUTS_S, "terrain", 0.5)
+
+        response = client.post("/api/v1/prediction/get-hazard", json={"lat": 6.5, "lon": -1.5})
+
+        metrics = response.json()["data"]["hazard_metrics"]
+        assert metrics["max_temp_celsius"] == 31.0
+        assert metrics["elevation_m"] == prediction.FALLBACK_TERRAIN["elevation_m"]
+        assert metrics["soil_ph"] == prediction.FALLBACK_TERRAIN["soil_ph"]
@@ -0,0 +1,84 @@
+"""
+Unit tests for the vectorized sensitivity engine (sensitivity_engine.run_sensitivity_batch).
+
+The batch path must return the same sensitivity_ranking structure as the
+scalar run_sensitivity_analysis, location by location.
+"""
+
+import numpy as np
+import pytest
+
+from physics_engine import SUPPORTED_CROPS
+from sensitivity_engine import (
+    SHOCKS,
+    run_parallel_sensitivity,
+    run_sensitivity_analysis,
+    run_sensitivity_batch,
+)
+
+
+def _location(temp, rain, crop, **assumptions):
+    return {
+        "climate_conditions": {"temperature_c": temp, "rainfall_mm": rain},
+        "crop_analysis": {"crop_type": crop},
+        "financial_analysis": {"assumptions": assumptions},
+    }
+
+
+@pytest.fixture
+def atlas():
+    rng = np.random.default_rng(7)
+    n = 1000
+    return [
+        _location(
+            float(t), float(r), str(c),
+            capex=float(capex), opex=float(opex), price_per_ton=float(price),
+            discount_rate_pct=float(rate), analysis_years=int(years),
+        )
+        for t, r, c, capex, opex, price, rate, years in zip(
+            rng.uniform(15, 40, n), rng.uniform(0, 3000, n), rng.choice(SUPPORTED_CROPS, n),
+            rng.uniform(500, 5000, n), rng.uniform(0, 800, n), rng.uniform(100, 6000, n),
+            rng.choice([0.0, 5.0, 10.0], n), rng.choice([0, 1, 10, 20], n),
+        )
+    ]
+
+
+class TestMatchesScalar:
+    def test_every_location(self, atlas):
+        batch = run_sensitivity_batch(atlas)
+        for location, result in zip(atlas, batch):
+            expected = run_sensitivity_analysis(location)
+            assert result["primary_driver"] == expected["primary_driver"]
+            assert result["baseline_npv"] == pytest.approx(expected["baseline_npv"], abs=0.011)
+            assert [s["driver"] for s in result["sensitivity_ranking"]] == \
+                [s["driver"] for s in expected["sensitivity_ranking"]]
+            for got, want in zip(result["sensitivity_ranking"], expected["sensitivity_ranking"]):
+                assert got["shocked_npv"] == pytest.approx(want["shocked_npv"], abs=0.011)
+                assert got["impact_pct"] == pytest.approx(want["impact_pct"], abs=0.011)
+
+    def test_defaults_and_mixed_case_crop(self):
+        locations = [{}, _location(23.3, 796.9, "RICE")]
+        assert run_sensitivity_batch(locations) == [run_sensitivity_analysis(loc) for loc in locations]
+
+    def test_result_structure(self, atlas):
+        result = run_sensitivity_batch(atlas[:1])[0]
+        assert set(result) == {"baseline_npv", "primary_driver", "driver_impact_pct", "sensitivity_ranking"}
+        assert sorted(s["driver"] for s in result["sensitivity_ranking"]) == sorted(s[0] for s in SHOCKS)
+
+
+class TestParallelSensitivity:
+    def test_chunking_preserves_order(self, atlas):
+        assert run_parallel_sensitivity(atlas, chunk_size=64) == run_sensitivity_batch(atlas)
+
+    def test_invalid_locations_get_error_results(self, atlas):
+        locations = [atlas[0], _location(25.0, 1000.0, "banana"), _location("hot", 1000.0, "maize"), atlas[1]]
+        results = run_parallel_sensitivity(locations)
+
+        assert results[1]["primary_driver"] == "Error"
+        assert "banana" in results[1]["error"]
+        assert results[2]["primary_driver"] == "Error"
+        assert results[0] == run_sensitivity_batch(atlas[:1])[0]
+        assert results[3] == run_sensitivity_batch(atlas[1:2])[0]
+
+    def test_empty(self):
+        assert run_parallel_sensitivity([]) == []
@@ -0,0 +1,124 @@
+"""
+Unit tests for the variance-based (Sobol) mode of sensitivity_engine.
+
+The estimators are checked against the analytic indices of the Ishigami
+function; the per-location analysis is checked for structure, speed and the
+executive-summary wording in run_diagnostic_atlas.
+"""
+
+import time
+
+import numpy as np
+import pytest
+from scipy.stats import qmc
+
+from run_diagnostic_atlas import update_executive_summary
+from sensitivity_engine import (
+    SOBOL_FACTORS,
+    run_sobol_analysis,
+    run_sobol_batch,
+    saltelli_sample,
+    sobol_indices,
+)
+
+LOCATION = {
+    "climate_conditions": {"temperature_c": 29.0, "rainfall_mm": 700.0},
+    "crop_analysis": {"crop_type": "maize"},
+    "financial_analysis": {"assumptions": {"capex": 2000.0, "opex": 425.0, "price_per_ton": 4000.0}},
+}
+
+
+def _ishigami_outputs(n=2 ** 15, a=7.0, b=0.1):
+    k = 3
+    unit = qmc.Sobol(d=2 * k, scramble=True, seed=1).random(n)
+    A, B = (unit[:, :k] * 2 - 1) * np.pi, (unit[:, k:] * 2 - 1) * np.pi
+    blocks = [A, B]
+    for i in range(k):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    x = np.stack(blocks)
+    return np.sin(x[..., 0]) + a * np.sin(x[..., 1]) ** 2 + b * x[..., 2] ** 4 * np.sin(x[..., 0])
+
+
+class TestEstimators:
+    def test_ishigami_analytic_indices(self):
+        first_order, total_order = sobol_indices(_ishigami_outputs())
+        np.testing.assert_allclose(first_order, [0.3139, 0.4424, 0.0], atol=0.02)
+        np.testing.assert_allclose(total_order, [0.5576, 0.4424, 0.2437], atol=0.02)
+
+    def test_constant_output_has_zero_indices(self):
+        first_order, total_order = sobol_indices(np.ones((5, 64)))
+        assert not first_order.any() and not total_order.any()
+
+    def test_leading_axes_are_kept(self):
+        outputs = np.stack([_ishigami_outputs(n=256)] * 2)
+        first_order, _ = sobol_indices(outputs)
+        assert first_order.shape == (2, 3)
+
+
+class TestSaltelliSample:
+    def test_design_layout(self):
+        design = saltelli_sample(1000, seed=3)
+        k = len(SOBOL_FACTORS)
+        assert design.shape == (k + 2, 1024, k)
+        for i, (_, _, low, high) in enumerate(SOBOL_FACTORS):
+            assert design[..., i].min() >= low and design[..., i].max() <= high
+            # AB_i is A with column i from B
+            np.testing.assert_array_equal(design[i + 2, :, i], design[1, :, i])
+            others = [j for j in range(k) if j != i]
+            np.testing.assert_array_equal(design[i + 2][:, others], design[0][:, others])
+
+
+class TestSobolAnalysis:
+    def test_result_structure(self):
+        result = run_sobol_analysis(LOCATION, n_samples=4096)
+        assert result["method"] == "sobol"
+        assert result["n_samples"] == 4096
+        assert {s["driver"] for s in result["sobol_indices"]} == {f[0] for f in SOBOL_FACTORS}
+        totals = [s["total_order"] for s in result["sobol_indices"]]
+        assert totals == sorted(totals, reverse=True)
+        primary = max(result["sobol_indices"], key=lambda s: s["first_order"])
+        assert result["primary_driver"] == primary["driver"]
+        assert result["driver_impact_pct"] == pytest.approx(primary["first_order"] * 100, abs=0.01)
+
+    def test_indices_are_consistent(self):
+        result = run_sobol_analysis(LOCATION)
+        first_sum = sum(s["first_order"] for s in result["sobol_indices"])
+        assert first_sum == pytest.approx(1.0, abs=0.05)
+        for s in result["sobol_indices"]:
+            assert s["total_order"] >= s["first_order"] - 0.02
+
+    def test_climate_does_not_matter_below_heat_threshold(self):
+        cool = dict(LOCATION, climate_conditions={"temperature_c": 15.0, "rainfall_mm": 900.0})
+        indices = {s["driver"]: s for s in run_sobol_analysis(cool)["sobol_indices"]}
+        assert indices["Climate"]["total_order"] == 0.0
+
+    def test_reproducible_for_a_seed(self):
+        assert run_sobol_analysis(LOCATION, seed=5) == run_sobol_analysis(LOCATION, seed=5)
+
+    def test_well_under_a_second_per_location(self):
+        start = time.perf_counter()
+        run_sobol_analysis(LOCATION, n_samples=16384)
+        assert time.perf_counter() - start < 0.5
+
+    def test_invalid_location_gets_error_result(self):
+        results = run_sobol_batch([{"crop_analysis": {"crop_type": "banana"}}, LOCATION], n_samples=256)
+        assert results[0]["primary_driver"] == "Error"
+        assert results[1]["method"] == "sobol"
+
+
+class TestExecutiveSummary:
+    SUMMARY = "INVESTABLE: Strong returns. Resilient seed pays back quickly."
+
+    def test_sobol_reports_share_of_variance(self):
+        location = {"executive_summary": self.SUMMARY,
+                    "sensitivity_analysis": {"method": "sobol", "primary_driver": "Market Price", "driver_impact_pct": 80.1}}
+        assert "Market Price which accounts for 80.1% of variance." in update_executive_summary(location)
+
+    def test_stress_tests_report_npv_drop(self):
+        location = {"executive_summary": self.SUMMARY,
+                    "sensitivity_analysis": {"primary_driver": "Climate (+2°C)", "driver_impact_pct": 12.5}}
+        summary = update_executive_summary(location)
+        assert "Climate Sensitivity which reduces NPV by 12.5% under stress." in summary
+        assert "variance" not in summary
@@ -0,0 +1,105 @@
+"""
+Unit tests for the in-process simulation engine.
+
+Checks that simulation_engine produces the same output as the headless_runner
+CLI and that the portfolio router's in-process batches behave like the old
+per-row subprocess calls.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from simulation_engine import SimulationParams, run_simulation, run_simulations
+from routers.portfolio import run_asset_simulation
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _strip_timestamp(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k != "execution_timestamp"}
+
+
+class TestSimulationParams:
+    def test_rejects_unknown_project_type(self):
+        with pytest.raises(ValueError):
+            SimulationParams(lat=0.0, lon=0.0, project_type="volcano")
+
+    def test_rejects_unknown_crop(self):
+        with pytest.raises(ValueError):
+            SimulationParams(lat=0.0, lon=0.0, crop_type="banana")
+
+    def test_rejects_out_of_range_coordinates(self):
+        with pytest.raises(ValueError):
+            SimulationParams(lat=95.0, lon=0.0)
+
+
+class TestRunSimulation:
+    @pytest.mark.parametrize("project_type", ["agriculture", "health"])
+    def test_matches_headless_runner_cli(self, project_type):
+        """In-process output should be identical to the CLI's JSON output."""
+        env = os.environ.copy()
+        env["FINANCIAL_CAPEX"] = "9000"
+        env["FINANCIAL_OPEX"] = "900"
+        proc = subprocess.run(
+            [
+                sys.executable, str(REPO_ROOT / "headless_runner.py"),
+                "--lat", "12.3", "--lon", "45.6", "--scenario_year", "2050",
+                "--project_type", project_type, "--crop_type", "rice",
+                "--temp_delta", "1.5", "--use-mock-data",
+            ],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        cli_result = json.loads(proc.stdout)
+
+        result = run_simulation(SimulationParams(
+            lat=12.3, lon=45.6, scenario_year=2050, project_type=project_type,
+            crop_type="rice", temp_delta=1.5, capex=9000.0, opex=900.0,
+            use_mock_data=True,
+        ))
+
+        assert _strip_timestamp(result) == _strip_timestamp(cli_result)
+
+    def test_financial_assumptions_come_from_params(self):
+        result = run_simulation(SimulationParams(
+            lat=5.6, lon=-0.2, capex=1234.0, opex=56.0, discount_rate=0.05,
+            analysis_years=5, use_mock_data=True,
+        ))
+        assumptions = result["financial_analysis"]["assumptions"]
+        assert assumptions["capex"] == 1234.0
+        assert assumptions["opex"] == 56.0
+        assert assumptions["discount_rate_pct"] == pytest.approx(5.0)
+        assert len(result["financial_analysis"]["incremental_cash_flows"]) == 6
+
+    def test_batch_preserves_order(self):
+        params = [SimulationParams(lat=lat, lon=10.0, use_mock_data=True) for lat in (-30.0, 0.0, 40.0)]
+        results = run_simulations(params)
+        assert [r["location"]["lat"] for r in results] == [-30.0, 0.0, 40.0]
+        assert all(r["success"] for r in results)
+
+
+class TestPortfolioAssetSimulation:
+    def test_rows_keep_their_index(self):
+        rows = [
+            {"lat": 6.5, "lon": -1.5, "asset_value": 100000.0, "crop_type": "cocoa"},
+            {"lat": 42.0, "lon": -93.5, "asset_value": 250000.0, "crop_type": "maize"},
+        ]
+        results = [run_asset_simulation(row, 10 + offset) for offset, row in enumerate(rows)]
+        assert [r["row_index"] for r in results] == [10, 11]
+        assert all(r["status"] == "success" for r in results)
+        assert results[0]["financial_analysis"]["assumptions"]["capex"] == 100000.0
+        assert results[0]["financial_analysis"]["assumptions"]["opex"] == pytest.approx(10000.0)
+
+    def test_invalid_row_is_reported_not_raised(self):
+        rows = [
+            {"lat": 6.5, "lon": -1.5, "asset_value": 100000.0, "crop_type": "banana"},
+            {"lat": 6.5, "lon": -1.5, "asset_value": 100000.0, "crop_type": "cocoa"},
+        ]
+        results = [run_asset_simulation(row, index) for index, row in enumerate(rows)]
+        assert results[0]["status"] == "error"
+        assert "Invalid row data" in results[0]["error"]
+        assert results[1]["status"] == "success"
@@ -0,0 +1,191 @@
+"""
+Unit tests for single-flight request coalescing (single_flight).
+
+Identical concurrent calls — sync in threads or async on the event loop —
+should share one execution, and the counters should report the deduplication.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import gee_connector
+import single_flight
+from mock_earth_engine import MockEarthEngine
+from single_flight import SingleFlight, call_key
+
+
+@pytest.fixture
+def group(monkeypatch):
+    group = SingleFlight()
+    monkeypatch.setattr(single_flight, "default_group", group)
+    return group
+
+
+def _counting(delay=0.2):
+    calls = []
+    lock = threading.Lock()
+
+    def lookup(lat, lon, start_date=None, end_date=None):
+        with lock:
+            calls.append((lat, lon))
+        time.sleep(delay)
+        return {"lat": lat, "lon": lon}
+
+    return lookup, calls
+
+
+class TestCallKey:
+    def test_positional_and_keyword_calls_match(self):
+        lookup, _ = _counting()
+        assert call_key(lookup, (1.0, 2.0), {}) == call_key(lookup, (), {"lat": 1.0, "lon": 2.0})
+
+    def test_different_arguments_differ(self):
+        lookup, _ = _counting()
+        assert call_key(lookup, (1.0, 2.0), {}) != call_key(lookup, (1.0, 3.0), {})
+
+    def test_unhashable_arguments_fall_back_to_repr(self):
+        lookup, _ = _counting()
+        key = call_key(lookup, ([1.0], 2.0), {})
+        assert key == call_key(lookup, ([1.0], 2.0), {})
+
+
+class TestSyncCoalescing:
+    def test_concurrent_identical_calls_share_one_execution(self, group):
+        lookup, calls = _counting()
+        wrapped = single_flight.coalesced(lookup)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: wrapped(lat=6.5, lon=-1.5), range(8)))
+
+        assert len(calls) == 1
+        assert all(r == {"lat": 6.5, "lon": -1.5} for r in results)
+        metrics = group.get_metrics()
+        assert metrics["executions"] == 1
+        assert metrics["deduplicated"] == 7
+        assert metrics["in_flight"] == 0
+
+    def test_followers_get_independent_copies(self, group):
+        lookup, _ = _counting()
+        wrapped = single_flight.coalesced(lookup)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: wrapped(6.5, -1.5), range(4)))
+
+        results[0]["lat"] = 0.0
+        assert [r["lat"] for r in results[1:]] == [6.5, 6.5, 6.5]
+
+    def test_leader_mutations_do_not_reach_followers(self, group):
+        started = threading.Event()
+
+        def lookup(lat, lon):
+            started.set()
+            time.sleep(0.2)
+            return {"lat": lat, "lon": lon}
+
+        wrapped = single_flight.coalesced(lookup)
+
+        def leader():
+            result = wrapped(6.5, -1.5)
+            result["data_source"] = "leader"
+            return result
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            lead = pool.submit(leader)
+            started.wait()
+            followers = [pool.submit(wrapped, 6.5, -1.5) for _ in range(3)]
+            assert lead.result()["data_source"] == "leader"
+            results = [f.result() for f in followers]
+
+        assert group.get_metrics()["deduplicated"] == 3
+        assert all("data_source" not in r for r in results)
+
+    def test_errors_propagate_to_all_waiters(self, group):
+        def failing(lat, lon):
+            time.sleep(0.2)
+            raise RuntimeError("GEE unavailable")
+
+        wrapped = single_flight.coalesced(failing)
+
+        def call(_):
+            try:
+                wrapped(1.0, 2.0)
+            except RuntimeError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert list(pool.map(call, range(4))) == ["GEE unavailable"] * 4
+        assert group.get_metrics()["executions"] == 1
+
+    def test_sequential_calls_are_not_coalesced(self, group):
+        lookup, calls = _counting(delay=0)
+        wrapped = single_flight.coalesced(lookup)
+        wrapped(1.0, 2.0)
+        wrapped(1.0, 2.0)
+        assert len(calls) == 2
+
+    def test_gee_lookups_are_coalesced(self, group, monkeypatch):
+        engine = MockEarthEngine(latency_s=0.2)
+        monkeypatch.setattr(gee_connector, "ee", engine)
+        monkeypatch.setattr(gee_connector, "authenticate_gee", lambda: None)
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda _: gee_connector.get_terrain_data(lat=27.9, lon=86.9), range(6)))
+
+        assert engine.getinfo_calls == 1
+        assert all(r == results[0] for r in results)
+
+
+class TestAsyncCoalescing:
+    def test_concurrent_coroutines_share_one_execution(self, group):
+        lookup, calls = _counting()
+
+        async def main():
+            return await asyncio.gather(*(
+                single_flight.run_coalesced(asyncio.to_thread, lookup, 6.5, -1.5) for _ in range(10)
+            ))
+
+        results = asyncio.run(main())
+
+        assert len(calls) == 1
+        assert len(results) == 10
+        assert group.get_metrics()["deduplicated"] == 9
+
+    def test_leader_mutations_do_not_reach_followers(self, group):
+        lookup, _ = _counting(delay=0.1)
+
+        async def leader():
+            result = await single_flight.run_coalesced(asyncio.to_thread, lookup, 6.5, -1.5)
+            result["data_source"] = "leader"
+            return result
+
+        async def follower():
+            await asyncio.sleep(0)
+            result = await single_flight.run_coalesced(asyncio.to_thread, lookup, 6.5, -1.5)
+            return dict(result)
+
+        async def main():
+            return await asyncio.gather(leader(), *(follower() for _ in range(3)))
+
+        lead, *results = asyncio.run(main())
+
+        assert lead["data_source"] == "leader"
+        assert group.get_metrics()["deduplicated"] == 3
+        assert all("data_source" not in r for r in results)
+
+    def test_cancelled_waiter_does_not_cancel_shared_call(self, group):
+        lookup, calls = _counting(delay=0.3)
+
+        async def main():
+            impatient = asyncio.wait_for(single_flight.run_coalesced(asyncio.to_thread, lookup, 1.0, 2.0), 0.05)
+            patient = single_flight.run_coalesced(asyncio.to_thread, lookup, 1.0, 2.0)
+            return await asyncio.gather(impatient, patient, return_exceptions=True)
+
+        timed_out, result = asyncio.run(main())
+
+        assert isinstance(timed_out, asyncio.TimeoutError)
+        assert result == {"lat": 1.0, "lon": 2.0}
+        assert len(calls) == 1
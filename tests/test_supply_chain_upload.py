@@ -0,0 +1,175 @@
+"""
+Unit tests for bulk supply chain network ingestion (/api/v1/supply-chain/upload).
+
+The streaming, batched upload must store exactly what the per-row ORM
+version stored: one node per distinct id (labelled from its first row) and
+one edge per CSV row, in order, and nothing at all for a rejected file.
+"""
+
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models import SupplyChainEdge, SupplyChainNode, create_missing_indexes
+from routers import supply_chain
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "examples" / "sample_supply_chain.csv"
+HEADER = "source_id,source_label,source_type,target_id,target_label,target_type\n"
+
+
+@pytest.fixture
+def engine():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(supply_chain, "async_session", async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    app = FastAPI()
+    app.include_router(supply_chain.router)
+    return TestClient(app)
+
+
+def _upload(client, text, filename="network.csv"):
+    return client.post("/api/v1/supply-chain/upload", files={"file": (filename, io.BytesIO(text.encode()), "text/csv")})
+
+
+def _stored(engine, network_id=None):
+    async def load():
+        async with engine.connect() as conn:
+            nodes = (await conn.execute(
+                select(SupplyChainNode.network_id, SupplyChainNode.node_id, SupplyChainNode.label, SupplyChainNode.node_type)
+                .order_by(SupplyChainNode.id))).all()
+            edges = (await conn.execute(
+                select(SupplyChainEdge.network_id, SupplyChainEdge.source_node_id, SupplyChainEdge.target_node_id)
+                .order_by(SupplyChainEdge.id))).all()
+        return nodes, edges
+
+    return asyncio.run(load())
+
+
+def _chain_csv(n_edges):
+    rows = [f"n{i},Node {i},Supplier,n{i + 1},Node {i + 1},Port" for i in range(n_edges)]
+    return HEADER + "\n".join(rows) + "\n"
+
+
+class TestUpload:
+    def test_sample_network(self, client, engine):
+        response = _upload(client, SAMPLE_CSV.read_text())
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["nodes_created"], body["edges_created"]) == (8, 8)
+
+        nodes, edges = _stored(engine)
+        assert len(nodes) == 8 and len(edges) == 8
+        assert {n.network_id for n in nodes} == {body["network_id"]}
+        assert nodes[0][1:] == ("taiwan_fab", "Taiwan Semiconductor Fab", "Supplier")
+        assert edges[0][1:] == ("taiwan_fab", "shenzhen_assembly")
+
+    def test_first_occurrence_labels_and_stripping(self, client, engine):
+        text = HEADER + " a , Alpha ,Supplier,b,Beta,Port\nb,Renamed,Hub, a ,Other,Other\n"
+        body = _upload(client, text).json()
+        assert (body["nodes_created"], body["edges_created"]) == (2, 2)
+        nodes, edges = _stored(engine)
+        assert [n[1:] for n in nodes] == [("a", "Alpha", "Supplier"), ("b", "Beta", "Port")]
+        assert [e[1:] for e in edges] == [("a", "b"), ("b", "a")]
+
+    def test_batches_match_single_pass(self, client, engine, monkeypatch):
+        monkeypatch.setattr(supply_chain, "UPLOAD_BATCH_ROWS", 7)
+        text = _chain_csv(50) + "n0,Node 0,Supplier,n25,Node 25,Port\n"
+        body = _upload(client, text).json()
+        assert (body["nodes_created"], body["edges_created"]) == (51, 51)
+        nodes, edges = _stored(engine)
+        assert [n[1] for n in nodes] == [f"n{i}" for i in range(51)]
+        assert [e[1:] for e in edges][-1] == ("n0", "n25")
+
+    def test_blank_lines_are_skipped(self, client, engine, monkeypatch):
+        monkeypatch.setattr(supply_chain, "UPLOAD_BATCH_ROWS", 2)
+        rows = _chain_csv(5)[len(HEADER):].splitlines()
+        text = HEADER + rows[0] + "\n\n\n,,,,,\n\n" + "\n".join(rows[1:]) + "\n\n"
+        body = _upload(client, text).json()
+        assert (body["nodes_created"], body["edges_created"]) == (6, 5)
+        assert len(_stored(engine)[1]) == 5
+
+    def test_trailing_blank_line(self, client):
+        response = _upload(client, HEADER + "a,Alpha,Supplier,b,Beta,Port\n\n")
+        assert response.status_code == 200
+        assert response.json()["edges_created"] == 1
+
+    def test_cascade_on_uploaded_network(self, client):
+        network_id = _upload(client, SAMPLE_CSV.read_text()).json()["network_id"]
+        response = client.post("/api/v1/supply-chain/simulate-cascade", json={
+            "network_id": network_id, "disrupted_node_id": "port_la", "hazard_severity": "Severe",
+        })
+        statuses = {n["id"]: n["data"]["status"] for n in response.json()["nodes"]}
+        assert statuses["port_la"] == "Critical"
+        assert statuses["chicago_dc"] == "Warning"
+
+
+class TestRejected:
+    @pytest.mark.parametrize("filename, text, detail", [
+        ("network.txt", HEADER, "File must be a CSV file"),
+        ("network.csv", "source_id,target_id\na,b\n", "CSV must contain columns"),
+        ("network.csv", "", "CSV must contain columns"),
+        ("network.csv", HEADER, "CSV contains no valid nodes"),
+    ])
+    def test_bad_files(self, client, engine, filename, text, detail):
+        response = _upload(client, text, filename)
+        assert response.status_code == 400
+        assert detail in response.json()["detail"]
+        assert _stored(engine) == ([], [])
+
+    def test_malformed_row_rolls_back_earlier_batches(self, client, engine, monkeypatch):
+        monkeypatch.setattr(supply_chain, "UPLOAD_BATCH_ROWS", 5)
+        text = _chain_csv(20) + "short_row,only\n"
+        response = _upload(client, text)
+        assert response.status_code == 400
+        assert "CSV line 22 has 2 fields" in response.json()["detail"]
+        assert _stored(engine) == ([], [])
+
+
+class TestIndexes:
+    def test_composite_indexes(self, engine):
+        async def indexes():
+            async with engine.connect() as conn:
+                return await conn.run_sync(lambda c: {
+                    table: {tuple(ix["column_names"]) for ix in inspect(c).get_indexes(table)}
+                    for table in ("supply_chain_nodes", "supply_chain_edges")
+                })
+
+        found = asyncio.run(indexes())
+        assert ("network_id", "node_id") in found["supply_chain_nodes"]
+        assert ("network_id", "source_node_id") in found["supply_chain_edges"]
+
+    def test_missing_indexes_are_added_to_existing_tables(self):
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+        async def run():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.exec_driver_sql("DROP INDEX ix_supply_chain_edges_network_source")
+                await conn.run_sync(create_missing_indexes)
+                await conn.run_sync(create_missing_indexes)
+                return (await conn.exec_driver_sql(
+                    "SELECT count(*) FROM sqlite_master WHERE name = 'ix_supply_chain_edges_network_source'")).scalar()
+
+        try:
+            assert asyncio.run(run()) == 1
+        finally:
+            asyncio.run(engine.dispose())
@@ -0,0 +1,199 @@
+"""
+Unit tests for the flood and coastal /predict-batch endpoints.
+
+The surrogate pickles are replaced with small random forests trained on the
+same feature columns. Each batch result must equal the single-scenario
+/predict response, while the model is called once per batch.
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestRegressor
+
+import model_registry
+from auth import get_current_user
+from model_registry import ModelRegistry
+from routers import coastal, flood
+
+
+class CountingModel:
+    """Wraps a fitted regressor and counts predict() calls."""
+
+    def __init__(self, model):
+        self.model = model
+        self.feature_names_in_ = model.feature_names_in_
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return self.model.predict(X)
+
+
+def _forest(columns, target):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 1, (300, len(columns))) * [150, 1, 10], columns=columns)
+    return RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0).fit(X, target(X.to_numpy()))
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    registry = ModelRegistry()
+    monkeypatch.setattr(model_registry, "default_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def flood_model(registry):
+    model = CountingModel(_forest(list(flood.FLOOD_FEATURES), lambda X: X[:, 0] * X[:, 1] * 2 / X[:, 2] ** 0.5))
+    registry.put(flood.FLOOD_MODEL, model)
+    return model
+
+
+@pytest.fixture
+def coastal_model(registry, monkeypatch):
+    model = CountingModel(_forest(list(coastal.COASTAL_FEATURES), lambda X: X[:, 0] / 30 + X[:, 1] - X[:, 2] / 20))
+    registry.put(coastal.COASTAL_MODEL, model)
+    lookups = []
+
+    def get_coastal_params(lat, lon):
+        lookups.append((lat, lon))
+        if lat == 0.0:
+            raise RuntimeError("GEE unavailable")
+        if lat == 1.0:
+            # Open ocean: no NASADEM slope
+            return {"slope_pct": None, "max_wave_height": 3.0}
+        return {"slope_pct": 2.0 + abs(lat) / 10, "max_wave_height": 3.0 + abs(lon) / 50}
+
+    monkeypatch.setattr(coastal, "get_coastal_params", get_coastal_params)
+    model.lookups = lookups
+    return model
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(flood.router)
+    app.include_router(coastal.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    return TestClient(app)
+
+
+def _flood_scenarios(n=40):
+    rng = np.random.default_rng(1)
+    interventions = list(flood.INTERVENTION_FACTORS)
+    return [
+        {"rain_intensity": float(r), "current_imperviousness": float(i), "intervention_type": interventions[k % len(interventions)],
+         "slope_pct": float(s), "global_warming": float(w), "daily_revenue": 5000.0, "expected_downtime_days": 3}
+        for k, (r, i, s, w) in enumerate(zip(rng.uniform(10, 150, n), rng.uniform(0, 1, n), rng.uniform(0.1, 10, n), rng.uniform(0, 3, n)))
+    ]
+
+
+class TestFloodBatch:
+    def test_matches_single_predictions(self, client, flood_model):
+        scenarios = _flood_scenarios()
+        batch = client.post("/api/v1/flood/predict-batch", json={"scenarios": scenarios}).json()
+        assert flood_model.calls == 1
+
+        assert batch["data"]["count"] == len(scenarios)
+        assert batch["data"]["failed"] == 0
+        for scenario, result in zip(scenarios, batch["data"]["results"]):
+            assert result == client.post("/api/v1/flood/predict", json=scenario).json()
+
+    def test_matches_per_row_dataframe_predictions(self, client, flood_model):
+        scenario = _flood_scenarios(1)[0]
+        depths = client.post("/api/v1/flood/predict-batch", json={"scenarios": [scenario]}).json()["data"]["results"][0]["data"]["predictions"]
+
+        row = pd.DataFrame({"rain_intensity_mm_hr": [scenario["rain_intensity"]], "impervious_pct": [scenario["current_imperviousness"]], "slope_pct": [scenario["slope_pct"]]})
+        assert depths["baseline_depth_cm"] == round(float(flood_model.model.predict(row)[0]), 2)
+
+    def test_invalid_scenarios_fail_individually(self, client, flood_model):
+        scenarios = _flood_scenarios(3)
+        scenarios[1]["rain_intensity"] = 500.0
+        scenarios[2]["intervention_type"] = "moat"
+        data = client.post("/api/v1/flood/predict-batch", json={"scenarios": scenarios}).json()["data"]
+
+        assert data["failed"] == 2
+        assert data["results"][0]["status"] == "success"
+        assert data["results"][1]["code"] == "INVALID_RAIN_INTENSITY"
+        assert data["results"][2]["code"] == "INVALID_INTERVENTION_TYPE"
+
+    def test_failure_after_prediction_is_counted(self, client, flood_model, monkeypatch):
+        build_result = flood._urban_flood_result
+
+        def failing_on_heavy_rain(scenario, *depths):
+            if scenario.rain_intensity > 100:
+                raise ZeroDivisionError("float division by zero")
+            return build_result(scenario, *depths)
+
+        monkeypatch.setattr(flood, "_urban_flood_result", failing_on_heavy_rain)
+        scenarios = _flood_scenarios(2)
+        scenarios[0]["rain_intensity"], scenarios[1]["rain_intensity"] = 50.0, 120.0
+        data = client.post("/api/v1/flood/predict-batch", json={"scenarios": scenarios}).json()["data"]
+
+        assert [r["status"] for r in data["results"]] == ["success", "error"]
+        assert data["failed"] == 1
+
+    def test_empty_batch_is_rejected(self, client, flood_model):
+        assert client.post("/api/v1/flood/predict-batch", json={"scenarios": []}).status_code == 422
+
+    def test_missing_model(self, client, registry, tmp_path):
+        registry.register(flood.FLOOD_MODEL, str(tmp_path / "flood_surrogate.pkl"))
+        response = client.post("/api/v1/flood/predict-batch", json={"scenarios": _flood_scenarios(1)})
+        assert response.status_code == 500
+        assert response.json()["code"] == "MODEL_NOT_FOUND"
+
+
+class TestCoastalBatch:
+    SCENARIOS = [
+        {"lat": 10.5, "lon": 100.2, "mangrove_width": 50.0},
+        {"lat": 10.5, "lon": 100.2, "mangrove_width": 5.0, "sea_level_rise": 0.8, "intervention": "Sea Wall"},
+        {"lat": -6.2, "lon": 39.3, "mangrove_width": 0.0, "daily_revenue": 1000.0, "expected_downtime_days": 2},
+    ]
+
+    def test_matches_single_predictions(self, client, coastal_model):
+        batch = client.post("/api/v1/coastal/predict-batch", json={"scenarios": self.SCENARIOS}).json()
+        assert coastal_model.calls == 1
+        # One lookup per distinct location
+        assert sorted(coastal_model.lookups) == [(-6.2, 39.3), (10.5, 100.2)]
+        assert batch["data"]["locations"] == 2
+
+        for scenario, result in zip(self.SCENARIOS, batch["data"]["results"]):
+            assert result == client.post("/api/v1/coastal/predict", json=scenario).json()
+
+    def test_failed_lookup_fails_only_its_scenarios(self, client, coastal_model):
+        scenarios = self.SCENARIOS + [{"lat": 0.0, "lon": 0.0, "mangrove_width": 20.0}]
+        data = client.post("/api/v1/coastal/predict-batch", json={"scenarios": scenarios}).json()["data"]
+
+        assert data["failed"] == 1
+        assert data["results"][3] == {"status": "error", "message": "Prediction failed: GEE unavailable", "code": "PREDICTION_ERROR"}
+        assert all(r["status"] == "success" for r in data["results"][:3])
+
+    def test_failure_after_prediction_is_counted(self, client, coastal_model):
+        scenarios = self.SCENARIOS[:1] + [{"lat": 1.0, "lon": 0.0, "mangrove_width": 20.0}]
+        response = client.post("/api/v1/coastal/predict-batch", json={"scenarios": scenarios})
+        data = response.json()["data"]
+
+        assert response.status_code == 200
+        assert data["results"][0]["status"] == "success"
+        assert data["results"][1]["status"] == "error" and data["results"][1]["code"] == "PREDICTION_ERROR"
+        assert data["failed"] == 1
+
+    def test_prediction_runs_off_the_event_loop(self, client, coastal_model, monkeypatch):
+        loops = []
+        predict_matrix = coastal.predict_matrix
+
+        def recording(*args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return predict_matrix(*args, **kwargs)
+
+        monkeypatch.setattr(coastal, "predict_matrix", recording)
+        assert client.post("/api/v1/coastal/predict-batch", json={"scenarios": self.SCENARIOS}).status_code == 200
+        assert loops == [None]
@@ -0,0 +1,203 @@
+"""
+Unit tests for cached authentication (user_cache, auth.get_current_user).
+
+Repeated requests with the same token must hit the users table once per TTL,
+ORM changes to a user must invalidate the cached row, and signed-claims mode
+must authenticate without any query.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import auth
+import user_cache
+from database import Base
+from models import User
+from security import create_access_token
+from user_cache import UserCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = UserCache(ttl_s=60, max_size=100)
+    monkeypatch.setattr(user_cache, "default_cache", cache)
+    monkeypatch.setattr(user_cache, "AUTH_TRUST_CLAIMS_S", 0.0)
+    return cache
+
+
+@pytest.fixture
+def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    user_queries = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            user_queries.append(statement)
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    sessions.user_queries = user_queries
+    yield sessions
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(db, cache):
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    @app.get("/whoami")
+    async def whoami(user: User = Depends(auth.get_current_user)):
+        return {"id": user.id, "email": user.email}
+
+    async def get_db():
+        async with db() as session:
+            yield session
+
+    app.dependency_overrides[auth.get_db] = get_db
+    return TestClient(app)
+
+
+def _register(client, email="analyst@example.com"):
+    response = client.post("/api/auth/register", json={"email": email, "password": "s3cret-pass"})
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def _user_id(client, headers):
+    return client.get("/whoami", headers=headers).json()["id"]
+
+
+async def _update(db, user_id, **values):
+    async with db() as session:
+        user = (await session.execute(select(User).where(User.id == user_id))).scalar_one()
+        for key, value in values.items():
+            setattr(user, key, value)
+        await session.commit()
+
+
+async def _delete(db, user_id):
+    async with db() as session:
+        user = (await session.execute(select(User).where(User.id == user_id))).scalar_one()
+        await session.delete(user)
+        await session.commit()
+
+
+class TestTtlCache:
+    def test_one_query_for_repeated_requests(self, client, db, cache):
+        headers = _register(client)
+        db.user_queries.clear()
+
+        for _ in range(5):
+            assert client.get("/whoami", headers=headers).status_code == 200
+
+        assert len(db.user_queries) == 1
+        stats = cache.get_stats()
+        assert stats["requests"] == 5
+        assert stats["cache_hits"] == 4
+        assert stats["db_queries_per_request"] == 0.2
+
+    def test_entries_expire(self, client, db, cache):
+        headers = _register(client)
+        cache.ttl_s = 0.05
+        _user_id(client, headers)
+        time.sleep(0.1)
+        db.user_queries.clear()
+        _user_id(client, headers)
+        assert len(db.user_queries) == 1
+
+    def test_disabled_cache_queries_every_request(self, client, db, cache):
+        headers = _register(client)
+        cache.ttl_s = 0
+        db.user_queries.clear()
+        for _ in range(3):
+            _user_id(client, headers)
+        assert len(db.user_queries) == 3
+
+    def test_cached_user_is_a_detached_copy(self, client, cache):
+        user_id = _user_id(client, _register(client))
+        first, second = cache.get(user_id), cache.get(user_id)
+        assert first is not second
+        assert inspect(first).transient
+        assert first.email == "analyst@example.com"
+
+
+class TestInvalidation:
+    def test_orm_update_invalidates(self, client, db, cache):
+        headers = _register(client)
+        user_id = _user_id(client, headers)
+
+        asyncio.run(_update(db, user_id, email="renamed@example.com"))
+
+        assert client.get("/whoami", headers=headers).json()["email"] == "renamed@example.com"
+        assert cache.get_stats()["invalidations"] == 1
+
+    def test_deleted_user_is_rejected(self, client, db):
+        headers = _register(client)
+        user_id = _user_id(client, headers)
+
+        asyncio.run(_delete(db, user_id))
+
+        response = client.get("/whoami", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "User not found"
+
+    def test_lru_bound(self):
+        cache = UserCache(ttl_s=60, max_size=2)
+        for i in range(3):
+            cache.put(User(id=str(i), email=f"{i}@example.com", hashed_password="x"))
+        assert cache.get("0") is None
+        assert cache.get("2").email == "2@example.com"
+
+
+class TestSignedClaims:
+    def test_recent_token_needs_no_query(self, client, db, cache, monkeypatch):
+        headers = _register(client)
+        monkeypatch.setattr(user_cache, "AUTH_TRUST_CLAIMS_S", 300.0)
+        db.user_queries.clear()
+
+        for _ in range(3):
+            assert client.get("/whoami", headers=headers).json()["email"] == "analyst@example.com"
+
+        assert db.user_queries == []
+        assert cache.get_stats()["claims_trusted"] == 3
+
+    def test_me_always_verifies_the_user(self, client, db, monkeypatch):
+        headers = _register(client)
+        monkeypatch.setattr(user_cache, "AUTH_TRUST_CLAIMS_S", 300.0)
+        db.user_queries.clear()
+        response = client.get("/api/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert "created_at" in response.json()
+        assert len(db.user_queries) == 1
+
+    def test_old_token_falls_back_to_lookup(self, client, db, cache, monkeypatch):
+        user_id = _user_id(client, _register(client))
+        monkeypatch.setattr(user_cache, "AUTH_TRUST_CLAIMS_S", 1.0)
+        cache.clear()
+        token = create_access_token(subject=user_id, extra_claims={"email": "analyst@example.com", "iat": int(time.time()) - 60})
+        db.user_queries.clear()
+        assert client.get("/whoami", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert len(db.user_queries) == 1
+        assert cache.get_stats()["claims_trusted"] == 0
+
+    def test_token_without_email_claim_is_looked_up(self, client, db, cache, monkeypatch):
+        user_id = _user_id(client, _register(client))
+        monkeypatch.setattr(user_cache, "AUTH_TRUST_CLAIMS_S", 300.0)
+        cache.clear()
+        token = create_access_token(subject=user_id)
+        db.user_queries.clear()
+        assert client.get("/whoami", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert len(db.user_queries) == 1
@@ -0,0 +1,96 @@
+"""
+Unit tests for the vectorized yield kernel (physics_engine.calculate_yield_batch).
+
+The batch kernel must reproduce the scalar calculate_yield bit-for-bit across
+every crop and every branch of the piecewise model.
+"""
+
+import numpy as np
+import pytest
+
+from physics_engine import (
+    SUPPORTED_CROPS,
+    STAPLE_CROP_PARAMS,
+    calculate_yield,
+    calculate_yield_batch,
+    crop_codes,
+)
+
+
+def _scalar(temp, rain, seed, crop, temp_delta, rain_pct_change):
+    return np.array([
+        calculate_yield(float(t), float(r), int(s), str(c), float(td), float(rp))
+        for t, r, s, c, td, rp in zip(temp, rain, seed, crop, temp_delta, rain_pct_change)
+    ])
+
+
+def _assert_bitwise_equal(actual, expected):
+    assert actual.dtype == np.float64
+    assert np.array_equal(actual.view(np.int64), expected.view(np.int64))
+
+
+def _threshold_rainfall():
+    """Rainfall values exactly on and either side of every crop threshold."""
+    values = [0.0, 1200.0, 1750.0]
+    for params in STAPLE_CROP_PARAMS.values():
+        for key in ("min_rainfall_mm", "optimal_rainfall_min_mm", "optimal_rainfall_max_mm"):
+            v = params[key]
+            values.extend([v, np.nextafter(v, 0.0), np.nextafter(v, np.inf)])
+    return np.array(values)
+
+
+class TestCalculateYieldBatch:
+    @pytest.mark.parametrize("crop", SUPPORTED_CROPS)
+    def test_matches_scalar_random_inputs(self, crop):
+        rng = np.random.default_rng(7)
+        n = 5000
+        temp = rng.uniform(10.0, 45.0, n)
+        rain = rng.uniform(0.0, 4000.0, n)
+        seed = rng.integers(0, 2, n)
+        temp_delta = rng.uniform(-1.0, 5.0, n)
+        rain_pct = rng.uniform(-60.0, 60.0, n)
+        crops = np.full(n, crop)
+
+        batch = calculate_yield_batch(temp, rain, seed, crop, temp_delta, rain_pct)
+        _assert_bitwise_equal(batch, _scalar(temp, rain, seed, crops, temp_delta, rain_pct))
+
+    def test_matches_scalar_on_thresholds(self):
+        rain = _threshold_rainfall()
+        temp = np.array([20.0, 28.0, 31.0, 33.0, 40.0, 80.0])
+        t, r, s, c = np.meshgrid(temp, rain, [0, 1], np.arange(len(SUPPORTED_CROPS)), indexing="ij")
+        t, r, s, c = (a.ravel() for a in (t, r, s, c))
+        names = np.array(SUPPORTED_CROPS)[c]
+        zeros = np.zeros_like(t)
+
+        batch = calculate_yield_batch(t, r, s, names, zeros, zeros)
+        _assert_bitwise_equal(batch, _scalar(t, r, s, names, zeros, zeros))
+
+    def test_mixed_crops_and_integer_codes(self):
+        names = np.array(["Maize", "COCOA", "rice", "soy", "wheat"] * 20)
+        temp = np.linspace(15.0, 42.0, names.size)
+        rain = np.linspace(100.0, 3000.0, names.size)
+
+        by_name = calculate_yield_batch(temp, rain, 1, names)
+        by_code = calculate_yield_batch(temp, rain, 1, crop_codes(names))
+        expected = _scalar(temp, rain, np.ones(names.size), names, np.zeros(names.size), np.zeros(names.size))
+
+        _assert_bitwise_equal(by_name, expected)
+        _assert_bitwise_equal(by_code, expected)
+
+    def test_broadcasts_scalar_location_over_shocks(self):
+        temp_delta = np.array([[0.0], [2.0], [4.0]])
+        rain_pct = np.array([[-20.0, 0.0, 20.0]])
+
+        batch = calculate_yield_batch(30.0, 900.0, 0, "maize", temp_delta, rain_pct)
+
+        assert batch.shape == (3, 3)
+        assert batch[1, 0] == calculate_yield(30.0, 900.0, 0, "maize", 2.0, -20.0)
+
+    def test_extreme_heat_with_no_rain_clamps_to_positive_zero(self):
+        batch = calculate_yield_batch([90.0], [0.0], [0], "maize")
+        assert batch[0] == 0.0
+        assert not np.signbit(batch[0])
+
+    def test_unsupported_crop_raises(self):
+        with pytest.raises(ValueError, match="Unsupported crop_type"):
+            calculate_yield_batch([25.0], [800.0], [0], ["banana"])
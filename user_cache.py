@@ -0,0 +1,152 @@
+"""
+Authenticated User Cache
+========================
+
+``auth.get_current_user`` used to load the user row on every authenticated
+request, so cheap endpoints (/prediction/predict, /flood/predict, ...) paid a
+database round trip — often the dominant latency against Supabase Postgres —
+before doing any work. Two ways to skip that query:
+
+- TTL cache (default): user id -> snapshot of the users row, for
+  AUTH_USER_CACHE_TTL_S seconds (0 disables), at most AUTH_USER_CACHE_SIZE
+  users. Updating or deleting a User through the ORM invalidates its entry
+  in this process; other workers pick the change up within the TTL.
+- Signed claims (opt-in): a token issued less than AUTH_TRUST_CLAIMS_S
+  seconds ago is trusted as-is — the user is built from its ``sub`` and
+  ``email`` claims with no lookup. A deleted user keeps access until their
+  token is older than the window, so keep it short.
+
+Every lookup is counted by how it was resolved; ``get_stats`` reports the
+database queries per authenticated request.
+
+Cached users are returned as fresh transient ``User`` objects, never as an
+instance attached to another request's session.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+
+from models import User
+
+AUTH_USER_CACHE_TTL_S = float(os.environ.get("AUTH_USER_CACHE_TTL_S", "30"))
+AUTH_USER_CACHE_SIZE = int(os.environ.get("AUTH_USER_CACHE_SIZE", "10000"))
+
+# Tokens issued less than this many seconds ago are trusted without a lookup (0 = off)
+AUTH_TRUST_CLAIMS_S = float(os.environ.get("AUTH_TRUST_CLAIMS_S", "0"))
+
+_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+class UserCache:
+    """TTL-bounded LRU of users rows, with lookup counters."""
+
+    def __init__(self, ttl_s: float = AUTH_USER_CACHE_TTL_S, max_size: int = AUTH_USER_CACHE_SIZE):
+        self.ttl_s = ttl_s
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._users: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters = {'requests': 0, 'claims_trusted': 0, 'cache_hits': 0, 'db_queries': 0, 'invalidations': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0 and self.max_size > 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        """A copy of the cached user, or None if absent or expired."""
+        with self._lock:
+            self._counters['requests'] += 1
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if time.monotonic() >= expires_at:
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            self._counters['cache_hits'] += 1
+        return User(**values)
+
+    def put(self, user: User) -> None:
+        """Cache a snapshot of ``user``'s columns."""
+        if not self.enabled:
+            return
+        values = {key: getattr(user, key) for key in _COLUMNS}
+        with self._lock:
+            self._users[user.id] = (time.monotonic() + self.ttl_s, values)
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            if self._users.pop(user_id, None) is not None:
+                self._counters['invalidations'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def record_claims(self) -> None:
+        """Count a request authenticated from token claims alone."""
+        with self._lock:
+            self._counters['requests'] += 1
+            self._counters['claims_trusted'] += 1
+
+    def record_query(self) -> None:
+        """Count a users table query (after a ``get`` miss)."""
+        with self._lock:
+            self._counters['db_queries'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats['size'] = len(self._users)
+        stats['ttl_s'] = self.ttl_s
+        stats['trust_claims_s'] = AUTH_TRUST_CLAIMS_S
+        stats['db_queries_per_request'] = round(stats['db_queries'] / stats['requests'], 4) if stats['requests'] else None
+        return stats
+
+
+# Process-wide cache used by auth.get_current_user
+default_cache = UserCache()
+
+
+def user_from_claims(payload: Dict[str, Any]) -> Optional[User]:
+    """
+    The user described by a decoded token, if signed-claims mode trusts it.
+
+    Args:
+        payload: Verified JWT claims
+
+    Returns:
+        Transient User built from ``sub`` and ``email`` if AUTH_TRUST_CLAIMS_S
+        is set and the token was issued within it, else None
+    """
+    if AUTH_TRUST_CLAIMS_S <= 0:
+        return None
+    issued_at, email = payload.get("iat"), payload.get("email")
+    if issued_at is None or not email or time.time() - float(issued_at) > AUTH_TRUST_CLAIMS_S:
+        return None
+    default_cache.record_claims()
+    return User(id=payload["sub"], email=email)
+
+
+def invalidate(user_id: str) -> None:
+    """Drop ``user_id`` from the process-wide cache."""
+    default_cache.invalidate(user_id)
+
+
+def get_stats() -> Dict[str, Any]:
+    """Statistics for the process-wide cache."""
+    return default_cache.get_stats()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(_mapper, _connection, target: User) -> None:
+    default_cache.invalidate(target.id)